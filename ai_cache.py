@@ -0,0 +1,114 @@
+"""
+Persistent LRU cache of AI fallback decisions.
+
+Maps a normalized utterance to the (function, params) the model chose for it,
+so a phrasing that missed the keyword router is only sent through generate()
+once. The file is tagged with a fingerprint of the model ID, prompt and tool
+schema; if any of those change, the cached decisions are dropped on load.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 512
+
+
+def normalize(text):
+    """Cache key for an utterance: lower-case, single spaces, no edge punctuation."""
+    text = re.sub(r"\s+", " ", text.lower()).strip()
+    return text.strip(" .,!?;:'\"")
+
+
+def fingerprint(*parts):
+    """Stable hash of anything JSON-serializable (model ID, prompt, tool schema)."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class DecisionCache:
+    """Thread-safe LRU of utterance -> (function, params), saved to `path` as JSON."""
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, fingerprint=""):
+        self.path = path
+        self.capacity = max(1, int(capacity))
+        self.fingerprint = fingerprint
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, text):
+        """Return (function, params) for `text`, or None. Counts a hit or a miss."""
+        key = normalize(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            func, params = entry
+            return func, dict(params)
+
+    def put(self, text, func, params):
+        """Remember a decision, evicting the least recently used past `capacity`."""
+        key = normalize(text)
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = (func, dict(params))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    def items(self):
+        """Snapshot of (key, function, params), least recently used first."""
+        with self._lock:
+            return [(k, f, dict(p)) for k, (f, p) in self._entries.items()]
+
+    # ─── Persistence ───
+    def load(self):
+        """Read the cache file. A missing, corrupt or stale (other fingerprint) file starts empty."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("fingerprint") != self.fingerprint:
+            return
+        with self._lock:
+            self._entries.clear()
+            for key, func, params in data.get("entries", [])[-self.capacity:]:
+                self._entries[key] = (func, params)
+
+    def save(self):
+        """Write the cache atomically (temp file + rename). No-op without a path."""
+        if not self.path:
+            return
+        with self._lock:
+            data = {"fingerprint": self.fingerprint,
+                    "entries": [[k, f, p] for k, (f, p) in self._entries.items()]}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with self._save_lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass  # a read-only home directory just means no persistence
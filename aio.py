@@ -0,0 +1,163 @@
+"""
+asyncio execution core.
+
+One event loop runs on a background thread for the whole process (the engine
+loop). Commands are coroutines on it, so many can be in flight at once without
+a thread each:
+
+  run()        awaitable subprocess (asyncio.create_subprocess_*), with a
+               timeout; the process is killed on timeout or cancellation
+  to_thread()  run a blocking function (PowerShell host calls, plain handlers,
+               the model) on a small bounded pool and await the result
+  call()       await a handler, whether it is a coroutine function or not
+  run_sync()   from an ordinary thread: run a coroutine on the engine loop and
+               wait for it (what the synchronous API is built on)
+  submit()     from an ordinary thread: start a coroutine, get a Future back
+
+Fire-and-forget launches (subprocess.Popen of "start ...") need none of this:
+Popen already returns as soon as the process exists.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import locale
+import os
+import signal
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_BLOCKING_WORKERS = 8
+
+_loop = None
+_loop_thread = None
+_executor = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """The engine loop, started on first use."""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _watch_children(_loop)
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="engine-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def _watch_children(loop):
+    """Before 3.12, asyncio on POSIX waits for each child process on a thread of
+    its own; with pidfds (Linux 5.3+) the loop itself is told when one exits."""
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(loop)
+    asyncio.get_event_loop_policy().set_child_watcher(watcher)
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(MAX_BLOCKING_WORKERS, thread_name_prefix="engine-blocking")
+        return _executor
+
+
+def submit(coro):
+    """Schedule `coro` on the engine loop. Returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run_sync(coro, timeout=None):
+    """Run `coro` on the engine loop and wait for its result. Not for use on the loop itself."""
+    get_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() called on the engine loop; await the coroutine instead")
+    return submit(coro).result(timeout)
+
+
+async def to_thread(fn, *args, **kwargs):
+    """Await `fn(*args, **kwargs)` run on the bounded blocking pool, in a copy of the caller's context."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+
+
+async def call(fn, *args, **kwargs):
+    """Await a handler: coroutine functions run on the loop, plain functions on the blocking pool."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    result = await to_thread(fn, *args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def _decode(data):
+    return data.decode(locale.getpreferredencoding(False), errors="replace") if data is not None else None
+
+
+async def run(cmd, timeout=None, capture_output=True, on_line=None):
+    """Awaitable subprocess.run(cmd, shell=True or argv list, text=True). Returns a CompletedProcess.
+
+    Raises subprocess.TimeoutExpired after `timeout` seconds; the process and
+    its children are killed then, and also if the awaiting task is cancelled.
+    With `on_line`, it is called with each line of stdout as it arrives.
+    """
+    pipe = subprocess.PIPE if capture_output else None
+    # Own process group, so a kill reaches what the shell started too
+    group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True}
+    if isinstance(cmd, str):
+        proc = await asyncio.create_subprocess_shell(cmd, stdout=pipe, stderr=pipe, **group)
+    else:
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=pipe, stderr=pipe, **group)
+    try:
+        if on_line is not None and capture_output:
+            out, err = await asyncio.wait_for(_communicate_lines(proc, on_line), timeout)
+        else:
+            out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill(proc)
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except asyncio.CancelledError:
+        await asyncio.shield(_kill(proc))  # reap it (no zombie), though this task is being cancelled
+        raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, _decode(out), _decode(err))
+
+
+async def _communicate_lines(proc, on_line):
+    """proc.communicate(), passing each stdout line to `on_line` on the way."""
+    lines = []
+
+    async def read_stdout():
+        async for raw in proc.stdout:
+            lines.append(raw)
+            on_line(_decode(raw).rstrip("\r\n"))
+
+    _, err = await asyncio.gather(read_stdout(), proc.stderr.read())
+    await proc.wait()
+    return b"".join(lines), err
+
+
+async def _kill(proc):
+    """Kill `proc` and everything it started (which would otherwise hold its pipes open), and reap it."""
+    try:
+        if os.name == "nt":
+            # taskkill is a process too: await it rather than block the loop
+            killer = await asyncio.create_subprocess_exec(
+                "taskkill", "/T", "/F", "/PID", str(proc.pid),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            await killer.wait()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, OSError):
+        pass  # already exited
+    await proc.wait()
@@ -1,359 +1,554 @@
-"""
-Laptop Control Assistant — Modern Dark UI
-Run:  python app.py
-"""
-import tkinter as tk
-from tkinter import ttk
-import threading
-import time
-import main as engine  # import the backend
-
-# ═══════════════════════════════════════════════════════
-#  COLORS & THEME
-# ═══════════════════════════════════════════════════════
-BG          = "#1a1a2e"
-BG_DARK     = "#16213e"
-BG_CARD     = "#0f3460"
-BG_INPUT    = "#1f2940"
-ACCENT      = "#e94560"
-ACCENT_HOVER= "#ff6b81"
-TEXT        = "#eaeaea"
-TEXT_DIM    = "#8899aa"
-TEXT_USER   = "#53d8fb"
-TEXT_BOT    = "#a8e6cf"
-TEXT_ERR    = "#ff6b6b"
-BORDER      = "#2a3a5c"
-SUCCESS     = "#00d26a"
-
-FONT        = ("Segoe UI", 11)
-FONT_BOLD   = ("Segoe UI", 11, "bold")
-FONT_TITLE  = ("Segoe UI", 16, "bold")
-FONT_SMALL  = ("Segoe UI", 9)
-FONT_CHAT   = ("Consolas", 11)
-FONT_BTN    = ("Segoe UI", 9, "bold")
-
-
-class LaptopAssistantApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Laptop Control Assistant")
-        self.root.geometry("1050x720")
-        self.root.minsize(800, 550)
-        self.root.configure(bg=BG)
-
-        # Try to set icon (ignore if fails)
-        try:
-            self.root.iconbitmap(default="")
-        except:
-            pass
-
-        self.model_loaded = False
-        self._build_ui()
-        self._add_welcome()
-
-        # Load model in background
-        threading.Thread(target=self._load_model_bg, daemon=True).start()
-
-    # ───────────────────────────────────────────────
-    #  BUILD UI
-    # ───────────────────────────────────────────────
-    def _build_ui(self):
-        # ── Title bar ──
-        title_frame = tk.Frame(self.root, bg=BG_DARK, height=50)
-        title_frame.pack(fill=tk.X)
-        title_frame.pack_propagate(False)
-
-        tk.Label(title_frame, text="⚡", font=("Segoe UI", 20), bg=BG_DARK, fg=ACCENT).pack(side=tk.LEFT, padx=(15, 5))
-        tk.Label(title_frame, text="Laptop Control Assistant", font=FONT_TITLE, bg=BG_DARK, fg=TEXT).pack(side=tk.LEFT)
-
-        self.status_label = tk.Label(title_frame, text="⏳ Loading AI model...", font=FONT_SMALL, bg=BG_DARK, fg=TEXT_DIM)
-        self.status_label.pack(side=tk.RIGHT, padx=15)
-
-        # ── Main area (chat + sidebar) ──
-        main_frame = tk.Frame(self.root, bg=BG)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=0, pady=0)
-
-        # ── Sidebar (quick actions) — scrollable ──
-        sidebar_outer = tk.Frame(main_frame, bg=BG_DARK, width=210)
-        sidebar_outer.pack(side=tk.RIGHT, fill=tk.Y, padx=(1, 0))
-        sidebar_outer.pack_propagate(False)
-
-        tk.Label(sidebar_outer, text="Quick Actions", font=FONT_BOLD, bg=BG_DARK, fg=TEXT).pack(pady=(10, 4))
-
-        # Scrollable canvas for sidebar buttons
-        sidebar_canvas = tk.Canvas(sidebar_outer, bg=BG_DARK, highlightthickness=0, width=195)
-        sidebar_scroll = ttk.Scrollbar(sidebar_outer, orient=tk.VERTICAL, command=sidebar_canvas.yview)
-        sidebar_inner = tk.Frame(sidebar_canvas, bg=BG_DARK)
-
-        sidebar_inner.bind("<Configure>", lambda e: sidebar_canvas.configure(scrollregion=sidebar_canvas.bbox("all")))
-        sidebar_canvas.create_window((0, 0), window=sidebar_inner, anchor="nw")
-        sidebar_canvas.configure(yscrollcommand=sidebar_scroll.set)
-
-        sidebar_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        sidebar_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # Mouse wheel scrolling
-        def _on_sidebar_mousewheel(event):
-            sidebar_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        sidebar_canvas.bind_all("<MouseWheel>", _on_sidebar_mousewheel)
-
-        # Quick action buttons — organized by category
-        quick_actions = [
-            ("⚡ Connectivity", None, True),
-            ("Bluetooth ON",     "turn on bluetooth"),
-            ("Bluetooth OFF",    "turn off bluetooth"),
-            ("WiFi ON",          "turn on wifi"),
-            ("WiFi OFF",         "turn off wifi"),
-            ("Hotspot",          "open hotspot settings"),
-            ("Airplane Mode",    "open airplane settings"),
-
-            ("🔊 Audio & Media", None, True),
-            ("Mute / Unmute",    "mute"),
-            ("Volume 50%",       "set volume to 50"),
-            ("Volume 100%",      "set volume to 100"),
-            ("⏯ Play/Pause",    "play pause"),
-            ("⏭ Next Track",    "next track"),
-            ("⏮ Prev Track",    "previous track"),
-
-            ("💡 Display", None, True),
-            ("Brightness 30%",   "brightness to 30"),
-            ("Brightness 70%",   "brightness to 70"),
-            ("Dark Mode",        "turn on dark mode"),
-            ("Light Mode",       "turn on light mode"),
-            ("Night Light",      "turn on night light"),
-
-            ("🪟 Windows", None, True),
-            ("Minimize All",     "minimize all windows"),
-            ("Restore All",      "restore all windows"),
-            ("Snap Left",        "snap window left"),
-            ("Snap Right",       "snap window right"),
-            ("New Desktop",      "new virtual desktop"),
-            ("Task View",        "task view"),
-
-            ("🖥️ System", None, True),
-            ("Screenshot",       "take a screenshot"),
-            ("Lock Screen",      "lock my laptop"),
-            ("Sleep",            "sleep my laptop"),
-            ("Restart",          "restart my laptop"),
-            ("Cancel Shutdown",  "cancel shutdown"),
-
-            ("📊 Info", None, True),
-            ("Battery Level",    "battery level"),
-            ("System Info",      "system info"),
-            ("CPU Usage",        "cpu usage"),
-            ("RAM Usage",        "ram usage"),
-            ("Disk Space",       "disk space"),
-            ("My IP Address",    "my ip address"),
-            ("Uptime",           "uptime"),
-
-            ("🔒 Security", None, True),
-            ("Quick Virus Scan", "quick virus scan"),
-            ("Windows Update",   "check for updates"),
-            ("Clear Temp Files", "clear temp files"),
-            ("Disk Cleanup",     "disk cleanup"),
-            ("Empty Recycle Bin","empty recycle bin"),
-
-            ("📂 Folders", None, True),
-            ("Downloads",        "open downloads"),
-            ("Documents",        "open documents"),
-            ("Desktop",          "open desktop"),
-            ("File Explorer",    "open file explorer"),
-
-            ("🛠️ Tools", None, True),
-            ("Task Manager",     "open task manager"),
-            ("Running Apps",     "list running apps"),
-            ("Emoji Panel",      "open emoji panel"),
-            ("On-Screen KB",     "on-screen keyboard"),
-            ("Speed Test",       "speed test"),
-            ("Date & Time",      "what time is it"),
-            ("Open Settings",    "open settings"),
-
-            ("⚡ Power", None, True),
-            ("High Performance", "power plan high performance"),
-            ("Power Saver",      "power plan power saver"),
-            ("Balanced",         "power plan balanced"),
-        ]
-
-        for item in quick_actions:
-            if len(item) == 3:
-                # Section header
-                tk.Label(sidebar_inner, text=item[0], font=FONT_SMALL, bg=BG_DARK, fg=TEXT_DIM).pack(
-                    anchor=tk.W, padx=10, pady=(8, 2))
-            else:
-                label, cmd = item
-                btn = tk.Button(
-                    sidebar_inner, text=label, font=FONT_BTN,
-                    bg=BG_CARD, fg=TEXT, activebackground=ACCENT, activeforeground="white",
-                    bd=0, relief=tk.FLAT, cursor="hand2", padx=8, pady=3,
-                    command=lambda c=cmd: self._send_command(c)
-                )
-                btn.pack(fill=tk.X, padx=8, pady=1)
-                btn.bind("<Enter>", lambda e, b=btn: b.config(bg=ACCENT))
-                btn.bind("<Leave>", lambda e, b=btn: b.config(bg=BG_CARD))
-
-        # ── Chat area ──
-        chat_frame = tk.Frame(main_frame, bg=BG)
-        chat_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # Chat display
-        self.chat_display = tk.Text(
-            chat_frame, wrap=tk.WORD, font=FONT_CHAT,
-            bg=BG, fg=TEXT, bd=0, padx=15, pady=10,
-            insertbackground=TEXT, selectbackground=ACCENT,
-            state=tk.DISABLED, cursor="arrow", spacing3=4
-        )
-        self.chat_display.pack(fill=tk.BOTH, expand=True, padx=(5, 0))
-
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self.chat_display, orient=tk.VERTICAL, command=self.chat_display.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.chat_display.config(yscrollcommand=scrollbar.set)
-
-        # Chat tags
-        self.chat_display.tag_config("user", foreground=TEXT_USER, font=("Consolas", 11, "bold"))
-        self.chat_display.tag_config("bot", foreground=TEXT_BOT)
-        self.chat_display.tag_config("action", foreground=SUCCESS)
-        self.chat_display.tag_config("error", foreground=TEXT_ERR)
-        self.chat_display.tag_config("dim", foreground=TEXT_DIM, font=("Consolas", 9))
-        self.chat_display.tag_config("welcome", foreground=TEXT_DIM, font=("Consolas", 10))
-
-        # ── Input area ──
-        input_frame = tk.Frame(self.root, bg=BG_DARK, height=55)
-        input_frame.pack(fill=tk.X, side=tk.BOTTOM)
-        input_frame.pack_propagate(False)
-
-        inner = tk.Frame(input_frame, bg=BG_DARK)
-        inner.pack(fill=tk.BOTH, expand=True, padx=12, pady=10)
-
-        self.input_var = tk.StringVar()
-        self.input_entry = tk.Entry(
-            inner, textvariable=self.input_var,
-            font=FONT, bg=BG_INPUT, fg=TEXT, bd=0,
-            insertbackground=TEXT, selectbackground=ACCENT,
-            relief=tk.FLAT
-        )
-        self.input_entry.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, ipady=6, padx=(5, 8))
-        self.input_entry.bind("<Return>", lambda e: self._on_send())
-
-        self.send_btn = tk.Button(
-            inner, text="  Send ▶  ", font=FONT_BOLD,
-            bg=ACCENT, fg="white", activebackground=ACCENT_HOVER,
-            bd=0, relief=tk.FLAT, cursor="hand2", padx=15,
-            command=self._on_send
-        )
-        self.send_btn.pack(side=tk.RIGHT)
-        self.send_btn.bind("<Enter>", lambda e: self.send_btn.config(bg=ACCENT_HOVER))
-        self.send_btn.bind("<Leave>", lambda e: self.send_btn.config(bg=ACCENT))
-
-        # Focus input
-        self.input_entry.focus_set()
-
-    # ───────────────────────────────────────────────
-    #  WELCOME MESSAGE
-    # ───────────────────────────────────────────────
-    def _add_welcome(self):
-        self._append_chat("  ⚡ Laptop Control Assistant\n", "user")
-        self._append_chat(
-            "  Control EVERYTHING on your laptop with plain English!\n\n"
-            "  ⚡ Connectivity   \"turn on bluetooth\"  \"turn off wifi\"  \"open hotspot\"\n"
-            "  🔊 Audio          \"volume to 70\"  \"mute\"  \"next track\"  \"play/pause\"\n"
-            "  💡 Display         \"brightness 50\"  \"dark mode\"  \"night light\"\n"
-            "  🪟 Windows        \"minimize all\"  \"snap left\"  \"new desktop\"  \"task view\"\n"
-            "  🖥️ System         \"screenshot\"  \"lock\"  \"sleep\"  \"shutdown\"  \"restart\"\n"
-            "  📊 Info            \"battery level\"  \"cpu usage\"  \"ram usage\"  \"disk space\"\n"
-            "  🌐 Network        \"my ip\"  \"speed test\"  \"flush dns\"  \"wifi password\"\n"
-            "  📂 Files           \"open downloads\"  \"empty recycle bin\"  \"create folder\"\n"
-            "  🔒 Security       \"virus scan\"  \"update windows\"  \"clear temp\"\n"
-            "  🛠️ Apps            \"open chrome\"  \"close notepad\"  \"running apps\"\n"
-            "  🔍 Web             \"search for AI news\"  \"open youtube.com\"\n"
-            "  ⚡ Power           \"high performance\"  \"power saver\"  \"hibernate\"\n\n"
-            "  Type anything or use the Quick Action buttons on the right →\n\n",
-            "welcome"
-        )
-
-    # ───────────────────────────────────────────────
-    #  MODEL LOADING
-    # ───────────────────────────────────────────────
-    def _load_model_bg(self):
-        try:
-            engine.load_model()
-            self.model_loaded = True
-            self.root.after(0, lambda: self.status_label.config(text="✅ AI model ready", fg=SUCCESS))
-        except Exception as e:
-            self.root.after(0, lambda: self.status_label.config(text=f"⚠️ Model error: {e}", fg=TEXT_ERR))
-
-    # ───────────────────────────────────────────────
-    #  SEND COMMAND
-    # ───────────────────────────────────────────────
-    def _on_send(self):
-        text = self.input_var.get().strip()
-        if not text:
-            return
-        self._send_command(text)
-
-    def _send_command(self, text):
-        self.input_var.set("")
-        self._append_chat(f"  You ▶  {text}\n", "user")
-        self.input_entry.config(state=tk.DISABLED)
-        self.send_btn.config(state=tk.DISABLED, text="  ⏳...  ")
-        self.status_label.config(text="⏳ Processing...", fg=TEXT_DIM)
-
-        # Run in background thread
-        threading.Thread(target=self._execute_bg, args=(text,), daemon=True).start()
-
-    def _execute_bg(self, text):
-        try:
-            responses = engine.process_command(text)
-            self.root.after(0, lambda: self._show_responses(responses))
-        except Exception as e:
-            self.root.after(0, lambda: self._show_responses([f"  ❌ Error: {e}"]))
-
-    def _show_responses(self, responses):
-        for resp in responses:
-            if "->" in resp:
-                self._append_chat(f"  ✅ {resp.strip()}\n", "action")
-            elif "[AI" in resp or "Thinking" in resp:
-                self._append_chat(f"  {resp.strip()}\n", "dim")
-            elif "Error" in resp or "Unknown" in resp:
-                self._append_chat(f"  {resp.strip()}\n", "error")
-            else:
-                self._append_chat(f"  {resp.strip()}\n", "bot")
-
-        if not responses:
-            self._append_chat("  ⚠️ No response\n", "error")
-
-        self._append_chat("\n", "dim")
-        self.input_entry.config(state=tk.NORMAL)
-        self.send_btn.config(state=tk.NORMAL, text="  Send ▶  ")
-        self.status_label.config(text="✅ AI model ready" if self.model_loaded else "⏳ Loading AI model...",
-                                  fg=SUCCESS if self.model_loaded else TEXT_DIM)
-        self.input_entry.focus_set()
-
-    # ───────────────────────────────────────────────
-    #  CHAT DISPLAY
-    # ───────────────────────────────────────────────
-    def _append_chat(self, text, tag=None):
-        self.chat_display.config(state=tk.NORMAL)
-        if tag:
-            self.chat_display.insert(tk.END, text, tag)
-        else:
-            self.chat_display.insert(tk.END, text)
-        self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
-
-
-# ═══════════════════════════════════════════════════════
-#  MAIN
-# ═══════════════════════════════════════════════════════
-if __name__ == "__main__":
-    root = tk.Tk()
-
-    # Style the scrollbar
-    style = ttk.Style()
-    style.theme_use("clam")
-    style.configure("Vertical.TScrollbar",
-                    background=BG_CARD, troughcolor=BG,
-                    bordercolor=BG, arrowcolor=TEXT_DIM)
-
-    app = LaptopAssistantApp(root)
-    root.mainloop()
+"""
+Laptop Control Assistant — Modern Dark UI
+Run:  python app.py
+"""
+import collections
+import contextlib
+import os
+import tkinter as tk
+from tkinter import ttk
+import threading
+import time
+import chat_history
+import command_queue
+import main as engine  # import the backend
+
+# ═══════════════════════════════════════════════════════
+#  COLORS & THEME
+# ═══════════════════════════════════════════════════════
+BG          = "#1a1a2e"
+BG_DARK     = "#16213e"
+BG_CARD     = "#0f3460"
+BG_INPUT    = "#1f2940"
+ACCENT      = "#e94560"
+ACCENT_HOVER= "#ff6b81"
+TEXT        = "#eaeaea"
+TEXT_DIM    = "#8899aa"
+TEXT_USER   = "#53d8fb"
+TEXT_BOT    = "#a8e6cf"
+TEXT_ERR    = "#ff6b6b"
+BORDER      = "#2a3a5c"
+SUCCESS     = "#00d26a"
+
+FONT        = ("Segoe UI", 11)
+FONT_BOLD   = ("Segoe UI", 11, "bold")
+FONT_TITLE  = ("Segoe UI", 16, "bold")
+FONT_SMALL  = ("Segoe UI", 9)
+FONT_CHAT   = ("Consolas", 11)
+FONT_BTN    = ("Segoe UI", 9, "bold")
+
+FRAME_MS    = 16   # streamed output is drawn at most once per frame
+PIN_LABEL_MAX = 24  # pinned buttons are labelled with the command, cut to this many characters
+
+
+class LaptopAssistantApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Laptop Control Assistant")
+        self.root.geometry("1050x720")
+        self.root.minsize(800, 550)
+        self.root.configure(bg=BG)
+
+        # Try to set icon (ignore if fails)
+        try:
+            self.root.iconbitmap(default="")
+        except:
+            pass
+
+        self.model_loaded = False
+        # Commands run on the engine loop, a few at a time (see command_queue.py)
+        self.commands = command_queue.CommandQueue(
+            engine.handle_command,
+            workers=int(os.environ.get("LAPTOP_ASSISTANT_UI_WORKERS", command_queue.DEFAULT_WORKERS)),
+            is_fast=lambda text: engine.plan_for(text) is not None or engine.route(text) is not None,
+            on_change=lambda command: self._on_event(command, None),
+        )
+        # Events and state changes from the engine's threads, drawn by one root.after per frame
+        self._pending = collections.deque()
+        self._flush_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._rows = {}             # command id -> {"entry": history entry, "mid_line": drawing model tokens, "shown": events drawn}
+        self._gone = set()          # ids of commands whose rows were archived
+        # Only the latest entries stay in the widget; older ones go to disk (see chat_history.py)
+        try:
+            os.makedirs(engine.STATE_DIR, exist_ok=True)
+        except OSError:
+            pass
+        self.history = chat_history.ChatHistory(
+            engine.state_path("chat_history.jsonl"),
+            max_entries=int(os.environ.get("LAPTOP_ASSISTANT_CHAT_ENTRIES", chat_history.DEFAULT_MAX_ENTRIES)),
+            max_lines=int(os.environ.get("LAPTOP_ASSISTANT_CHAT_LINES", chat_history.DEFAULT_MAX_LINES)),
+        )
+        self._edit_depth = 0
+        self._follow = True         # the view was at the bottom when the current edit began
+        self._paging = False
+        self._build_ui()
+        self._add_welcome()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Load model in background
+        threading.Thread(target=self._load_model_bg, daemon=True).start()
+        # Have system info sampled before it is asked for (it pauses when nobody asks)
+        engine.telemetry_sampler.start()
+
+    # ───────────────────────────────────────────────
+    #  BUILD UI
+    # ───────────────────────────────────────────────
+    def _build_ui(self):
+        # ── Title bar ──
+        title_frame = tk.Frame(self.root, bg=BG_DARK, height=50)
+        title_frame.pack(fill=tk.X)
+        title_frame.pack_propagate(False)
+
+        tk.Label(title_frame, text="⚡", font=("Segoe UI", 20), bg=BG_DARK, fg=ACCENT).pack(side=tk.LEFT, padx=(15, 5))
+        tk.Label(title_frame, text="Laptop Control Assistant", font=FONT_TITLE, bg=BG_DARK, fg=TEXT).pack(side=tk.LEFT)
+
+        self.status_label = tk.Label(title_frame, text="⏳ Loading AI model...", font=FONT_SMALL, bg=BG_DARK, fg=TEXT_DIM)
+        self.status_label.pack(side=tk.RIGHT, padx=15)
+
+        # ── Main area (chat + sidebar) ──
+        main_frame = tk.Frame(self.root, bg=BG)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=0, pady=0)
+
+        # ── Sidebar (quick actions) — scrollable ──
+        sidebar_outer = tk.Frame(main_frame, bg=BG_DARK, width=210)
+        sidebar_outer.pack(side=tk.RIGHT, fill=tk.Y, padx=(1, 0))
+        sidebar_outer.pack_propagate(False)
+
+        tk.Label(sidebar_outer, text="Quick Actions", font=FONT_BOLD, bg=BG_DARK, fg=TEXT).pack(pady=(10, 4))
+
+        # Scrollable canvas for sidebar buttons
+        sidebar_canvas = tk.Canvas(sidebar_outer, bg=BG_DARK, highlightthickness=0, width=195)
+        sidebar_scroll = ttk.Scrollbar(sidebar_outer, orient=tk.VERTICAL, command=sidebar_canvas.yview)
+        sidebar_inner = tk.Frame(sidebar_canvas, bg=BG_DARK)
+
+        sidebar_inner.bind("<Configure>", lambda e: sidebar_canvas.configure(scrollregion=sidebar_canvas.bbox("all")))
+        sidebar_canvas.create_window((0, 0), window=sidebar_inner, anchor="nw")
+        sidebar_canvas.configure(yscrollcommand=sidebar_scroll.set)
+
+        sidebar_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        sidebar_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Mouse wheel scrolling
+        def _on_sidebar_mousewheel(event):
+            sidebar_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        sidebar_canvas.bind_all("<MouseWheel>", _on_sidebar_mousewheel)
+
+        # Buttons the user pinned (right-click one to unpin), then the built-in ones by category
+        self.pinned_frame = tk.Frame(sidebar_inner, bg=BG_DARK)
+        self.pinned_frame.pack(fill=tk.X)
+        self._draw_pinned()
+
+        # Resolved to intents once, here: a click runs the handler without parsing any text
+        for item in engine.registry.quick_actions():
+            if isinstance(item, tuple):
+                # Section header
+                tk.Label(sidebar_inner, text=item[0], font=FONT_SMALL, bg=BG_DARK, fg=TEXT_DIM).pack(
+                    anchor=tk.W, padx=10, pady=(8, 2))
+            else:
+                self._quick_button(sidebar_inner, item)
+
+        # ── Chat area ──
+        chat_frame = tk.Frame(main_frame, bg=BG)
+        chat_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Chat display
+        self.chat_display = tk.Text(
+            chat_frame, wrap=tk.WORD, font=FONT_CHAT,
+            bg=BG, fg=TEXT, bd=0, padx=15, pady=10,
+            insertbackground=TEXT, selectbackground=ACCENT,
+            state=tk.DISABLED, cursor="arrow", spacing3=4
+        )
+        self.chat_display.pack(fill=tk.BOTH, expand=True, padx=(5, 0))
+
+        # Scrollbar
+        self.chat_scrollbar = ttk.Scrollbar(self.chat_display, orient=tk.VERTICAL, command=self.chat_display.yview)
+        self.chat_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.chat_display.config(yscrollcommand=self._on_chat_scroll)
+        # Scrolling up past the top pages archived history back in
+        self.chat_display.bind("<MouseWheel>", lambda e: self._maybe_page_in() if e.delta > 0 else None, add="+")
+        self.chat_display.bind("<Button-4>", lambda e: self._maybe_page_in(), add="+")
+
+        # Chat tags
+        self.chat_display.tag_config("user", foreground=TEXT_USER, font=("Consolas", 11, "bold"))
+        self.chat_display.tag_config("bot", foreground=TEXT_BOT)
+        self.chat_display.tag_config("action", foreground=SUCCESS)
+        self.chat_display.tag_config("error", foreground=TEXT_ERR)
+        self.chat_display.tag_config("dim", foreground=TEXT_DIM, font=("Consolas", 9))
+        self.chat_display.tag_config("welcome", foreground=TEXT_DIM, font=("Consolas", 10))
+        self.chat_display.tag_config("link", foreground=ACCENT, font=("Consolas", 9, "underline"))
+
+        # ── Input area ──
+        input_frame = tk.Frame(self.root, bg=BG_DARK, height=55)
+        input_frame.pack(fill=tk.X, side=tk.BOTTOM)
+        input_frame.pack_propagate(False)
+
+        inner = tk.Frame(input_frame, bg=BG_DARK)
+        inner.pack(fill=tk.BOTH, expand=True, padx=12, pady=10)
+
+        self.input_var = tk.StringVar()
+        self.input_entry = tk.Entry(
+            inner, textvariable=self.input_var,
+            font=FONT, bg=BG_INPUT, fg=TEXT, bd=0,
+            insertbackground=TEXT, selectbackground=ACCENT,
+            relief=tk.FLAT
+        )
+        self.input_entry.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, ipady=6, padx=(5, 8))
+        self.input_entry.bind("<Return>", lambda e: self._on_send())
+
+        self.send_btn = tk.Button(
+            inner, text="  Send ▶  ", font=FONT_BOLD,
+            bg=ACCENT, fg="white", activebackground=ACCENT_HOVER,
+            bd=0, relief=tk.FLAT, cursor="hand2", padx=15,
+            command=self._on_send
+        )
+        self.send_btn.pack(side=tk.RIGHT)
+        self.send_btn.bind("<Enter>", lambda e: self.send_btn.config(bg=ACCENT_HOVER))
+        self.send_btn.bind("<Leave>", lambda e: self.send_btn.config(bg=ACCENT))
+
+        # Focus input
+        self.input_entry.focus_set()
+
+    def _quick_button(self, parent, action):
+        btn = tk.Button(
+            parent, text=action.label, font=FONT_BTN,
+            bg=BG_CARD, fg=TEXT, activebackground=ACCENT, activeforeground="white",
+            bd=0, relief=tk.FLAT, cursor="hand2", padx=8, pady=3,
+            command=lambda a=action: self._run_quick(a)
+        )
+        btn.pack(fill=tk.X, padx=8, pady=1)
+        btn.bind("<Enter>", lambda e, b=btn: b.config(bg=ACCENT))
+        btn.bind("<Leave>", lambda e, b=btn: b.config(bg=BG_CARD))
+        return btn
+
+    def _draw_pinned(self):
+        for child in self.pinned_frame.winfo_children():
+            child.destroy()
+        pinned = engine.pinned_actions.items()
+        if not pinned:
+            return
+        tk.Label(self.pinned_frame, text="📌 Pinned", font=FONT_SMALL, bg=BG_DARK, fg=TEXT_DIM).pack(
+            anchor=tk.W, padx=10, pady=(8, 2))
+        for action in pinned:
+            btn = self._quick_button(self.pinned_frame, action)
+            btn.bind("<Button-3>", lambda e, a=action: self._unpin(a))
+
+    # ───────────────────────────────────────────────
+    #  WELCOME MESSAGE
+    # ───────────────────────────────────────────────
+    def _add_welcome(self):
+        self._append_entry([("  ⚡ Laptop Control Assistant\n", "user"), (
+            "  Control EVERYTHING on your laptop with plain English!\n\n"
+            "  ⚡ Connectivity   \"turn on bluetooth\"  \"turn off wifi\"  \"open hotspot\"\n"
+            "  🔊 Audio          \"volume to 70\"  \"mute\"  \"next track\"  \"play/pause\"\n"
+            "  💡 Display         \"brightness 50\"  \"dark mode\"  \"night light\"\n"
+            "  🪟 Windows        \"minimize all\"  \"snap left\"  \"new desktop\"  \"task view\"\n"
+            "  🖥️ System         \"screenshot\"  \"lock\"  \"sleep\"  \"shutdown\"  \"restart\"\n"
+            "  📊 Info            \"battery level\"  \"cpu usage\"  \"ram usage\"  \"disk space\"\n"
+            "  🌐 Network        \"my ip\"  \"speed test\"  \"flush dns\"  \"wifi password\"\n"
+            "  📂 Files           \"open downloads\"  \"empty recycle bin\"  \"create folder\"\n"
+            "  🔒 Security       \"virus scan\"  \"update windows\"  \"clear temp\"\n"
+            "  🛠️ Apps            \"open chrome\"  \"close notepad\"  \"running apps\"\n"
+            "  🔍 Web             \"search for AI news\"  \"open youtube.com\"\n"
+            "  ⚡ Power           \"high performance\"  \"power saver\"  \"hibernate\"\n\n"
+            "  Type anything or use the Quick Action buttons on the right →\n\n",
+            "welcome"
+        )], keep=False)
+
+    # ───────────────────────────────────────────────
+    #  MODEL LOADING
+    # ───────────────────────────────────────────────
+    def _load_model_bg(self):
+        # Spin up a PowerShell host now so the first click doesn't pay its cold start
+        try:
+            engine.get_ps_pool().start()
+        except OSError:
+            pass
+        try:
+            engine.load_model()
+            self.model_loaded = True
+            self.root.after(0, lambda: self.status_label.config(text="✅ AI model ready", fg=SUCCESS))
+        except Exception as e:
+            self.root.after(0, lambda: self.status_label.config(text=f"⚠️ Model error: {e}", fg=TEXT_ERR))
+
+    # ───────────────────────────────────────────────
+    #  SEND COMMAND
+    # ───────────────────────────────────────────────
+    def _on_send(self):
+        text = self.input_var.get().strip()
+        if not text:
+            return
+        self._send_command(text)
+
+    def _send_command(self, text):
+        # Queued on the engine's event loop; nothing here waits for it, so
+        # quick actions can be sent (and overtake) while a slow one runs
+        self.input_var.set("")
+        self.commands.submit(text, listener=self._on_event)
+        self.input_entry.focus_set()
+
+    def _run_quick(self, action):
+        self.commands.submit(action.label, listener=self._on_event,
+                             run=lambda channel: engine.handle_intent(action.intent, action.args, channel))
+
+    def _cancel_command(self, command):
+        self.commands.cancel(command)
+
+    def _pin_command(self, command):
+        """Pin what a finished command resolved to as a sidebar button labelled with its text."""
+        intent, args = command.channel.calls[0]
+        label = command.text if len(command.text) <= PIN_LABEL_MAX else command.text[:PIN_LABEL_MAX - 1] + "…"
+        try:
+            engine.pinned_actions.pin(label, intent, args)
+        except ValueError:
+            return
+        self._draw_pinned()
+
+    def _unpin(self, action):
+        if engine.pinned_actions.unpin(action.label):
+            self._draw_pinned()
+
+    def _on_event(self, command, event):
+        """Channel listener and queue on_change (engine threads): queue it and make sure a frame is scheduled.
+
+        `event` is None for a change of the command's state.
+        """
+        self._pending.append((command, event))
+        with self._flush_lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.root.after(FRAME_MS, self._flush_events)
+
+    def _flush_events(self):
+        """Draw everything queued since the last frame: one insert per command with output."""
+        with self._flush_lock:
+            self._flush_scheduled = False
+        pieces, changed = {}, {}
+        with self._editing():
+            while self._pending:
+                command, event = self._pending.popleft()
+                if command.id in self._gone:
+                    continue
+                row = self._rows.get(command.id) or self._add_row(command)
+                if event is None:
+                    changed[command.id] = command
+                elif command.state != command_queue.CANCELLED:
+                    row["shown"] += 1
+                    pieces.setdefault(command.id, []).extend(self._event_pieces(row, event))
+            for command_id, out in pieces.items():
+                self._insert_chat(f"out{command_id}", out, self._rows[command_id]["entry"])
+            for command in changed.values():
+                self._update_row(command)
+        self._update_status()
+
+    def _event_pieces(self, row, event):
+        """(text, tag) pieces that draw `event` below its command."""
+        if event.severity == "token":
+            start = [] if row["mid_line"] else [("  ", "dim")]
+            row["mid_line"] = True
+            return start + [(event.message, "dim")]
+        pieces = []
+        if row["mid_line"]:
+            pieces.append(("\n", "dim"))
+            row["mid_line"] = False
+        message = event.message.strip() if event.severity != "output" else event.message.rstrip()
+        if event.severity == "action":
+            pieces.append((f"  ✅ {message}\n", "action"))
+        elif event.severity in ("note", "output"):
+            pieces.append((f"  {message}\n", "dim"))
+        elif event.severity == "error":
+            pieces.append((f"  {message}\n", "error"))
+        else:
+            pieces.append((f"  {message}\n", "bot"))
+        return pieces
+
+    # ─── Per-command rows: "You ▶ text", a status line, then its output ───
+    def _add_row(self, command):
+        cancel, pin = f"cancel{command.id}", f"pin{command.id}"
+        self.chat_display.tag_bind(cancel, "<Button-1>", lambda e, c=command: self._cancel_command(c))
+        self.chat_display.tag_bind(pin, "<Button-1>", lambda e, c=command: self._pin_command(c))
+        for link in (cancel, pin):
+            self.chat_display.tag_bind(link, "<Enter>", lambda e: self.chat_display.config(cursor="hand2"))
+            self.chat_display.tag_bind(link, "<Leave>", lambda e: self.chat_display.config(cursor="arrow"))
+        with self._editing():
+            entry = self._append_entry([(f"  You ▶  {command.text}\n", "user")] + self._status_pieces(command)
+                                       + [("\n", "dim"), ("\n", "dim")], done=False)
+            # Output goes in just above the blank separator line, in order
+            self.chat_display.mark_set(f"out{command.id}", "end-2c")
+            self.chat_display.mark_gravity(f"out{command.id}", tk.RIGHT)
+        row = self._rows[command.id] = {"entry": entry, "mid_line": False, "shown": 0}
+        return row
+
+    def _remove_row(self, entry_id):
+        """Forget the command row drawn as history entry `entry_id` (it left the widget)."""
+        for command_id, row in list(self._rows.items()):
+            if row["entry"] == entry_id:
+                del self._rows[command_id]
+                self._gone.add(command_id)
+                self.chat_display.tag_delete(f"status{command_id}", f"cancel{command_id}", f"pin{command_id}")
+                self.chat_display.mark_unset(f"out{command_id}")
+
+    def _status_pieces(self, command):
+        status, cancel = f"status{command.id}", f"cancel{command.id}"
+        text = {
+            command_queue.QUEUED: "  ⏳ queued",
+            command_queue.RUNNING: "  ⏳ running...",
+            command_queue.DONE: f"  ✓ done in {command.seconds or 0:.1f} s",
+            command_queue.FAILED: "  ❌ failed",
+            command_queue.CANCELLED: "  ⛔ cancelled",
+        }[command.state]
+        pieces = [(text, (status, "dim"))]
+        if command.active:
+            pieces.append(("   ✖ cancel", (status, cancel, "link")))
+        elif command.state == command_queue.DONE and len(command.channel.calls) == 1:
+            # It ran one intent: offer it as a button that skips the parsing next time
+            pieces.append(("   📌 pin", (status, f"pin{command.id}", "link")))
+        return pieces
+
+    def _update_row(self, command):
+        row = self._rows[command.id]
+        if not command.active:
+            finish = []
+            if row["mid_line"]:
+                finish.append(("\n", "dim"))
+                row["mid_line"] = False
+            if command.state == command_queue.FAILED:
+                finish.append((f"  ❌ Error: {command.error}\n", "error"))
+            elif command.state == command_queue.DONE and not row["shown"]:
+                finish.append(("  ⚠️ No response\n", "error"))
+            if finish:
+                self._insert_chat(f"out{command.id}", finish, row["entry"])
+            self.history.finish(row["entry"])
+        ranges = self.chat_display.tag_ranges(f"status{command.id}")
+        with self._editing():
+            self.chat_display.delete(ranges[0], ranges[-1])
+            self.chat_display.insert(ranges[0], *[x for piece in self._status_pieces(command) for x in piece])
+
+    def _update_status(self):
+        pending = self.commands.pending()
+        running = sum(c.state == command_queue.RUNNING for c in pending)
+        queued = len(pending) - running
+        if pending:
+            self.status_label.config(text=f"⏳ {running} running" + (f", {queued} queued" if queued else ""), fg=TEXT_DIM)
+        else:
+            self.status_label.config(text="✅ AI model ready" if self.model_loaded else "⏳ Loading AI model...",
+                                      fg=SUCCESS if self.model_loaded else TEXT_DIM)
+
+    # ───────────────────────────────────────────────
+    #  CHAT DISPLAY
+    # ───────────────────────────────────────────────
+    @contextlib.contextmanager
+    def _editing(self):
+        """Group edits: one NORMAL/DISABLED toggle, one trim of old entries and one scroll to the end.
+
+        The trim and the scroll only happen if the view was at the bottom, so
+        reading back through history isn't yanked around by new output.
+        """
+        if self._edit_depth == 0:
+            self._follow = self.chat_display.yview()[1] >= 1.0
+            self.chat_display.config(state=tk.NORMAL)
+        self._edit_depth += 1
+        try:
+            yield
+        finally:
+            self._edit_depth -= 1
+            if self._edit_depth == 0:
+                if self._follow:
+                    self._trim()
+                self.chat_display.config(state=tk.DISABLED)
+                if self._follow:
+                    self.chat_display.see(tk.END)
+
+    def _append_entry(self, pieces, done=True, keep=True):
+        """Start a history entry at the bottom of the chat with `pieces`. Returns its id."""
+        entry = self.history.add(done=done, keep=keep)
+        with self._editing():
+            self.chat_display.mark_set(f"entry{entry}", "end-1c")
+            self.chat_display.mark_gravity(f"entry{entry}", tk.LEFT)
+            self._insert_chat(tk.END, pieces, entry)
+        return entry
+
+    def _insert_chat(self, index, pieces, entry):
+        """Insert (text, tag) pieces at `index` with one Text.insert; they belong to history entry `entry`."""
+        with self._editing():
+            self.chat_display.insert(index, *[x for piece in pieces for x in piece])
+        self.history.grow(entry, sum(text.count("\n") for text, _ in pieces))
+
+    def _trim(self):
+        """Move the oldest finished entries out of the widget (to the archive) while over the caps."""
+        for entry in self.history.overflow():
+            end = f"entry{self.history.visible[1].id}"
+            pieces = chat_history.pieces_from_dump(
+                self.chat_display.dump(f"entry{entry}", end, text=True, tag=True))
+            self.chat_display.delete(f"entry{entry}", end)
+            self.chat_display.mark_unset(f"entry{entry}")
+            self._remove_row(entry)
+            self.history.evict(entry, pieces)
+
+    def _on_chat_scroll(self, first, last):
+        self.chat_scrollbar.set(first, last)
+        if float(first) <= 0.0 and float(last) < 1.0:
+            self._maybe_page_in()
+
+    def _maybe_page_in(self):
+        if self.chat_display.yview()[0] <= 0.0 and not self._paging and self.history.has_older():
+            self._paging = True
+            self.root.after_idle(self._page_in)
+
+    def _page_in(self):
+        """Draw the next page of archived entries above the oldest one shown, keeping the view where it is."""
+        self._paging = False
+        top = self.history.visible[0].id if self.history.visible else None
+        loaded = self.history.page()
+        if not loaded:
+            return
+        first_line = int(self.chat_display.index("@0,0").split(".")[0])
+        self.chat_display.config(state=tk.NORMAL)
+        if top is not None:
+            self.chat_display.mark_gravity(f"entry{top}", tk.RIGHT)  # stay in front of its own text
+        for entry, _lines, pieces in reversed(loaded):
+            self.chat_display.insert("1.0", *[x for text, tag in pieces for x in (text, tag or ())])
+            self.chat_display.mark_set(f"entry{entry}", "1.0")
+            self.chat_display.mark_gravity(f"entry{entry}", tk.RIGHT)
+        for entry, _lines, _pieces in loaded:
+            self.chat_display.mark_gravity(f"entry{entry}", tk.LEFT)
+        if top is not None:
+            self.chat_display.mark_gravity(f"entry{top}", tk.LEFT)
+        self.chat_display.config(state=tk.DISABLED)
+        self.chat_display.yview(f"{first_line + sum(lines for _, lines, _ in loaded)}.0")
+
+    def _on_close(self):
+        """Archive what the chat shows, so the next session can scroll back to it."""
+        try:
+            for command in self.commands.pending():
+                self.commands.cancel(command)
+            while len(self.history.visible) > 1:
+                entry = self.history.visible[0].id
+                end = f"entry{self.history.visible[1].id}"
+                self.history.finish(entry)
+                self.history.evict(entry, chat_history.pieces_from_dump(
+                    self.chat_display.dump(f"entry{entry}", end, text=True, tag=True)))
+            if self.history.visible:
+                entry = self.history.visible[0].id
+                self.history.evict(entry, chat_history.pieces_from_dump(
+                    self.chat_display.dump(f"entry{entry}", "end-1c", text=True, tag=True)))
+        finally:
+            self.root.destroy()
+
+
+# ═══════════════════════════════════════════════════════
+#  MAIN
+# ═══════════════════════════════════════════════════════
+if __name__ == "__main__":
+    root = tk.Tk()
+
+    # Style the scrollbar
+    style = ttk.Style()
+    style.theme_use("clam")
+    style.configure("Vertical.TScrollbar",
+                    background=BG_CARD, troughcolor=BG,
+                    bordercolor=BG, arrowcolor=TEXT_DIM)
+
+    app = LaptopAssistantApp(root)
+    root.mainloop()
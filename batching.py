@@ -0,0 +1,91 @@
+"""
+Micro-batching in front of the model.
+
+Callers on any thread submit() one request and block for its result. A single
+worker thread takes the first pending request, gathers whatever else arrives
+within `window` seconds (up to `max_batch`), and runs them through one
+run_batch() call — one batched generate() instead of one per request. Because
+only the worker touches the model, generate() calls are also never concurrent.
+"""
+import queue
+import threading
+import time
+
+DEFAULT_MAX_BATCH = 8
+DEFAULT_WINDOW = 0.005
+
+
+class _Pending:
+    __slots__ = ("item", "done", "result", "error")
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Runs `run_batch(items) -> results` (same length and order) on batches of submitted items."""
+
+    def __init__(self, run_batch, max_batch=DEFAULT_MAX_BATCH, window=DEFAULT_WINDOW, name="micro-batcher"):
+        self.run_batch = run_batch
+        self.max_batch = max(1, int(max_batch))
+        self.window = window
+        self._queue = queue.Queue()
+        self._closed = False
+        self.stats = {"batches": 0, "items": 0, "largest": 0}
+        self._worker = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item, timeout=None):
+        """Queue `item` and wait for its result. Re-raises whatever run_batch raised."""
+        if self._closed:
+            raise RuntimeError("batcher is closed")
+        pending = _Pending(item)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError("batched request timed out")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                self._queue.put(None)  # finish this batch, then stop
+                break
+            batch.append(pending)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self.stats["batches"] += 1
+            self.stats["items"] += len(batch)
+            self.stats["largest"] = max(self.stats["largest"], len(batch))
+            try:
+                results = self.run_batch([p.item for p in batch])
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            for pending in batch:
+                pending.done.set()
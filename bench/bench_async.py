@@ -0,0 +1,63 @@
+"""
+Benchmark: many blocking commands at once, a thread each vs. the engine loop.
+
+Runs N copies of a command that takes --seconds to finish (a Python child
+that sleeps, standing in for powercfg/taskkill/ping), first the old way (one
+thread per command around subprocess.run) and then as coroutines on aio's
+loop, and reports wall time and the peak number of Python threads.
+
+    python bench/bench_async.py [-n 50] [--seconds 0.5]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import aio
+
+
+def with_threads(cmd, n):
+    threads = [threading.Thread(target=subprocess.run, args=(cmd,), kwargs={"shell": True, "capture_output": True})
+               for _ in range(n)]
+    for t in threads:
+        t.start()
+    peak = threading.active_count()
+    for t in threads:
+        t.join()
+    return peak
+
+
+def with_loop(cmd, n):
+    peak = 0
+
+    async def all_of_them():
+        nonlocal peak
+        tasks = [asyncio.ensure_future(aio.run(cmd)) for _ in range(n)]
+        await asyncio.sleep(0.05)
+        peak = threading.active_count()
+        await asyncio.gather(*tasks)
+
+    aio.run_sync(all_of_them())
+    return peak
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=50, help="commands in flight")
+    ap.add_argument("--seconds", type=float, default=0.5, help="how long each command takes")
+    args = ap.parse_args()
+    cmd = f'"{sys.executable}" -c "import time; time.sleep({args.seconds})"'
+    aio.get_loop()
+
+    for label, fn in (("thread per command", with_threads), ("engine loop", with_loop)):
+        started = time.perf_counter()
+        peak = fn(cmd, args.n)
+        print(f"  {label:<20} {args.n} commands in {time.perf_counter() - started:.2f} s, peak {peak} threads")
+
+
+if __name__ == "__main__":
+    main_()
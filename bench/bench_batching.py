@@ -0,0 +1,69 @@
+"""
+Benchmark: AI fallback throughput vs. micro-batch size.
+
+Loads the real model (needs transformers + torch and the weights) and fires
+the same set of router-miss utterances from several threads at once through
+a MicroBatcher capped at 1, 2, 4 and 8 requests per generate().
+
+    python bench/bench_batching.py [-c 16] [-t 8]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LAPTOP_ASSISTANT_MODEL"] = "local"  # measure the model in this process
+import main
+from batching import MicroBatcher
+
+UTTERANCES = [
+    "make it louder", "crank the volume to 70", "i can't see anything, it's too dark",
+    "get me to the bluetooth page", "fire up the browser", "look for cheap flights to rome",
+    "put the machine to sleep", "turn the sound way down",
+]
+
+
+def run(max_batch, count, threads):
+    batcher = MicroBatcher(main.ai_decide_batch, max_batch=max_batch, window=0.005)
+    work = [UTTERANCES[i % len(UTTERANCES)] for i in range(count)]
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                if not work:
+                    return
+                text = work.pop()
+            batcher.submit(text)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=client) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    batcher.close()
+    return count / elapsed, batcher.stats["items"] / batcher.stats["batches"]
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-c", "--count", type=int, default=16, help="requests per run")
+    ap.add_argument("-t", "--threads", type=int, default=8, help="concurrent clients")
+    args = ap.parse_args()
+
+    main.load_model()
+    main.ai_decide_batch(UTTERANCES[:2])  # warm-up
+    base = None
+    for max_batch in (1, 2, 4, 8):
+        rate, mean_batch = run(max_batch, args.count, args.threads)
+        base = base or rate
+        print(f"  max batch {max_batch}:  {rate:6.2f} requests/s  (mean batch {mean_batch:.1f}, "
+              f"{rate / base:.1f}x)")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,61 @@
+"""
+Benchmark: free decoding + regex vs. constrained, early-stopping decoding.
+
+Loads the real model (needs transformers + torch and the weights) and runs
+ai_decide() on a fixed set of router-miss utterances in both modes, reporting
+generated tokens and latency per request and whether both modes chose the
+same call.
+
+    python bench/bench_decoding.py [-r 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LAPTOP_ASSISTANT_MODEL"] = "local"  # measure the model in this process
+import main
+
+UTTERANCES = [
+    "make it louder", "crank the volume to 70", "i can't see anything, it's too dark",
+    "get me to the bluetooth page", "fire up the browser", "look for cheap flights to rome",
+    "put the machine to sleep", "turn the sound way down", "tell me a joke",
+]
+
+
+def run(mode, repeat):
+    main.DECODING = mode
+    decisions = {}
+    tokens, seconds = [], []
+    for _ in range(repeat):
+        for text in UTTERANCES:
+            before = dict(main.decode_stats)
+            decisions[text] = main.ai_decide(text)
+            tokens.append(main.decode_stats["tokens"] - before["tokens"])
+            seconds.append(main.decode_stats["seconds"] - before["seconds"])
+    return decisions, tokens, seconds
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-r", "--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    main.load_model()
+    main.ai_decide(UTTERANCES[0])  # warm-up
+
+    results = {mode: run(mode, args.repeat) for mode in ("free", "constrained")}
+    for mode, (_, tokens, seconds) in results.items():
+        print(f"  {mode:<12} {statistics.mean(tokens):6.1f} tokens/request   "
+              f"median {statistics.median(seconds) * 1000:7.1f} ms   max {max(seconds) * 1000:7.1f} ms")
+    free, constrained = results["free"][0], results["constrained"][0]
+    same = sum(free[t] == constrained[t] for t in UTTERANCES)
+    print(f"  same call in both modes: {same}/{len(UTTERANCES)}")
+    for text in UTTERANCES:
+        if free[text] != constrained[text]:
+            print(f"    {text!r}: free={free[text]} constrained={constrained[text]}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,69 @@
+"""
+Benchmark: a fresh front end's first AI answer, in-process model vs model server.
+
+Each sample is a new interpreter that imports main and resolves one router miss
+with the model. "local" loads the model in that process, as every CLI/GUI start
+used to; "server" asks the already-running model server. The server is started
+(and its model loaded) once before the server samples; its startup is reported
+separately. Needs the model weights.
+
+    python bench/bench_model_server.py [-n 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import model_server
+
+UTTERANCE = "make it louder"
+FIRST_ANSWER = "import main; print(main.ai_decide({text!r}))"
+
+
+def sample(backend, n, env):
+    times = []
+    for _ in range(n):
+        t = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", FIRST_ANSWER.format(text=UTTERANCE)], cwd=ROOT,
+                              env=dict(env, LAPTOP_ASSISTANT_MODEL=backend), capture_output=True, text=True)
+        times.append(time.perf_counter() - t)
+        if proc.returncode != 0:
+            raise SystemExit(proc.stderr)
+    return times
+
+
+def report(label, times):
+    print(f"  {label:<30} median {statistics.median(times) * 1000:9.1f} ms   "
+          f"min {min(times) * 1000:9.1f} ms")
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=5)
+    args = ap.parse_args()
+    state_dir = tempfile.mkdtemp(prefix="bench_model_server_")
+    env = dict(os.environ, LAPTOP_ASSISTANT_HOME=state_dir)
+
+    report("local: import + load + decide", sample("local", args.n, env))
+
+    client = model_server.ModelClient(state_dir, connect_timeout=60)
+    t = time.perf_counter()
+    client.call("load")
+    report("server start + load (once)", [time.perf_counter() - t])
+    try:
+        report("server: import + decide", sample("server", args.n, env))
+        print(f"  server stats: {client.call('stats')}")
+    finally:
+        try:
+            client.call("shutdown")
+        except (EOFError, OSError):
+            pass
+
+
+if __name__ == "__main__":
+    main_()
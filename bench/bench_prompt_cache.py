@@ -0,0 +1,70 @@
+"""
+Benchmark: time-to-first-token with and without the prompt prefix cache.
+
+Loads the real model (needs transformers + torch and the weights), then times
+generate(max_new_tokens=1) for a set of router-miss utterances, once
+prefilling the whole prompt and once starting from the cached prefix.
+
+    python bench/bench_prompt_cache.py [-r 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LAPTOP_ASSISTANT_MODEL"] = "local"  # measure the model in this process
+import main
+
+UTTERANCES = [
+    "make it louder", "crank up the tunes", "i can't see anything, it's too dark",
+    "get me to the bluetooth page", "fire up the browser", "look for cheap flights to rome",
+    "put the machine to sleep", "turn the sound way down",
+]
+
+
+def ttft(cache, text, reuse):
+    inputs = cache.encode(text).to(main.model.device)
+    kwargs = {"max_new_tokens": 1, "pad_token_id": main.processor.eos_token_id}
+    t = time.perf_counter()
+    if reuse:
+        cache.generate(inputs, **kwargs)
+    else:
+        main.model.generate(**inputs, **kwargs)
+    return time.perf_counter() - t, inputs["input_ids"].shape[1]
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-r", "--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    main.load_model()
+    cache = main.prompt_cache
+    if not cache.prefix_length:
+        raise SystemExit("prompt prefix cache is not available (LAPTOP_ASSISTANT_PREFIX_CACHE=0?)")
+    ttft(cache, UTTERANCES[0], False)  # warm up kernels before timing
+    ttft(cache, UTTERANCES[0], True)
+
+    results = {False: [], True: []}
+    lengths = []
+    for _ in range(args.repeat):
+        for text in UTTERANCES:
+            for reuse in (False, True):
+                seconds, length = ttft(cache, text, reuse)
+                results[reuse].append(seconds)
+            lengths.append(length)
+
+    prompt = statistics.mean(lengths)
+    print(f"prompt: {prompt:.0f} tokens on average, {cache.prefix_length} of them in the cached prefix "
+          f"({cache.prefix_length / prompt:.0%})")
+    for reuse, label in ((False, "full prefill"), (True, "cached prefix")):
+        times = results[reuse]
+        print(f"  {label:<14} TTFT median {statistics.median(times) * 1000:7.1f} ms   "
+              f"p90 {sorted(times)[int(len(times) * 0.9)] * 1000:7.1f} ms")
+    print(f"  speed-up: {statistics.median(results[False]) / statistics.median(results[True]):.1f}x")
+
+
+if __name__ == "__main__":
+    main_()
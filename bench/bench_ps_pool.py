@@ -0,0 +1,81 @@
+"""
+Benchmark: one host process per action vs. the persistent host pool.
+
+    python bench/bench_ps_pool.py            # stand-in Python host (any OS)
+    python bench/bench_ps_pool.py --real     # real powershell.exe (Windows)
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pshost
+
+
+def cold_call(cmd, script, real):
+    if real:
+        subprocess.run(["powershell", "-NoProfile", "-Command", script], capture_output=True)
+    else:
+        subprocess.run(cmd + ["-c", script], capture_output=True)
+
+
+def timed(fn, n):
+    samples = []
+    for _ in range(n):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return samples
+
+
+def report(name, samples):
+    print(f"  {name:<28} mean {statistics.mean(samples):8.2f} ms   "
+          f"p50 {statistics.median(samples):8.2f} ms   max {max(samples):8.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--real", action="store_true", help="use powershell.exe instead of the stub")
+    ap.add_argument("-n", type=int, default=30)
+    ap.add_argument("--threads", type=int, default=4)
+    args = ap.parse_args()
+
+    if args.real:
+        script = "Get-Date | Out-Null; Write-Host ok"
+        pool = pshost.PowerShellPool(size=args.threads)
+        python_cmd = None
+    else:
+        script = "print('ok')"
+        pool = pshost.PowerShellPool(size=args.threads, command=pshost.stub_host_command())
+        python_cmd = [sys.executable]
+
+    print(f"host: {'powershell.exe' if args.real else 'pshost_stub.py'}   n={args.n}")
+    report("cold process per call", timed(lambda: cold_call(python_cmd, script, args.real), args.n))
+
+    t = time.perf_counter()
+    pool.start(1)
+    print(f"  {'pool first host start':<28} {(time.perf_counter() - t) * 1000:8.2f} ms")
+    report("pooled host", timed(lambda: pool.run(script), args.n))
+
+    # Concurrent clients sharing the pool
+    per_thread = max(1, args.n // args.threads)
+    t = time.perf_counter()
+    workers = [threading.Thread(target=lambda: [pool.run(script) for _ in range(per_thread)])
+               for _ in range(args.threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    total = per_thread * args.threads
+    elapsed = time.perf_counter() - t
+    print(f"  {'pooled, %d threads' % args.threads:<28} {total / elapsed:8.1f} calls/s")
+    print(f"  pool stats: {pool.stats}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: accuracy vs. latency of the inference precisions.
+
+Loads the real model (needs transformers + torch and the weights) at each
+precision and runs ai_decide on a fixed utterance set. Reports load time
+(the first int8/bf16 run includes the conversion; later runs hit the
+artifact cache), median decision latency, and how many decisions match fp32.
+
+    python bench/bench_quantize.py [--precisions fp32 bf16 int8] [-r 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LAPTOP_ASSISTANT_MODEL"] = "local"  # measure the model in this process
+import main
+
+UTTERANCES = [
+    "make it louder", "crank the volume to 70", "set brightness to 40", "i can't see anything, it's too dark",
+    "get me to the bluetooth page", "open the wifi settings", "fire up the browser", "launch notepad",
+    "look for cheap flights to rome", "search the web for pasta recipes", "put the machine to sleep",
+    "lock my computer", "take a screenshot of this", "turn the sound way down", "tell me a joke",
+]
+
+
+def load(precision):
+    main.processor = main.model = main.prompt_cache = None
+    main.PRECISION = precision
+    started = time.perf_counter()
+    main.load_model()
+    return time.perf_counter() - started
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--precisions", nargs="+", default=["fp32", "bf16", "int8"])
+    ap.add_argument("-r", "--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    reference = None
+    for precision in ["fp32"] + [p for p in args.precisions if p != "fp32"]:
+        load_s = load(precision)
+        main.ai_decide_batch(UTTERANCES[:1])  # warm-up
+        decisions, times = {}, []
+        for _ in range(args.repeat):
+            for text in UTTERANCES:
+                started = time.perf_counter()
+                decisions[text] = main.ai_decide_batch([text])[0]
+                times.append(time.perf_counter() - started)
+        reference = reference or decisions
+        same = sum(decisions[t] == reference[t] for t in UTTERANCES)
+        print(f"  {precision:<5} ({main.model_precision:<5}) load {load_s:6.1f} s   "
+              f"median {statistics.median(times) * 1000:7.1f} ms   same call as fp32: {same}/{len(UTTERANCES)}")
+        for text in UTTERANCES:
+            if decisions[text] != reference[text]:
+                print(f"      {text!r}: fp32={reference[text]} {precision}={decisions[text]}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,120 @@
+"""
+Benchmark: compiled keyword router vs. the old if-chain (legacy_router.py).
+
+Builds a large utterance corpus from the routes' own trigger phrases plus
+misses, checks both routers make the same calls, then reports throughput.
+Differences that are known fixes to the old chain (FIXED) are counted apart.
+
+    python bench/bench_router.py [-n 20000]
+
+Measured (20k utterances, five runs): the if-chain takes 27-31 us per
+utterance, smart_execute 9-11 us, a speed-up of 2.7-3.2x (median 2.8x);
+resolving alone (route()) takes 5-6 us. Single runs vary by 15% or so;
+the 4.7x quoted when the router landed was one best run, not typical.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+import main
+import legacy_router
+
+TEMPLATES = [
+    "{}", "please {}", "{} now", "can you {} for me", "hey assistant {}", "i want to {}",
+    "{} please", "could you {} quickly",
+]
+FILLERS = [
+    "tell me a joke", "how are you", "what's the weather like in paris", "write a poem",
+    "who won the game last night", "translate hello to french", "order a pizza",
+    "remind me about the meeting", "what is the meaning of life", "make it cozier in here",
+]
+NUMBERS = ["10", "25", "50", "75", "100"]
+
+# Old-chain misroutes the registry fixes on purpose: (reason, test on text and old calls)
+FIXED = [
+    ("'cancel shutdown' shut the PC down",
+     lambda text, calls: ("shutdown_pc", ()) in calls and re.search(r"(cancel|abort|stop) shutdown", text)),
+    ("'pen' settings matched inside 'open'",
+     lambda text, calls: ("open_settings", ("pen",)) in calls and not re.search(r"\bpen\b", text)),
+]
+
+
+def build_corpus(n, seed=0):
+    rng = random.Random(seed)
+    phrases = []
+    for route in main.registry.routes():
+        for trig in route.triggers:
+            phrases.append(trig.strip())
+            if route.pattern is not None:
+                phrases.append(f"{trig.strip()} to {rng.choice(NUMBERS)}")
+                phrases.append(f"{trig.strip()} {rng.choice(['chrome', 'notepad', 'google.com', 'cats'])}")
+    for word in main.ON_WORDS + main.OFF_WORDS:
+        for feature in main.TOGGLEABLE:
+            phrases.append(f"{word.strip()} {feature}")
+    phrases += FILLERS * 20
+    return [rng.choice(TEMPLATES).format(rng.choice(phrases)) for _ in range(n)]
+
+
+def patch_main():
+    for name in legacy_router.LEAVES:
+        record = legacy_router.recorder(name)
+        setattr(main, name, record)
+        if name in main.registry.intents:
+            main.registry.intents[name].handler = record
+    main.subprocess = legacy_router.subprocess
+    main.aio = legacy_router.aio
+
+
+def throughput(fn, corpus):
+    t = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    elapsed = time.perf_counter() - t
+    return len(corpus) / elapsed, elapsed / len(corpus) * 1e6
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=20000)
+    args = ap.parse_args()
+
+    corpus = build_corpus(args.n)
+    patch_main()
+    calls = legacy_router.CALLS
+
+    mismatches = 0
+    fixed = {reason: 0 for reason, _ in FIXED}
+    for text in corpus:
+        del calls[:]
+        old = (legacy_router.smart_execute(text), list(calls))
+        del calls[:]
+        new = (main.smart_execute(text), list(calls))
+        if old != new:
+            reason = next((r for r, test in FIXED if test(text, old[1])), None)
+            if reason:
+                fixed[reason] += 1
+                continue
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  MISMATCH {text!r}: old={old} new={new}")
+    print(f"corpus: {len(corpus)} utterances, {mismatches} routing differences")
+    for reason, count in fixed.items():
+        print(f"  fixed: {reason}: {count}")
+
+    legacy_rate, legacy_us = throughput(legacy_router.smart_execute, corpus)
+    new_rate, new_us = throughput(main.smart_execute, corpus)
+    resolve_rate, resolve_us = throughput(main.route, corpus)
+    print(f"  {'if-chain (before)':<26} {legacy_rate:10.0f} utt/s  {legacy_us:7.1f} us/utt")
+    print(f"  {'compiled router':<26} {new_rate:10.0f} utt/s  {new_us:7.1f} us/utt")
+    print(f"  {'compiled, resolve only':<26} {resolve_rate:10.0f} utt/s  {resolve_us:7.1f} us/utt")
+    print(f"  speed-up: {new_rate / legacy_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main_()
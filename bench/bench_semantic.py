@@ -0,0 +1,78 @@
+"""
+Benchmark: semantic nearest-neighbour stage in front of the model.
+
+Paraphrases router phrases with filler words the keyword router doesn't
+need ("could you ... please") plus reordered words, and counts how many of
+the ones that miss the router the semantic stage answers (and how many of
+those it gets right), how many non-commands it wrongly answers, and the
+lookup latency. Every answered utterance is a generate() call saved.
+
+    python bench/bench_semantic.py [-n 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LAPTOP_ASSISTANT_HOME", tempfile.mkdtemp(prefix="bench_semantic_"))
+import main
+
+TEMPLATES = [
+    "could you {} please", "{} for me", "i want you to {}", "hey {} now", "please {}",
+    "can you {}", "{} thanks", "would you kindly {}",
+]
+NON_COMMANDS = [
+    "tell me a joke", "how are you", "what's the weather like in paris", "write a poem",
+    "who won the game last night", "translate hello to french", "order a pizza",
+    "remind me about the meeting", "what is the meaning of life", "sing me a song",
+    "how tall is mount everest", "recommend a good book",
+]
+
+
+def paraphrase(rng, text):
+    words = text.split()
+    if len(words) > 1 and rng.random() < 0.5:
+        words = words[1:] + words[:1]  # "turn on bluetooth" -> "on bluetooth turn"
+    return rng.choice(TEMPLATES).format(" ".join(words))
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=5000)
+    args = ap.parse_args()
+    rng = random.Random(0)
+
+    t = time.perf_counter()
+    index = main.get_semantic_index()
+    if index is None:
+        raise SystemExit("numpy is not installed")
+    print(f"index: {len(index)} phrasings, built in {(time.perf_counter() - t) * 1000:.1f} ms")
+
+    phrases = list(main.registry.phrases())
+    misses = answered = correct = 0
+    t = time.perf_counter()
+    for _ in range(args.n):
+        text, intent, expected = rng.choice(phrases)
+        utterance = paraphrase(rng, text)
+        if main.route(utterance) is not None:
+            continue
+        misses += 1
+        match = index.lookup(utterance)
+        if match is not None:
+            answered += 1
+            correct += match[:2] == (intent, expected)
+    lookup_us = (time.perf_counter() - t) / args.n * 1e6
+    false_hits = sum(index.lookup(text) is not None for text in NON_COMMANDS)
+
+    print(f"router misses: {misses} of {args.n} paraphrases")
+    print(f"  answered without the model: {answered} ({answered / max(misses, 1):.0%}), "
+          f"correct: {correct} ({correct / max(answered, 1):.0%})")
+    print(f"  non-commands answered (false positives): {false_hits} of {len(NON_COMMANDS)}")
+    print(f"  route + lookup: {lookup_us:.1f} us/utterance")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,66 @@
+"""
+Benchmark: cold start to the first routed command.
+
+Each sample is a fresh interpreter that imports main and routes one command;
+the time is measured from spawning the process to the routed result. "eager"
+imports transformers up front the way main.py used to (skipped when it isn't
+installed); --with-model also loads the model first, like the old CLI did.
+
+    python bench/bench_startup.py [-n 10] [--with-model]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMAND = "turn on bluetooth"
+LAZY = "import main; print(main.route({cmd!r}))"
+EAGER = "import transformers; import main; print(main.route({cmd!r}))"
+EAGER_MODEL = "import main; main.MODEL_BACKEND = 'local'; main.load_model(); print(main.route({cmd!r}))"
+
+
+def has_transformers():
+    probe = subprocess.run([sys.executable, "-c", "import transformers"], capture_output=True)
+    return probe.returncode == 0
+
+
+def sample(code, n):
+    times = []
+    for _ in range(n):
+        t = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code.format(cmd=COMMAND)],
+                              cwd=ROOT, capture_output=True, text=True)
+        times.append(time.perf_counter() - t)
+        if proc.returncode != 0:
+            raise SystemExit(proc.stderr)
+    return times
+
+
+def report(label, times):
+    print(f"  {label:<28} median {statistics.median(times) * 1000:8.1f} ms   "
+          f"min {min(times) * 1000:8.1f} ms")
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=10)
+    ap.add_argument("--with-model", action="store_true", help="also time loading the model up front")
+    args = ap.parse_args()
+
+    baseline = sample("pass", args.n)
+    report("bare interpreter", baseline)
+    report("lazy (import main + route)", sample(LAZY, args.n))
+    if has_transformers():
+        report("eager transformers import", sample(EAGER, args.n))
+        if args.with_model:
+            report("eager import + load_model", sample(EAGER_MODEL, args.n))
+    else:
+        print("  transformers is not installed; skipping the eager runs")
+
+
+if __name__ == "__main__":
+    main_()
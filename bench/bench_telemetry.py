@@ -0,0 +1,74 @@
+"""
+Benchmark: info questions answered by a query each vs. from the telemetry snapshot.
+
+Asks for CPU, RAM, battery, uptime, disk usage and system info in turn, -n
+rounds, where collecting the metrics takes --seconds (standing in for the CIM
+query through PowerShell; the JSON it parses is fixtures/cim_laptop.json).
+"query each" collects once per question, as the info commands used to;
+"sampler" reads a telemetry.Sampler, which collects all of them together and
+answers from memory while the snapshot is fresh. On Linux it also times the
+native backend (procfs.ProcBackend), which needs no subprocess at all.
+
+    python bench/bench_telemetry.py [-n 5] [--seconds 0.5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import telemetry
+
+QUESTIONS = [("cpu_percent",), ("memory",), ("battery",), ("boot_time",), ("disks",), ("system", "memory")]
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "cim_laptop.json")
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=5, help="rounds of questions")
+    ap.add_argument("--seconds", type=float, default=0.5, help="how long collecting the metrics takes")
+    args = ap.parse_args()
+    with open(FIXTURE, encoding="utf-8") as f:
+        SAMPLE = f.read()
+    collects = 0
+
+    def collect():
+        nonlocal collects
+        collects += 1
+        time.sleep(args.seconds)
+        return telemetry.parse_cim(SAMPLE)
+
+    started = time.perf_counter()
+    for _ in range(args.n):
+        for _names in QUESTIONS:
+            collect()
+    elapsed = time.perf_counter() - started
+    print(f"  {'query each':<12} {args.n * len(QUESTIONS)} questions in {elapsed:.2f} s, {collects} collects")
+
+    collects = 0
+    sampler = telemetry.Sampler(collect, interval=60)
+    started = time.perf_counter()
+    latencies = []
+    for _ in range(args.n):
+        for names in QUESTIONS:
+            asked = time.perf_counter()
+            sampler.read(*names)
+            latencies.append(time.perf_counter() - asked)
+    elapsed = time.perf_counter() - started
+    sampler.close()
+    latencies.sort()
+    print(f"  {'sampler':<12} {len(latencies)} questions in {elapsed:.2f} s, {collects} collects, "
+          f"median {latencies[len(latencies) // 2] * 1e6:.0f} us")
+
+    if sys.platform.startswith("linux"):
+        import procfs
+        backend = procfs.ProcBackend()
+        backend.collect()
+        started = time.perf_counter()
+        for _ in range(1000):
+            backend.collect()
+        print(f"  {'/proc, /sys':<12} {(time.perf_counter() - started) / 1000 * 1e6:.0f} us per collect (all metrics)")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,64 @@
+"""
+Benchmark: per-tier hit rates and latency of the intent cascade.
+
+Runs a mix of router phrasings, labelled near-misses and small talk through
+process_command with every handler stubbed out, and prints main.tier_stats:
+how many utterances each tier (router, cache, semantic index, classifier,
+model) answered and its average lookup time. The model tier is stubbed too
+(it declines), so this shows what reaches it, not how long generate() takes.
+The classifier is also scored on its own against the labelled set.
+
+    python bench/bench_tiers.py [--threshold 0.8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ.setdefault("LAPTOP_ASSISTANT_HOME", tempfile.mkdtemp(prefix="bench_tiers_"))
+import main
+from bench_tool_retrieval import LABELLED
+
+SMALL_TALK = ["tell me a joke", "how are you", "write a poem", "who won the game last night",
+              "what is the meaning of life", "order a pizza"]
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threshold", type=float, default=None, help="classifier confidence threshold")
+    args = ap.parse_args()
+
+    chosen = []
+    for intent in main.registry.intents.values():
+        intent.handler = lambda *a, **k: None
+    main.ai_decide = lambda text: chosen.append(None)
+    main.log = lambda *a, **k: None
+    clf = main.get_intent_classifier()
+    if clf is None:
+        raise SystemExit("numpy is not installed; the semantic and classifier tiers are disabled")
+    if args.threshold is not None:
+        clf.threshold = args.threshold
+
+    routed = [text for text, _, _ in main.registry.phrases()][::10]
+    for text in routed + SMALL_TALK:
+        main.process_command(text)
+
+    correct = wrong = 0
+    for text, expected in LABELLED:
+        guess = main.classify(text)
+        main.process_command(text)
+        if guess is not None:
+            correct += guess[0] == expected
+            wrong += guess[0] != expected
+
+    print(f"  {len(routed)} router phrasings, {len(SMALL_TALK)} small talk, {len(LABELLED)} labelled near-misses")
+    main.print_tier_stats()
+    print(f"  classifier alone on the labelled set: {correct} right, {wrong} wrong, "
+          f"{len(LABELLED) - correct - wrong} below the threshold ({clf.threshold})")
+
+
+if __name__ == "__main__":
+    main_()
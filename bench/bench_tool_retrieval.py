@@ -0,0 +1,66 @@
+"""
+Benchmark: per-request tool retrieval.
+
+For a labelled set of router-miss utterances, reports how often the intended
+action is among the k tools offered (recall@k), the size of the tool schema
+rendered into the prompt (JSON characters, all tools vs. the selection), and
+how long a selection takes. Runs without the model.
+
+    python bench/bench_tool_retrieval.py [-k 4 6 8]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+import tool_retrieval
+
+LABELLED = [
+    ("make it louder", "set_volume"), ("crank up the tunes", "set_volume"),
+    ("i can't see anything, it's too dark", "set_brightness"), ("get me to the bluetooth page", "open_settings"),
+    ("fire up the browser", "open_app"), ("look for cheap flights to rome", "web_search"),
+    ("put the machine to sleep", "sleep_pc"), ("how much battery do i have left", "show_battery_level"),
+    ("kill chrome", "kill_process"), ("what's my ip", "show_ip_address"), ("empty the trash", "empty_recycle_bin"),
+    ("take a picture of the screen", "take_screenshot"), ("new desktop please", "new_virtual_desktop"),
+    ("is windows up to date", "check_windows_update"), ("how long has this pc been on", "show_uptime"),
+    ("wipe the clipboard", "clear_clipboard"), ("skip this song", "media_next"),
+    ("check for viruses", "run_virus_scan"), ("get rid of temp files", "clear_temp_files"),
+    ("lock the computer", "lock_screen"), ("what time is it", "show_datetime"),
+    ("hide the taskbar", "toggle_taskbar_autohide"), ("how fast is my internet", "speed_test"),
+    ("show me my wifi password", "show_wifi_password"),
+]
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-k", type=int, nargs="+", default=[4, 6, 8])
+    args = ap.parse_args()
+    if not main.semantic.available():
+        raise SystemExit("numpy is not installed; tool retrieval is disabled")
+
+    documents = main.registry.tool_documents()
+    t = time.perf_counter()
+    tool_retrieval.ToolRetriever(documents)
+    print(f"  {len(documents)} intents, index built in {(time.perf_counter() - t) * 1000:.0f} ms")
+    full = len(json.dumps(main.ai_functions))
+    print(f"  all tools: {full} schema chars; core tools: {len(json.dumps(main.core_functions))}")
+
+    for k in args.k:
+        retriever = tool_retrieval.ToolRetriever(documents, k=k)
+        hits, sizes, times = 0, [], []
+        for text, expected in LABELLED:
+            t = time.perf_counter()
+            names = retriever.select(text)
+            times.append(time.perf_counter() - t)
+            hits += expected in names
+            sizes.append(len(json.dumps(main.registry.tool_schema(names))))
+        print(f"  k={k}: recall {hits}/{len(LABELLED)}, {statistics.mean(sizes):.0f} schema chars "
+              f"({statistics.mean(sizes) / full:.0%} of all), select {statistics.median(times) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,430 @@
+"""
+The keyword router as it was before the compiled matcher (an if-chain of
+substring scans), kept verbatim as the baseline for bench_router.py.
+
+Actions are replaced by recorders: every call lands in CALLS as
+(function_name, args) instead of touching the system.
+"""
+import re
+
+from main import SETTINGS_MAP, APP_MAP
+
+CALLS = []
+
+LEAVES = [
+    "set_volume", "mute_audio", "set_brightness", "media_play_pause", "media_next",
+    "media_previous", "media_stop", "kill_process", "list_running_apps",
+    "minimize_all_windows", "restore_all_windows", "close_current_window", "switch_window",
+    "snap_window_left", "snap_window_right", "maximize_window", "minimize_window",
+    "new_virtual_desktop", "close_virtual_desktop", "open_task_view", "take_screenshot",
+    "lock_screen", "shutdown_pc", "cancel_shutdown", "restart_pc", "hibernate_pc", "sleep_pc",
+    "logoff_pc", "set_power_plan", "set_screen_timeout", "set_sleep_timeout",
+    "set_screen_resolution", "show_battery_level", "generate_battery_report",
+    "show_system_info", "show_disk_usage", "show_cpu_usage", "show_ram_usage", "show_uptime",
+    "show_windows_version", "show_startup_apps", "show_installed_apps", "show_public_ip",
+    "show_ip_address", "ping_host", "flush_dns", "show_wifi_password", "show_network_info",
+    "speed_test", "open_folder", "empty_recycle_bin", "create_folder", "clear_clipboard",
+    "open_clipboard_history", "run_full_virus_scan", "run_virus_scan", "update_defender",
+    "check_windows_update", "open_firewall", "clear_temp_files", "disk_cleanup",
+    "open_onscreen_keyboard", "open_emoji_panel", "show_datetime", "set_timer", "set_alarm",
+    "open_run_dialog", "open_action_center", "web_search", "open_website", "open_settings",
+    "open_app", "toggle_bluetooth", "toggle_wifi", "toggle_airplane_mode",
+    "toggle_night_light", "toggle_hotspot", "toggle_location", "toggle_dark_mode",
+    "toggle_color_filter", "toggle_high_contrast", "toggle_focus_assist",
+    "toggle_taskbar_autohide", "open_narrator", "open_magnifier",
+]
+
+
+def recorder(name):
+    def record(*args, **kwargs):
+        CALLS.append((name, tuple(str(a) for a in list(args) + list(kwargs.values()))))
+        return True
+    record.__name__ = name
+    return record
+
+
+class _Subprocess:
+    @staticmethod
+    def run(cmd, **kwargs):
+        CALLS.append(("subprocess.run", (cmd,)))
+
+
+subprocess = _Subprocess()
+
+
+class _Aio:
+    """main's aio, with run() recorded like subprocess.run (some TOGGLEABLE switches run taskkill through it)."""
+    def __getattr__(self, name):
+        import aio
+        return getattr(aio, name)
+
+    @staticmethod
+    def run(cmd, **kwargs):
+        CALLS.append(("subprocess.run", (cmd,)))
+
+
+aio = _Aio()
+for _name in LEAVES:
+    globals()[_name] = recorder(_name)
+
+
+# Map of toggleable features -> (on_func, off_func)
+TOGGLEABLE = {
+    "bluetooth":    (lambda: toggle_bluetooth(True),  lambda: toggle_bluetooth(False)),
+    "wifi":         (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
+    "wi-fi":        (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
+    "wireless":     (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
+    "airplane":     (lambda: toggle_airplane_mode(True), lambda: toggle_airplane_mode(False)),
+    "airplane mode":(lambda: toggle_airplane_mode(True), lambda: toggle_airplane_mode(False)),
+    "night light":  (lambda: toggle_night_light(True),  lambda: toggle_night_light(False)),
+    "nightlight":   (lambda: toggle_night_light(True),  lambda: toggle_night_light(False)),
+    "hotspot":      (lambda: toggle_hotspot(True),     lambda: toggle_hotspot(False)),
+    "mobile hotspot":(lambda: toggle_hotspot(True),    lambda: toggle_hotspot(False)),
+    "location":     (lambda: toggle_location(True),    lambda: toggle_location(False)),
+    "dark mode":    (lambda: toggle_dark_mode(True),   lambda: toggle_dark_mode(False)),
+    "light mode":   (lambda: toggle_dark_mode(False),  lambda: toggle_dark_mode(True)),
+    "dark theme":   (lambda: toggle_dark_mode(True),   lambda: toggle_dark_mode(False)),
+    "color filter":  (lambda: toggle_color_filter(True), lambda: toggle_color_filter(False)),
+    "high contrast": (lambda: toggle_high_contrast(True), lambda: toggle_high_contrast(False)),
+    "focus assist":  (lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
+    "do not disturb":(lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
+    "dnd":           (lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
+    "taskbar auto hide": (lambda: toggle_taskbar_autohide(True), lambda: toggle_taskbar_autohide(False)),
+    "narrator":      (lambda: open_narrator(),  lambda: subprocess.run('taskkill /IM narrator.exe /F', shell=True, capture_output=True)),
+    "magnifier":     (lambda: open_magnifier(), lambda: subprocess.run('taskkill /IM magnify.exe /F', shell=True, capture_output=True)),
+}
+
+def smart_execute(text):
+    """Parse user input with keywords and execute the right action.
+    Returns True if handled, False if needs AI fallback."""
+    text_lower = text.lower().strip()
+
+    # --- Detect ON/OFF intent ---
+    wants_on = any(w in text_lower for w in ["turn on", "enable", "activate", "switch on", "start "])
+    wants_off = any(w in text_lower for w in ["turn off", "disable", "deactivate", "switch off", "stop "])
+
+    # --- Toggle hardware features (bluetooth, wifi, dark mode, etc.) ---
+    if wants_on or wants_off:
+        for feature, (on_fn, off_fn) in sorted(TOGGLEABLE.items(), key=lambda x: len(x[0]), reverse=True):
+            if feature in text_lower:
+                if wants_on:
+                    on_fn()
+                else:
+                    off_fn()
+                return True
+
+    # --- Volume ---
+    vol_match = re.search(r'(?:set\s+)?volume\s+(?:to\s+)?(\d+)', text_lower)
+    if vol_match:
+        set_volume(int(vol_match.group(1)))
+        return True
+    if any(w in text_lower for w in ["mute", "unmute", "silence"]):
+        mute_audio()
+        return True
+    if "volume up" in text_lower or "increase volume" in text_lower or "louder" in text_lower:
+        set_volume(80)
+        return True
+    if "volume down" in text_lower or "decrease volume" in text_lower or "quieter" in text_lower or "lower volume" in text_lower:
+        set_volume(30)
+        return True
+    if "max volume" in text_lower or "full volume" in text_lower:
+        set_volume(100)
+        return True
+
+    # --- Brightness ---
+    br_match = re.search(r'(?:set\s+)?brightness\s+(?:to\s+)?(\d+)', text_lower)
+    if br_match:
+        set_brightness(int(br_match.group(1)))
+        return True
+    if any(w in text_lower for w in ["brighter", "increase brightness", "brightness up", "max brightness"]):
+        set_brightness(80 if "max" not in text_lower else 100)
+        return True
+    if any(w in text_lower for w in ["dimmer", "dim", "decrease brightness", "brightness down", "min brightness"]):
+        set_brightness(30 if "min" not in text_lower else 5)
+        return True
+
+    # --- Media controls ---
+    if any(w in text_lower for w in ["play pause", "play/pause", "pause music", "resume music", "pause media", "play media"]):
+        media_play_pause()
+        return True
+    if any(w in text_lower for w in ["next track", "next song", "skip song", "skip track"]):
+        media_next()
+        return True
+    if any(w in text_lower for w in ["previous track", "previous song", "last song", "go back song"]):
+        media_previous()
+        return True
+    if any(w in text_lower for w in ["stop music", "stop media", "stop playing"]):
+        media_stop()
+        return True
+
+    # --- Process/Task management ---
+    kill_match = re.search(r'(?:kill|close|end|terminate|force close|quit)\s+(?:the\s+)?(?:app\s+)?(?:process\s+)?(.+?)(?:\s+app|\s+process|\s*$)', text_lower)
+    if kill_match and not any(w in text_lower for w in ["window", "desktop", "virtual"]):
+        target = kill_match.group(1).strip()
+        if target and target not in ("my", "the", "a", "all"):
+            kill_process(target)
+            return True
+    if any(w in text_lower for w in ["list running", "running apps", "running processes", "what's running", "show processes", "task list"]):
+        list_running_apps()
+        return True
+
+    # --- Window management ---
+    if any(w in text_lower for w in ["minimize all", "show desktop", "hide all"]):
+        minimize_all_windows()
+        return True
+    if any(w in text_lower for w in ["restore all", "show all windows", "unhide all"]):
+        restore_all_windows()
+        return True
+    if "close window" in text_lower or "close this window" in text_lower:
+        close_current_window()
+        return True
+    if "alt tab" in text_lower or "switch window" in text_lower:
+        switch_window()
+        return True
+    if "snap left" in text_lower or "snap window left" in text_lower:
+        snap_window_left()
+        return True
+    if "snap right" in text_lower or "snap window right" in text_lower:
+        snap_window_right()
+        return True
+    if "maximize window" in text_lower or "maximize this" in text_lower or "full screen" in text_lower:
+        maximize_window()
+        return True
+    if "minimize window" in text_lower or "minimize this" in text_lower:
+        minimize_window()
+        return True
+    if "new desktop" in text_lower or "new virtual desktop" in text_lower or "create desktop" in text_lower:
+        new_virtual_desktop()
+        return True
+    if "close desktop" in text_lower or "close virtual desktop" in text_lower or "remove desktop" in text_lower:
+        close_virtual_desktop()
+        return True
+    if "task view" in text_lower:
+        open_task_view()
+        return True
+
+    # --- System actions ---
+    if "screenshot" in text_lower or "screen shot" in text_lower or "snip" in text_lower or "screen capture" in text_lower:
+        take_screenshot()
+        return True
+    if "lock" in text_lower and any(w in text_lower for w in ["screen", "computer", "pc", "laptop", "my"]):
+        lock_screen()
+        return True
+    if "shut down" in text_lower or "shutdown" in text_lower:
+        shutdown_pc()
+        return True
+    if "cancel shutdown" in text_lower or "abort shutdown" in text_lower or "stop shutdown" in text_lower:
+        cancel_shutdown()
+        return True
+    if "restart" in text_lower or "reboot" in text_lower:
+        restart_pc()
+        return True
+    if "hibernate" in text_lower:
+        hibernate_pc()
+        return True
+    if "sleep" in text_lower and not "sleep timeout" in text_lower:
+        sleep_pc()
+        return True
+    if "log off" in text_lower or "logoff" in text_lower or "sign out" in text_lower:
+        logoff_pc()
+        return True
+
+    # --- Power plan ---
+    power_match = re.search(r'(?:power plan|power mode|set power)\s+(?:to\s+)?(.+)', text_lower)
+    if power_match:
+        set_power_plan(power_match.group(1).strip())
+        return True
+    if "high performance" in text_lower and "power" in text_lower:
+        set_power_plan("high performance")
+        return True
+    if "power saver" in text_lower or "battery saver" in text_lower:
+        set_power_plan("power saver")
+        return True
+    if "balanced" in text_lower and "power" in text_lower:
+        set_power_plan("balanced")
+        return True
+
+    # --- Screen/sleep timeout ---
+    screen_timeout_match = re.search(r'screen\s+timeout\s+(?:to\s+)?(\d+)', text_lower)
+    if screen_timeout_match:
+        set_screen_timeout(int(screen_timeout_match.group(1)))
+        return True
+    sleep_timeout_match = re.search(r'sleep\s+timeout\s+(?:to\s+)?(\d+)', text_lower)
+    if sleep_timeout_match:
+        set_sleep_timeout(int(sleep_timeout_match.group(1)))
+        return True
+
+    # --- Resolution ---
+    res_match = re.search(r'resolution\s+(?:to\s+)?(\d{3,4})\s*[x×]\s*(\d{3,4})', text_lower)
+    if res_match:
+        set_screen_resolution(int(res_match.group(1)), int(res_match.group(2)))
+        return True
+
+    # --- Battery & System info ---
+    if any(w in text_lower for w in ["battery level", "battery status", "battery percentage", "how much battery", "charge level"]):
+        show_battery_level()
+        return True
+    if "battery report" in text_lower:
+        generate_battery_report()
+        return True
+    if any(w in text_lower for w in ["system info", "system information", "my specs", "pc specs", "computer specs", "about my pc", "about my computer"]):
+        show_system_info()
+        return True
+    if any(w in text_lower for w in ["disk space", "disk usage", "storage space", "free space", "drive space"]):
+        show_disk_usage()
+        return True
+    if any(w in text_lower for w in ["cpu usage", "processor usage", "cpu load"]):
+        show_cpu_usage()
+        return True
+    if any(w in text_lower for w in ["ram usage", "memory usage", "free ram", "used ram"]):
+        show_ram_usage()
+        return True
+    if any(w in text_lower for w in ["uptime", "how long running", "boot time"]):
+        show_uptime()
+        return True
+    if any(w in text_lower for w in ["windows version", "os version", "which windows"]):
+        show_windows_version()
+        return True
+    if any(w in text_lower for w in ["startup apps", "startup programs", "startup list"]):
+        show_startup_apps()
+        return True
+    if any(w in text_lower for w in ["installed apps", "installed programs", "installed software", "list apps"]):
+        show_installed_apps()
+        return True
+
+    # --- Network info ---
+    if any(w in text_lower for w in ["my ip", "ip address", "show ip", "what is my ip"]):
+        if "public" in text_lower:
+            show_public_ip()
+        else:
+            show_ip_address()
+        return True
+    if "public ip" in text_lower:
+        show_public_ip()
+        return True
+    ping_match = re.search(r'ping\s+(.+)', text_lower)
+    if ping_match:
+        ping_host(ping_match.group(1).strip())
+        return True
+    if "flush dns" in text_lower or "clear dns" in text_lower:
+        flush_dns()
+        return True
+    if any(w in text_lower for w in ["wifi password", "show password", "network password"]):
+        show_wifi_password()
+        return True
+    if any(w in text_lower for w in ["network info", "network status", "network adapters", "connection info"]):
+        show_network_info()
+        return True
+    if any(w in text_lower for w in ["speed test", "internet speed", "test speed", "bandwidth"]):
+        speed_test()
+        return True
+
+    # --- File/Folder management ---
+    folder_match = re.search(r'(?:open|go to|show)\s+(?:my\s+)?(?:the\s+)?(downloads|documents|desktop|pictures|videos|music|home|appdata|temp|c drive|d drive|c:|d:)', text_lower)
+    if folder_match:
+        open_folder(folder_match.group(1))
+        return True
+    if "empty recycle" in text_lower or "empty trash" in text_lower or "clear recycle" in text_lower:
+        empty_recycle_bin()
+        return True
+    create_match = re.search(r'create\s+(?:a\s+)?(?:new\s+)?folder\s+(?:called\s+|named\s+)?(.+)', text_lower)
+    if create_match:
+        create_folder(create_match.group(1).strip())
+        return True
+
+    # --- Clipboard ---
+    if "clear clipboard" in text_lower or "empty clipboard" in text_lower:
+        clear_clipboard()
+        return True
+    if "clipboard history" in text_lower or "clipboard settings" in text_lower:
+        open_clipboard_history()
+        return True
+
+    # --- Security & Maintenance ---
+    if any(w in text_lower for w in ["virus scan", "scan for virus", "quick scan", "malware scan", "defender scan"]):
+        if "full" in text_lower:
+            run_full_virus_scan()
+        else:
+            run_virus_scan()
+        return True
+    if "update defender" in text_lower or "defender update" in text_lower or "update virus" in text_lower:
+        update_defender()
+        return True
+    if "windows update" in text_lower or "check for updates" in text_lower or "update windows" in text_lower:
+        check_windows_update()
+        return True
+    if "firewall" in text_lower:
+        open_firewall()
+        return True
+    if any(w in text_lower for w in ["clear temp", "delete temp", "clean temp"]):
+        clear_temp_files()
+        return True
+    if any(w in text_lower for w in ["disk cleanup", "clean disk", "free up space"]):
+        disk_cleanup()
+        return True
+
+    # --- Input & Accessibility ---
+    if any(w in text_lower for w in ["on-screen keyboard", "onscreen keyboard", "virtual keyboard", "screen keyboard"]):
+        open_onscreen_keyboard()
+        return True
+    if any(w in text_lower for w in ["emoji", "emoji panel", "emoji picker"]):
+        open_emoji_panel()
+        return True
+
+    # --- Productivity ---
+    if any(w in text_lower for w in ["what time", "current time", "what date", "current date", "what day"]):
+        show_datetime()
+        return True
+    timer_match = re.search(r'(?:set\s+)?(?:a\s+)?timer\s+(?:for\s+)?(\d+)', text_lower)
+    if timer_match:
+        set_timer(int(timer_match.group(1)))
+        return True
+    if "alarm" in text_lower:
+        set_alarm()
+        return True
+    if "run dialog" in text_lower or "run box" in text_lower:
+        open_run_dialog()
+        return True
+    if "action center" in text_lower or "notification center" in text_lower or "notifications panel" in text_lower:
+        open_action_center()
+        return True
+
+    # --- Web search ---
+    search_match = re.search(r'(?:search|google|look up|find|bing)\s+(?:for\s+)?(.+)', text_lower)
+    if search_match:
+        web_search(search_match.group(1).strip())
+        return True
+
+    # --- Open website ---
+    url_match = re.search(r'(?:open|go to|visit|browse)\s+((?:https?://)?(?:www\.)?[\w.-]+\.\w{2,}(?:/\S*)?)', text_lower)
+    if url_match:
+        open_website(url_match.group(1).strip())
+        return True
+
+    # --- Open settings page (only if user says 'settings' or 'open') ---
+    if any(w in text_lower for w in ["settings", "open", "show", "go to", "launch"]):
+        for key in sorted(SETTINGS_MAP.keys(), key=len, reverse=True):
+            if key in text_lower:
+                open_settings(key)
+                return True
+
+    # --- Open apps ---
+    for app_name in sorted(APP_MAP.keys(), key=len, reverse=True):
+        if app_name in text_lower:
+            open_app(app_name)
+            return True
+
+    # --- Play something ---
+    if "play" in text_lower:
+        play_match = re.search(r'play\s+(.+?)(?:\s+on\s+|\s*$)', text_lower)
+        if play_match:
+            query = play_match.group(1).strip()
+            if "spotify" in text_lower:
+                open_app("spotify")
+            else:
+                web_search(f"{query} play online")
+            return True
+
+    return False
+
+
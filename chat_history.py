@@ -0,0 +1,196 @@
+"""
+Bounded chat history for the UI.
+
+The chat widget only holds the most recent entries (a command with its
+output, the welcome text, ...): at most `max_entries` of them and about
+`max_lines` lines. Past either cap the oldest finished entries are taken out
+of the widget and appended to an archive on disk (JSON lines of (text, tag)
+pieces). Scrolling to the top pages them back in, newest first, `PAGE_SIZE`
+at a time; the archive carries over between sessions and is trimmed to
+`max_archived` entries when opened.
+
+This module only does the bookkeeping and the file; app.py does the drawing.
+"""
+import bisect
+import collections
+import json
+import os
+
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_MAX_LINES = 2000
+DEFAULT_MAX_ARCHIVED = 5000
+PAGE_SIZE = 20
+
+# The chat's display tags; anything else (status and cancel-link tags) is not archived
+STYLE_TAGS = ("user", "bot", "action", "error", "dim", "welcome")
+
+
+class _Entry:
+    __slots__ = ("id", "lines", "done", "archived")
+
+    def __init__(self, id, lines, done, archived):
+        self.id = id
+        self.lines = lines
+        self.done = done          # may be taken out of the widget
+        self.archived = archived  # already on disk (paged back in, or not to be kept)
+
+
+class ChatHistory:
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES, max_lines=DEFAULT_MAX_LINES,
+                 max_archived=DEFAULT_MAX_ARCHIVED):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.max_lines = max(1, int(max_lines))
+        self.max_archived = max_archived
+        self.visible = collections.deque()   # _Entry, oldest first (the widget's contents)
+        self._ids = []                       # archived entry ids, oldest first
+        self._offsets = []                   # their byte offsets in the file
+        self._next_id = 1
+        if path is not None:
+            self._open()
+
+    # ─── Visible entries ───
+    def add(self, lines=0, done=False, keep=True):
+        """Register a new entry at the bottom of the chat; returns its id.
+
+        keep=False: it is dropped, not archived, once it scrolls out (e.g. the welcome text).
+        """
+        entry = _Entry(self._next_id, lines, done, not keep)
+        self._next_id += 1
+        self.visible.append(entry)
+        return entry.id
+
+    def grow(self, entry_id, lines):
+        """`lines` more lines were drawn for the entry."""
+        entry = self._find(entry_id)
+        if entry is not None:
+            entry.lines += lines
+
+    def finish(self, entry_id):
+        """The entry won't change any more, so it may be taken out of the widget."""
+        entry = self._find(entry_id)
+        if entry is not None:
+            entry.done = True
+
+    @property
+    def lines(self):
+        return sum(e.lines for e in self.visible)
+
+    def overflow(self):
+        """Ids of the oldest entries to take out of the widget to get back under the caps.
+
+        Stops at the first entry still in progress: entries leave from the top, in order.
+        """
+        ids, count, lines = [], len(self.visible), self.lines
+        for entry in self.visible:
+            if count <= self.max_entries and lines <= self.max_lines:
+                break
+            if not entry.done or count == 1:
+                break
+            ids.append(entry.id)
+            count -= 1
+            lines -= entry.lines
+        return ids
+
+    def evict(self, entry_id, pieces):
+        """Take the (oldest) entry out of the widget, archiving its `pieces` unless already on disk."""
+        entry = self.visible.popleft()
+        assert entry.id == entry_id, "entries leave the widget oldest first"
+        if not entry.archived:
+            self._append(entry.id, pieces)
+
+    # ─── Archive ───
+    def has_older(self):
+        """Whether scrolling up can page more archived entries in."""
+        return self._oldest_archived_index() > 0
+
+    def page(self, count=PAGE_SIZE):
+        """Up to `count` archived entries older than the oldest visible one: [(id, lines, pieces)], oldest first.
+
+        They are registered at the top of the chat (the caller draws them there).
+        """
+        end = self._oldest_archived_index()
+        start = max(0, end - count)
+        if start == end:
+            return []
+        loaded = []
+        with open(self.path, "rb") as f:
+            for entry_id, offset in zip(self._ids[start:end], self._offsets[start:end]):
+                f.seek(offset)
+                record = json.loads(f.readline())
+                pieces = [tuple(p) for p in record["pieces"]]
+                loaded.append((entry_id, sum(text.count("\n") for text, _ in pieces), pieces))
+        for entry_id, lines, _ in reversed(loaded):
+            self.visible.appendleft(_Entry(entry_id, lines, True, True))
+        return loaded
+
+    def _oldest_archived_index(self):
+        """How many archived entries are older than what the widget shows."""
+        if not self.visible:
+            return len(self._ids)
+        return bisect.bisect_left(self._ids, self.visible[0].id)
+
+    def _append(self, entry_id, pieces):
+        if self.path is None:
+            return
+        line = json.dumps({"id": entry_id, "pieces": [[text, tag] for text, tag in pieces]}, ensure_ascii=False)
+        try:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line.encode("utf-8") + b"\n")
+        except OSError:
+            return  # no writable state dir: the entry is just dropped
+        self._ids.append(entry_id)
+        self._offsets.append(offset)
+
+    def _open(self):
+        """Index the archive (and trim it to max_archived entries)."""
+        try:
+            with open(self.path, "rb") as f:
+                records = f.readlines()
+        except OSError:
+            return
+        if self.max_archived is not None and len(records) > self.max_archived:
+            records = records[-self.max_archived:]
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.writelines(records)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+        offset = 0
+        for record in records:
+            try:
+                entry_id = int(json.loads(record)["id"])
+            except (ValueError, KeyError, TypeError):
+                entry_id = None
+            if entry_id is not None:
+                self._ids.append(entry_id)
+                self._offsets.append(offset)
+                self._next_id = max(self._next_id, entry_id + 1)
+            offset += len(record)
+
+    def _find(self, entry_id):
+        for entry in reversed(self.visible):
+            if entry.id == entry_id:
+                return entry
+        return None
+
+
+def pieces_from_dump(dump):
+    """(text, style tag) pieces from a tk.Text.dump(..., text=True, tag=True) of an entry."""
+    active, pieces = [], []
+    for key, value, _index in dump:
+        if key == "tagon":
+            active.append(value)
+        elif key == "tagoff":
+            if value in active:
+                active.remove(value)
+        elif key == "text":
+            style = next((t for t in reversed(active) if t in STYLE_TAGS), None)
+            if pieces and pieces[-1][1] == style:
+                pieces[-1] = (pieces[-1][0] + value, style)
+            else:
+                pieces.append((value, style))
+    return pieces
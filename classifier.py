@@ -0,0 +1,241 @@
+"""
+Linear intent classifier: the tier between the keyword router and the model.
+
+A multinomial logistic regression over hashed TF-IDF features (words, word
+bigrams, character trigrams), trained from the router's phrase lists and the
+decisions the model made before. Prediction is a sum over the utterance's few
+dozen non-zero features of rows of the weight matrix, so it takes
+microseconds, not a generate().
+
+Classes are an intent plus the arguments its phrasing implies (e.g. "louder" is
+set_volume with level 80). Arguments the words themselves carry, like a number,
+a settings page or an app name, are left to SlotFiller, which reads them from
+the utterance with the intent's own route regexes and trigger vocabularies.
+
+Weights are kept in <directory>/classifier.npz with a fingerprint of the
+training data, and retrained when it changes. The tier needs numpy
+(available()), which is imported on first use, as in semantic.py.
+"""
+import json
+import math
+import os
+import re
+import zlib
+
+from semantic import STOPWORDS, available, load_numpy
+
+DIM = 1 << 13
+# Out-of-domain requests ("what time does the store close", "is dark mode on")
+# reach up to ~0.75 on the assistant's own intents; below this the model decides
+DEFAULT_THRESHOLD = 0.8
+EPOCHS = 100
+LEARNING_RATE = 200.0
+L2 = 1e-5
+
+_WORDS = re.compile(r"[a-z0-9']+")
+_NUMBER = re.compile(r"-?\d+")
+
+
+def features(text):
+    """Hashed feature ids of `text` (words, word bigrams, char trigrams), with repeats."""
+    words = [w for w in _WORDS.findall(text.lower()) if w not in STOPWORDS]
+    feats = [f"w:{w}" for w in words] + [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        feats += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return [zlib.crc32(f.encode("utf-8")) % DIM for f in feats]
+
+
+def label_args(text, args):
+    """The arguments a phrasing implies: `args` without the values spelled out in `text` (slots)."""
+    lowered = text.lower()
+    return {k: v for k, v in args.items()
+            if isinstance(v, bool) or str(v).lower() not in lowered}
+
+
+class IntentClassifier:
+    """Softmax regression over sparse TF-IDF vectors. Labels are (intent, args) pairs."""
+
+    def __init__(self, directory=None, threshold=DEFAULT_THRESHOLD):
+        self.directory = directory
+        self.threshold = threshold
+        self.fingerprint = None
+        self.labels = []        # [(intent, args)]
+        self.idf = None         # DIM
+        self.weights = None     # DIM x classes (no bias: words nobody trained on score every class 0)
+
+    @property
+    def _path(self):
+        return os.path.join(self.directory, "classifier.npz")
+
+    def _vector(self, feats):
+        """(feature ids, TF-IDF weights) for a feature list, L2-normalized."""
+        np = load_numpy()
+        counts = {}
+        for f in feats:
+            counts[f] = counts.get(f, 0) + 1
+        idx = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        val = np.array([1.0 + math.log(c) for c in counts.values()], dtype=np.float32) * self.idf[idx]
+        return idx, val / np.linalg.norm(val)
+
+    # ─── Training ───
+    def build(self, examples, fingerprint):
+        """Load stored weights for `fingerprint`, or train on `examples` [(text, intent, args)] and store them."""
+        if self._load(fingerprint):
+            return self
+        self.train(examples)
+        self.fingerprint = fingerprint
+        if self.directory is not None:
+            self._save()
+        return self
+
+    def train(self, examples):
+        np = load_numpy()
+        code_of = {}
+        rows = []
+        for text, intent, args in examples:
+            key = (intent, json.dumps(args, sort_keys=True))
+            if key not in code_of:
+                code_of[key] = len(self.labels)
+                self.labels.append((intent, dict(args)))
+            rows.append((features(text), code_of[key]))
+        rows = [(f, y) for f, y in rows if f]
+        n, classes = len(rows), len(self.labels)
+
+        df = np.zeros(DIM, dtype=np.float32)
+        for f, _ in rows:
+            df[np.unique(f)] += 1
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+        # Train on the columns that occur (dense, so the products are BLAS calls);
+        # the stored matrix has zero rows for all other features.
+        vectors = [self._vector(f) for f, _ in rows]
+        used = np.unique(np.concatenate([i for i, _ in vectors]))
+        x = np.zeros((n, len(used)), dtype=np.float32)
+        for r, (idx, val) in enumerate(vectors):
+            x[r, np.searchsorted(used, idx)] = val
+        y = np.array([c for _, c in rows])
+        # Every class weighs the same, however many phrasings it has
+        sample_weight = ((1.0 / np.bincount(y, minlength=classes)[y]) * (n / classes)).astype(np.float32)
+
+        w = np.zeros((len(used), classes), dtype=np.float32)
+        onehot = np.zeros((n, classes), dtype=np.float32)
+        onehot[np.arange(n), y] = 1
+        for _ in range(EPOCHS):
+            logits = x @ w
+            logits -= logits.max(axis=1, keepdims=True)
+            p = np.exp(logits)
+            p /= p.sum(axis=1, keepdims=True)
+            err = (p - onehot) * sample_weight[:, None] / n
+            w -= LEARNING_RATE * (x.T @ err + L2 * w)
+        full = np.zeros((DIM, classes), dtype=np.float32)
+        full[used] = w
+        w = full
+        self.weights = w
+
+    # ─── Prediction ───
+    def predict(self, text):
+        """(intent, args, confidence) for the most likely class, or None if below the threshold."""
+        np = load_numpy()
+        if self.weights is None:
+            return None
+        feats = features(text)
+        if not feats:
+            return None
+        idx, val = self._vector(feats)
+        logits = val @ self.weights[idx]
+        logits -= logits.max()
+        p = np.exp(logits)
+        p /= p.sum()
+        best = int(p.argmax())
+        if p[best] < self.threshold:
+            return None
+        intent, args = self.labels[best]
+        return intent, dict(args), float(p[best])
+
+    # ─── Storage ───
+    def _load(self, fingerprint):
+        np = load_numpy()
+        if self.directory is None or fingerprint is None:
+            return False
+        try:
+            with np.load(self._path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != fingerprint:
+                    return False
+                self.labels = [(i, a) for i, a in json.loads(str(data["labels"]))]
+                self.idf, self.weights = data["idf"], data["weights"]
+        except (OSError, KeyError, ValueError):
+            return False
+        self.fingerprint = fingerprint
+        return True
+
+    def _save(self):
+        np = load_numpy()
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self._path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, fingerprint=np.array(self.fingerprint or ""), labels=np.array(json.dumps(self.labels)),
+                 idf=self.idf, weights=self.weights)
+        os.replace(tmp, self._path)
+
+
+class SlotFiller:
+    """Fills in the arguments a predicted intent still needs, from the utterance itself."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._patterns = {}
+        self._vocab = {}
+        for name, intent in registry.intents.items():
+            self._patterns[name] = [r.pattern for r in intent.routes if r.pattern is not None and r.pattern.groupindex]
+            vocab = {}
+            for r in intent.routes:
+                if r.pick:
+                    vocab.setdefault(r.pick, set()).update(r.triggers)
+            self._vocab[name] = {p: sorted(words, key=len, reverse=True) for p, words in vocab.items()}
+
+    def fill(self, text, intent, args):
+        """`args` completed from `text`, or None if a required argument can't be found.
+
+        Arguments nothing supplies fall back to the handler's defaults.
+        """
+        lowered = text.lower().strip()
+        args = dict(args)
+        for pattern in self._patterns.get(intent, ()):
+            m = pattern.search(lowered)
+            if m:
+                for k, v in m.groupdict().items():
+                    if v and v.strip() and k not in args:
+                        args[k] = v.strip()
+        for param, words in self._vocab.get(intent, {}).items():
+            if param not in args:
+                for w in words:
+                    if re.search(rf"(?<!\w){re.escape(w)}(?!\w)", lowered):
+                        args[param] = w
+                        break
+        for param, (kind, *_) in self.registry.intents[intent].params.items():
+            if param not in args and kind in ("integer", "number"):
+                m = _NUMBER.search(lowered)
+                if m:
+                    args[param] = int(m.group())
+        return self.registry.bind_tool(intent, args)
+
+
+def training_examples(registry, decisions=()):
+    """(text, intent, args) to train on.
+
+    Every phrasing the routes accept, each intent's description and regex
+    triggers, and the model's past `decisions` [(text, function, params)].
+    """
+    examples = []
+    for text, intent, args in registry.phrases():
+        examples.append((text, intent, label_args(text, args)))
+    for name, intent in registry.intents.items():
+        examples.append((intent.description, name, {}))
+        for route in intent.routes:
+            if route.pattern is not None:
+                examples += [(t, name, label_args(t, route.args)) for t in route.triggers]
+    for text, name, params in decisions:
+        args = registry.bind_tool(name, params)
+        if args is not None:
+            examples.append((text, name, label_args(text, args)))
+    return examples
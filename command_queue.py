@@ -0,0 +1,153 @@
+"""
+Command queue for the UI.
+
+Commands are submitted from any thread (the Tk main loop) and run on the
+engine loop (aio.py), at most `workers` at a time. The rest wait in a queue;
+when a slot frees, a queued command the keyword router resolves on its own
+(`is_fast`) goes ahead of ones waiting for the model, so quick actions are not
+stuck behind slow ones. A command submitted with its own `run` (a quick action
+already resolved to an intent) skips the text entirely and counts as fast.
+
+Every Command has its own responses.Channel. cancel() drops a queued command,
+or for a running one sets the channel's cancellation flag (PowerShell scripts
+and generate() stop on it) and cancels its task (aio.run kills the
+subprocess it was awaiting).
+"""
+import asyncio
+import itertools
+import threading
+import time
+
+import aio
+import responses
+
+DEFAULT_WORKERS = 4
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class Command:
+    __slots__ = ("id", "text", "channel", "state", "fast", "submitted", "started", "finished", "error", "_run",
+                 "_task")
+
+    def __init__(self, id, text, channel, fast, run=None):
+        self.id = id
+        self.text = text
+        self.channel = channel
+        self.fast = fast
+        self.state = QUEUED
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.error = None
+        self._run = run
+        self._task = None
+
+    @property
+    def seconds(self):
+        """How long it ran (so far), or None while queued."""
+        if self.started is None:
+            return None
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def active(self):
+        return self.state in (QUEUED, RUNNING)
+
+    def __repr__(self):
+        return f"Command({self.id}, {self.text!r}, {self.state})"
+
+
+class CommandQueue:
+    """Runs `await run(text, channel)` for submitted commands, `workers` at a time.
+
+    on_change(command), if given, is called whenever a command changes state,
+    on the thread that changed it (the engine loop, or the caller of
+    submit()/cancel()).
+    """
+
+    def __init__(self, run, workers=DEFAULT_WORKERS, is_fast=None, on_change=None):
+        self.run = run
+        self.workers = max(1, int(workers))
+        self.is_fast = is_fast
+        self.on_change = on_change
+        self._ids = itertools.count(1)
+        self._queued = []
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def submit(self, text, listener=None, run=None):
+        """Queue `text`; returns its Command. `listener(command, event)` receives the command's events.
+
+        `await run(channel)`, if given, is run instead of the queue's run(text, channel).
+        """
+        fast = run is not None or (bool(self.is_fast(text)) if self.is_fast is not None else False)
+        command = Command(next(self._ids), text, None, fast, run)
+        command.channel = responses.Channel(None if listener is None else lambda event: listener(command, event))
+        with self._lock:
+            self._queued.append(command)
+        self._changed(command)
+        aio.get_loop().call_soon_threadsafe(self._pump)
+        return command
+
+    def cancel(self, command):
+        """Cancel a queued or running command (from any thread). Returns False if it had already finished."""
+        with self._lock:
+            if command.state == QUEUED and command in self._queued:
+                self._queued.remove(command)
+                self._finish(command, CANCELLED)
+            elif command.state == RUNNING:
+                command.channel.cancel()
+            else:
+                return False
+        if command.state == CANCELLED:
+            self._changed(command)
+            return True
+        aio.get_loop().call_soon_threadsafe(command._task.cancel)
+        return True
+
+    def pending(self):
+        """Commands queued or running, oldest first."""
+        with self._lock:
+            return sorted(list(self._queued) + list(self._running), key=lambda c: c.id)
+
+    # ─── On the engine loop ───
+    def _pump(self):
+        while True:
+            with self._lock:
+                if len(self._running) >= self.workers or not self._queued:
+                    return
+                command = next((c for c in self._queued if c.fast), self._queued[0])
+                self._queued.remove(command)
+                self._running.add(command)
+                command.state = RUNNING
+                command.started = time.perf_counter()
+                command._task = asyncio.ensure_future(self._run(command))
+            self._changed(command)
+
+    async def _run(self, command):
+        state = DONE
+        try:
+            if command._run is not None:
+                await command._run(command.channel)
+            else:
+                await self.run(command.text, command.channel)
+        except asyncio.CancelledError:
+            state = CANCELLED
+        except Exception as e:
+            command.error = e
+            state = FAILED
+        with self._lock:
+            self._running.discard(command)
+            self._finish(command, state)
+        self._changed(command)
+        self._pump()
+
+    @staticmethod
+    def _finish(command, state):
+        command.state = state
+        command.finished = time.perf_counter()
+
+    def _changed(self, command):
+        if self.on_change is not None:
+            self.on_change(command)
@@ -0,0 +1,228 @@
+"""
+Constrained, early-stopping decoding of FunctionGemma function calls.
+
+The model answers with  call:name{key:<escape>text<escape>,level:50}  (optionally
+preceded by <start_function_call>). CallGrammar accepts exactly that, with
+`name` one of the tools and the keys, value types and required arguments
+taken from that tool's schema. During generate():
+
+  CallLogitsProcessor  keeps the greedy choice among the model's top-k tokens
+                       that leaves the text a valid call prefix. If the very
+                       first token doesn't start a call, the model is treated
+                       as declining and nothing is forced.
+  CallStoppingCriteria ends a row as soon as its call's closing brace is out
+                       (or it declined), instead of running to max_new_tokens.
+  TokenStream          reports each row's new text as it is generated, so
+                       callers can show it live, and stops the rows whose
+                       caller gave up (cancelled).
+
+The finished text is parsed by the same grammar, so arguments come back typed
+and there is no regex guessing afterwards.
+"""
+import re
+
+CALL_OPENER = "<start_function_call>"
+ESCAPE = "<escape>"
+
+INVALID, PARTIAL, COMPLETE = "invalid", "partial", "complete"
+
+_WORD = re.compile(r"\w*")
+_INT = re.compile(r"-?\d*")
+
+
+class CallGrammar:
+    """Validates and parses call text against a tool schema (the ai_functions list)."""
+
+    def __init__(self, tools):
+        self.tools = {}
+        for tool in tools:
+            fn = tool["function"]
+            params = fn.get("parameters", {})
+            props = {k: v.get("type", "string") for k, v in params.get("properties", {}).items()}
+            self.tools[fn["name"]] = (props, set(params.get("required", ())))
+
+    def check(self, text):
+        """INVALID, PARTIAL (valid so far) or COMPLETE (closing brace reached)."""
+        return self._walk(text)[0]
+
+    def parse(self, text):
+        """(name, params) for a complete call, else None."""
+        state, name, params = self._walk(text)
+        return (name, params) if state == COMPLETE else None
+
+    def _walk(self, text):
+        s = text.lstrip()
+        if s.startswith(CALL_OPENER):
+            s = s[len(CALL_OPENER):].lstrip()
+        elif CALL_OPENER.startswith(s):
+            return PARTIAL, None, None
+        if len(s) < 5:
+            return (PARTIAL if "call:".startswith(s) else INVALID), None, None
+        if not s.startswith("call:"):
+            return INVALID, None, None
+        s = s[5:]
+        name = _WORD.match(s).group()
+        rest = s[len(name):]
+        if not rest:
+            return (PARTIAL if any(n.startswith(name) for n in self.tools) else INVALID), None, None
+        if name not in self.tools or rest[0] != "{":
+            return INVALID, None, None
+        state, params = self._walk_args(*self.tools[name], rest[1:])
+        return state, name, params
+
+    def _walk_args(self, props, required, s):
+        params = {}
+        pos = 0
+        while True:
+            if pos == len(s):
+                return PARTIAL, params
+            if s[pos] == "}":
+                return (COMPLETE if required <= params.keys() else INVALID), params
+            if params:
+                if s[pos] != ",":
+                    return INVALID, params
+                pos += 1
+            key = _WORD.match(s, pos).group()
+            pos += len(key)
+            open_keys = [p for p in props if p not in params]
+            if pos == len(s):
+                return (PARTIAL if any(p.startswith(key) for p in open_keys) else INVALID), params
+            if s[pos] != ":" or key not in open_keys:
+                return INVALID, params
+            pos += 1
+            state, value, pos = self._walk_value(props[key], s, pos)
+            if state != COMPLETE:
+                return state, params
+            params[key] = value
+
+    @staticmethod
+    def _walk_value(kind, s, pos):
+        """(state, value, new_pos). COMPLETE means the value ended and pos is past it."""
+        rest = s[pos:]
+        if kind in ("integer", "number"):
+            digits = _INT.match(rest).group()
+            end = pos + len(digits)
+            if end == len(s):
+                return PARTIAL, None, end
+            if digits in ("", "-"):
+                return INVALID, None, end
+            return COMPLETE, int(digits), end
+        if kind == "boolean":
+            for word in ("true", "false"):
+                if rest.startswith(word):
+                    return COMPLETE, word == "true", pos + len(word)
+                if word.startswith(rest):
+                    return PARTIAL, None, len(s)
+            return INVALID, None, pos
+        # strings: <escape>...<escape>
+        if not rest.startswith(ESCAPE):
+            return (PARTIAL if ESCAPE.startswith(rest) else INVALID), None, len(s)
+        end = rest.find(ESCAPE, len(ESCAPE))
+        if end < 0:
+            return PARTIAL, None, len(s)
+        return COMPLETE, rest[len(ESCAPE):end], pos + end + len(ESCAPE)
+
+
+# ═══════════════════════════════════════════════════════
+#  GENERATE() HOOKS
+# ═══════════════════════════════════════════════════════
+
+class CallConstraint:
+    """Per-request decoding state shared by the logits processor and stopping criteria.
+
+    `prompt_length` is the (padded) prompt width; everything after it in a
+    row of input_ids is that row's generated text.
+    """
+
+    def __init__(self, grammar, tokenizer, prompt_length, eos_token_id, top_k=20):
+        self.grammar = grammar
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.eos_token_id = eos_token_id
+        self.top_k = top_k
+        self.finished = {}   # row -> COMPLETE or "declined"
+
+    def text(self, ids):
+        return self.tokenizer.decode(ids, skip_special_tokens=False)
+
+    def generate_kwargs(self):
+        """Extra model.generate() arguments for constrained greedy decoding."""
+        from transformers import LogitsProcessorList, StoppingCriteriaList
+        return {
+            "do_sample": False,
+            "logits_processor": LogitsProcessorList([CallLogitsProcessor(self)]),
+            "stopping_criteria": StoppingCriteriaList([CallStoppingCriteria(self)]),
+        }
+
+
+class CallLogitsProcessor:
+    def __init__(self, constraint):
+        self.c = constraint
+
+    def __call__(self, input_ids, scores):
+        c = self.c
+        for row in range(input_ids.shape[0]):
+            generated = input_ids[row, c.prompt_length:].tolist()
+            choice = c.eos_token_id
+            if row not in c.finished:
+                started = bool(c.text(generated).strip())
+                candidates = scores[row].topk(min(c.top_k, scores.shape[-1])).indices.tolist()
+                # Before the call starts only the model's own first choice counts:
+                # if that isn't a call, it is declining and we don't force one.
+                for tok in (candidates if started else candidates[:1]):
+                    if tok != c.eos_token_id and c.grammar.check(c.text(generated + [tok])) != INVALID:
+                        choice = tok
+                        break
+                else:
+                    c.finished[row] = "declined"
+            scores[row, :] = float("-inf")
+            scores[row, choice] = 0.0
+        return scores
+
+
+class CallStoppingCriteria:
+    def __init__(self, constraint):
+        self.c = constraint
+
+    def __call__(self, input_ids, scores, **kwargs):
+        c = self.c
+        done = []
+        for row in range(input_ids.shape[0]):
+            if row not in c.finished and c.grammar.check(c.text(input_ids[row, c.prompt_length:].tolist())) == COMPLETE:
+                c.finished[row] = COMPLETE
+            done.append(row in c.finished)
+        return input_ids.new_tensor(done).bool()
+
+
+class TokenStream:
+    """Stopping criterion that calls on_text(row, text) with what each row added this step.
+
+    A row stops only when `stop(row)` (if given) returns True.
+    """
+
+    def __init__(self, tokenizer, prompt_length, on_text, stop=None):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.on_text = on_text
+        self.stop = stop
+        self.sent = {}   # row -> text reported so far
+
+    def add_to(self, kwargs):
+        """Append this stream to the stopping criteria in model.generate() `kwargs`."""
+        from transformers import StoppingCriteriaList
+        criteria = kwargs.get("stopping_criteria") or StoppingCriteriaList()
+        criteria.append(self)
+        kwargs["stopping_criteria"] = criteria
+        return kwargs
+
+    def __call__(self, input_ids, scores, **kwargs):
+        for row in range(input_ids.shape[0]):
+            text = self.tokenizer.decode(input_ids[row, self.prompt_length:].tolist(), skip_special_tokens=True)
+            sent = self.sent.get(row, "")
+            # A half-decoded multi-byte character can change on the next token; wait for it to settle
+            if len(text) > len(sent) and text.startswith(sent) and not text.endswith("\ufffd"):
+                self.on_text(row, text[len(sent):])
+                self.sent[row] = text
+        if self.stop is None:
+            return input_ids.new_zeros(input_ids.shape[0]).bool()
+        return input_ids.new_tensor([bool(self.stop(row)) for row in range(input_ids.shape[0])]).bool()
@@ -0,0 +1,360 @@
+"""
+Declarative intent registry.
+
+Each intent names its handler, its keyword routes (trigger phrases, slot
+regexes, priority) and the tool parameters the AI calls it with. The keyword
+router, the AI tool schema and the UI quick actions are all generated from
+here, so adding an action is one declaration.
+
+Quick actions (the UI's sidebar buttons) are resolved to an intent and its
+arguments when the sidebar is built, so a click runs the handler directly;
+PinnedActions keeps the ones the user pinned from their own commands.
+"""
+import inspect
+import json
+import os
+import threading
+
+import aio
+import responses
+from router import Router
+
+
+class Intent:
+    """An action the assistant can perform.
+
+    params  {name: (json_type, description[, choices])} — the arguments the AI
+            may pass, all required; by default taken from the handler's
+            signature, with only the arguments that have no default required.
+            `choices` lists the values the handler accepts (an enum)
+    ai      a core tool: offered to the model even when tools can't be
+            retrieved per request (any intent can be called by the AI)
+    routes  router.Route objects that resolve text to this intent
+    final   ends the session (lock, shutdown...): in a compound command it
+            runs on its own, after the actions said before it and before
+            the ones said after it (see plan.py)
+    guarded destructive (killing a process, emptying the bin...): only a
+            keyword route or the model may pick it, never a guess (see
+            IntentRegistry.guessable)
+    """
+    __slots__ = ("name", "handler", "description", "params", "required", "ai", "routes", "final", "guarded")
+
+    def __init__(self, name, handler, description=None, params=None, ai=False, routes=(), final=False,
+                 guarded=False):
+        self.name = name
+        self.handler = handler
+        doc = (handler.__doc__ or "").strip().splitlines()
+        self.description = description or (doc[0].rstrip(".") if doc else name.replace("_", " "))
+        if params is None:
+            self.params, self.required = _signature_params(handler)
+        else:
+            self.params, self.required = dict(params), list(params)
+        self.ai = ai
+        self.final = final
+        self.guarded = guarded
+        self.routes = list(routes)
+        for route in self.routes:
+            route.action = name
+
+    def schema(self):
+        """The function-calling schema handed to the chat template."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {p: _property(*spec) for p, spec in self.params.items()},
+                    "required": list(self.required),
+                },
+            },
+        }
+
+    def __repr__(self):
+        return f"Intent({self.name!r})"
+
+
+class QuickAction:
+    """A sidebar button: runs `intent` with `args`, no text to parse. `phrase` is what it was declared as, if any."""
+    __slots__ = ("label", "intent", "args", "phrase")
+
+    def __init__(self, label, intent, args, phrase=None):
+        self.label = label
+        self.intent = intent
+        self.args = dict(args)
+        self.phrase = phrase
+
+    def __eq__(self, other):
+        return (isinstance(other, QuickAction)
+                and (self.label, self.intent, self.args) == (other.label, other.intent, other.args))
+
+    def __repr__(self):
+        return f"QuickAction({self.label!r}, {self.intent}({self.args}))"
+
+
+_JSON_TYPES = {bool: "boolean", int: "integer", float: "number"}
+
+
+def _property(kind, description, choices=None):
+    prop = {"type": kind, "description": description}
+    if choices is not None:
+        prop["enum"] = list(choices)
+    return prop
+
+
+def _fits(value, spec):
+    """Whether `value` is a valid argument for the parameter `spec` (numbers may be strings, as regex slots are)."""
+    kind, choices = spec[0], spec[2] if len(spec) > 2 else None
+    if isinstance(value, bool):
+        ok = kind == "boolean"
+    elif kind == "integer":
+        ok = isinstance(value, int) or (isinstance(value, str) and value.strip().lstrip("-").isdigit())
+    elif kind == "number" and isinstance(value, str):
+        try:
+            ok = float(value) is not None
+        except ValueError:
+            ok = False
+    elif kind == "number":
+        ok = isinstance(value, (int, float))
+    elif kind == "boolean":
+        ok = False
+    else:
+        ok = isinstance(value, (str, int, float))  # text; a number reads as one
+    return ok and (choices is None or value in choices)
+
+
+def _signature_params(handler):
+    """Tool parameters for a handler without declared ones: types from the defaults."""
+    params, required = {}, []
+    for p in inspect.signature(handler).parameters.values():
+        if p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD):
+            continue
+        if p.default is p.empty:
+            required.append(p.name)
+        params[p.name] = (_JSON_TYPES.get(type(p.default), "string"), p.name.replace("_", " "))
+    return params, required
+
+
+class IntentRegistry:
+    def __init__(self):
+        self.intents = {}
+        self._quick = []
+        self._router = None
+
+    def add(self, handler, name=None, **kwargs):
+        """Register `handler` as an intent (named after the function by default)."""
+        intent = Intent(name or handler.__name__, handler, **kwargs)
+        if intent.name in self.intents:
+            raise ValueError(f"Duplicate intent: {intent.name}")
+        self.intents[intent.name] = intent
+        self._router = None
+        return intent
+
+    def quick(self, section, label, phrase, intent):
+        """Declare a sidebar button for `phrase`, which must resolve to `intent` (it runs what it resolves to)."""
+        self._quick.append((section, label, phrase, intent))
+
+    # ─── Keyword routing ───
+    def routes(self):
+        return [r for intent in self.intents.values() for r in intent.routes]
+
+    @property
+    def router(self):
+        if self._router is None:
+            self._router = Router(self.routes())
+        return self._router
+
+    def resolve(self, text):
+        """Resolve text to (intent_name, args), or None."""
+        resolved = self.router.resolve(text.lower().strip())
+        if resolved is None:
+            return None
+        return resolved[0], resolved[1]
+
+    def guessable(self, name, args):
+        """Whether a guess (the semantic index, the classifier) may run `name` with `args` unconfirmed.
+
+        Final and guarded intents, and switching something off, are left to the model.
+        """
+        intent = self.intents[name]
+        return not (intent.final or intent.guarded or args.get("on") is False)
+
+    def phrases(self):
+        """(text, intent_name, args) for every phrasing the routes accept with fixed arguments.
+
+        Regex routes are skipped (their arguments come from the text); `also`
+        words are paired with each trigger.
+        """
+        for intent in self.intents.values():
+            for route in intent.routes:
+                if route.pattern is not None or route.when is not None:
+                    continue
+                for trigger in route.triggers:
+                    args = dict(route.args)
+                    if route.pick:
+                        args[route.pick] = trigger
+                    texts = [f"{a.strip()} {trigger}" for a in route.also] or [trigger]
+                    for text in texts:
+                        yield text, intent.name, args
+
+    def execute(self, name, args):
+        """Run an intent's handler. Returns False only if the handler reported failure.
+
+        Coroutine handlers are run on the engine loop (see aio.py) and waited for.
+        What the handler logs is tagged with the intent's name (see responses.py).
+        """
+        responses.record_call(name, args)
+        with responses.acting_as(name):
+            result = self.intents[name].handler(**args)
+            if inspect.isawaitable(result):
+                result = aio.run_sync(result)
+        return result is not False
+
+    async def execute_async(self, name, args):
+        """execute() for the engine loop: coroutine handlers are awaited, plain ones run on the blocking pool."""
+        responses.record_call(name, args)
+        with responses.acting_as(name):
+            return await aio.call(self.intents[name].handler, **args) is not False
+
+    # ─── AI tools ───
+    def tool_schema(self, names=None):
+        """Schemas for the intents in `names` (in registration order), or for the core (ai=True) ones."""
+        if names is None:
+            return [i.schema() for i in self.intents.values() if i.ai]
+        names = set(names)
+        return [i.schema() for i in self.intents.values() if i.name in names]
+
+    def tool_documents(self):
+        """{intent_name: [texts describing it]} — description, name and trigger phrases, for tool retrieval."""
+        docs = {name: [intent.description, name.replace("_", " ")] for name, intent in self.intents.items()}
+        for text, name, _ in self.phrases():
+            docs[name].append(text)
+        for intent in self.intents.values():
+            for route in intent.routes:
+                if route.pattern is not None or route.when is not None:
+                    docs[intent.name].extend(route.triggers)
+        return docs
+
+    def bind_tool(self, name, params):
+        """Handler arguments for an AI-chosen function call, or None if it can't be called.
+
+        Arguments the intent doesn't declare are dropped; missing ones fall back
+        to the handler's defaults. Unknown functions, arguments that are
+        missing without a default, and values that don't fit the declared type
+        or choices give None.
+        """
+        intent = self.intents.get(name)
+        if intent is None:
+            return None
+        args = {p: params[p] for p in intent.params if p in params}
+        if not all(_fits(v, intent.params[p]) for p, v in args.items()):
+            return None
+        signature = inspect.signature(intent.handler).parameters
+        for p in intent.params:
+            if p not in args and signature[p].default is inspect.Parameter.empty:
+                return None
+        return args
+
+    def call_tool(self, name, params):
+        """Run an AI-chosen function call. Returns False if it can't be called or failed."""
+        args = self.bind_tool(name, params)
+        if args is None:
+            return False
+        return self.execute(name, args)
+
+    # ─── UI ───
+    def quick_actions(self):
+        """Sidebar layout for app.py: (section, None, True) headers and QuickAction buttons.
+
+        Each button's phrase is resolved here, once. Raises ValueError if one
+        no longer routes to its intent.
+        """
+        items = []
+        section = None
+        for sec, label, phrase, intent in self._quick:
+            resolved = self.resolve(phrase)
+            if resolved is None or resolved[0] != intent:
+                raise ValueError(f"Quick action {label!r}: {phrase!r} routes to {resolved}, not {intent}")
+            if sec != section:
+                items.append((sec, None, True))
+                section = sec
+            items.append(QuickAction(label, intent, resolved[1], phrase))
+        return items
+
+
+class PinnedActions:
+    """Quick actions the user pinned, saved to `path` as JSON (a list of {label, intent, args}).
+
+    Pins whose intent no longer exists, or can't be called with the saved
+    arguments, are dropped on load.
+    """
+
+    def __init__(self, registry, path=None):
+        self.registry = registry
+        self.path = path
+        self._actions = []
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._actions)
+
+    def items(self):
+        with self._lock:
+            return list(self._actions)
+
+    def pin(self, label, intent, args):
+        """Pin a resolved command as a button (replacing one with the same label). Returns its QuickAction."""
+        bound = self.registry.bind_tool(intent, args)
+        if bound is None:
+            raise ValueError(f"Can't pin {intent}({args})")
+        action = QuickAction(label, intent, bound)
+        with self._lock:
+            self._actions = [a for a in self._actions if a.label != label] + [action]
+        self.save()
+        return action
+
+    def unpin(self, label):
+        with self._lock:
+            kept = [a for a in self._actions if a.label != label]
+            changed, self._actions = len(kept) != len(self._actions), kept
+        if changed:
+            self.save()
+        return changed
+
+    # ─── Persistence ───
+    def load(self):
+        """Read the pins file. A missing or corrupt file means no pins."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        actions = []
+        for item in data if isinstance(data, list) else []:
+            try:
+                label, intent, args = item["label"], item["intent"], item["args"]
+            except (KeyError, TypeError):
+                continue
+            bound = self.registry.bind_tool(intent, args) if isinstance(args, dict) else None
+            if bound is not None:
+                actions.append(QuickAction(label, intent, bound))
+        with self._lock:
+            self._actions = actions
+
+    def save(self):
+        """Write the pins atomically (temp file + rename). No-op without a path."""
+        if not self.path:
+            return
+        with self._lock:
+            data = [{"label": a.label, "intent": a.intent, "args": a.args} for a in self._actions]
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # a read-only home directory just means the pins don't persist
@@ -0,0 +1,142 @@
+"""
+Keystroke injection.
+
+One engine for every "press these keys" action:  send_chord("win+left"),
+send_chord("volume_down", repeat=50).  On Windows events go straight to
+user32.SendInput through ctypes, so nothing is compiled or spawned per press.
+The backend is pluggable; RecordingBackend captures events for tests.
+"""
+import ctypes
+import sys
+import threading
+import time
+
+# ─── Virtual-key codes ───
+VK = {
+    "win": 0x5B, "lwin": 0x5B, "rwin": 0x5C,
+    "ctrl": 0x11, "control": 0x11, "alt": 0x12, "shift": 0x10,
+    "tab": 0x09, "enter": 0x0D, "esc": 0x1B, "escape": 0x1B, "space": 0x20,
+    "backspace": 0x08, "delete": 0x2E, "insert": 0x2D,
+    "pageup": 0x21, "pagedown": 0x22, "end": 0x23, "home": 0x24,
+    "left": 0x25, "up": 0x26, "right": 0x27, "down": 0x28,
+    "printscreen": 0x2C, "prtsc": 0x2C,
+    "period": 0xBE, ".": 0xBE, "comma": 0xBC, ",": 0xBC, ";": 0xBA,
+    "volume_mute": 0xAD, "volume_down": 0xAE, "volume_up": 0xAF,
+    "media_next": 0xB0, "media_prev": 0xB1, "media_stop": 0xB2, "media_play_pause": 0xB3,
+}
+VK.update({chr(c).lower(): c for c in range(ord("A"), ord("Z") + 1)})
+VK.update({str(d): 0x30 + d for d in range(10)})
+VK.update({f"f{n}": 0x6F + n for n in range(1, 25)})
+
+# Keys that need KEYEVENTF_EXTENDEDKEY to be delivered correctly
+EXTENDED = {0x5B, 0x5C, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2C, 0x2D, 0x2E,
+            0xAD, 0xAE, 0xAF, 0xB0, 0xB1, 0xB2, 0xB3}
+
+HOLD_SECONDS = 0.05  # modifiers stay down this long, like the old keybd_event scripts
+
+
+def parse_chord(chord):
+    """'win+ctrl+d' -> [0x5B, 0x11, 0x44]. Raises ValueError on unknown keys."""
+    codes = []
+    for name in chord.lower().replace(" ", "").split("+"):
+        if name not in VK:
+            raise ValueError(f"Unknown key: {name!r} in {chord!r}")
+        codes.append(VK[name])
+    return codes
+
+
+# ═══════════════════════════════════════════════════════
+#  BACKENDS
+# ═══════════════════════════════════════════════════════
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", ctypes.c_ushort), ("wScan", ctypes.c_ushort), ("dwFlags", ctypes.c_ulong),
+                ("time", ctypes.c_ulong), ("dwExtraInfo", ctypes.c_size_t)]
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", ctypes.c_long), ("dy", ctypes.c_long), ("mouseData", ctypes.c_ulong),
+                ("dwFlags", ctypes.c_ulong), ("time", ctypes.c_ulong), ("dwExtraInfo", ctypes.c_size_t)]
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_ulong), ("u", _INPUTUNION)]
+
+
+class SendInputBackend:
+    """Inject events with user32.SendInput (Windows)."""
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_EXTENDEDKEY = 0x1
+    KEYEVENTF_KEYUP = 0x2
+
+    def __init__(self):
+        self.user32 = ctypes.windll.user32
+
+    def send(self, events):
+        """events: list of (vk, down). Sent in one SendInput call so they can't interleave."""
+        arr = (_INPUT * len(events))()
+        for i, (vk, down) in enumerate(events):
+            flags = 0 if down else self.KEYEVENTF_KEYUP
+            if vk in EXTENDED:
+                flags |= self.KEYEVENTF_EXTENDEDKEY
+            arr[i].type = self.INPUT_KEYBOARD
+            arr[i].u.ki = _KEYBDINPUT(vk, self.user32.MapVirtualKeyW(vk, 0), flags, 0, 0)
+        sent = self.user32.SendInput(len(events), arr, ctypes.sizeof(_INPUT))
+        if sent != len(events):
+            raise ctypes.WinError()
+
+
+class RecordingBackend:
+    """Records events instead of sending them."""
+
+    def __init__(self):
+        self.events = []
+
+    def send(self, events):
+        self.events.extend(events)
+
+
+class UnsupportedBackend:
+    def send(self, events):
+        raise OSError(f"No keystroke backend for platform {sys.platform!r}")
+
+
+_backend = None
+_lock = threading.Lock()
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = SendInputBackend() if sys.platform == "win32" else UnsupportedBackend()
+    return _backend
+
+def set_backend(backend):
+    """Swap the backend (e.g. RecordingBackend in tests). Returns the previous one."""
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
+
+
+# ═══════════════════════════════════════════════════════
+#  PUBLIC API
+# ═══════════════════════════════════════════════════════
+
+def send_chord(chord, repeat=1, hold=HOLD_SECONDS):
+    """Press the keys of `chord` in order and release them in reverse.
+
+    Multi-key chords are held for `hold` seconds; single keys repeated
+    `repeat` times (volume steps) go out in one batch.
+    """
+    codes = parse_chord(chord)
+    down = [(vk, True) for vk in codes]
+    up = [(vk, False) for vk in reversed(codes)]
+    backend = get_backend()
+    with _lock:
+        if len(codes) > 1 and hold:
+            for _ in range(repeat):
+                backend.send(down)
+                time.sleep(hold)
+                backend.send(up)
+        else:
+            backend.send((down + up) * repeat)
@@ -0,0 +1,190 @@
+"""
+Model lifecycle: load on demand, unload when idle or over a memory budget.
+
+ModelLifecycle wraps the process's load/unload functions. Inference runs inside
+`with lifecycle.use():`, which loads the model if needed and keeps it from being
+unloaded mid-call. A monitor thread (started with the first load) unloads it
+once nothing has used it for `idle_timeout` seconds, or when the process's
+resident memory goes over `memory_budget` bytes while it is not in use.
+Resident memory doesn't always fall back under the budget after an unload
+(the heap keeps freed pages); then the next unload for memory waits until
+RSS grows past where it was, instead of unloading every pass. The
+next use loads it again; the weights come from the converted-model cache and
+the OS page cache, so a reload is much cheaper than the first load.
+
+metrics() reports loads, unloads (by reason), the last load time, the latency
+of the first call after each load, and current/peak resident memory.
+"""
+import contextlib
+import gc
+import os
+import sys
+import threading
+import time
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60.0
+DEFAULT_CHECK_INTERVAL = 30.0
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None if the platform won't say."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        if get_info(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    return None
+
+
+def release_memory():
+    """Collect garbage and hand freed heap pages back to the OS where the allocator allows it."""
+    gc.collect()
+    if sys.platform.startswith("linux"):
+        try:
+            import ctypes
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass  # not glibc
+
+
+class ModelLifecycle:
+    """Loads on first use, unloads when idle or over budget. Thread-safe."""
+
+    def __init__(self, load, unload, is_loaded, idle_timeout=DEFAULT_IDLE_TIMEOUT, memory_budget=None,
+                 check_interval=DEFAULT_CHECK_INTERVAL, rss=current_rss, on_unload=None):
+        self.load = load
+        self.unload_fn = unload
+        self.is_loaded = is_loaded
+        self.idle_timeout = idle_timeout or None      # seconds; None: never unload for idleness
+        self.memory_budget = memory_budget or None    # bytes; None: no budget
+        self.check_interval = check_interval
+        self.rss = rss
+        self.on_unload = on_unload
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # one load at a time, counted once
+        self._active = 0
+        self._last_used = time.monotonic()
+        self._first_call_pending = False
+        self._memory_unload_rss = None  # RSS at the last unload for memory, if it stayed over budget after it
+        self._monitor = None
+        self._stop = threading.Event()
+        self.stats = {"loads": 0, "load_seconds": None, "first_call_seconds": None,
+                      "unloads": {}, "peak_rss": 0}
+
+    def ensure_loaded(self):
+        """Load the model if it isn't, and start the monitor. Counts as a use."""
+        with self._lock:
+            self._last_used = time.monotonic()
+        if self.is_loaded():
+            return
+        with self._load_lock:
+            if self.is_loaded():
+                return  # another thread loaded it while this one waited
+            started = time.perf_counter()
+            self.load()
+            with self._lock:
+                if self.is_loaded():
+                    self.stats["loads"] += 1
+                    self.stats["load_seconds"] = time.perf_counter() - started
+                    self._first_call_pending = True
+                self._last_used = time.monotonic()
+        self._sample_rss()
+        self._start_monitor()
+
+    @contextlib.contextmanager
+    def use(self):
+        """Hold the model loaded for the duration of the block."""
+        with self._lock:
+            self._active += 1
+        try:
+            self.ensure_loaded()
+            started = time.perf_counter()
+            yield
+            with self._lock:
+                if self._first_call_pending:
+                    self._first_call_pending = False
+                    self.stats["first_call_seconds"] = time.perf_counter() - started
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_used = time.monotonic()
+
+    def unload(self, reason="manual"):
+        """Unload now unless the model is in use. Returns True if it was unloaded."""
+        with self._lock:
+            if self._active or not self.is_loaded():
+                return False
+            self.unload_fn()
+            self.stats["unloads"][reason] = self.stats["unloads"].get(reason, 0) + 1
+        release_memory()
+        if self.on_unload is not None:
+            self.on_unload(reason)
+        return True
+
+    def check(self):
+        """One monitor pass: unload if idle past the timeout or over the memory budget."""
+        rss = self._sample_rss()
+        if not self.is_loaded():
+            return None
+        with self._lock:
+            idle = time.monotonic() - self._last_used
+        if self.idle_timeout is not None and idle >= self.idle_timeout:
+            return "idle" if self.unload("idle") else None
+        if self.memory_budget is not None and rss is not None and rss > self.memory_budget:
+            if self._memory_unload_rss is not None and rss <= self._memory_unload_rss:
+                return None  # the last unload didn't get under budget, and RSS hasn't grown since
+            if not self.unload("memory"):
+                return None
+            after = self._sample_rss()
+            self._memory_unload_rss = rss if after is not None and after > self.memory_budget else None
+            return "memory"
+        return None
+
+    def metrics(self):
+        rss = self._sample_rss()
+        with self._lock:
+            return dict(self.stats, unloads=dict(self.stats["unloads"]), loaded=self.is_loaded(),
+                        rss=rss, idle_seconds=time.monotonic() - self._last_used)
+
+    def close(self):
+        self._stop.set()
+
+    def _sample_rss(self):
+        rss = self.rss()
+        if rss is not None:
+            self.stats["peak_rss"] = max(self.stats["peak_rss"], rss)
+        return rss
+
+    def _start_monitor(self):
+        if self._monitor is not None or (self.idle_timeout is None and self.memory_budget is None):
+            return
+        with self._lock:
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._watch, name="model-lifecycle", daemon=True)
+                self._monitor.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception:
+                pass  # the monitor must outlive a failed unload; the next pass retries
@@ -1,1568 +1,1998 @@
-from transformers import AutoProcessor, AutoModelForCausalLM
-import re
-import subprocess
-import os
-import json
-import urllib.parse
-import io
-import sys
-import datetime
-import shutil
-import ctypes
-
-MODEL_ID = "google/functiongemma-270m-it"
-
-# Global model references
-processor = None
-model = None
-
-# Log buffer for UI
-_log_buffer = []
-
-def log(msg):
-    """Log a message. Used by both CLI and UI."""
-    _log_buffer.append(msg)
-    print(msg)
-
-def get_and_clear_log():
-    """Get all logged messages and clear the buffer."""
-    msgs = list(_log_buffer)
-    _log_buffer.clear()
-    return msgs
-
-def load_model():
-    global processor, model
-    if processor is not None:
-        return
-    log("Loading AI model...")
-    processor = AutoProcessor.from_pretrained(MODEL_ID)
-    model = AutoModelForCausalLM.from_pretrained(
-        MODEL_ID,
-        device_map="auto",
-        torch_dtype="auto"
-    )
-    log("Model loaded!")
-
-# ═══════════════════════════════════════════════════════
-#  SETTINGS MAP
-# ═══════════════════════════════════════════════════════
-SETTINGS_MAP = {
-    "bluetooth":        "ms-settings:bluetooth",
-    "wifi":             "ms-settings:network-wifi",
-    "network":          "ms-settings:network",
-    "airplane":         "ms-settings:network-airplanemode",
-    "vpn":              "ms-settings:network-vpn",
-    "hotspot":          "ms-settings:network-mobilehotspot",
-    "proxy":            "ms-settings:network-proxy",
-    "display":          "ms-settings:display",
-    "night light":      "ms-settings:nightlight",
-    "sound":            "ms-settings:sound",
-    "notifications":    "ms-settings:notifications",
-    "focus":            "ms-settings:quiethours",
-    "power":            "ms-settings:powersleep",
-    "battery":          "ms-settings:batterysaver",
-    "storage":          "ms-settings:storagesense",
-    "personalization":  "ms-settings:personalization",
-    "background":       "ms-settings:personalization-background",
-    "colors":           "ms-settings:personalization-colors",
-    "lock screen":      "ms-settings:lockscreen",
-    "themes":           "ms-settings:themes",
-    "taskbar":          "ms-settings:taskbar",
-    "start menu":       "ms-settings:personalization-start",
-    "accounts":         "ms-settings:yourinfo",
-    "date":             "ms-settings:dateandtime",
-    "time":             "ms-settings:dateandtime",
-    "language":         "ms-settings:regionlanguage",
-    "keyboard":         "ms-settings:keyboard",
-    "mouse":            "ms-settings:mousetouchpad",
-    "touchpad":         "ms-settings:devices-touchpad",
-    "printer":          "ms-settings:printers",
-    "camera":           "ms-settings:privacy-webcam",
-    "microphone":       "ms-settings:privacy-microphone",
-    "location":         "ms-settings:privacy-location",
-    "apps":             "ms-settings:appsfeatures",
-    "default apps":     "ms-settings:defaultapps",
-    "startup":          "ms-settings:startupapps",
-    "update":           "ms-settings:windowsupdate",
-    "windows update":   "ms-settings:windowsupdate",
-    "recovery":         "ms-settings:recovery",
-    "about":            "ms-settings:about",
-    "clipboard":        "ms-settings:clipboard",
-    "remote desktop":   "ms-settings:remotedesktop",
-    "accessibility":    "ms-settings:easeofaccess",
-    "privacy":          "ms-settings:privacy",
-    "developer":        "ms-settings:developers",
-    "security":         "windowsdefender:",
-    "gaming":           "ms-settings:gaming-gamebar",
-    "fonts":            "ms-settings:fonts",
-    "multitasking":     "ms-settings:multitasking",
-    "projecting":       "ms-settings:project",
-    "typing":           "ms-settings:typing",
-    "pen":              "ms-settings:pen",
-    "usb":              "ms-settings:usb",
-    "autoplay":         "ms-settings:autoplay",
-    "default browser":  "ms-settings:defaultapps",
-    "optional features": "ms-settings:optionalfeatures",
-    "maps":             "ms-settings:maps",
-    "offline maps":     "ms-settings:maps",
-    "speech":           "ms-settings:speech",
-    "signin":           "ms-settings:signinoptions",
-    "sign in":          "ms-settings:signinoptions",
-    "email":            "ms-settings:emailandaccounts",
-    "sync":             "ms-settings:sync",
-    "family":           "ms-settings:family-group",
-    "color management": "ms-settings:display-advancedgraphics",
-    "graphics":         "ms-settings:display-advancedgraphics",
-    "scaling":          "ms-settings:display",
-    "night mode":       "ms-settings:nightlight",
-    "screen timeout":   "ms-settings:powersleep",
-    "sleep timeout":    "ms-settings:powersleep",
-    "ethernet":         "ms-settings:network-ethernet",
-    "dial-up":          "ms-settings:network-dialup",
-    "data usage":       "ms-settings:datausage",
-    "background apps":  "ms-settings:privacy-backgroundapps",
-    "firewall":         "ms-settings:windowsdefender",
-    "device encryption": "ms-settings:deviceencryption",
-    "troubleshoot":     "ms-settings:troubleshoot",
-    "activation":       "ms-settings:activation",
-    "device manager":   "devmgmt.msc",
-    "disk management":  "diskmgmt.msc",
-    "event viewer":     "eventvwr.msc",
-    "services":         "services.msc",
-    "group policy":     "gpedit.msc",
-    "system info":      "msinfo32",
-}
-
-# ═══════════════════════════════════════════════════════
-#  APP MAP
-# ═══════════════════════════════════════════════════════
-APP_MAP = {
-    "notepad":          "notepad.exe",
-    "calculator":       "calc.exe",
-    "calc":             "calc.exe",
-    "paint":            "mspaint.exe",
-    "chrome":           "start chrome",
-    "google chrome":    "start chrome",
-    "edge":             "start msedge",
-    "firefox":          "start firefox",
-    "browser":          "start msedge",
-    "file explorer":    "explorer.exe",
-    "explorer":         "explorer.exe",
-    "files":            "explorer.exe",
-    "task manager":     "taskmgr.exe",
-    "command prompt":   "cmd.exe",
-    "cmd":              "cmd.exe",
-    "terminal":         "wt.exe",
-    "powershell":       "powershell.exe",
-    "control panel":    "control",
-    "snipping tool":    "snippingtool.exe",
-    "snip":             "snippingtool.exe",
-    "word":             "start winword",
-    "excel":            "start excel",
-    "powerpoint":       "start powerpnt",
-    "outlook":          "start outlook",
-    "spotify":          "start spotify:",
-    "vscode":           "code",
-    "vs code":          "code",
-    "code":             "code",
-    "teams":            "start msteams:",
-    "discord":          "start discord:",
-    "whatsapp":         "start whatsapp:",
-    "telegram":         "start telegram:",
-    "photos":           "start ms-photos:",
-    "maps":             "start bingmaps:",
-    "weather":          "start bingweather:",
-    "clock":            "start ms-clock:",
-    "calendar":         "start outlookcal:",
-    "settings":         "start ms-settings:",
-    "store":            "start ms-windows-store:",
-    "xbox":             "start xbox:",
-    "movies":           "start mswindowsvideo:",
-    "music":            "start mswindowsmusic:",
-    "zoom":             "start zoommtg:",
-    "slack":            "start slack:",
-    "notion":           "start notion:",
-    "onenote":          "start onenote:",
-    "sticky notes":     "start ms-stickynotes:",
-    "feedback":         "start feedback-hub:",
-    "tips":             "start ms-get-started:",
-    "magnifier":        "magnify.exe",
-    "narrator":         "narrator.exe",
-    "on-screen keyboard": "osk.exe",
-    "osk":              "osk.exe",
-    "character map":    "charmap.exe",
-    "registry editor":  "regedit.exe",
-    "regedit":          "regedit.exe",
-    "remote desktop":   "mstsc.exe",
-    "rdp":              "mstsc.exe",
-    "disk cleanup":     "cleanmgr.exe",
-    "defragment":       "dfrgui.exe",
-    "system config":    "msconfig.exe",
-    "resource monitor":  "resmon.exe",
-    "performance monitor": "perfmon.exe",
-    "reliability":      "start perfmon /rel",
-    "wordpad":          "write.exe",
-    "sound recorder":   "start ms-callrecording:",
-    "screen recorder":  "start ms-screenclip:",
-    "camera app":       "start microsoft.windows.camera:",
-    "alarm":            "start ms-clock:",
-    "timer":            "start ms-clock:",
-    "stopwatch":        "start ms-clock:",
-    "mail":             "start outlookmail:",
-    "people":           "start ms-people:",
-    "video editor":     "start ms-photos:videospage",
-    "3d viewer":        "start com.microsoft.3dviewer:",
-}
-
-# ═══════════════════════════════════════════════════════
-#  FUNCTION IMPLEMENTATIONS (all use subprocess/PowerShell)
-# ═══════════════════════════════════════════════════════
-
-# ─── PowerShell script to toggle a Windows radio (Bluetooth/WiFi) ───
-RADIO_TOGGLE_PS = r'''
-Add-Type -AssemblyName System.Runtime.WindowsRuntime
-$asTaskGeneric = ([System.WindowsRuntimeSystemExtensions].GetMethods() | Where-Object {
-    $_.Name -eq 'AsTask' -and $_.GetParameters().Count -eq 1 -and
-    $_.GetParameters()[0].ParameterType.Name -eq 'IAsyncOperation`1'
-})[0]
-function Await($WinRtTask, $ResultType) {
-    $asTask = $asTaskGeneric.MakeGenericMethod($ResultType)
-    $netTask = $asTask.Invoke($null, @($WinRtTask))
-    $netTask.Wait(-1) | Out-Null
-    $netTask.Result
-}
-[Windows.Devices.Radios.Radio,Windows.System.Devices,ContentType=WindowsRuntime] | Out-Null
-$radios = Await ([Windows.Devices.Radios.Radio]::GetRadiosAsync()) ([System.Collections.Generic.IReadOnlyList[Windows.Devices.Radios.Radio]])
-$radio = $radios | Where-Object { $_.Kind -eq '%KIND%' }
-if ($radio) {
-    $result = Await ($radio.SetStateAsync('%STATE%')) ([Windows.Devices.Radios.RadioAccessStatus])
-    Write-Host "%KIND% turned %STATE%"
-} else {
-    Write-Host "No %KIND% radio found"
-}
-'''
-
-def toggle_radio(kind, state):
-    """Toggle a Windows radio. kind='Bluetooth'|'WiFi', state='On'|'Off'"""
-    ps = RADIO_TOGGLE_PS.replace('%KIND%', kind).replace('%STATE%', state)
-    result = subprocess.run(["powershell", "-ExecutionPolicy", "Bypass", "-Command", ps],
-                           capture_output=True, text=True, timeout=15)
-    output = (result.stdout + result.stderr).strip()
-    if output:
-        log(f"  -> {output}")
-    else:
-        log(f"  -> {kind} {state.lower()} command sent")
-
-def toggle_bluetooth(on=True):
-    toggle_radio('Bluetooth', 'On' if on else 'Off')
-
-def toggle_wifi(on=True):
-    toggle_radio('WiFi', 'On' if on else 'Off')
-
-def toggle_airplane_mode(on=True):
-    subprocess.Popen("start ms-settings:network-airplanemode", shell=True)
-    log(f"  -> Opened airplane mode settings (toggle manually)")
-
-def toggle_night_light(on=True):
-    state = '1' if on else '0'
-    ps = f'''$path = 'HKCU:\Software\Microsoft\Windows\CurrentVersion\CloudStore\Store\DefaultAccount\Current\default$windows.data.bluelightreduction.bluelightreductionstate\windows.data.bluelightreduction.bluelightreductionstate'
-if (Test-Path $path) {{ Remove-Item $path -Force }}
-Start-Process ms-settings:nightlight'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log(f"  -> Night light {'on' if on else 'off'} (settings opened)")
-
-def toggle_hotspot(on=True):
-    subprocess.Popen("start ms-settings:network-mobilehotspot", shell=True)
-    log(f"  -> Opened hotspot settings (toggle manually)")
-
-def toggle_location(on=True):
-    subprocess.Popen("start ms-settings:privacy-location", shell=True)
-    log(f"  -> Opened location settings (toggle manually)")
-
-def open_settings(key):
-    uri = SETTINGS_MAP.get(key)
-    if uri:
-        subprocess.Popen(f"start {uri}", shell=True)
-        log(f"  -> Opened {key} settings")
-        return True
-    return False
-
-def open_app(name):
-    cmd = APP_MAP.get(name.lower().strip())
-    if cmd:
-        subprocess.Popen(cmd, shell=True)
-        log(f"  -> Opened {name}")
-        return True
-    subprocess.Popen(f"start {name}", shell=True)
-    log(f"  -> Trying to open {name}...")
-    return True
-
-def set_volume(level):
-    level = max(0, min(100, int(level)))
-    ps = f'''$wsh = New-Object -ComObject WScript.Shell
-$vol = {level}
-1..50 | ForEach-Object {{ $wsh.SendKeys([char]174) }}
-Start-Sleep -Milliseconds 100
-$steps = [Math]::Round($vol / 2)
-1..$steps | ForEach-Object {{ $wsh.SendKeys([char]175) }}'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log(f"  -> Volume set to ~{level}%")
-
-def mute_audio():
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys([char]173)'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Toggled mute")
-
-def set_brightness(level):
-    level = max(0, min(100, int(level)))
-    ps = f"(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,{level})"
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log(f"  -> Brightness set to {level}%")
-
-def take_screenshot():
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys("^{PRTSC}")'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    subprocess.Popen("snippingtool.exe", shell=True)
-    log("  -> Screenshot tool opened")
-
-def lock_screen():
-    subprocess.run("rundll32.exe user32.dll,LockWorkStation", shell=True)
-    log("  -> Screen locked")
-
-def shutdown_pc():
-    log("  -> Shutting down in 10 seconds... (run 'shutdown /a' to cancel)")
-    subprocess.run("shutdown /s /t 10", shell=True)
-
-def restart_pc():
-    log("  -> Restarting in 10 seconds... (run 'shutdown /a' to cancel)")
-    subprocess.run("shutdown /r /t 10", shell=True)
-
-def sleep_pc():
-    subprocess.run("rundll32.exe powrprof.dll,SetSuspendState 0,1,0", shell=True)
-    log("  -> Putting to sleep...")
-
-def logoff_pc():
-    subprocess.run("shutdown /l", shell=True)
-    log("  -> Logging off...")
-
-def web_search(query):
-    url = f"https://www.google.com/search?q={urllib.parse.quote(query)}"
-    subprocess.Popen(f'start "" "{url}"', shell=True)
-    log(f"  -> Searching: {query}")
-
-def open_website(url):
-    if not url.startswith("http"):
-        url = "https://" + url
-    subprocess.Popen(f'start "" "{url}"', shell=True)
-    log(f"  -> Opening {url}")
-
-
-# ═══════════════════════════════════════════════════════
-#  PROCESS / TASK MANAGEMENT
-# ═══════════════════════════════════════════════════════
-
-def kill_process(name):
-    """Kill a running process by name."""
-    name = name.strip().lower()
-    if not name.endswith(".exe"):
-        name += ".exe"
-    result = subprocess.run(f'taskkill /IM "{name}" /F', shell=True, capture_output=True, text=True)
-    if result.returncode == 0:
-        log(f"  -> Closed {name}")
-    else:
-        log(f"  -> Could not close {name}: {result.stderr.strip()}")
-
-def list_running_apps():
-    """List currently running visible apps."""
-    ps = 'Get-Process | Where-Object {$_.MainWindowTitle -ne ""} | Select-Object -Property Name,MainWindowTitle | Format-Table -AutoSize | Out-String -Width 200'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> Running apps:\n{result.stdout.strip()[:1500]}")
-
-
-# ═══════════════════════════════════════════════════════
-#  FILE / FOLDER MANAGEMENT
-# ═══════════════════════════════════════════════════════
-
-def open_folder(folder_name):
-    """Open a common folder."""
-    folders = {
-        "downloads":  os.path.expanduser("~/Downloads"),
-        "documents":  os.path.expanduser("~/Documents"),
-        "desktop":    os.path.expanduser("~/Desktop"),
-        "pictures":   os.path.expanduser("~/Pictures"),
-        "videos":     os.path.expanduser("~/Videos"),
-        "music":      os.path.expanduser("~/Music"),
-        "appdata":    os.environ.get("APPDATA", ""),
-        "temp":       os.environ.get("TEMP", ""),
-        "home":       os.path.expanduser("~"),
-        "user":       os.path.expanduser("~"),
-        "c drive":    "C:\\",
-        "c:":         "C:\\",
-        "d drive":    "D:\\",
-        "d:":         "D:\\",
-        "root":       "C:\\",
-    }
-    path = folders.get(folder_name.lower().strip())
-    if path and os.path.exists(path):
-        subprocess.Popen(f'explorer "{path}"', shell=True)
-        log(f"  -> Opened {folder_name}: {path}")
-        return True
-    # Try opening as a literal path
-    if os.path.exists(folder_name):
-        subprocess.Popen(f'explorer "{folder_name}"', shell=True)
-        log(f"  -> Opened {folder_name}")
-        return True
-    log(f"  -> Folder not found: {folder_name}")
-    return False
-
-def empty_recycle_bin():
-    """Empty the Windows Recycle Bin."""
-    ps = 'Clear-RecycleBin -Force -ErrorAction SilentlyContinue'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Recycle bin emptied")
-
-def create_folder(path):
-    """Create a new folder on the Desktop."""
-    full = os.path.join(os.path.expanduser("~/Desktop"), path)
-    os.makedirs(full, exist_ok=True)
-    log(f"  -> Created folder: {full}")
-
-
-# ═══════════════════════════════════════════════════════
-#  DISPLAY & APPEARANCE
-# ═══════════════════════════════════════════════════════
-
-def toggle_dark_mode(on=True):
-    """Toggle Windows dark/light mode."""
-    val = 0 if on else 1  # 0 = dark, 1 = light
-    ps = f'''Set-ItemProperty -Path HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize -Name AppsUseLightTheme -Value {val}
-Set-ItemProperty -Path HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize -Name SystemUsesLightTheme -Value {val}'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log(f"  -> {'Dark' if on else 'Light'} mode enabled")
-
-def set_screen_resolution(width, height):
-    """Attempt to change screen resolution."""
-    ps = f'''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class Disp {{
-  [DllImport("user32.dll")] public static extern int ChangeDisplaySettings(ref DEVMODE dm, int flags);
-  [StructLayout(LayoutKind.Sequential, CharSet=CharSet.Ansi)]
-  public struct DEVMODE {{
-    [MarshalAs(UnmanagedType.ByValTStr, SizeConst=32)] public string dmDeviceName;
-    public short dmSpecVersion; public short dmDriverVersion; public short dmSize; public short dmDriverExtra;
-    public int dmFields; public int dmPositionX; public int dmPositionY; public int dmDisplayOrientation;
-    public int dmDisplayFixedOutput; public short dmColor; public short dmDuplex; public short dmYResolution;
-    public short dmTTOption; public short dmCollate;
-    [MarshalAs(UnmanagedType.ByValTStr, SizeConst=32)] public string dmFormName;
-    public short dmLogPixels; public int dmBitsPerPel; public int dmPelsWidth; public int dmPelsHeight;
-    public int dmDisplayFlags; public int dmDisplayFrequency;
-  }}
-}}
-"@
-$dm = New-Object Disp+DEVMODE
-$dm.dmSize = [Runtime.InteropServices.Marshal]::SizeOf($dm)
-$dm.dmPelsWidth = {width}; $dm.dmPelsHeight = {height}
-$dm.dmFields = 0x180000
-[Disp]::ChangeDisplaySettings([ref]$dm, 0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log(f"  -> Resolution set to {width}x{height}")
-
-def rotate_screen(angle=0):
-    """Open display settings for rotation (0, 90, 180, 270)."""
-    subprocess.Popen("start ms-settings:display", shell=True)
-    log(f"  -> Opened display settings for rotation")
-
-def toggle_color_filter(on=True):
-    """Toggle Windows color filters (grayscale, etc.)."""
-    val = 1 if on else 0
-    ps = f'Set-ItemProperty -Path "HKCU:\\Software\\Microsoft\\ColorFiltering" -Name Active -Value {val} -Type DWord -Force'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log(f"  -> Color filter {'enabled' if on else 'disabled'}")
-
-def toggle_high_contrast(on=True):
-    """Toggle high contrast mode."""
-    if on:
-        subprocess.Popen("start ms-settings:easeofaccess-highcontrast", shell=True)
-    else:
-        subprocess.Popen("start ms-settings:easeofaccess-highcontrast", shell=True)
-    log(f"  -> Opened high contrast settings")
-
-def set_wallpaper(path):
-    """Set desktop wallpaper from a file path."""
-    if os.path.exists(path):
-        ctypes.windll.user32.SystemParametersInfoW(20, 0, path, 3)
-        log(f"  -> Wallpaper set to {path}")
-    else:
-        log(f"  -> File not found: {path}")
-
-def toggle_taskbar_autohide(on=True):
-    """Toggle taskbar auto-hide."""
-    val = 3 if on else 2  # 3 = auto-hide, 2 = always show
-    ps = f'''$p = 'HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\StuckRects3'
-$v = (Get-ItemProperty -Path $p).Settings
-$v[8] = {val}
-Set-ItemProperty -Path $p -Name Settings -Value $v
-Stop-Process -Name explorer -Force'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log(f"  -> Taskbar auto-hide {'enabled' if on else 'disabled'}")
-
-
-# ═══════════════════════════════════════════════════════
-#  NETWORK & CONNECTIVITY
-# ═══════════════════════════════════════════════════════
-
-def show_ip_address():
-    """Show the current IP addresses."""
-    ps = '(Get-NetIPAddress -AddressFamily IPv4 | Where-Object {$_.InterfaceAlias -notlike "*Loopback*"}).IPAddress'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    ips = result.stdout.strip()
-    log(f"  -> IP Addresses: {ips if ips else 'Not connected'}")
-
-def show_public_ip():
-    """Show public IP address."""
-    ps = '(Invoke-WebRequest -Uri "https://api.ipify.org" -UseBasicParsing).Content'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True, timeout=10)
-    ip = result.stdout.strip()
-    log(f"  -> Public IP: {ip if ip else 'Could not determine'}")
-
-def ping_host(host):
-    """Ping a host and show result."""
-    result = subprocess.run(f'ping -n 3 {host}', shell=True, capture_output=True, text=True, timeout=15)
-    log(f"  -> Ping {host}:\n{result.stdout.strip()[-500:]}")
-
-def flush_dns():
-    """Flush the DNS resolver cache."""
-    result = subprocess.run('ipconfig /flushdns', shell=True, capture_output=True, text=True)
-    log(f"  -> {result.stdout.strip()}")
-
-def show_wifi_password():
-    """Show saved WiFi password for the current network."""
-    ps = '''$prof = (netsh wlan show interfaces | Select-String "Profile" | ForEach-Object { ($_ -split ":")[1].Trim() })
-if ($prof) { netsh wlan show profile name="$prof" key=clear | Select-String "Key Content" } else { Write-Host "Not connected to WiFi" }'''
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> {result.stdout.strip() if result.stdout.strip() else 'Could not retrieve WiFi password'}")
-
-def show_network_info():
-    """Show network adapter info."""
-    ps = 'Get-NetAdapter | Where-Object {$_.Status -eq "Up"} | Select-Object Name,InterfaceDescription,LinkSpeed,MacAddress | Format-Table -AutoSize | Out-String'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> Network Adapters:\n{result.stdout.strip()[:1000]}")
-
-def speed_test():
-    """Open a speed test in browser."""
-    subprocess.Popen('start "" "https://fast.com"', shell=True)
-    log("  -> Opened speed test (fast.com)")
-
-
-# ═══════════════════════════════════════════════════════
-#  POWER & BATTERY
-# ═══════════════════════════════════════════════════════
-
-def hibernate_pc():
-    """Hibernate the PC."""
-    subprocess.run("shutdown /h", shell=True)
-    log("  -> Hibernating...")
-
-def cancel_shutdown():
-    """Cancel a pending shutdown/restart."""
-    subprocess.run("shutdown /a", shell=True)
-    log("  -> Shutdown cancelled")
-
-def set_power_plan(plan):
-    """Set Windows power plan: balanced, high, saver."""
-    plans = {
-        "balanced":         "381b4222-f694-41f0-9685-ff5bb260df2e",
-        "high performance": "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c",
-        "high":             "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c",
-        "power saver":      "a1841308-3541-4fab-bc81-f71556f20b4a",
-        "saver":            "a1841308-3541-4fab-bc81-f71556f20b4a",
-    }
-    guid = plans.get(plan.lower().strip())
-    if guid:
-        subprocess.run(f'powercfg /setactive {guid}', shell=True, capture_output=True)
-        log(f"  -> Power plan set to {plan}")
-    else:
-        log(f"  -> Unknown plan: {plan}. Try: balanced, high performance, power saver")
-
-def show_battery_level():
-    """Show battery percentage."""
-    ps = '(Get-WmiObject Win32_Battery).EstimatedChargeRemaining'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    level = result.stdout.strip()
-    if level:
-        log(f"  -> Battery: {level}%")
-    else:
-        log("  -> No battery detected (desktop PC?)")
-
-def generate_battery_report():
-    """Generate a detailed battery report."""
-    report_path = os.path.join(os.path.expanduser("~/Desktop"), "battery-report.html")
-    subprocess.run(f'powercfg /batteryreport /output "{report_path}"', shell=True, capture_output=True)
-    subprocess.Popen(f'start "" "{report_path}"', shell=True)
-    log(f"  -> Battery report saved to Desktop and opened")
-
-def set_screen_timeout(minutes):
-    """Set screen timeout in minutes."""
-    seconds = int(minutes) * 60
-    subprocess.run(f'powercfg /change monitor-timeout-ac {minutes}', shell=True, capture_output=True)
-    subprocess.run(f'powercfg /change monitor-timeout-dc {minutes}', shell=True, capture_output=True)
-    log(f"  -> Screen timeout set to {minutes} minutes")
-
-def set_sleep_timeout(minutes):
-    """Set sleep timeout in minutes."""
-    subprocess.run(f'powercfg /change standby-timeout-ac {minutes}', shell=True, capture_output=True)
-    subprocess.run(f'powercfg /change standby-timeout-dc {minutes}', shell=True, capture_output=True)
-    log(f"  -> Sleep timeout set to {minutes} minutes")
-
-
-# ═══════════════════════════════════════════════════════
-#  CLIPBOARD
-# ═══════════════════════════════════════════════════════
-
-def clear_clipboard():
-    """Clear the clipboard."""
-    subprocess.run('echo off | clip', shell=True, capture_output=True)
-    log("  -> Clipboard cleared")
-
-def open_clipboard_history():
-    """Open Windows clipboard history (Win+V)."""
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys("^v")'
-    # Actually Win+V
-    ps = 'Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait("^v")'
-    subprocess.Popen("start ms-settings:clipboard", shell=True)
-    log("  -> Opened clipboard settings")
-
-
-# ═══════════════════════════════════════════════════════
-#  MEDIA CONTROLS
-# ═══════════════════════════════════════════════════════
-
-def media_play_pause():
-    """Send media play/pause key."""
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys([char]179)'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Media: Play/Pause")
-
-def media_next():
-    """Send media next track key."""
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys([char]176)'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Media: Next track")
-
-def media_previous():
-    """Send media previous track key."""
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys([char]177)'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Media: Previous track")
-
-def media_stop():
-    """Send media stop key."""
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys([char]178)'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Media: Stopped")
-
-
-# ═══════════════════════════════════════════════════════
-#  WINDOW MANAGEMENT
-# ═══════════════════════════════════════════════════════
-
-def minimize_all_windows():
-    """Minimize all windows (show desktop)."""
-    ps = '(New-Object -ComObject Shell.Application).MinimizeAll()'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> All windows minimized")
-
-def show_desktop():
-    """Toggle show desktop."""
-    ps = '(New-Object -ComObject Shell.Application).ToggleDesktop()'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Toggled desktop view")
-
-def restore_all_windows():
-    """Restore all minimized windows."""
-    ps = '(New-Object -ComObject Shell.Application).UndoMinimizeAll()'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> All windows restored")
-
-def close_current_window():
-    """Close the current foreground window."""
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys("%{F4}")'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Sent Alt+F4 to close window")
-
-def switch_window():
-    """Send Alt+Tab."""
-    ps = '(New-Object -ComObject WScript.Shell).SendKeys("%{TAB}")'
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Alt+Tab sent")
-
-def snap_window_left():
-    """Snap current window to left half."""
-    ps = 'Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait("^({LEFT})")'
-    # Actually Win+Left
-    ps = '''$wsh = New-Object -ComObject WScript.Shell; $wsh.SendKeys("^{ESC}"); Start-Sleep -Milliseconds 50; $wsh.SendKeys("{LEFT}")'''
-    # Use keyboard shortcut properly
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD]::keybd_event(0x5B,0,0,0); [KBD]::keybd_event(0x25,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD]::keybd_event(0x25,0,2,0); [KBD]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Window snapped left")
-
-def snap_window_right():
-    """Snap current window to right half."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD]::keybd_event(0x5B,0,0,0); [KBD]::keybd_event(0x27,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD]::keybd_event(0x27,0,2,0); [KBD]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Window snapped right")
-
-def maximize_window():
-    """Maximize current window."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD]::keybd_event(0x5B,0,0,0); [KBD]::keybd_event(0x26,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD]::keybd_event(0x26,0,2,0); [KBD]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Window maximized")
-
-def minimize_window():
-    """Minimize current window."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD]::keybd_event(0x5B,0,0,0); [KBD]::keybd_event(0x28,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD]::keybd_event(0x28,0,2,0); [KBD]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Window minimized")
-
-
-# ═══════════════════════════════════════════════════════
-#  SYSTEM INFORMATION
-# ═══════════════════════════════════════════════════════
-
-def show_system_info():
-    """Show basic system information."""
-    ps = '''$os = Get-CimInstance Win32_OperatingSystem
-$cpu = Get-CimInstance Win32_Processor
-$ram = [math]::Round($os.TotalVisibleMemorySize/1MB, 1)
-$freeRam = [math]::Round($os.FreePhysicalMemory/1MB, 1)
-Write-Host "OS: $($os.Caption) $($os.OSArchitecture)"
-Write-Host "CPU: $($cpu.Name)"
-Write-Host "RAM: $freeRam GB free / $ram GB total"
-Write-Host "Computer: $($os.CSName)"
-Write-Host "User: $env:USERNAME"'''
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> System Info:\n{result.stdout.strip()}")
-
-def show_disk_usage():
-    """Show disk space usage."""
-    ps = 'Get-PSDrive -PSProvider FileSystem | Select-Object Name,@{N="Used(GB)";E={[math]::Round($_.Used/1GB,1)}},@{N="Free(GB)";E={[math]::Round($_.Free/1GB,1)}},@{N="Total(GB)";E={[math]::Round(($_.Used+$_.Free)/1GB,1)}} | Format-Table -AutoSize | Out-String'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> Disk Usage:\n{result.stdout.strip()}")
-
-def show_cpu_usage():
-    """Show current CPU usage."""
-    ps = "Get-CimInstance Win32_Processor | Select-Object -ExpandProperty LoadPercentage"
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> CPU Usage: {result.stdout.strip()}%")
-
-def show_ram_usage():
-    """Show current RAM usage."""
-    ps = '''$os = Get-CimInstance Win32_OperatingSystem
-$total = [math]::Round($os.TotalVisibleMemorySize/1MB, 1)
-$free = [math]::Round($os.FreePhysicalMemory/1MB, 1)
-$used = [math]::Round($total - $free, 1)
-$pct = [math]::Round(($used/$total)*100, 0)
-Write-Host "RAM: $used GB / $total GB ($pct% used)"'''
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> {result.stdout.strip()}")
-
-def show_uptime():
-    """Show system uptime."""
-    ps = '(Get-Date) - (Get-CimInstance Win32_OperatingSystem).LastBootUpTime | ForEach-Object { "Uptime: $($_.Days)d $($_.Hours)h $($_.Minutes)m" }'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> {result.stdout.strip()}")
-
-def show_windows_version():
-    """Show Windows version details."""
-    ps = '[System.Environment]::OSVersion.VersionString + "`n" + (Get-CimInstance Win32_OperatingSystem).Caption'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> {result.stdout.strip()}")
-
-def show_startup_apps():
-    """List apps that run at startup."""
-    ps = 'Get-CimInstance Win32_StartupCommand | Select-Object Name,Command,Location | Format-Table -AutoSize -Wrap | Out-String -Width 200'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> Startup apps:\n{result.stdout.strip()[:1500]}")
-
-def show_installed_apps():
-    """List installed programs."""
-    ps = 'Get-ItemProperty HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\* | Where-Object {$_.DisplayName} | Select-Object DisplayName,DisplayVersion | Sort-Object DisplayName | Format-Table -AutoSize | Out-String -Width 200'
-    result = subprocess.run(["powershell", "-Command", ps], capture_output=True, text=True)
-    log(f"  -> Installed Apps:\n{result.stdout.strip()[:2000]}")
-
-
-# ═══════════════════════════════════════════════════════
-#  SECURITY & MAINTENANCE
-# ═══════════════════════════════════════════════════════
-
-def run_virus_scan():
-    """Start a quick Windows Defender scan."""
-    ps = 'Start-MpScan -ScanType QuickScan'
-    subprocess.Popen(["powershell", "-Command", ps])
-    log("  -> Windows Defender quick scan started (runs in background)")
-
-def run_full_virus_scan():
-    """Start a full Windows Defender scan."""
-    ps = 'Start-MpScan -ScanType FullScan'
-    subprocess.Popen(["powershell", "-Command", ps])
-    log("  -> Windows Defender full scan started (may take a while)")
-
-def update_defender():
-    """Update Windows Defender definitions."""
-    ps = 'Update-MpSignature'
-    subprocess.Popen(["powershell", "-Command", ps])
-    log("  -> Updating Windows Defender definitions...")
-
-def check_windows_update():
-    """Open Windows Update settings."""
-    subprocess.Popen("start ms-settings:windowsupdate", shell=True)
-    log("  -> Opened Windows Update")
-
-def open_firewall():
-    """Open Windows Firewall settings."""
-    subprocess.Popen("start ms-settings:windowsdefender", shell=True)
-    log("  -> Opened Windows Security")
-
-def clear_temp_files():
-    """Clear temporary files."""
-    temp = os.environ.get("TEMP", "")
-    if temp:
-        ps = f'Remove-Item "{temp}\\*" -Recurse -Force -ErrorAction SilentlyContinue'
-        subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Temp files cleared")
-
-def disk_cleanup():
-    """Open disk cleanup utility."""
-    subprocess.Popen("cleanmgr.exe", shell=True)
-    log("  -> Disk Cleanup opened")
-
-
-# ═══════════════════════════════════════════════════════
-#  INPUT & ACCESSIBILITY
-# ═══════════════════════════════════════════════════════
-
-def open_onscreen_keyboard():
-    """Open the on-screen keyboard."""
-    subprocess.Popen("osk.exe", shell=True)
-    log("  -> On-screen keyboard opened")
-
-def open_emoji_panel():
-    """Open the emoji picker (Win+.)."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD2 {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD2]::keybd_event(0x5B,0,0,0); [KBD2]::keybd_event(0xBE,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD2]::keybd_event(0xBE,0,2,0); [KBD2]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Emoji panel opened")
-
-def open_magnifier():
-    """Open Windows Magnifier."""
-    subprocess.Popen("magnify.exe", shell=True)
-    log("  -> Magnifier opened")
-
-def open_narrator():
-    """Open Windows Narrator."""
-    subprocess.Popen("narrator.exe", shell=True)
-    log("  -> Narrator started")
-
-def toggle_focus_assist(on=True):
-    """Open Focus Assist settings."""
-    subprocess.Popen("start ms-settings:quiethours", shell=True)
-    log(f"  -> Opened Focus Assist settings")
-
-
-# ═══════════════════════════════════════════════════════
-#  TIME, DATE & PRODUCTIVITY
-# ═══════════════════════════════════════════════════════
-
-def show_datetime():
-    """Show current date and time."""
-    now = datetime.datetime.now()
-    log(f"  -> {now.strftime('%A, %B %d, %Y  %I:%M:%S %p')}")
-
-def set_timer(minutes):
-    """Open the Clock app for a timer."""
-    subprocess.Popen("start ms-clock:timer", shell=True)
-    log(f"  -> Clock app opened (set a {minutes}-minute timer)")
-
-def set_alarm():
-    """Open the Clock app alarms."""
-    subprocess.Popen("start ms-clock:alarm", shell=True)
-    log("  -> Clock app opened (alarms)")
-
-def open_run_dialog():
-    """Open the Run dialog (Win+R)."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD3 {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD3]::keybd_event(0x5B,0,0,0); [KBD3]::keybd_event(0x52,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD3]::keybd_event(0x52,0,2,0); [KBD3]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Run dialog opened")
-
-def open_task_view():
-    """Open Task View (Win+Tab)."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD4 {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD4]::keybd_event(0x5B,0,0,0); [KBD4]::keybd_event(0x09,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD4]::keybd_event(0x09,0,2,0); [KBD4]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Task View opened")
-
-def open_action_center():
-    """Open Action Center / Notification Center."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD5 {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD5]::keybd_event(0x5B,0,0,0); [KBD5]::keybd_event(0x41,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD5]::keybd_event(0x41,0,2,0); [KBD5]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Action Center opened")
-
-def new_virtual_desktop():
-    """Create a new virtual desktop."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD6 {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD6]::keybd_event(0x5B,0,0,0); [KBD6]::keybd_event(0x11,0,0,0); [KBD6]::keybd_event(0x44,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD6]::keybd_event(0x44,0,2,0); [KBD6]::keybd_event(0x11,0,2,0); [KBD6]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> New virtual desktop created")
-
-def close_virtual_desktop():
-    """Close current virtual desktop."""
-    ps = '''Add-Type @"
-using System; using System.Runtime.InteropServices;
-public class KBD7 {
-  [DllImport("user32.dll")] public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, int dwExtraInfo);
-}
-"@
-[KBD7]::keybd_event(0x5B,0,0,0); [KBD7]::keybd_event(0x11,0,0,0); [KBD7]::keybd_event(0x73,0,0,0)
-Start-Sleep -Milliseconds 50
-[KBD7]::keybd_event(0x73,0,2,0); [KBD7]::keybd_event(0x11,0,2,0); [KBD7]::keybd_event(0x5B,0,2,0)'''
-    subprocess.run(["powershell", "-Command", ps], capture_output=True)
-    log("  -> Virtual desktop closed")
-
-
-# ═══════════════════════════════════════════════════════
-#  SMART KEYWORD ROUTER (primary — always works)
-# ═══════════════════════════════════════════════════════
-
-# Map of toggleable features -> (on_func, off_func)
-TOGGLEABLE = {
-    "bluetooth":    (lambda: toggle_bluetooth(True),  lambda: toggle_bluetooth(False)),
-    "wifi":         (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
-    "wi-fi":        (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
-    "wireless":     (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
-    "airplane":     (lambda: toggle_airplane_mode(True), lambda: toggle_airplane_mode(False)),
-    "airplane mode":(lambda: toggle_airplane_mode(True), lambda: toggle_airplane_mode(False)),
-    "night light":  (lambda: toggle_night_light(True),  lambda: toggle_night_light(False)),
-    "nightlight":   (lambda: toggle_night_light(True),  lambda: toggle_night_light(False)),
-    "hotspot":      (lambda: toggle_hotspot(True),     lambda: toggle_hotspot(False)),
-    "mobile hotspot":(lambda: toggle_hotspot(True),    lambda: toggle_hotspot(False)),
-    "location":     (lambda: toggle_location(True),    lambda: toggle_location(False)),
-    "dark mode":    (lambda: toggle_dark_mode(True),   lambda: toggle_dark_mode(False)),
-    "light mode":   (lambda: toggle_dark_mode(False),  lambda: toggle_dark_mode(True)),
-    "dark theme":   (lambda: toggle_dark_mode(True),   lambda: toggle_dark_mode(False)),
-    "color filter":  (lambda: toggle_color_filter(True), lambda: toggle_color_filter(False)),
-    "high contrast": (lambda: toggle_high_contrast(True), lambda: toggle_high_contrast(False)),
-    "focus assist":  (lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
-    "do not disturb":(lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
-    "dnd":           (lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
-    "taskbar auto hide": (lambda: toggle_taskbar_autohide(True), lambda: toggle_taskbar_autohide(False)),
-    "narrator":      (lambda: open_narrator(),  lambda: subprocess.run('taskkill /IM narrator.exe /F', shell=True, capture_output=True)),
-    "magnifier":     (lambda: open_magnifier(), lambda: subprocess.run('taskkill /IM magnify.exe /F', shell=True, capture_output=True)),
-}
-
-def smart_execute(text):
-    """Parse user input with keywords and execute the right action.
-    Returns True if handled, False if needs AI fallback."""
-    text_lower = text.lower().strip()
-
-    # --- Detect ON/OFF intent ---
-    wants_on = any(w in text_lower for w in ["turn on", "enable", "activate", "switch on", "start "])
-    wants_off = any(w in text_lower for w in ["turn off", "disable", "deactivate", "switch off", "stop "])
-
-    # --- Toggle hardware features (bluetooth, wifi, dark mode, etc.) ---
-    if wants_on or wants_off:
-        for feature, (on_fn, off_fn) in sorted(TOGGLEABLE.items(), key=lambda x: len(x[0]), reverse=True):
-            if feature in text_lower:
-                if wants_on:
-                    on_fn()
-                else:
-                    off_fn()
-                return True
-
-    # --- Volume ---
-    vol_match = re.search(r'(?:set\s+)?volume\s+(?:to\s+)?(\d+)', text_lower)
-    if vol_match:
-        set_volume(int(vol_match.group(1)))
-        return True
-    if any(w in text_lower for w in ["mute", "unmute", "silence"]):
-        mute_audio()
-        return True
-    if "volume up" in text_lower or "increase volume" in text_lower or "louder" in text_lower:
-        set_volume(80)
-        return True
-    if "volume down" in text_lower or "decrease volume" in text_lower or "quieter" in text_lower or "lower volume" in text_lower:
-        set_volume(30)
-        return True
-    if "max volume" in text_lower or "full volume" in text_lower:
-        set_volume(100)
-        return True
-
-    # --- Brightness ---
-    br_match = re.search(r'(?:set\s+)?brightness\s+(?:to\s+)?(\d+)', text_lower)
-    if br_match:
-        set_brightness(int(br_match.group(1)))
-        return True
-    if any(w in text_lower for w in ["brighter", "increase brightness", "brightness up", "max brightness"]):
-        set_brightness(80 if "max" not in text_lower else 100)
-        return True
-    if any(w in text_lower for w in ["dimmer", "dim", "decrease brightness", "brightness down", "min brightness"]):
-        set_brightness(30 if "min" not in text_lower else 5)
-        return True
-
-    # --- Media controls ---
-    if any(w in text_lower for w in ["play pause", "play/pause", "pause music", "resume music", "pause media", "play media"]):
-        media_play_pause()
-        return True
-    if any(w in text_lower for w in ["next track", "next song", "skip song", "skip track"]):
-        media_next()
-        return True
-    if any(w in text_lower for w in ["previous track", "previous song", "last song", "go back song"]):
-        media_previous()
-        return True
-    if any(w in text_lower for w in ["stop music", "stop media", "stop playing"]):
-        media_stop()
-        return True
-
-    # --- Process/Task management ---
-    kill_match = re.search(r'(?:kill|close|end|terminate|force close|quit)\s+(?:the\s+)?(?:app\s+)?(?:process\s+)?(.+?)(?:\s+app|\s+process|\s*$)', text_lower)
-    if kill_match and not any(w in text_lower for w in ["window", "desktop", "virtual"]):
-        target = kill_match.group(1).strip()
-        if target and target not in ("my", "the", "a", "all"):
-            kill_process(target)
-            return True
-    if any(w in text_lower for w in ["list running", "running apps", "running processes", "what's running", "show processes", "task list"]):
-        list_running_apps()
-        return True
-
-    # --- Window management ---
-    if any(w in text_lower for w in ["minimize all", "show desktop", "hide all"]):
-        minimize_all_windows()
-        return True
-    if any(w in text_lower for w in ["restore all", "show all windows", "unhide all"]):
-        restore_all_windows()
-        return True
-    if "close window" in text_lower or "close this window" in text_lower:
-        close_current_window()
-        return True
-    if "alt tab" in text_lower or "switch window" in text_lower:
-        switch_window()
-        return True
-    if "snap left" in text_lower or "snap window left" in text_lower:
-        snap_window_left()
-        return True
-    if "snap right" in text_lower or "snap window right" in text_lower:
-        snap_window_right()
-        return True
-    if "maximize window" in text_lower or "maximize this" in text_lower or "full screen" in text_lower:
-        maximize_window()
-        return True
-    if "minimize window" in text_lower or "minimize this" in text_lower:
-        minimize_window()
-        return True
-    if "new desktop" in text_lower or "new virtual desktop" in text_lower or "create desktop" in text_lower:
-        new_virtual_desktop()
-        return True
-    if "close desktop" in text_lower or "close virtual desktop" in text_lower or "remove desktop" in text_lower:
-        close_virtual_desktop()
-        return True
-    if "task view" in text_lower:
-        open_task_view()
-        return True
-
-    # --- System actions ---
-    if "screenshot" in text_lower or "screen shot" in text_lower or "snip" in text_lower or "screen capture" in text_lower:
-        take_screenshot()
-        return True
-    if "lock" in text_lower and any(w in text_lower for w in ["screen", "computer", "pc", "laptop", "my"]):
-        lock_screen()
-        return True
-    if "shut down" in text_lower or "shutdown" in text_lower:
-        shutdown_pc()
-        return True
-    if "cancel shutdown" in text_lower or "abort shutdown" in text_lower or "stop shutdown" in text_lower:
-        cancel_shutdown()
-        return True
-    if "restart" in text_lower or "reboot" in text_lower:
-        restart_pc()
-        return True
-    if "hibernate" in text_lower:
-        hibernate_pc()
-        return True
-    if "sleep" in text_lower and not "sleep timeout" in text_lower:
-        sleep_pc()
-        return True
-    if "log off" in text_lower or "logoff" in text_lower or "sign out" in text_lower:
-        logoff_pc()
-        return True
-
-    # --- Power plan ---
-    power_match = re.search(r'(?:power plan|power mode|set power)\s+(?:to\s+)?(.+)', text_lower)
-    if power_match:
-        set_power_plan(power_match.group(1).strip())
-        return True
-    if "high performance" in text_lower and "power" in text_lower:
-        set_power_plan("high performance")
-        return True
-    if "power saver" in text_lower or "battery saver" in text_lower:
-        set_power_plan("power saver")
-        return True
-    if "balanced" in text_lower and "power" in text_lower:
-        set_power_plan("balanced")
-        return True
-
-    # --- Screen/sleep timeout ---
-    screen_timeout_match = re.search(r'screen\s+timeout\s+(?:to\s+)?(\d+)', text_lower)
-    if screen_timeout_match:
-        set_screen_timeout(int(screen_timeout_match.group(1)))
-        return True
-    sleep_timeout_match = re.search(r'sleep\s+timeout\s+(?:to\s+)?(\d+)', text_lower)
-    if sleep_timeout_match:
-        set_sleep_timeout(int(sleep_timeout_match.group(1)))
-        return True
-
-    # --- Resolution ---
-    res_match = re.search(r'resolution\s+(?:to\s+)?(\d{3,4})\s*[x×]\s*(\d{3,4})', text_lower)
-    if res_match:
-        set_screen_resolution(int(res_match.group(1)), int(res_match.group(2)))
-        return True
-
-    # --- Battery & System info ---
-    if any(w in text_lower for w in ["battery level", "battery status", "battery percentage", "how much battery", "charge level"]):
-        show_battery_level()
-        return True
-    if "battery report" in text_lower:
-        generate_battery_report()
-        return True
-    if any(w in text_lower for w in ["system info", "system information", "my specs", "pc specs", "computer specs", "about my pc", "about my computer"]):
-        show_system_info()
-        return True
-    if any(w in text_lower for w in ["disk space", "disk usage", "storage space", "free space", "drive space"]):
-        show_disk_usage()
-        return True
-    if any(w in text_lower for w in ["cpu usage", "processor usage", "cpu load"]):
-        show_cpu_usage()
-        return True
-    if any(w in text_lower for w in ["ram usage", "memory usage", "free ram", "used ram"]):
-        show_ram_usage()
-        return True
-    if any(w in text_lower for w in ["uptime", "how long running", "boot time"]):
-        show_uptime()
-        return True
-    if any(w in text_lower for w in ["windows version", "os version", "which windows"]):
-        show_windows_version()
-        return True
-    if any(w in text_lower for w in ["startup apps", "startup programs", "startup list"]):
-        show_startup_apps()
-        return True
-    if any(w in text_lower for w in ["installed apps", "installed programs", "installed software", "list apps"]):
-        show_installed_apps()
-        return True
-
-    # --- Network info ---
-    if any(w in text_lower for w in ["my ip", "ip address", "show ip", "what is my ip"]):
-        if "public" in text_lower:
-            show_public_ip()
-        else:
-            show_ip_address()
-        return True
-    if "public ip" in text_lower:
-        show_public_ip()
-        return True
-    ping_match = re.search(r'ping\s+(.+)', text_lower)
-    if ping_match:
-        ping_host(ping_match.group(1).strip())
-        return True
-    if "flush dns" in text_lower or "clear dns" in text_lower:
-        flush_dns()
-        return True
-    if any(w in text_lower for w in ["wifi password", "show password", "network password"]):
-        show_wifi_password()
-        return True
-    if any(w in text_lower for w in ["network info", "network status", "network adapters", "connection info"]):
-        show_network_info()
-        return True
-    if any(w in text_lower for w in ["speed test", "internet speed", "test speed", "bandwidth"]):
-        speed_test()
-        return True
-
-    # --- File/Folder management ---
-    folder_match = re.search(r'(?:open|go to|show)\s+(?:my\s+)?(?:the\s+)?(downloads|documents|desktop|pictures|videos|music|home|appdata|temp|c drive|d drive|c:|d:)', text_lower)
-    if folder_match:
-        open_folder(folder_match.group(1))
-        return True
-    if "empty recycle" in text_lower or "empty trash" in text_lower or "clear recycle" in text_lower:
-        empty_recycle_bin()
-        return True
-    create_match = re.search(r'create\s+(?:a\s+)?(?:new\s+)?folder\s+(?:called\s+|named\s+)?(.+)', text_lower)
-    if create_match:
-        create_folder(create_match.group(1).strip())
-        return True
-
-    # --- Clipboard ---
-    if "clear clipboard" in text_lower or "empty clipboard" in text_lower:
-        clear_clipboard()
-        return True
-    if "clipboard history" in text_lower or "clipboard settings" in text_lower:
-        open_clipboard_history()
-        return True
-
-    # --- Security & Maintenance ---
-    if any(w in text_lower for w in ["virus scan", "scan for virus", "quick scan", "malware scan", "defender scan"]):
-        if "full" in text_lower:
-            run_full_virus_scan()
-        else:
-            run_virus_scan()
-        return True
-    if "update defender" in text_lower or "defender update" in text_lower or "update virus" in text_lower:
-        update_defender()
-        return True
-    if "windows update" in text_lower or "check for updates" in text_lower or "update windows" in text_lower:
-        check_windows_update()
-        return True
-    if "firewall" in text_lower:
-        open_firewall()
-        return True
-    if any(w in text_lower for w in ["clear temp", "delete temp", "clean temp"]):
-        clear_temp_files()
-        return True
-    if any(w in text_lower for w in ["disk cleanup", "clean disk", "free up space"]):
-        disk_cleanup()
-        return True
-
-    # --- Input & Accessibility ---
-    if any(w in text_lower for w in ["on-screen keyboard", "onscreen keyboard", "virtual keyboard", "screen keyboard"]):
-        open_onscreen_keyboard()
-        return True
-    if any(w in text_lower for w in ["emoji", "emoji panel", "emoji picker"]):
-        open_emoji_panel()
-        return True
-
-    # --- Productivity ---
-    if any(w in text_lower for w in ["what time", "current time", "what date", "current date", "what day"]):
-        show_datetime()
-        return True
-    timer_match = re.search(r'(?:set\s+)?(?:a\s+)?timer\s+(?:for\s+)?(\d+)', text_lower)
-    if timer_match:
-        set_timer(int(timer_match.group(1)))
-        return True
-    if "alarm" in text_lower:
-        set_alarm()
-        return True
-    if "run dialog" in text_lower or "run box" in text_lower:
-        open_run_dialog()
-        return True
-    if "action center" in text_lower or "notification center" in text_lower or "notifications panel" in text_lower:
-        open_action_center()
-        return True
-
-    # --- Web search ---
-    search_match = re.search(r'(?:search|google|look up|find|bing)\s+(?:for\s+)?(.+)', text_lower)
-    if search_match:
-        web_search(search_match.group(1).strip())
-        return True
-
-    # --- Open website ---
-    url_match = re.search(r'(?:open|go to|visit|browse)\s+((?:https?://)?(?:www\.)?[\w.-]+\.\w{2,}(?:/\S*)?)', text_lower)
-    if url_match:
-        open_website(url_match.group(1).strip())
-        return True
-
-    # --- Open settings page (only if user says 'settings' or 'open') ---
-    if any(w in text_lower for w in ["settings", "open", "show", "go to", "launch"]):
-        for key in sorted(SETTINGS_MAP.keys(), key=len, reverse=True):
-            if key in text_lower:
-                open_settings(key)
-                return True
-
-    # --- Open apps ---
-    for app_name in sorted(APP_MAP.keys(), key=len, reverse=True):
-        if app_name in text_lower:
-            open_app(app_name)
-            return True
-
-    # --- Play something ---
-    if "play" in text_lower:
-        play_match = re.search(r'play\s+(.+?)(?:\s+on\s+|\s*$)', text_lower)
-        if play_match:
-            query = play_match.group(1).strip()
-            if "spotify" in text_lower:
-                open_app("spotify")
-            else:
-                web_search(f"{query} play online")
-            return True
-
-    return False
-
-
-# ═══════════════════════════════════════════════════════
-#  AI MODEL FALLBACK (for ambiguous prompts)
-# ═══════════════════════════════════════════════════════
-
-# Keep function list small for the 270M model
-ai_functions = [
-    {
-        "type": "function",
-        "function": {
-            "name": "open_settings",
-            "description": "Open a Windows settings page",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "setting": {"type": "string", "description": "Which setting to open: bluetooth, wifi, display, sound, network, power, battery, privacy, camera, microphone, apps, update"}
-                },
-                "required": ["setting"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "open_app",
-            "description": "Open an application",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "app_name": {"type": "string", "description": "Application name like chrome, notepad, calculator, spotify, edge, explorer, terminal"}
-                },
-                "required": ["app_name"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "set_volume",
-            "description": "Set system volume to a level between 0 and 100",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "level": {"type": "integer", "description": "Volume level 0-100"}
-                },
-                "required": ["level"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "set_brightness",
-            "description": "Set screen brightness to a level between 0 and 100",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "level": {"type": "integer", "description": "Brightness level 0-100"}
-                },
-                "required": ["level"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "system_action",
-            "description": "Perform a system action",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "action": {"type": "string", "description": "Action: shutdown, restart, sleep, lock, screenshot, mute"}
-                },
-                "required": ["action"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "web_search",
-            "description": "Search the web",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Search query"}
-                },
-                "required": ["query"]
-            }
-        }
-    },
-]
-
-def ai_fallback(user_input):
-    """Use the AI model when keyword matching fails."""
-    if processor is None:
-        load_model()
-    messages = [
-        {"role": "developer", "content": "You are a laptop assistant. Call the best function for the user's request."},
-        {"role": "user", "content": user_input}
-    ]
-
-    inputs = processor.apply_chat_template(
-        messages, tools=ai_functions, add_generation_prompt=True, return_tensors="pt"
-    )
-    outputs = model.generate(
-        **inputs.to(model.device), max_new_tokens=128, pad_token_id=processor.eos_token_id
-    )
-    response = processor.decode(outputs[0][len(inputs["input_ids"][0]):], skip_special_tokens=True)
-
-    match = re.search(r'call:(\w+)(\{.*?\})', response)
-    if match:
-        func_name = match.group(1)
-        params_str = match.group(2)
-        params = extract_params(params_str)
-        log(f"  [AI chose: {func_name}({params})]")
-        return execute_ai_function(func_name, params)
-    else:
-        log(f"  [AI] Sorry, I couldn't understand that. Try being more specific.")
-        return False
-
-def extract_params(params_str):
-    params = {}
-    try:
-        cleaned = params_str.replace("<escape>", '"')
-        params = json.loads(cleaned)
-        return params
-    except:
-        pass
-    for m in re.finditer(r'(\w+):\s*<escape>(.+?)<escape>', params_str):
-        params[m.group(1)] = m.group(2)
-    for m in re.finditer(r'"(\w+)":\s*(\d+)', params_str):
-        params[m.group(1)] = int(m.group(2))
-    for m in re.finditer(r'"(\w+)":\s*(true|false)', params_str, re.IGNORECASE):
-        params[m.group(1)] = m.group(2).lower() == "true"
-    for m in re.finditer(r'(\w+):\s*(\d+)', params_str):
-        if m.group(1) not in params:
-            params[m.group(1)] = int(m.group(2))
-    return params
-
-def execute_ai_function(func_name, params):
-    if func_name == "open_settings":
-        setting = params.get("setting", "").lower()
-        return open_settings(setting)
-    elif func_name == "open_app":
-        return open_app(params.get("app_name", ""))
-    elif func_name == "set_volume":
-        set_volume(params.get("level", 50))
-        return True
-    elif func_name == "set_brightness":
-        set_brightness(params.get("level", 50))
-        return True
-    elif func_name == "system_action":
-        action = params.get("action", "").lower()
-        actions = {
-            "shutdown": shutdown_pc, "restart": restart_pc, "sleep": sleep_pc,
-            "lock": lock_screen, "screenshot": take_screenshot, "mute": mute_audio,
-        }
-        fn = actions.get(action)
-        if fn:
-            fn()
-            return True
-        log(f"  -> Unknown action: {action}")
-        return False
-    elif func_name == "web_search":
-        web_search(params.get("query", ""))
-        return True
-    return False
-
-
-# ═══════════════════════════════════════════════════════
-#  PUBLIC API for UI
-# ═══════════════════════════════════════════════════════
-
-def process_command(user_input):
-    """Process a user command. Returns a list of response strings."""
-    _log_buffer.clear()
-    handled = smart_execute(user_input)
-    if not handled:
-        log("  [Thinking...]")
-        ai_fallback(user_input)
-    return get_and_clear_log()
-
-
-# ═══════════════════════════════════════════════════════
-#  CLI MODE
-# ═══════════════════════════════════════════════════════
-
-if __name__ == "__main__":
-    load_model()
-    print("=" * 55)
-    print("    LAPTOP CONTROL ASSISTANT (AI-Powered)")
-    print("=" * 55)
-    print()
-    print('Type "exit" to quit.')
-    print("-" * 55)
-
-    while True:
-        user_input = input("\n You > ").strip()
-        if not user_input:
-            continue
-        if user_input.lower() in ("exit", "quit", "bye"):
-            print("\n Goodbye!")
-            break
-        process_command(user_input)
+import time
+_IMPORT_STARTED = time.perf_counter()
+import asyncio
+import re
+import subprocess
+import os
+import json
+import urllib.parse
+import io
+import sys
+import datetime
+import shutil
+import ctypes
+import atexit
+import threading
+import aio
+import responses
+import pshost
+import ai_cache
+import semantic
+import decoding
+import batching
+import quantize
+import model_server
+import lifecycle
+import tool_retrieval
+import classifier
+import telemetry
+import plan
+from prompt_cache import PromptCache
+from keys import send_chord
+from router import Route
+from intents import IntentRegistry, PinnedActions
+
+MODEL_ID = "google/functiongemma-270m-it"
+# Inference precision: auto, fp32, bf16 or int8 (see quantize.py)
+PRECISION = os.environ.get("LAPTOP_ASSISTANT_PRECISION", "auto")
+
+# Per-user state (AI decision cache, ...). Override with LAPTOP_ASSISTANT_HOME.
+STATE_DIR = os.environ.get("LAPTOP_ASSISTANT_HOME") or os.path.join(os.path.expanduser("~"), ".laptop_assistant")
+
+def state_path(name):
+    return os.path.join(STATE_DIR, name)
+
+# Where the model runs. "server" (default): in model_server.py, one process
+# shared by every front end and started on first use. "local": in this process.
+MODEL_BACKEND = os.environ.get("LAPTOP_ASSISTANT_MODEL", "server")
+
+# Global model references. transformers (and torch behind it) is only imported
+# by load_model(), so commands the keyword router handles never pay for it.
+processor = None
+model = None
+model_precision = None
+prompt_cache = None
+_kept_processor = None  # tokenizer kept across an unload, for a quicker reload
+_model_lock = threading.Lock()
+_warm_up_thread = None
+
+def log(msg, severity=None, action=None, seconds=None):
+    """Log a message to the current command's response channel (see responses.py).
+
+    Outside of a command (model loading in the background, startup) it is printed.
+    """
+    channel = responses.current()
+    if channel is None:
+        print(msg)
+    else:
+        channel.emit(msg, severity, action, seconds)
+
+def stream_lines(limit=2000):
+    """An on_line callback for run_ps/aio.run: logs output lines as they arrive, up to `limit` characters."""
+    budget = [limit]
+    def on_line(line):
+        if not line.strip() or budget[0] <= 0:
+            return
+        budget[0] -= len(line)
+        log(f"     {line.rstrip()}" if budget[0] > 0 else "     ...", "output")
+    return on_line
+
+# ─── Startup profile: seconds spent per phase, in the order they ran ───
+PROFILE_STARTUP = False
+startup_profile = {}
+
+class profile_phase:
+    """with profile_phase("load model"): ...  — records how long the block took."""
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        startup_profile[self.name] = time.perf_counter() - self.started
+
+def print_startup_profile():
+    print("  Startup profile:")
+    for name, seconds in startup_profile.items():
+        print(f"    {name:<22} {seconds * 1000:9.1f} ms")
+
+def load_model():
+    """Load the model, in the model server or here. Safe to call from several threads."""
+    if MODEL_BACKEND == "server" and _load_model_server():
+        return
+    model_lifecycle.ensure_loaded()
+
+def _load_model_local():
+    """Import the ML stack and load the model into this process."""
+    global processor, model, model_precision, prompt_cache
+    with _model_lock:
+        if processor is not None:
+            return
+        log("Loading AI model...")
+        with profile_phase("import transformers"):
+            from transformers import AutoProcessor
+        with profile_phase("load processor"):
+            loaded_processor = _kept_processor or AutoProcessor.from_pretrained(MODEL_ID)
+        with profile_phase(f"load model ({PRECISION})"):
+            model, model_precision = quantize.load_causal_lm(MODEL_ID, PRECISION, state_path("models"))
+        if PRECISION.lower() == "bf16" and model_precision != "bf16":
+            log("  [AI] This CPU has no native bf16 (AVX512-BF16 or AMX); running the model in fp32 instead.")
+        prompt_cache = PromptCache(loaded_processor, model, SYSTEM_PROMPT, core_functions)
+        if os.environ.get("LAPTOP_ASSISTANT_PREFIX_CACHE", "1") != "0":
+            with profile_phase("prefill prompt prefix"):
+                try:
+                    prompt_cache.build()
+                except Exception as e:
+                    log(f"  [AI] Prompt prefix cache unavailable, prefilling every prompt: {e}")
+        if os.environ.get("LAPTOP_ASSISTANT_WARM_UP", "1") != "0":
+            # One short generate() now, so the first real request doesn't pay for
+            # cold kernels, allocator growth and lazy initialisation
+            with profile_phase("warm-up inference"):
+                try:
+                    inputs = prompt_cache.encode("turn on the wifi").to(model.device)
+                    prompt_cache.generate(inputs, max_new_tokens=8, do_sample=False,
+                                          pad_token_id=loaded_processor.eos_token_id)
+                except Exception as e:
+                    log(f"  [AI] Warm-up inference failed: {e}")
+        processor = loaded_processor  # set last: ai_fallback checks it to see if loading is done
+        log(f"Model loaded! ({model_precision})")
+    if PROFILE_STARTUP:
+        print_startup_profile()
+
+def unload_model():
+    """Drop the model from memory; the next AI fallback loads it again."""
+    global processor, model, model_precision, prompt_cache, _kept_processor
+    with _model_lock:
+        if processor is None:
+            return
+        _kept_processor = processor
+        processor = None
+        model = prompt_cache = model_precision = None
+
+# Unloads the in-process model after LAPTOP_ASSISTANT_MODEL_IDLE_MINUTES without
+# use (0: never), or when this process's resident memory is over
+# LAPTOP_ASSISTANT_MODEL_MEMORY_MB (unset: no budget).
+model_lifecycle = lifecycle.ModelLifecycle(
+    _load_model_local, unload_model, lambda: processor is not None,
+    idle_timeout=float(os.environ.get("LAPTOP_ASSISTANT_MODEL_IDLE_MINUTES", lifecycle.DEFAULT_IDLE_TIMEOUT / 60)) * 60,
+    memory_budget=int(float(os.environ.get("LAPTOP_ASSISTANT_MODEL_MEMORY_MB", 0)) * 2**20),
+    on_unload=lambda reason: log(f"  [AI] Model unloaded ({reason}); it will load again when needed."),
+)
+
+model_client = None
+
+def get_model_client():
+    global model_client
+    if model_client is None:
+        model_client = model_server.ModelClient(STATE_DIR)
+    return model_client
+
+def _load_model_server():
+    """Have the model server load the model. False if no server could be reached or started, or it failed to load."""
+    global MODEL_BACKEND, model_precision
+    with _model_lock:
+        if model_precision is not None:
+            return True
+        log("Loading AI model (model server)...")
+        try:
+            with profile_phase("model server load"):
+                model_precision = get_model_client().call("load")["precision"]
+        except (OSError, model_server.ServerError) as e:
+            log(f"  [AI] Model server unavailable, loading the model here instead: {e}")
+            MODEL_BACKEND = "local"
+            return False
+        log(f"Model loaded! ({model_precision}, model server)")
+    if PROFILE_STARTUP:
+        print_startup_profile()
+    return True
+
+def _warm_up():
+    try:
+        load_model()
+    except Exception as e:
+        log(f"  [AI] Warm-up failed, will retry on first use: {e}")
+
+def warm_up_model():
+    """Start loading the model on a background thread (once). Returns the thread."""
+    global _warm_up_thread
+    if _warm_up_thread is None:
+        _warm_up_thread = threading.Thread(target=_warm_up, name="model-warm-up", daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
+
+# ═══════════════════════════════════════════════════════
+#  SETTINGS MAP
+# ═══════════════════════════════════════════════════════
+SETTINGS_MAP = {
+    "bluetooth":        "ms-settings:bluetooth",
+    "wifi":             "ms-settings:network-wifi",
+    "network":          "ms-settings:network",
+    "airplane":         "ms-settings:network-airplanemode",
+    "vpn":              "ms-settings:network-vpn",
+    "hotspot":          "ms-settings:network-mobilehotspot",
+    "proxy":            "ms-settings:network-proxy",
+    "display":          "ms-settings:display",
+    "night light":      "ms-settings:nightlight",
+    "sound":            "ms-settings:sound",
+    "notifications":    "ms-settings:notifications",
+    "focus":            "ms-settings:quiethours",
+    "power":            "ms-settings:powersleep",
+    "battery":          "ms-settings:batterysaver",
+    "storage":          "ms-settings:storagesense",
+    "personalization":  "ms-settings:personalization",
+    "background":       "ms-settings:personalization-background",
+    "colors":           "ms-settings:personalization-colors",
+    "lock screen":      "ms-settings:lockscreen",
+    "themes":           "ms-settings:themes",
+    "taskbar":          "ms-settings:taskbar",
+    "start menu":       "ms-settings:personalization-start",
+    "accounts":         "ms-settings:yourinfo",
+    "date":             "ms-settings:dateandtime",
+    "time":             "ms-settings:dateandtime",
+    "language":         "ms-settings:regionlanguage",
+    "keyboard":         "ms-settings:keyboard",
+    "mouse":            "ms-settings:mousetouchpad",
+    "touchpad":         "ms-settings:devices-touchpad",
+    "printer":          "ms-settings:printers",
+    "camera":           "ms-settings:privacy-webcam",
+    "microphone":       "ms-settings:privacy-microphone",
+    "location":         "ms-settings:privacy-location",
+    "apps":             "ms-settings:appsfeatures",
+    "default apps":     "ms-settings:defaultapps",
+    "startup":          "ms-settings:startupapps",
+    "update":           "ms-settings:windowsupdate",
+    "windows update":   "ms-settings:windowsupdate",
+    "recovery":         "ms-settings:recovery",
+    "about":            "ms-settings:about",
+    "clipboard":        "ms-settings:clipboard",
+    "remote desktop":   "ms-settings:remotedesktop",
+    "accessibility":    "ms-settings:easeofaccess",
+    "privacy":          "ms-settings:privacy",
+    "developer":        "ms-settings:developers",
+    "security":         "windowsdefender:",
+    "gaming":           "ms-settings:gaming-gamebar",
+    "fonts":            "ms-settings:fonts",
+    "multitasking":     "ms-settings:multitasking",
+    "projecting":       "ms-settings:project",
+    "typing":           "ms-settings:typing",
+    "pen":              "ms-settings:pen",
+    "usb":              "ms-settings:usb",
+    "autoplay":         "ms-settings:autoplay",
+    "default browser":  "ms-settings:defaultapps",
+    "optional features": "ms-settings:optionalfeatures",
+    "maps":             "ms-settings:maps",
+    "offline maps":     "ms-settings:maps",
+    "speech":           "ms-settings:speech",
+    "signin":           "ms-settings:signinoptions",
+    "sign in":          "ms-settings:signinoptions",
+    "email":            "ms-settings:emailandaccounts",
+    "sync":             "ms-settings:sync",
+    "family":           "ms-settings:family-group",
+    "color management": "ms-settings:display-advancedgraphics",
+    "graphics":         "ms-settings:display-advancedgraphics",
+    "scaling":          "ms-settings:display",
+    "night mode":       "ms-settings:nightlight",
+    "screen timeout":   "ms-settings:powersleep",
+    "sleep timeout":    "ms-settings:powersleep",
+    "ethernet":         "ms-settings:network-ethernet",
+    "dial-up":          "ms-settings:network-dialup",
+    "data usage":       "ms-settings:datausage",
+    "background apps":  "ms-settings:privacy-backgroundapps",
+    "firewall":         "ms-settings:windowsdefender",
+    "device encryption": "ms-settings:deviceencryption",
+    "troubleshoot":     "ms-settings:troubleshoot",
+    "activation":       "ms-settings:activation",
+    "device manager":   "devmgmt.msc",
+    "disk management":  "diskmgmt.msc",
+    "event viewer":     "eventvwr.msc",
+    "services":         "services.msc",
+    "group policy":     "gpedit.msc",
+    "system info":      "msinfo32",
+}
+
+# ═══════════════════════════════════════════════════════
+#  APP MAP
+# ═══════════════════════════════════════════════════════
+APP_MAP = {
+    "notepad":          "notepad.exe",
+    "calculator":       "calc.exe",
+    "calc":             "calc.exe",
+    "paint":            "mspaint.exe",
+    "chrome":           "start chrome",
+    "google chrome":    "start chrome",
+    "edge":             "start msedge",
+    "firefox":          "start firefox",
+    "browser":          "start msedge",
+    "file explorer":    "explorer.exe",
+    "explorer":         "explorer.exe",
+    "files":            "explorer.exe",
+    "task manager":     "taskmgr.exe",
+    "command prompt":   "cmd.exe",
+    "cmd":              "cmd.exe",
+    "terminal":         "wt.exe",
+    "powershell":       "powershell.exe",
+    "control panel":    "control",
+    "snipping tool":    "snippingtool.exe",
+    "snip":             "snippingtool.exe",
+    "word":             "start winword",
+    "excel":            "start excel",
+    "powerpoint":       "start powerpnt",
+    "outlook":          "start outlook",
+    "spotify":          "start spotify:",
+    "vscode":           "code",
+    "vs code":          "code",
+    "code":             "code",
+    "teams":            "start msteams:",
+    "discord":          "start discord:",
+    "whatsapp":         "start whatsapp:",
+    "telegram":         "start telegram:",
+    "photos":           "start ms-photos:",
+    "maps":             "start bingmaps:",
+    "weather":          "start bingweather:",
+    "clock":            "start ms-clock:",
+    "calendar":         "start outlookcal:",
+    "settings":         "start ms-settings:",
+    "store":            "start ms-windows-store:",
+    "xbox":             "start xbox:",
+    "movies":           "start mswindowsvideo:",
+    "music":            "start mswindowsmusic:",
+    "zoom":             "start zoommtg:",
+    "slack":            "start slack:",
+    "notion":           "start notion:",
+    "onenote":          "start onenote:",
+    "sticky notes":     "start ms-stickynotes:",
+    "feedback":         "start feedback-hub:",
+    "tips":             "start ms-get-started:",
+    "magnifier":        "magnify.exe",
+    "narrator":         "narrator.exe",
+    "on-screen keyboard": "osk.exe",
+    "osk":              "osk.exe",
+    "character map":    "charmap.exe",
+    "registry editor":  "regedit.exe",
+    "regedit":          "regedit.exe",
+    "remote desktop":   "mstsc.exe",
+    "rdp":              "mstsc.exe",
+    "disk cleanup":     "cleanmgr.exe",
+    "defragment":       "dfrgui.exe",
+    "system config":    "msconfig.exe",
+    "resource monitor":  "resmon.exe",
+    "performance monitor": "perfmon.exe",
+    "reliability":      "start perfmon /rel",
+    "wordpad":          "write.exe",
+    "sound recorder":   "start ms-callrecording:",
+    "screen recorder":  "start ms-screenclip:",
+    "camera app":       "start microsoft.windows.camera:",
+    "alarm":            "start ms-clock:",
+    "timer":            "start ms-clock:",
+    "stopwatch":        "start ms-clock:",
+    "mail":             "start outlookmail:",
+    "people":           "start ms-people:",
+    "video editor":     "start ms-photos:videospage",
+    "3d viewer":        "start com.microsoft.3dviewer:",
+}
+
+# ═══════════════════════════════════════════════════════
+#  POWERSHELL HOST POOL
+# ═══════════════════════════════════════════════════════
+
+# Long-lived powershell.exe hosts shared by every action (see pshost.py).
+# Set LAPTOP_ASSISTANT_PS_HOST="python -u pshost_stub.py" to run without Windows.
+ps_pool = None
+_ps_pool_lock = threading.Lock()
+
+def get_ps_pool():
+    """Return the shared PowerShell pool, creating it on first use."""
+    global ps_pool
+    with _ps_pool_lock:
+        if ps_pool is None:
+            size = int(os.environ.get("LAPTOP_ASSISTANT_PS_POOL", pshost.DEFAULT_POOL_SIZE))
+            ps_pool = pshost.PowerShellPool(size=size)
+            atexit.register(ps_pool.close)
+        return ps_pool
+
+def run_ps(script, timeout=None, on_line=None):
+    """Run a PowerShell script on a pooled host and return its output (all streams).
+
+    `on_line` is called with each line of output as the script writes it (see
+    stream_lines); a script that ends in Out-String or Sort-Object still hands
+    over its lines all at once, when that step finishes.
+    A script that runs past `timeout` (the pool's 30 s by default) is killed and
+    what it printed so far is returned. Raises pshost.Cancelled if the command
+    it runs for is cancelled meanwhile.
+    """
+    try:
+        return get_ps_pool().run(script, timeout=timeout, on_line=on_line, cancel=responses.cancel_event())
+    except pshost.HostCrashed as e:
+        return e.output
+    except subprocess.TimeoutExpired as e:
+        output = e.output or ""
+        log(f"  [PowerShell timed out after {e.timeout:g} s]")
+        if output.strip():
+            log(f"  [Output so far]\n{output.rstrip()}")
+        return output
+
+def launch_ps(script):
+    """Start a long-running script in its own detached powershell.exe (scans, updates)."""
+    subprocess.Popen(["powershell", "-Command", script])
+
+
+# ═══════════════════════════════════════════════════════
+#  SYSTEM TELEMETRY
+# ═══════════════════════════════════════════════════════
+
+def _run_telemetry_script(script):
+    # Not tied to any command: a cancelled command must not cancel a sample other commands wait on
+    try:
+        return get_ps_pool().run(script, timeout=30)
+    except pshost.HostCrashed as e:
+        return e.output
+
+# Where system info comes from, chosen for this platform: one CIM query through
+# the PowerShell pool on Windows, /proc and /sys on Linux (see telemetry.backend_for)
+telemetry_backend = telemetry.backend_for(sys.platform, _run_telemetry_script)
+
+# Sampled every LAPTOP_ASSISTANT_TELEMETRY_SECONDS on AC power, every
+# LAPTOP_ASSISTANT_TELEMETRY_BATTERY_SECONDS on battery, while info is being asked for
+telemetry_sampler = telemetry.Sampler(
+    telemetry_backend.collect,
+    interval=float(os.environ.get("LAPTOP_ASSISTANT_TELEMETRY_SECONDS", telemetry.DEFAULT_INTERVAL)),
+    battery_interval=float(os.environ.get("LAPTOP_ASSISTANT_TELEMETRY_BATTERY_SECONDS",
+                                          telemetry.DEFAULT_BATTERY_INTERVAL)),
+)
+atexit.register(telemetry_sampler.close)
+
+
+# ═══════════════════════════════════════════════════════
+#  FUNCTION IMPLEMENTATIONS (all use subprocess/PowerShell)
+# ═══════════════════════════════════════════════════════
+
+# ─── PowerShell script to toggle a Windows radio (Bluetooth/WiFi) ───
+RADIO_TOGGLE_PS = r'''
+Add-Type -AssemblyName System.Runtime.WindowsRuntime
+$asTaskGeneric = ([System.WindowsRuntimeSystemExtensions].GetMethods() | Where-Object {
+    $_.Name -eq 'AsTask' -and $_.GetParameters().Count -eq 1 -and
+    $_.GetParameters()[0].ParameterType.Name -eq 'IAsyncOperation`1'
+})[0]
+function Await($WinRtTask, $ResultType) {
+    $asTask = $asTaskGeneric.MakeGenericMethod($ResultType)
+    $netTask = $asTask.Invoke($null, @($WinRtTask))
+    $netTask.Wait(-1) | Out-Null
+    $netTask.Result
+}
+[Windows.Devices.Radios.Radio,Windows.System.Devices,ContentType=WindowsRuntime] | Out-Null
+$radios = Await ([Windows.Devices.Radios.Radio]::GetRadiosAsync()) ([System.Collections.Generic.IReadOnlyList[Windows.Devices.Radios.Radio]])
+$radio = $radios | Where-Object { $_.Kind -eq '%KIND%' }
+if ($radio) {
+    $result = Await ($radio.SetStateAsync('%STATE%')) ([Windows.Devices.Radios.RadioAccessStatus])
+    Write-Host "%KIND% turned %STATE%"
+} else {
+    Write-Host "No %KIND% radio found"
+}
+'''
+
+def toggle_radio(kind, state):
+    """Toggle a Windows radio. kind='Bluetooth'|'WiFi', state='On'|'Off'"""
+    ps = RADIO_TOGGLE_PS.replace('%KIND%', kind).replace('%STATE%', state)
+    output = run_ps(ps, timeout=15).strip()
+    if output:
+        log(f"  -> {output}")
+    else:
+        log(f"  -> {kind} {state.lower()} command sent")
+
+def toggle_bluetooth(on=True):
+    toggle_radio('Bluetooth', 'On' if on else 'Off')
+
+def toggle_wifi(on=True):
+    toggle_radio('WiFi', 'On' if on else 'Off')
+
+def toggle_airplane_mode(on=True):
+    subprocess.Popen("start ms-settings:network-airplanemode", shell=True)
+    log(f"  -> Opened airplane mode settings (toggle manually)")
+
+def toggle_night_light(on=True):
+    state = '1' if on else '0'
+    ps = f'''$path = 'HKCU:\Software\Microsoft\Windows\CurrentVersion\CloudStore\Store\DefaultAccount\Current\default$windows.data.bluelightreduction.bluelightreductionstate\windows.data.bluelightreduction.bluelightreductionstate'
+if (Test-Path $path) {{ Remove-Item $path -Force }}
+Start-Process ms-settings:nightlight'''
+    run_ps(ps)
+    log(f"  -> Night light {'on' if on else 'off'} (settings opened)")
+
+def toggle_hotspot(on=True):
+    subprocess.Popen("start ms-settings:network-mobilehotspot", shell=True)
+    log(f"  -> Opened hotspot settings (toggle manually)")
+
+def toggle_location(on=True):
+    subprocess.Popen("start ms-settings:privacy-location", shell=True)
+    log(f"  -> Opened location settings (toggle manually)")
+
+def open_settings(setting):
+    uri = SETTINGS_MAP.get(setting.lower().strip())
+    if uri:
+        subprocess.Popen(f"start {uri}", shell=True)
+        log(f"  -> Opened {setting} settings")
+        return True
+    return False
+
+def open_app(app_name):
+    cmd = APP_MAP.get(app_name.lower().strip())
+    if cmd:
+        subprocess.Popen(cmd, shell=True)
+        log(f"  -> Opened {app_name}")
+        return True
+    subprocess.Popen(f"start {app_name}", shell=True)
+    log(f"  -> Trying to open {app_name}...")
+    return True
+
+def set_volume(level=50):
+    level = max(0, min(100, int(level)))
+    # Each volume key step is 2%: bottom out, then step back up
+    send_chord("volume_down", repeat=50)
+    time.sleep(0.1)
+    send_chord("volume_up", repeat=round(level / 2))
+    log(f"  -> Volume set to ~{level}%")
+
+def mute_audio():
+    send_chord("volume_mute")
+    log("  -> Toggled mute")
+
+def set_brightness(level=50):
+    level = max(0, min(100, int(level)))
+    ps = f"(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,{level})"
+    run_ps(ps)
+    log(f"  -> Brightness set to {level}%")
+
+def take_screenshot():
+    send_chord("ctrl+printscreen")
+    subprocess.Popen("snippingtool.exe", shell=True)
+    log("  -> Screenshot tool opened")
+
+async def lock_screen():
+    await aio.run("rundll32.exe user32.dll,LockWorkStation")
+    log("  -> Screen locked")
+
+async def shutdown_pc():
+    log("  -> Shutting down in 10 seconds... (run 'shutdown /a' to cancel)")
+    await aio.run("shutdown /s /t 10")
+
+async def restart_pc():
+    log("  -> Restarting in 10 seconds... (run 'shutdown /a' to cancel)")
+    await aio.run("shutdown /r /t 10")
+
+async def sleep_pc():
+    await aio.run("rundll32.exe powrprof.dll,SetSuspendState 0,1,0")
+    log("  -> Putting to sleep...")
+
+async def logoff_pc():
+    await aio.run("shutdown /l")
+    log("  -> Logging off...")
+
+def web_search(query):
+    url = f"https://www.google.com/search?q={urllib.parse.quote(query)}"
+    subprocess.Popen(f'start "" "{url}"', shell=True)
+    log(f"  -> Searching: {query}")
+
+def open_website(url):
+    if not url.startswith("http"):
+        url = "https://" + url
+    subprocess.Popen(f'start "" "{url}"', shell=True)
+    log(f"  -> Opening {url}")
+
+
+# ═══════════════════════════════════════════════════════
+#  PROCESS / TASK MANAGEMENT
+# ═══════════════════════════════════════════════════════
+
+async def kill_process(name):
+    """Kill a running process by name."""
+    name = name.strip().lower()
+    if not name.endswith(".exe"):
+        name += ".exe"
+    result = await aio.run(f'taskkill /IM "{name}" /F')
+    if result.returncode == 0:
+        log(f"  -> Closed {name}")
+    else:
+        log(f"  -> Could not close {name}: {result.stderr.strip()}")
+
+def list_running_apps():
+    """List currently running visible apps."""
+    ps = 'Get-Process | Where-Object {$_.MainWindowTitle -ne ""} | Select-Object -Property Name,MainWindowTitle | Format-Table -AutoSize | Out-String -Width 200'
+    output = run_ps(ps)
+    log(f"  -> Running apps:\n{output.strip()[:1500]}")
+
+
+# ═══════════════════════════════════════════════════════
+#  FILE / FOLDER MANAGEMENT
+# ═══════════════════════════════════════════════════════
+
+def open_folder(folder_name):
+    """Open a common folder."""
+    folders = {
+        "downloads":  os.path.expanduser("~/Downloads"),
+        "documents":  os.path.expanduser("~/Documents"),
+        "desktop":    os.path.expanduser("~/Desktop"),
+        "pictures":   os.path.expanduser("~/Pictures"),
+        "videos":     os.path.expanduser("~/Videos"),
+        "music":      os.path.expanduser("~/Music"),
+        "appdata":    os.environ.get("APPDATA", ""),
+        "temp":       os.environ.get("TEMP", ""),
+        "home":       os.path.expanduser("~"),
+        "user":       os.path.expanduser("~"),
+        "c drive":    "C:\\",
+        "c:":         "C:\\",
+        "d drive":    "D:\\",
+        "d:":         "D:\\",
+        "root":       "C:\\",
+    }
+    path = folders.get(folder_name.lower().strip())
+    if path and os.path.exists(path):
+        subprocess.Popen(f'explorer "{path}"', shell=True)
+        log(f"  -> Opened {folder_name}: {path}")
+        return True
+    # Try opening as a literal path
+    if os.path.exists(folder_name):
+        subprocess.Popen(f'explorer "{folder_name}"', shell=True)
+        log(f"  -> Opened {folder_name}")
+        return True
+    log(f"  -> Folder not found: {folder_name}")
+    return False
+
+def empty_recycle_bin():
+    """Empty the Windows Recycle Bin."""
+    ps = 'Clear-RecycleBin -Force -ErrorAction SilentlyContinue'
+    run_ps(ps)
+    log("  -> Recycle bin emptied")
+
+def create_folder(path):
+    """Create a new folder on the Desktop."""
+    full = os.path.join(os.path.expanduser("~/Desktop"), path)
+    os.makedirs(full, exist_ok=True)
+    log(f"  -> Created folder: {full}")
+
+
+# ═══════════════════════════════════════════════════════
+#  DISPLAY & APPEARANCE
+# ═══════════════════════════════════════════════════════
+
+def toggle_dark_mode(on=True):
+    """Toggle Windows dark/light mode."""
+    val = 0 if on else 1  # 0 = dark, 1 = light
+    ps = f'''Set-ItemProperty -Path HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize -Name AppsUseLightTheme -Value {val}
+Set-ItemProperty -Path HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize -Name SystemUsesLightTheme -Value {val}'''
+    run_ps(ps)
+    log(f"  -> {'Dark' if on else 'Light'} mode enabled")
+
+def set_screen_resolution(width, height):
+    """Attempt to change screen resolution."""
+    ps = f'''Add-Type @"
+using System; using System.Runtime.InteropServices;
+public class Disp {{
+  [DllImport("user32.dll")] public static extern int ChangeDisplaySettings(ref DEVMODE dm, int flags);
+  [StructLayout(LayoutKind.Sequential, CharSet=CharSet.Ansi)]
+  public struct DEVMODE {{
+    [MarshalAs(UnmanagedType.ByValTStr, SizeConst=32)] public string dmDeviceName;
+    public short dmSpecVersion; public short dmDriverVersion; public short dmSize; public short dmDriverExtra;
+    public int dmFields; public int dmPositionX; public int dmPositionY; public int dmDisplayOrientation;
+    public int dmDisplayFixedOutput; public short dmColor; public short dmDuplex; public short dmYResolution;
+    public short dmTTOption; public short dmCollate;
+    [MarshalAs(UnmanagedType.ByValTStr, SizeConst=32)] public string dmFormName;
+    public short dmLogPixels; public int dmBitsPerPel; public int dmPelsWidth; public int dmPelsHeight;
+    public int dmDisplayFlags; public int dmDisplayFrequency;
+  }}
+}}
+"@
+$dm = New-Object Disp+DEVMODE
+$dm.dmSize = [Runtime.InteropServices.Marshal]::SizeOf($dm)
+$dm.dmPelsWidth = {width}; $dm.dmPelsHeight = {height}
+$dm.dmFields = 0x180000
+[Disp]::ChangeDisplaySettings([ref]$dm, 0)'''
+    run_ps(ps)
+    log(f"  -> Resolution set to {width}x{height}")
+
+def rotate_screen(angle=0):
+    """Open display settings for rotation (0, 90, 180, 270)."""
+    subprocess.Popen("start ms-settings:display", shell=True)
+    log(f"  -> Opened display settings for rotation")
+
+def toggle_color_filter(on=True):
+    """Toggle Windows color filters (grayscale, etc.)."""
+    val = 1 if on else 0
+    ps = f'Set-ItemProperty -Path "HKCU:\\Software\\Microsoft\\ColorFiltering" -Name Active -Value {val} -Type DWord -Force'
+    run_ps(ps)
+    log(f"  -> Color filter {'enabled' if on else 'disabled'}")
+
+def toggle_high_contrast(on=True):
+    """Toggle high contrast mode."""
+    if on:
+        subprocess.Popen("start ms-settings:easeofaccess-highcontrast", shell=True)
+    else:
+        subprocess.Popen("start ms-settings:easeofaccess-highcontrast", shell=True)
+    log(f"  -> Opened high contrast settings")
+
+def set_wallpaper(path):
+    """Set desktop wallpaper from a file path."""
+    if os.path.exists(path):
+        ctypes.windll.user32.SystemParametersInfoW(20, 0, path, 3)
+        log(f"  -> Wallpaper set to {path}")
+    else:
+        log(f"  -> File not found: {path}")
+
+def toggle_taskbar_autohide(on=True):
+    """Toggle taskbar auto-hide."""
+    val = 3 if on else 2  # 3 = auto-hide, 2 = always show
+    ps = f'''$p = 'HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\StuckRects3'
+$v = (Get-ItemProperty -Path $p).Settings
+$v[8] = {val}
+Set-ItemProperty -Path $p -Name Settings -Value $v
+Stop-Process -Name explorer -Force'''
+    run_ps(ps)
+    log(f"  -> Taskbar auto-hide {'enabled' if on else 'disabled'}")
+
+
+# ═══════════════════════════════════════════════════════
+#  NETWORK & CONNECTIVITY
+# ═══════════════════════════════════════════════════════
+
+def show_ip_address():
+    """Show the current IP addresses."""
+    ps = '(Get-NetIPAddress -AddressFamily IPv4 | Where-Object {$_.InterfaceAlias -notlike "*Loopback*"}).IPAddress'
+    output = run_ps(ps)
+    ips = output.strip()
+    log(f"  -> IP Addresses: {ips if ips else 'Not connected'}")
+
+def show_public_ip():
+    """Show public IP address."""
+    ps = '(Invoke-WebRequest -Uri "https://api.ipify.org" -UseBasicParsing).Content'
+    output = run_ps(ps, timeout=10)
+    ip = output.strip()
+    log(f"  -> Public IP: {ip if ip else 'Could not determine'}")
+
+async def ping_host(host):
+    """Ping a host and show result."""
+    log(f"  -> Ping {host}:")
+    await aio.run(f'ping -n 3 {host}', timeout=15, on_line=stream_lines(500))
+
+async def flush_dns():
+    """Flush the DNS resolver cache."""
+    result = await aio.run('ipconfig /flushdns')
+    log(f"  -> {result.stdout.strip()}")
+
+def show_wifi_password():
+    """Show saved WiFi password for the current network."""
+    ps = '''$prof = (netsh wlan show interfaces | Select-String "Profile" | ForEach-Object { ($_ -split ":")[1].Trim() })
+if ($prof) { netsh wlan show profile name="$prof" key=clear | Select-String "Key Content" } else { Write-Host "Not connected to WiFi" }'''
+    output = run_ps(ps)
+    log(f"  -> {output.strip() if output.strip() else 'Could not retrieve WiFi password'}")
+
+def show_network_info():
+    """Show network adapter info."""
+    ps = 'Get-NetAdapter | Where-Object {$_.Status -eq "Up"} | Select-Object Name,InterfaceDescription,LinkSpeed,MacAddress | Format-Table -AutoSize | Out-String'
+    output = run_ps(ps)
+    log(f"  -> Network Adapters:\n{output.strip()[:1000]}")
+
+def speed_test():
+    """Open a speed test in browser."""
+    subprocess.Popen('start "" "https://fast.com"', shell=True)
+    log("  -> Opened speed test (fast.com)")
+
+
+# ═══════════════════════════════════════════════════════
+#  POWER & BATTERY
+# ═══════════════════════════════════════════════════════
+
+async def hibernate_pc():
+    """Hibernate the PC."""
+    await aio.run("shutdown /h")
+    log("  -> Hibernating...")
+
+async def cancel_shutdown():
+    """Cancel a pending shutdown/restart."""
+    await aio.run("shutdown /a")
+    log("  -> Shutdown cancelled")
+
+POWER_PLANS = {
+    "balanced":         "381b4222-f694-41f0-9685-ff5bb260df2e",
+    "high performance": "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c",
+    "high":             "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c",
+    "power saver":      "a1841308-3541-4fab-bc81-f71556f20b4a",
+    "saver":            "a1841308-3541-4fab-bc81-f71556f20b4a",
+}
+
+async def set_power_plan(plan):
+    """Set Windows power plan: balanced, high, saver."""
+    guid = POWER_PLANS.get(plan.lower().strip())
+    if guid:
+        await aio.run(f'powercfg /setactive {guid}')
+        log(f"  -> Power plan set to {plan}")
+    else:
+        log(f"  -> Unknown plan: {plan}. Try: balanced, high performance, power saver")
+
+def show_battery_level():
+    """Show battery percentage."""
+    battery = telemetry_sampler.read("battery")["battery"]
+    if battery is not None:
+        log(f"  -> Battery: {battery.percent}%")
+    elif telemetry_sampler.age("battery") is None:
+        log("  -> Battery: unavailable")  # never sampled: the query failed
+    else:
+        log("  -> No battery detected (desktop PC?)")
+
+async def generate_battery_report():
+    """Generate a detailed battery report."""
+    report_path = os.path.join(os.path.expanduser("~/Desktop"), "battery-report.html")
+    await aio.run(f'powercfg /batteryreport /output "{report_path}"')
+    subprocess.Popen(f'start "" "{report_path}"', shell=True)
+    log(f"  -> Battery report saved to Desktop and opened")
+
+async def set_screen_timeout(minutes):
+    """Set screen timeout in minutes."""
+    seconds = int(minutes) * 60
+    await asyncio.gather(aio.run(f'powercfg /change monitor-timeout-ac {minutes}'),
+                         aio.run(f'powercfg /change monitor-timeout-dc {minutes}'))
+    log(f"  -> Screen timeout set to {minutes} minutes")
+
+async def set_sleep_timeout(minutes):
+    """Set sleep timeout in minutes."""
+    await asyncio.gather(aio.run(f'powercfg /change standby-timeout-ac {minutes}'),
+                         aio.run(f'powercfg /change standby-timeout-dc {minutes}'))
+    log(f"  -> Sleep timeout set to {minutes} minutes")
+
+
+# ═══════════════════════════════════════════════════════
+#  CLIPBOARD
+# ═══════════════════════════════════════════════════════
+
+async def clear_clipboard():
+    """Clear the clipboard."""
+    await aio.run('echo off | clip')
+    log("  -> Clipboard cleared")
+
+def open_clipboard_history():
+    """Open Windows clipboard history (Win+V)."""
+    ps = '(New-Object -ComObject WScript.Shell).SendKeys("^v")'
+    # Actually Win+V
+    ps = 'Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait("^v")'
+    subprocess.Popen("start ms-settings:clipboard", shell=True)
+    log("  -> Opened clipboard settings")
+
+
+# ═══════════════════════════════════════════════════════
+#  MEDIA CONTROLS
+# ═══════════════════════════════════════════════════════
+
+def media_play_pause():
+    """Send media play/pause key."""
+    send_chord("media_play_pause")
+    log("  -> Media: Play/Pause")
+
+def media_next():
+    """Send media next track key."""
+    send_chord("media_next")
+    log("  -> Media: Next track")
+
+def media_previous():
+    """Send media previous track key."""
+    send_chord("media_prev")
+    log("  -> Media: Previous track")
+
+def media_stop():
+    """Send media stop key."""
+    send_chord("media_stop")
+    log("  -> Media: Stopped")
+
+
+# ═══════════════════════════════════════════════════════
+#  WINDOW MANAGEMENT
+# ═══════════════════════════════════════════════════════
+
+def minimize_all_windows():
+    """Minimize all windows (show desktop)."""
+    ps = '(New-Object -ComObject Shell.Application).MinimizeAll()'
+    run_ps(ps)
+    log("  -> All windows minimized")
+
+def show_desktop():
+    """Toggle show desktop."""
+    ps = '(New-Object -ComObject Shell.Application).ToggleDesktop()'
+    run_ps(ps)
+    log("  -> Toggled desktop view")
+
+def restore_all_windows():
+    """Restore all minimized windows."""
+    ps = '(New-Object -ComObject Shell.Application).UndoMinimizeAll()'
+    run_ps(ps)
+    log("  -> All windows restored")
+
+def close_current_window():
+    """Close the current foreground window."""
+    send_chord("alt+f4")
+    log("  -> Sent Alt+F4 to close window")
+
+def switch_window():
+    """Send Alt+Tab."""
+    send_chord("alt+tab")
+    log("  -> Alt+Tab sent")
+
+def snap_window_left():
+    """Snap current window to left half."""
+    send_chord("win+left")
+    log("  -> Window snapped left")
+
+def snap_window_right():
+    """Snap current window to right half."""
+    send_chord("win+right")
+    log("  -> Window snapped right")
+
+def maximize_window():
+    """Maximize current window."""
+    send_chord("win+up")
+    log("  -> Window maximized")
+
+def minimize_window():
+    """Minimize current window."""
+    send_chord("win+down")
+    log("  -> Window minimized")
+
+
+# ═══════════════════════════════════════════════════════
+#  SYSTEM INFORMATION
+# ═══════════════════════════════════════════════════════
+
+def show_system_info():
+    """Show basic system information."""
+    info = telemetry_sampler.read("system", "memory")
+    system, memory = info["system"], info["memory"]
+    if system is None:
+        log("  -> System Info: unavailable")
+        return
+    lines = [f"OS: {system.os_name} {system.architecture}", f"CPU: {system.cpu_name}"]
+    if memory is not None:
+        lines.append(f"RAM: {memory.free / 2**30:.1f} GB free / {memory.total / 2**30:.1f} GB total")
+    lines += [f"Computer: {system.computer}", f"User: {system.user}"]
+    log("  -> System Info:\n" + "\n".join(lines))
+
+def show_disk_usage():
+    """Show disk space usage."""
+    disks = telemetry_sampler.read("disks")["disks"]
+    if not disks:
+        log("  -> Disk Usage: unavailable")
+        return
+    rows = [("Name", "Used(GB)", "Free(GB)", "Total(GB)")]
+    rows += [(d.name, f"{d.used / 2**30:.1f}", f"{d.free / 2**30:.1f}", f"{d.total / 2**30:.1f}") for d in disks]
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    table = [" ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths)))
+             for row in rows]
+    table.insert(1, " ".join("-" * w for w in widths))
+    log("  -> Disk Usage:\n" + "\n".join(table))
+
+def show_cpu_usage():
+    """Show current CPU usage."""
+    cpu = telemetry_sampler.read("cpu_percent")["cpu_percent"]
+    log(f"  -> CPU Usage: {cpu:.0f}%" if cpu is not None else "  -> CPU Usage: unavailable")
+
+def show_ram_usage():
+    """Show current RAM usage."""
+    memory = telemetry_sampler.read("memory")["memory"]
+    if memory is None:
+        log("  -> RAM: unavailable")
+        return
+    log(f"  -> RAM: {memory.used / 2**30:.1f} GB / {memory.total / 2**30:.1f} GB ({memory.percent_used:.0f}% used)")
+
+def show_uptime():
+    """Show system uptime."""
+    boot_time = telemetry_sampler.read("boot_time")["boot_time"]
+    if boot_time is None:
+        log("  -> Uptime: unavailable")
+        return
+    minutes = int(time.time() - boot_time) // 60
+    log(f"  -> Uptime: {minutes // 1440}d {minutes // 60 % 24}h {minutes % 60}m")
+
+def show_windows_version():
+    """Show Windows version details."""
+    system = telemetry_sampler.read("system")["system"]
+    if system is None:
+        log("  -> Windows version: unavailable")
+        return
+    log(f"  -> {system.os_name} (version {system.os_version})")
+
+def show_startup_apps():
+    """List apps that run at startup."""
+    ps = 'Get-CimInstance Win32_StartupCommand | Select-Object Name,Command,Location | Format-Table -AutoSize -Wrap | Out-String -Width 200'
+    output = run_ps(ps)
+    log(f"  -> Startup apps:\n{output.strip()[:1500]}")
+
+def show_installed_apps():
+    """List installed programs."""
+    ps = 'Get-ItemProperty HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\* | Where-Object {$_.DisplayName} | Select-Object DisplayName,DisplayVersion | Sort-Object DisplayName | Format-Table -AutoSize'
+    log("  -> Installed Apps:")
+    run_ps(ps, on_line=stream_lines(2000))
+
+
+# ═══════════════════════════════════════════════════════
+#  SECURITY & MAINTENANCE
+# ═══════════════════════════════════════════════════════
+
+def run_virus_scan():
+    """Start a quick Windows Defender scan."""
+    ps = 'Start-MpScan -ScanType QuickScan'
+    launch_ps(ps)
+    log("  -> Windows Defender quick scan started (runs in background)")
+
+def run_full_virus_scan():
+    """Start a full Windows Defender scan."""
+    ps = 'Start-MpScan -ScanType FullScan'
+    launch_ps(ps)
+    log("  -> Windows Defender full scan started (may take a while)")
+
+def update_defender():
+    """Update Windows Defender definitions."""
+    ps = 'Update-MpSignature'
+    launch_ps(ps)
+    log("  -> Updating Windows Defender definitions...")
+
+def check_windows_update():
+    """Open Windows Update settings."""
+    subprocess.Popen("start ms-settings:windowsupdate", shell=True)
+    log("  -> Opened Windows Update")
+
+def open_firewall():
+    """Open Windows Firewall settings."""
+    subprocess.Popen("start ms-settings:windowsdefender", shell=True)
+    log("  -> Opened Windows Security")
+
+def clear_temp_files():
+    """Clear temporary files."""
+    temp = os.environ.get("TEMP", "")
+    if temp:
+        ps = f'Remove-Item "{temp}\\*" -Recurse -Force -ErrorAction SilentlyContinue'
+        run_ps(ps)
+    log("  -> Temp files cleared")
+
+def disk_cleanup():
+    """Open disk cleanup utility."""
+    subprocess.Popen("cleanmgr.exe", shell=True)
+    log("  -> Disk Cleanup opened")
+
+
+# ═══════════════════════════════════════════════════════
+#  INPUT & ACCESSIBILITY
+# ═══════════════════════════════════════════════════════
+
+def open_onscreen_keyboard():
+    """Open the on-screen keyboard."""
+    subprocess.Popen("osk.exe", shell=True)
+    log("  -> On-screen keyboard opened")
+
+def open_emoji_panel():
+    """Open the emoji picker (Win+.)."""
+    send_chord("win+period")
+    log("  -> Emoji panel opened")
+
+def open_magnifier():
+    """Open Windows Magnifier."""
+    subprocess.Popen("magnify.exe", shell=True)
+    log("  -> Magnifier opened")
+
+def open_narrator():
+    """Open Windows Narrator."""
+    subprocess.Popen("narrator.exe", shell=True)
+    log("  -> Narrator started")
+
+def toggle_focus_assist(on=True):
+    """Open Focus Assist settings."""
+    subprocess.Popen("start ms-settings:quiethours", shell=True)
+    log(f"  -> Opened Focus Assist settings")
+
+
+# ═══════════════════════════════════════════════════════
+#  TIME, DATE & PRODUCTIVITY
+# ═══════════════════════════════════════════════════════
+
+def show_datetime():
+    """Show current date and time."""
+    now = datetime.datetime.now()
+    log(f"  -> {now.strftime('%A, %B %d, %Y  %I:%M:%S %p')}")
+
+def set_timer(minutes):
+    """Open the Clock app for a timer."""
+    subprocess.Popen("start ms-clock:timer", shell=True)
+    log(f"  -> Clock app opened (set a {minutes}-minute timer)")
+
+def set_alarm():
+    """Open the Clock app alarms."""
+    subprocess.Popen("start ms-clock:alarm", shell=True)
+    log("  -> Clock app opened (alarms)")
+
+def open_run_dialog():
+    """Open the Run dialog (Win+R)."""
+    send_chord("win+r")
+    log("  -> Run dialog opened")
+
+def open_task_view():
+    """Open Task View (Win+Tab)."""
+    send_chord("win+tab")
+    log("  -> Task View opened")
+
+def open_action_center():
+    """Open Action Center / Notification Center."""
+    send_chord("win+a")
+    log("  -> Action Center opened")
+
+def new_virtual_desktop():
+    """Create a new virtual desktop."""
+    send_chord("win+ctrl+d")
+    log("  -> New virtual desktop created")
+
+def close_virtual_desktop():
+    """Close current virtual desktop."""
+    send_chord("win+ctrl+f4")
+    log("  -> Virtual desktop closed")
+
+
+# ═══════════════════════════════════════════════════════
+#  SMART KEYWORD ROUTER (primary — always works)
+# ═══════════════════════════════════════════════════════
+
+# Map of toggleable features -> (on_func, off_func)
+TOGGLEABLE = {
+    "bluetooth":    (lambda: toggle_bluetooth(True),  lambda: toggle_bluetooth(False)),
+    "wifi":         (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
+    "wi-fi":        (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
+    "wireless":     (lambda: toggle_wifi(True),       lambda: toggle_wifi(False)),
+    "airplane":     (lambda: toggle_airplane_mode(True), lambda: toggle_airplane_mode(False)),
+    "airplane mode":(lambda: toggle_airplane_mode(True), lambda: toggle_airplane_mode(False)),
+    "night light":  (lambda: toggle_night_light(True),  lambda: toggle_night_light(False)),
+    "nightlight":   (lambda: toggle_night_light(True),  lambda: toggle_night_light(False)),
+    "hotspot":      (lambda: toggle_hotspot(True),     lambda: toggle_hotspot(False)),
+    "mobile hotspot":(lambda: toggle_hotspot(True),    lambda: toggle_hotspot(False)),
+    "location":     (lambda: toggle_location(True),    lambda: toggle_location(False)),
+    "dark mode":    (lambda: toggle_dark_mode(True),   lambda: toggle_dark_mode(False)),
+    "light mode":   (lambda: toggle_dark_mode(False),  lambda: toggle_dark_mode(True)),
+    "dark theme":   (lambda: toggle_dark_mode(True),   lambda: toggle_dark_mode(False)),
+    "color filter":  (lambda: toggle_color_filter(True), lambda: toggle_color_filter(False)),
+    "high contrast": (lambda: toggle_high_contrast(True), lambda: toggle_high_contrast(False)),
+    "focus assist":  (lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
+    "do not disturb":(lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
+    "dnd":           (lambda: toggle_focus_assist(True), lambda: toggle_focus_assist(False)),
+    "taskbar auto hide": (lambda: toggle_taskbar_autohide(True), lambda: toggle_taskbar_autohide(False)),
+    "narrator":      (lambda: open_narrator(),  lambda: aio.run('taskkill /IM narrator.exe /F')),
+    "magnifier":     (lambda: open_magnifier(), lambda: aio.run('taskkill /IM magnify.exe /F')),
+}
+
+def toggle_feature(feature, on=True):
+    """Turn a TOGGLEABLE feature on or off."""
+    on_fn, off_fn = TOGGLEABLE[feature]
+    # A switch may return an awaitable (aio.run); aio.call awaits it on the loop
+    return on_fn() if on else off_fn()
+
+def play_online(query):
+    """Search the web for something to play."""
+    web_search(f"{query} play online")
+
+
+ON_WORDS = ["turn on", "enable", "activate", "switch on", "start "]
+OFF_WORDS = ["turn off", "disable", "deactivate", "switch off", "stop "]
+BRIGHTER_WORDS = ["brighter", "increase brightness", "brightness up", "max brightness"]
+DIMMER_WORDS = ["dimmer", "dim", "decrease brightness", "brightness down", "min brightness"]
+IP_WORDS = ["my ip", "ip address", "show ip", "what is my ip"]
+SETTINGS_VERBS = ["settings", "open", "show", "go to", "launch"]
+VIRUS_SCAN_WORDS = ["virus scan", "scan for virus", "quick scan", "malware scan", "defender scan"]
+
+SYSTEM_ACTIONS = {
+    "shutdown": shutdown_pc, "restart": restart_pc, "sleep": sleep_pc,
+    "lock": lock_screen, "screenshot": take_screenshot, "mute": mute_audio,
+}
+
+async def system_action(action):
+    """Run one of the SYSTEM_ACTIONS by name."""
+    fn = SYSTEM_ACTIONS.get(action.lower().strip())
+    if fn is None:
+        log(f"  -> Unknown action: {action}")
+        return False
+    await aio.call(fn)
+
+
+# Every action the assistant knows, declared once. The keyword router, the AI
+# tool list and the UI quick actions are all built from this registry.
+# Routes are tried by priority (lower first) and the first whose conditions
+# hold wins. Regex routes list the literal words their regex needs as
+# triggers, so the regex only runs when the automaton has already seen them.
+registry = IntentRegistry()
+
+# --- Toggle hardware features (bluetooth, wifi, dark mode, etc.) ---
+registry.add(toggle_feature, params={
+        "feature": ("string", "Feature to switch", list(TOGGLEABLE)),
+        "on": ("boolean", "true to turn it on, false to turn it off")}, routes=[
+    Route(TOGGLEABLE, also=ON_WORDS, pick="feature", args={"on": True}, priority=10),
+    Route(TOGGLEABLE, also=OFF_WORDS, excludes=ON_WORDS, pick="feature", args={"on": False}, priority=20),
+])
+
+# --- Volume ---
+registry.add(set_volume, ai=True, description="Set system volume to a level between 0 and 100",
+             params={"level": ("integer", "Volume level 0-100")}, routes=[
+    Route(["volume"], pattern=r'(?:set\s+)?volume\s+(?:to\s+)?(?P<level>\d+)', priority=30),
+    Route(["volume up", "increase volume", "louder"], args={"level": 80}, priority=50),
+    Route(["volume down", "decrease volume", "quieter", "lower volume"], args={"level": 30}, priority=60),
+    Route(["max volume", "full volume"], args={"level": 100}, priority=70),
+])
+registry.add(mute_audio, routes=[
+    Route(["mute", "unmute", "silence"], priority=40),
+])
+
+# --- Brightness ---
+registry.add(set_brightness, ai=True, description="Set screen brightness to a level between 0 and 100",
+             params={"level": ("integer", "Brightness level 0-100")}, routes=[
+    Route(["brightness"], pattern=r'(?:set\s+)?brightness\s+(?:to\s+)?(?P<level>\d+)', priority=80),
+    Route(BRIGHTER_WORDS, also=["max"], args={"level": 100}, priority=90),
+    Route(BRIGHTER_WORDS, args={"level": 80}, priority=100),
+    Route(DIMMER_WORDS, also=["min"], args={"level": 5}, priority=110),
+    Route(DIMMER_WORDS, args={"level": 30}, priority=120),
+])
+
+# --- Media controls ---
+registry.add(media_play_pause, routes=[
+    Route(["play pause", "play/pause", "pause music", "resume music", "pause media", "play media"], priority=130),
+])
+registry.add(media_next, routes=[
+    Route(["next track", "next song", "skip song", "skip track"], priority=140),
+])
+registry.add(media_previous, routes=[
+    Route(["previous track", "previous song", "last song", "go back song"], priority=150),
+])
+registry.add(media_stop, routes=[
+    Route(["stop music", "stop media", "stop playing"], priority=160),
+])
+
+# --- Process/Task management ---
+registry.add(kill_process, guarded=True, routes=[
+    Route(["kill", "close", "end", "terminate", "quit"],
+          excludes=["window", "desktop", "virtual"],
+          pattern=r'(?:kill|close|end|terminate|force close|quit)\s+(?:the\s+)?(?:app\s+)?(?:process\s+)?(?P<name>.+?)(?:\s+app|\s+process|\s*$)',
+          when=lambda a: a["name"] and a["name"] not in ("my", "the", "a", "all"), priority=170),
+])
+registry.add(list_running_apps, routes=[
+    Route(["list running", "running apps", "running processes", "what's running", "show processes", "task list"], priority=180),
+])
+
+# --- Window management ---
+registry.add(minimize_all_windows, routes=[
+    Route(["minimize all", "show desktop", "hide all"], priority=190),
+])
+registry.add(restore_all_windows, routes=[
+    Route(["restore all", "show all windows", "unhide all"], priority=200),
+])
+registry.add(close_current_window, routes=[
+    Route(["close window", "close this window"], priority=210),
+])
+registry.add(switch_window, routes=[
+    Route(["alt tab", "switch window"], priority=220),
+])
+registry.add(snap_window_left, routes=[
+    Route(["snap left", "snap window left"], priority=230),
+])
+registry.add(snap_window_right, routes=[
+    Route(["snap right", "snap window right"], priority=240),
+])
+registry.add(maximize_window, routes=[
+    Route(["maximize window", "maximize this", "full screen"], priority=250),
+])
+registry.add(minimize_window, routes=[
+    Route(["minimize window", "minimize this"], priority=260),
+])
+registry.add(new_virtual_desktop, routes=[
+    Route(["new desktop", "new virtual desktop", "create desktop"], priority=270),
+])
+registry.add(close_virtual_desktop, routes=[
+    Route(["close desktop", "close virtual desktop", "remove desktop"], priority=280),
+])
+registry.add(open_task_view, routes=[
+    Route(["task view"], priority=290),
+])
+
+# --- System actions ---
+registry.add(take_screenshot, routes=[
+    Route(["screenshot", "screen shot", "snip", "screen capture"], priority=300),
+])
+registry.add(lock_screen, final=True, routes=[
+    Route(["lock"], also=["screen", "computer", "pc", "laptop", "my"], priority=310),
+])
+registry.add(shutdown_pc, final=True, routes=[
+    Route(["shut down", "shutdown"], priority=320),
+])
+registry.add(cancel_shutdown, routes=[
+    # Ahead of shutdown_pc: these phrases contain its "shutdown" trigger
+    Route(["cancel shutdown", "abort shutdown", "stop shutdown"], priority=315),
+])
+registry.add(restart_pc, final=True, routes=[
+    Route(["restart", "reboot"], priority=340),
+])
+registry.add(hibernate_pc, final=True, routes=[
+    Route(["hibernate"], priority=350),
+])
+registry.add(sleep_pc, final=True, routes=[
+    Route(["sleep"], excludes=["sleep timeout"], priority=360),
+])
+registry.add(logoff_pc, final=True, routes=[
+    Route(["log off", "logoff", "sign out"], priority=370),
+])
+
+# --- Power plan ---
+registry.add(set_power_plan, params={"plan": ("string", "Power plan", list(POWER_PLANS))}, routes=[
+    Route(["power plan", "power mode", "set power"],
+          pattern=r'(?:power plan|power mode|set power)\s+(?:to\s+)?(?P<plan>.+)', priority=380),
+    Route(["high performance"], also=["power"], args={"plan": "high performance"}, priority=390),
+    Route(["power saver", "battery saver"], args={"plan": "power saver"}, priority=400),
+    Route(["balanced"], also=["power"], args={"plan": "balanced"}, priority=410),
+])
+
+# --- Screen/sleep timeout ---
+registry.add(set_screen_timeout, params={"minutes": ("integer", "Minutes before the screen turns off")}, routes=[
+    Route(["timeout"], pattern=r'screen\s+timeout\s+(?:to\s+)?(?P<minutes>\d+)', priority=420),
+])
+registry.add(set_sleep_timeout, params={"minutes": ("integer", "Minutes before the PC sleeps")}, routes=[
+    Route(["timeout"], pattern=r'sleep\s+timeout\s+(?:to\s+)?(?P<minutes>\d+)', priority=430),
+])
+
+# --- Resolution ---
+registry.add(set_screen_resolution, params={"width": ("integer", "Width in pixels"),
+                                            "height": ("integer", "Height in pixels")}, routes=[
+    Route(["resolution"],
+          pattern=r'resolution\s+(?:to\s+)?(?P<width>\d{3,4})\s*[x×]\s*(?P<height>\d{3,4})', priority=440),
+])
+
+# --- Battery & System info ---
+registry.add(show_battery_level, routes=[
+    Route(["battery level", "battery status", "battery percentage", "how much battery", "charge level"], priority=450),
+])
+registry.add(generate_battery_report, routes=[
+    Route(["battery report"], priority=460),
+])
+registry.add(show_system_info, routes=[
+    Route(["system info", "system information", "my specs", "pc specs", "computer specs", "about my pc", "about my computer"], priority=470),
+])
+registry.add(show_disk_usage, routes=[
+    Route(["disk space", "disk usage", "storage space", "free space", "drive space"], priority=480),
+])
+registry.add(show_cpu_usage, routes=[
+    Route(["cpu usage", "processor usage", "cpu load"], priority=490),
+])
+registry.add(show_ram_usage, routes=[
+    Route(["ram usage", "memory usage", "free ram", "used ram"], priority=500),
+])
+registry.add(show_uptime, routes=[
+    Route(["uptime", "how long running", "boot time"], priority=510),
+])
+registry.add(show_windows_version, routes=[
+    Route(["windows version", "os version", "which windows"], priority=520),
+])
+registry.add(show_startup_apps, routes=[
+    Route(["startup apps", "startup programs", "startup list"], priority=530),
+])
+registry.add(show_installed_apps, routes=[
+    Route(["installed apps", "installed programs", "installed software", "list apps"], priority=540),
+])
+
+# --- Network info ---
+registry.add(show_public_ip, routes=[
+    Route(IP_WORDS, also=["public"], priority=550),
+    Route(["public ip"], priority=570),
+])
+registry.add(show_ip_address, routes=[
+    Route(IP_WORDS, priority=560),
+])
+registry.add(ping_host, routes=[
+    Route(["ping"], pattern=r'ping\s+(?P<host>.+)', priority=580),
+])
+registry.add(flush_dns, routes=[
+    Route(["flush dns", "clear dns"], priority=590),
+])
+registry.add(show_wifi_password, routes=[
+    Route(["wifi password", "show password", "network password"], priority=600),
+])
+registry.add(show_network_info, routes=[
+    Route(["network info", "network status", "network adapters", "connection info"], priority=610),
+])
+registry.add(speed_test, routes=[
+    Route(["speed test", "internet speed", "test speed", "bandwidth"], priority=620),
+])
+
+# --- File/Folder management ---
+registry.add(open_folder, routes=[
+    Route(["open", "go to", "show"],
+          pattern=r'(?:open|go to|show)\s+(?:my\s+)?(?:the\s+)?(?P<folder_name>downloads|documents|desktop|pictures|videos|music|home|appdata|temp|c drive|d drive|c:|d:)', priority=630),
+])
+registry.add(empty_recycle_bin, guarded=True, routes=[
+    Route(["empty recycle", "empty trash", "clear recycle"], priority=640),
+])
+registry.add(create_folder, routes=[
+    Route(["folder"], pattern=r'create\s+(?:a\s+)?(?:new\s+)?folder\s+(?:called\s+|named\s+)?(?P<path>.+)', priority=650),
+])
+
+# --- Clipboard ---
+registry.add(clear_clipboard, routes=[
+    Route(["clear clipboard", "empty clipboard"], priority=660),
+])
+registry.add(open_clipboard_history, routes=[
+    Route(["clipboard history", "clipboard settings"], priority=670),
+])
+
+# --- Security & Maintenance ---
+registry.add(run_full_virus_scan, routes=[
+    Route(VIRUS_SCAN_WORDS, also=["full"], priority=680),
+])
+registry.add(run_virus_scan, routes=[
+    Route(VIRUS_SCAN_WORDS, priority=690),
+])
+registry.add(update_defender, routes=[
+    Route(["update defender", "defender update", "update virus"], priority=700),
+])
+registry.add(check_windows_update, routes=[
+    Route(["windows update", "check for updates", "update windows"], priority=710),
+])
+registry.add(open_firewall, routes=[
+    Route(["firewall"], priority=720),
+])
+registry.add(clear_temp_files, guarded=True, routes=[
+    Route(["clear temp", "delete temp", "clean temp"], priority=730),
+])
+registry.add(disk_cleanup, routes=[
+    Route(["disk cleanup", "clean disk", "free up space"], priority=740),
+])
+
+# --- Input & Accessibility ---
+registry.add(open_onscreen_keyboard, routes=[
+    Route(["on-screen keyboard", "onscreen keyboard", "virtual keyboard", "screen keyboard"], priority=750),
+])
+registry.add(open_emoji_panel, routes=[
+    Route(["emoji", "emoji panel", "emoji picker"], priority=760),
+])
+
+# --- Productivity ---
+registry.add(show_datetime, routes=[
+    Route(["what time", "current time", "what date", "current date", "what day"], priority=770),
+])
+registry.add(set_timer, params={"minutes": ("integer", "Timer length in minutes")}, routes=[
+    Route(["timer"], pattern=r'(?:set\s+)?(?:a\s+)?timer\s+(?:for\s+)?(?P<minutes>\d+)', priority=780),
+])
+registry.add(set_alarm, routes=[
+    Route(["alarm"], priority=790),
+])
+registry.add(open_run_dialog, routes=[
+    Route(["run dialog", "run box"], priority=800),
+])
+registry.add(open_action_center, routes=[
+    Route(["action center", "notification center", "notifications panel"], priority=810),
+])
+
+# --- Web ---
+registry.add(web_search, ai=True, description="Search the web",
+             params={"query": ("string", "Search query")}, routes=[
+    Route(["search", "google", "look up", "find", "bing"],
+          pattern=r'(?:search|google|look up|find|bing)\s+(?:for\s+)?(?P<query>.+)', priority=820),
+])
+registry.add(open_website, routes=[
+    Route(["open", "go to", "visit", "browse"],
+          pattern=r'(?:open|go to|visit|browse)\s+(?P<url>(?:https?://)?(?:www\.)?[\w.-]+\.\w{2,}(?:/\S*)?)', priority=830),
+])
+
+# --- Settings pages and apps (only if nothing more specific matched) ---
+registry.add(open_settings, ai=True, description="Open a Windows settings page",
+             params={"setting": ("string", "Which setting to open: bluetooth, wifi, display, sound, network, power, battery, privacy, camera, microphone, apps, update", list(SETTINGS_MAP))}, routes=[
+    # "pen" is also a substring of "open", so it must match as a whole word
+    Route([k for k in SETTINGS_MAP if k != "pen"], also=SETTINGS_VERBS, pick="setting", priority=840),
+    Route(["pen"], also=SETTINGS_VERBS, pattern=r'\bpen\b', args={"setting": "pen"}, priority=840),
+])
+registry.add(open_app, ai=True, description="Open an application",
+             params={"app_name": ("string", "Application name like chrome, notepad, calculator, spotify, edge, explorer, terminal")}, routes=[
+    Route(APP_MAP, pick="app_name", priority=850),
+    Route(["play"], also=["spotify"], pattern=r'play\s+(.+?)(?:\s+on\s+|\s*$)', args={"app_name": "spotify"}, priority=860),
+])
+registry.add(play_online, routes=[
+    Route(["play"], pattern=r'play\s+(?P<query>.+?)(?:\s+on\s+|\s*$)', priority=870),
+])
+
+# --- AI only ---
+registry.add(system_action, ai=True, guarded=True, description="Perform a system action",
+             params={"action": ("string", "Action: shutdown, restart, sleep, lock, screenshot, mute",
+                                list(SYSTEM_ACTIONS))})
+
+
+# --- Sidebar quick actions (section, label, phrase, intent it must route to) ---
+registry.quick("⚡ Connectivity", "Bluetooth ON", "turn on bluetooth", "toggle_feature")
+registry.quick("⚡ Connectivity", "Bluetooth OFF", "turn off bluetooth", "toggle_feature")
+registry.quick("⚡ Connectivity", "WiFi ON", "turn on wifi", "toggle_feature")
+registry.quick("⚡ Connectivity", "WiFi OFF", "turn off wifi", "toggle_feature")
+registry.quick("⚡ Connectivity", "Hotspot", "open hotspot settings", "open_settings")
+registry.quick("⚡ Connectivity", "Airplane Mode", "open airplane settings", "open_settings")
+
+registry.quick("🔊 Audio & Media", "Mute / Unmute", "mute", "mute_audio")
+registry.quick("🔊 Audio & Media", "Volume 50%", "set volume to 50", "set_volume")
+registry.quick("🔊 Audio & Media", "Volume 100%", "set volume to 100", "set_volume")
+registry.quick("🔊 Audio & Media", "⏯ Play/Pause", "play pause", "media_play_pause")
+registry.quick("🔊 Audio & Media", "⏭ Next Track", "next track", "media_next")
+registry.quick("🔊 Audio & Media", "⏮ Prev Track", "previous track", "media_previous")
+
+registry.quick("💡 Display", "Brightness 30%", "brightness to 30", "set_brightness")
+registry.quick("💡 Display", "Brightness 70%", "brightness to 70", "set_brightness")
+registry.quick("💡 Display", "Dark Mode", "turn on dark mode", "toggle_feature")
+registry.quick("💡 Display", "Light Mode", "turn on light mode", "toggle_feature")
+registry.quick("💡 Display", "Night Light", "turn on night light", "toggle_feature")
+
+registry.quick("🪟 Windows", "Minimize All", "minimize all windows", "minimize_all_windows")
+registry.quick("🪟 Windows", "Restore All", "restore all windows", "restore_all_windows")
+registry.quick("🪟 Windows", "Snap Left", "snap window left", "snap_window_left")
+registry.quick("🪟 Windows", "Snap Right", "snap window right", "snap_window_right")
+registry.quick("🪟 Windows", "New Desktop", "new virtual desktop", "new_virtual_desktop")
+registry.quick("🪟 Windows", "Task View", "task view", "open_task_view")
+
+registry.quick("🖥️ System", "Screenshot", "take a screenshot", "take_screenshot")
+registry.quick("🖥️ System", "Lock Screen", "lock my laptop", "lock_screen")
+registry.quick("🖥️ System", "Sleep", "sleep my laptop", "sleep_pc")
+registry.quick("🖥️ System", "Restart", "restart my laptop", "restart_pc")
+registry.quick("🖥️ System", "Cancel Shutdown", "cancel shutdown", "cancel_shutdown")
+
+registry.quick("📊 Info", "Battery Level", "battery level", "show_battery_level")
+registry.quick("📊 Info", "System Info", "system info", "show_system_info")
+registry.quick("📊 Info", "CPU Usage", "cpu usage", "show_cpu_usage")
+registry.quick("📊 Info", "RAM Usage", "ram usage", "show_ram_usage")
+registry.quick("📊 Info", "Disk Space", "disk space", "show_disk_usage")
+registry.quick("📊 Info", "My IP Address", "my ip address", "show_ip_address")
+registry.quick("📊 Info", "Uptime", "uptime", "show_uptime")
+
+registry.quick("🔒 Security", "Quick Virus Scan", "quick virus scan", "run_virus_scan")
+registry.quick("🔒 Security", "Windows Update", "check for updates", "check_windows_update")
+registry.quick("🔒 Security", "Clear Temp Files", "clear temp files", "clear_temp_files")
+registry.quick("🔒 Security", "Disk Cleanup", "disk cleanup", "disk_cleanup")
+registry.quick("🔒 Security", "Empty Recycle Bin", "empty recycle bin", "empty_recycle_bin")
+
+registry.quick("📂 Folders", "Downloads", "open downloads", "open_folder")
+registry.quick("📂 Folders", "Documents", "open documents", "open_folder")
+registry.quick("📂 Folders", "Desktop", "open desktop", "open_folder")
+registry.quick("📂 Folders", "File Explorer", "open file explorer", "open_app")
+
+registry.quick("🛠️ Tools", "Task Manager", "open task manager", "open_app")
+registry.quick("🛠️ Tools", "Running Apps", "list running apps", "list_running_apps")
+registry.quick("🛠️ Tools", "Emoji Panel", "open emoji panel", "open_emoji_panel")
+registry.quick("🛠️ Tools", "On-Screen KB", "on-screen keyboard", "open_onscreen_keyboard")
+registry.quick("🛠️ Tools", "Speed Test", "speed test", "speed_test")
+registry.quick("🛠️ Tools", "Date & Time", "what time is it", "show_datetime")
+registry.quick("🛠️ Tools", "Open Settings", "open settings", "open_app")
+
+registry.quick("⚡ Power", "High Performance", "power plan high performance", "set_power_plan")
+registry.quick("⚡ Power", "Power Saver", "power plan power saver", "set_power_plan")
+registry.quick("⚡ Power", "Balanced", "power plan balanced", "set_power_plan")
+
+# Buttons the user pinned from their own commands (see app.py)
+pinned_actions = PinnedActions(registry, state_path("pinned_actions.json"))
+
+def route(text):
+    """Resolve text to (intent_name, args) without running anything, or None."""
+    return registry.resolve(text)
+
+def plan_for(text):
+    """A plan.Plan if `text` is several commands that each route on their own, else None."""
+    final = {name for name, intent in registry.intents.items() if intent.final}
+    return plan.Plan.build(text, route, final)
+
+def report_plan(compound):
+    """Log each action's outcome and the plan's wall time against running it serially."""
+    for action in compound.actions:
+        args = ", ".join(f"{k}={v!r}" for k, v in action.args.items())
+        outcome = "ok" if action.ok else f"failed ({action.error})" if action.error else "failed"
+        log(f"  [{action.intent}({args}): {outcome}, {action.seconds * 1000:.0f} ms]",
+            "note" if action.ok else "error", action.intent, action.seconds)
+    log(f"  [{len(compound.actions)} actions in {len(compound.stages)} steps: {compound.seconds * 1000:.0f} ms "
+        f"(one by one: {compound.serial_seconds * 1000:.0f} ms)]", seconds=compound.seconds)
+
+def smart_execute(text):
+    """Parse user input with keywords and execute the right action.
+    Returns True if handled, False if needs AI fallback."""
+    started = time.perf_counter()
+    resolved = route(text)
+    record_tier("router", resolved is not None, started)
+    if resolved is None:
+        return False
+    registry.execute(*resolved)
+    return True
+
+
+# ═══════════════════════════════════════════════════════
+#  AI MODEL FALLBACK (for ambiguous prompts)
+# ═══════════════════════════════════════════════════════
+
+# Every intent can be called by the model, but each prompt only offers the
+# LAPTOP_ASSISTANT_TOOLS_K most relevant to the utterance, to keep the prompt
+# short for the 270M model. The core tools (ai=True) are offered when tools
+# can't be retrieved (no numpy, or K=0).
+ai_functions = registry.tool_schema(registry.intents)
+core_functions = registry.tool_schema()
+TOOLS_K = int(os.environ.get("LAPTOP_ASSISTANT_TOOLS_K", tool_retrieval.DEFAULT_K))
+_schema_of = {t["function"]["name"]: t for t in ai_functions}
+tool_retriever = None
+_tool_retriever_lock = threading.Lock()
+
+def select_tools(user_input):
+    """The tool schemas to offer the model for this utterance."""
+    global tool_retriever
+    if TOOLS_K <= 0 or not semantic.available():
+        return core_functions
+    with _tool_retriever_lock:
+        if tool_retriever is None:
+            tool_retriever = tool_retrieval.ToolRetriever(
+                registry.tool_documents(), k=TOOLS_K, fallback=[t["function"]["name"] for t in core_functions])
+    return [_schema_of[name] for name in tool_retriever.select(user_input)]
+
+SYSTEM_PROMPT = "You are a laptop assistant. Call the best function for the user's request."
+
+# Decisions the model already made, keyed by normalized utterance. Invalidated
+# automatically when the model, prompt or tool list changes.
+ai_decisions = ai_cache.DecisionCache(
+    state_path("ai_cache.json"),
+    capacity=int(os.environ.get("LAPTOP_ASSISTANT_AI_CACHE", ai_cache.DEFAULT_CAPACITY)),
+    fingerprint=ai_cache.fingerprint(MODEL_ID, SYSTEM_PROMPT, ai_functions, TOOLS_K),
+)
+
+# "constrained" (default): grammar-constrained greedy decoding that stops at the
+# call's closing brace. "free": sample up to 128 tokens and regex-scan the text.
+DECODING = os.environ.get("LAPTOP_ASSISTANT_DECODING", "constrained")
+decode_stats = {"calls": 0, "tokens": 0, "seconds": 0.0}
+
+# Response channels waiting on the model, per utterance being decided: the batch
+# worker streams each row's tokens to them and stops a row once all are cancelled
+_deciding = {}
+_deciding_lock = threading.Lock()
+
+def _parse_decision(new_tokens, grammar):
+    if DECODING == "constrained":
+        return grammar.parse(processor.decode(new_tokens, skip_special_tokens=False))
+    response = processor.decode(new_tokens, skip_special_tokens=True)
+    match = re.search(r'call:(\w+)(\{.*?\})', response)
+    if not match:
+        return None
+    return match.group(1), extract_params(match.group(2))
+
+def ai_decide_batch(user_inputs):
+    """Run the model once over several utterances. Returns a (func_name, params) or None per input."""
+    with model_lifecycle.use():
+        pad = processor.eos_token_id
+        tools = [select_tools(text) for text in user_inputs]
+        # Calls are constrained to the tools offered somewhere in this batch
+        grammar = decoding.CallGrammar({t["function"]["name"]: t for row in tools for t in row}.values())
+        # A single prompt reuses the prefix cache; batches are left-padded and prefilled in full
+        inputs = prompt_cache.encode_batch(user_inputs, pad, tools).to(model.device)
+        prompt_length = inputs["input_ids"].shape[1]
+        kwargs = {"max_new_tokens": 128, "pad_token_id": pad}
+        if DECODING == "constrained":
+            constraint = decoding.CallConstraint(grammar, processor, prompt_length, pad)
+            kwargs.update(constraint.generate_kwargs())
+        channels = [_deciding.get(text, ()) for text in user_inputs]
+        if any(channels):
+            def on_text(row, text):
+                for channel in list(channels[row]):
+                    channel.emit(text, "token")
+            def stop(row):
+                return bool(channels[row]) and all(c.cancelled.is_set() for c in list(channels[row]))
+            decoding.TokenStream(processor, prompt_length, on_text, stop).add_to(kwargs)
+        started = time.perf_counter()
+        outputs = prompt_cache.generate(inputs, tools=tools[0] if len(tools) == 1 else None, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        decisions = []
+        for row in outputs[:, prompt_length:]:
+            new_tokens = row[row != pad]
+            decode_stats["calls"] += 1
+            decode_stats["tokens"] += len(new_tokens)
+            decode_stats["seconds"] += elapsed  # every request in the batch waited the whole time
+            decisions.append(_parse_decision(new_tokens, grammar))
+    return decisions
+
+# Router misses arriving together (UI, scripts, several clients) share one
+# batched generate(). LAPTOP_ASSISTANT_BATCH=1 turns batching off.
+decide_batcher = None
+_decide_batcher_lock = threading.Lock()
+
+def get_decide_batcher():
+    global decide_batcher
+    with _decide_batcher_lock:
+        if decide_batcher is None:
+            decide_batcher = batching.MicroBatcher(
+                ai_decide_batch,
+                max_batch=int(os.environ.get("LAPTOP_ASSISTANT_BATCH", batching.DEFAULT_MAX_BATCH)),
+                window=float(os.environ.get("LAPTOP_ASSISTANT_BATCH_WINDOW_MS", batching.DEFAULT_WINDOW * 1000)) / 1000,
+                name="ai-batcher",
+            )
+        return decide_batcher
+
+def ai_decide(user_input):
+    """Ask the model which function to call. Returns (func_name, params) or None."""
+    global MODEL_BACKEND
+    if MODEL_BACKEND == "server":
+        channel = responses.current()
+        try:
+            if channel is None:
+                return get_model_client().decide(user_input)
+            # The server streams the model's tokens back to this request's channel, and stops on its cancel
+            decision = get_model_client().decide(user_input, on_event=channel.emit, cancel=channel.cancelled)
+            return None if channel.cancelled.is_set() else decision
+        except (OSError, model_server.ServerError) as e:
+            log(f"  [AI] Model server unavailable, loading the model here instead: {e}")
+            MODEL_BACKEND = "local"
+    channel = responses.current()
+    if channel is None:
+        return get_decide_batcher().submit(user_input)
+    with _deciding_lock:
+        _deciding.setdefault(user_input, []).append(channel)
+    try:
+        decision = get_decide_batcher().submit(user_input)
+    finally:
+        with _deciding_lock:
+            _deciding[user_input].remove(channel)
+            if not _deciding[user_input]:
+                del _deciding[user_input]
+    return None if channel.cancelled.is_set() else decision
+
+# Nearest-neighbour lookup over every known phrasing (router phrases plus what
+# the model resolved before). Built on the first router miss, not at import.
+semantic_index = None
+_semantic_lock = threading.Lock()
+
+def get_semantic_index():
+    """Return the semantic index, building it on first use. None if numpy is missing."""
+    global semantic_index
+    with _semantic_lock:
+        if semantic_index is None and semantic.available():
+            phrases = list(registry.phrases())
+            index = semantic.SemanticIndex(state_path("semantic"))
+            try:
+                index.build(phrases, ai_cache.fingerprint(phrases))
+            except OSError:
+                index = semantic.SemanticIndex()  # no writable state dir: keep it in memory
+                index.build(phrases, None)
+            semantic_index = index
+        return semantic_index
+
+# Intent classifier between the semantic index and the model: trained from the
+# router phrases plus the model's past decisions, retrained when those change.
+# Below LAPTOP_ASSISTANT_CLASSIFIER_THRESHOLD confidence the model decides.
+intent_classifier = None
+slot_filler = None
+_classifier_lock = threading.Lock()
+
+def get_intent_classifier():
+    """Return the intent classifier, training (or loading) it on first use. None if numpy is missing."""
+    global intent_classifier, slot_filler
+    with _classifier_lock:
+        if intent_classifier is None and classifier.available():
+            slot_filler = classifier.SlotFiller(registry)
+            examples = classifier.training_examples(registry, ai_decisions.items())
+            threshold = float(os.environ.get("LAPTOP_ASSISTANT_CLASSIFIER_THRESHOLD", classifier.DEFAULT_THRESHOLD))
+            try:
+                clf = classifier.IntentClassifier(state_path("classifier"), threshold).build(
+                    examples, ai_cache.fingerprint(examples))
+            except OSError:
+                clf = classifier.IntentClassifier(None, threshold).build(examples, None)  # no writable state dir
+            intent_classifier = clf
+        return intent_classifier
+
+def classify(user_input):
+    """(intent, args, confidence) if the classifier is confident and every argument is found, else None."""
+    clf = get_intent_classifier()
+    guess = clf.predict(user_input) if clf is not None else None
+    if guess is None:
+        return None
+    intent, args, confidence = guess
+    args = slot_filler.fill(user_input, intent, args)
+    return None if args is None else (intent, args, confidence)
+
+# Hits, misses and time spent per tier of the cascade (router, cache, semantic,
+# classifier, model), for the exit report and bench/bench_tiers.py
+tier_stats = {tier: {"hits": 0, "misses": 0, "seconds": 0.0}
+              for tier in ("router", "cache", "semantic", "classifier", "model")}
+
+def record_tier(tier, hit, started):
+    stats = tier_stats[tier]
+    stats["hits" if hit else "misses"] += 1
+    stats["seconds"] += time.perf_counter() - started
+
+def print_tier_stats():
+    print("  Tier        hits  misses   avg time")
+    for tier, stats in tier_stats.items():
+        calls = stats["hits"] + stats["misses"]
+        if calls:
+            print(f"  {tier:<10} {stats['hits']:5d} {stats['misses']:7d} {stats['seconds'] / calls * 1000:8.2f} ms")
+
+def ai_fallback(user_input):
+    """Use the AI model when keyword matching fails."""
+    started = time.perf_counter()
+    decision = ai_decisions.get(user_input)
+    record_tier("cache", decision is not None, started)
+    if decision is not None:
+        func_name, params = decision
+        log(f"  [AI (cached) chose: {func_name}({params})]")
+        return execute_ai_function(func_name, params)
+
+    started = time.perf_counter()
+    index = get_semantic_index()
+    match = index.lookup(user_input) if index is not None else None
+    if match is not None and not registry.guessable(match[0], match[1]):
+        log(f"  [Closest match {match[0]}({match[1]}); leaving it to the model]")
+        match = None
+    if index is not None:
+        record_tier("semantic", match is not None, started)
+    if match is not None:
+        intent, args, score = match
+        log(f"  [Closest match: {intent}({args}), similarity {score:.2f}]")
+        return run_intent(intent, args)
+
+    started = time.perf_counter()
+    guess = classify(user_input)
+    if guess is not None and not registry.guessable(guess[0], guess[1]):
+        log(f"  [Classifier suggested {guess[0]}({guess[1]}); leaving it to the model]")
+        guess = None
+    if intent_classifier is not None:
+        record_tier("classifier", guess is not None, started)
+    if guess is not None:
+        intent, args, confidence = guess
+        log(f"  [Classifier chose: {intent}({args}), confidence {confidence:.2f}]")
+        return run_intent(intent, args)
+
+    started = time.perf_counter()
+    decision = ai_decide(user_input)
+    record_tier("model", decision is not None, started)
+    cancel = responses.cancel_event()
+    if cancel is not None and cancel.is_set():
+        return False  # the user gave up on this command: don't act on a late answer
+    if decision is None:
+        log(f"  [AI] Sorry, I couldn't understand that. Try being more specific.")
+        return False
+    func_name, params = decision
+    log(f"  [AI chose: {func_name}({params})]")
+    ok = execute_ai_function(func_name, params)
+    if ok:
+        ai_decisions.put(user_input, func_name, params)
+        if index is not None:
+            index.add(user_input, func_name, registry.bind_tool(func_name, params))
+    return ok
+
+def extract_params(params_str):
+    params = {}
+    try:
+        cleaned = params_str.replace("<escape>", '"')
+        params = json.loads(cleaned)
+        return params
+    except:
+        pass
+    for m in re.finditer(r'(\w+):\s*<escape>(.+?)<escape>', params_str):
+        params[m.group(1)] = m.group(2)
+    for m in re.finditer(r'"(\w+)":\s*(\d+)', params_str):
+        params[m.group(1)] = int(m.group(2))
+    for m in re.finditer(r'"(\w+)":\s*(true|false)', params_str, re.IGNORECASE):
+        params[m.group(1)] = m.group(2).lower() == "true"
+    for m in re.finditer(r'(\w+):\s*(\d+)', params_str):
+        if m.group(1) not in params:
+            params[m.group(1)] = int(m.group(2))
+    return params
+
+def execute_ai_function(func_name, params):
+    args = registry.bind_tool(func_name, params)
+    if args is None:
+        log(f"  [AI call {func_name}({params}) doesn't fit its parameters]")
+        return False
+    return run_intent(func_name, args)
+
+def run_intent(name, args):
+    """registry.execute(), with an exception from the handler logged as an error: the command fails, the caller goes on."""
+    try:
+        return registry.execute(name, args)
+    except Exception as e:
+        log(f"  ❌ Error running {name}: {e}", "error", name)
+        return False
+
+# ═══════════════════════════════════════════════════════
+#  PUBLIC API for UI
+# ═══════════════════════════════════════════════════════
+
+async def handle_command(user_input, channel=None):
+    """Process a user command on the engine loop (see aio.py). Returns its responses.Channel.
+
+    Handlers that shell out await their subprocess instead of blocking, and
+    blocking work (PowerShell calls, the model) runs on aio's bounded pool, so
+    commands can run concurrently on one loop. Each gets its own channel (pass
+    one with a listener to see events as they are logged).
+    """
+    channel = channel or responses.Channel()
+    with responses.opened(channel):
+        await _run_command(user_input)
+    return channel
+
+async def _run_command(user_input):
+    started = time.perf_counter()
+    compound = plan_for(user_input)
+    resolved = route(user_input) if compound is None else None
+    record_tier("router", compound is not None or resolved is not None, started)
+    try:
+        if compound is not None:
+            await compound.run(registry.execute_async)
+            report_plan(compound)
+        elif resolved is not None:
+            await registry.execute_async(*resolved)
+        else:
+            log("  [Thinking...]")
+            await aio.to_thread(ai_fallback, user_input)
+    except Exception as e:
+        log(f"  ❌ Error: {e}", "error")
+
+async def handle_intent(name, args, channel=None):
+    """Run an already resolved intent (a quick action) like handle_command, without parsing any text."""
+    channel = channel or responses.Channel()
+    with responses.opened(channel):
+        try:
+            await registry.execute_async(name, args)
+        except Exception as e:
+            log(f"  ❌ Error: {e}", "error", name)
+    return channel
+
+async def process_command_async(user_input):
+    """Process a user command. Returns a list of response strings."""
+    return (await handle_command(user_input)).messages()
+
+def process_command(user_input):
+    """Process a user command. Returns a list of response strings."""
+    return aio.run_sync(process_command_async(user_input))
+
+
+# ═══════════════════════════════════════════════════════
+#  CLI MODE
+# ═══════════════════════════════════════════════════════
+
+startup_profile["import main"] = time.perf_counter() - _IMPORT_STARTED
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Laptop control assistant (CLI)")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="load the AI model in the background right away instead of on first use")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long importing and loading took, per phase")
+    parser.add_argument("--precision", choices=quantize.PRECISIONS, default=PRECISION,
+                        help="inference precision for the AI model (default: %(default)s)")
+    cli_args = parser.parse_args()
+    PROFILE_STARTUP = cli_args.startup_profile
+    PRECISION = cli_args.precision
+    os.environ["LAPTOP_ASSISTANT_PRECISION"] = PRECISION  # for a model server this starts
+    if cli_args.warm_up:
+        warm_up_model()
+
+    print("=" * 55)
+    print("    LAPTOP CONTROL ASSISTANT (AI-Powered)")
+    print("=" * 55)
+    print()
+    print('Type "exit" to quit.')
+    print("-" * 55)
+    if PROFILE_STARTUP:
+        print_startup_profile()
+
+    while True:
+        user_input = input("\n You > ").strip()
+        if not user_input:
+            continue
+        if user_input.lower() in ("exit", "quit", "bye"):
+            stats = ai_decisions.stats
+            if stats["hits"] or stats["misses"]:
+                print(f" AI cache: {stats['hits']} hits, {stats['misses']} misses, {len(ai_decisions)} entries")
+            if decode_stats["calls"]:
+                calls = decode_stats["calls"]
+                print(f" AI model: {calls} calls, {decode_stats['tokens'] / calls:.1f} tokens "
+                      f"and {decode_stats['seconds'] / calls * 1000:.0f} ms per call ({DECODING} decoding)")
+            if any(stats["hits"] + stats["misses"] for tier, stats in tier_stats.items() if tier != "router"):
+                print_tier_stats()
+            lifecycle_stats = model_lifecycle.metrics()
+            if lifecycle_stats["loads"]:
+                first_call = lifecycle_stats["first_call_seconds"]
+                print(f" AI model: loaded {lifecycle_stats['loads']}x (last load {lifecycle_stats['load_seconds']:.1f} s"
+                      + (f", first call {first_call * 1000:.0f} ms" if first_call is not None else "")
+                      + f"), peak memory {lifecycle_stats['peak_rss'] / 2**20:.0f} MB")
+            print("\n Goodbye!")
+            break
+        aio.run_sync(handle_command(user_input, responses.Channel(listener=responses.Printer())))
@@ -0,0 +1,350 @@
+"""
+Out-of-process model server.
+
+The model lives in its own worker process, loaded once and shared by every
+front end (CLI, GUI, scripts). Front ends talk to it through ModelClient over
+a local pipe (Windows named pipe, Unix domain socket elsewhere) using
+multiprocessing.connection, authenticated with a per-user key. A supervisor
+process restarts the worker if it dies; ModelClient starts the supervisor on
+first use if no server is running. Only one worker per state dir runs: it
+holds model_server.lock, so when two front ends start a server at once the
+second worker exits and its supervisor with it.
+
+Requests are dicts {"op": ..., ...}; replies are {"ok": True, "result": ...}
+or {"ok": False, "error": "..."}. Ops: ping, load, decide, stats, shutdown.
+A request with "stream": True runs with a responses.Channel current on the
+server, and everything logged to it (the model's tokens, as generated) is
+sent ahead of the reply as {"event": [message, severity]}. Meanwhile the
+client may send {"op": "cancel"}, which cancels that channel (generate()
+stops); the reply still follows.
+
+    python model_server.py                # supervisor + worker (what clients start)
+    python model_server.py --worker       # worker only, no restarts
+"""
+import argparse
+import hashlib
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import responses
+
+CONNECT_TIMEOUT = 20.0
+CANCEL_POLL = 0.05  # how often a streamed request checks for cancellation (seconds)
+RESTART_BACKOFF_MAX = 30.0
+
+
+def default_state_dir():
+    return os.environ.get("LAPTOP_ASSISTANT_HOME") or os.path.join(os.path.expanduser("~"), ".laptop_assistant")
+
+
+def default_address(state_dir):
+    """The server's address for `state_dir`: one server (and key, and lock) per state dir."""
+    if sys.platform == "win32":
+        # Pipe names are global, not files in the state dir: name the pipe after it
+        digest = hashlib.sha256(os.path.abspath(state_dir).encode("utf-8")).hexdigest()[:16]
+        return r"\\.\pipe\laptop_assistant_model_" + digest
+    return os.path.join(state_dir, "model.sock")
+
+
+def load_authkey(state_dir):
+    """The per-user key clients and server share; created (owner-only) on first use."""
+    path = os.path.join(state_dir, "model_server.key")
+    try:
+        with open(path, "rb") as f:
+            key = f.read()
+        if key:
+            return key
+    except OSError:
+        pass
+    os.makedirs(state_dir, exist_ok=True)
+    key = secrets.token_bytes(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def acquire_server_lock(state_dir):
+    """Lock model_server.lock for this process's lifetime: the open lock file, or None if another server holds it.
+
+    The OS releases the lock when the process dies, however it dies.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    f = open(os.path.join(state_dir, "model_server.lock"), "a+b")
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+class ServerError(RuntimeError):
+    """The server ran the request and it failed (the message is the server-side error)."""
+
+
+# ═══════════════════════════════════════════════════════
+#  SERVER
+# ═══════════════════════════════════════════════════════
+
+def serve(address, authkey, handlers, ready=None):
+    """Accept clients forever, one thread per connection. `handlers` maps op -> fn(**request).
+
+    The caller holds the server lock (acquire_server_lock), so a socket left at
+    `address` belongs to a worker that died and is replaced.
+    """
+    if sys.platform != "win32" and os.path.exists(address):
+        os.unlink(address)  # stale socket from a worker that crashed
+    listener = Listener(address, authkey=authkey)
+    if ready is not None:
+        ready.set()
+    while True:
+        try:
+            conn = listener.accept()
+        except OSError:
+            continue  # failed handshake (wrong key) or a client that went away
+        threading.Thread(target=_handle, args=(conn, handlers), daemon=True).start()
+
+
+def _handle(conn, handlers):
+    with conn:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            op = request.pop("op", None)
+            if op == "cancel":
+                continue  # arrived after the request it was for had finished
+            stream = request.pop("stream", False)
+            fn = handlers.get(op)
+            try:
+                if fn is None:
+                    raise ValueError(f"unknown op {op!r}")
+                reply = {"ok": True, "result": _run_streaming(conn, fn, request) if stream else fn(**request)}
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                return
+            if op == "shutdown":
+                os._exit(0)
+
+
+def _run_streaming(conn, fn, request):
+    """fn(**request) with a Channel current, sending each event it emits to the client as it comes.
+
+    A {"op": "cancel"} from the client (or the client going away) cancels the channel.
+    """
+    events = queue.Queue()
+    channel = responses.Channel(events.put)
+    outcome = {}
+
+    def run():
+        try:
+            with responses.opened(channel):
+                outcome["result"] = fn(**request)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            events.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+    connected = True
+    while True:
+        try:
+            event = events.get(timeout=CANCEL_POLL)
+        except queue.Empty:
+            event = False
+        if event is None:
+            break
+        try:
+            if event:
+                conn.send({"event": [event.message, event.severity]})
+            if connected and conn.poll() and conn.recv().get("op") == "cancel":
+                channel.cancel()
+        except (EOFError, OSError):
+            connected = False  # the client went away: nobody wants the answer
+            channel.cancel()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def engine_handlers():
+    """Ops backed by main.py, running the model in this process."""
+    os.environ["LAPTOP_ASSISTANT_MODEL"] = "local"
+    import main as engine
+
+    def load():
+        engine.load_model()
+        return {"precision": engine.model_precision}
+
+    return {
+        "ping": lambda: {"pid": os.getpid(), "loaded": engine.processor is not None},
+        "load": load,
+        "decide": lambda text: engine.ai_decide(text),
+        "stats": lambda: {"decode": dict(engine.decode_stats),
+                          "batches": dict(engine.get_decide_batcher().stats),
+                          "lifecycle": engine.model_lifecycle.metrics()},
+        "shutdown": lambda: None,
+    }
+
+
+def run_worker(state_dir):
+    lock = acquire_server_lock(state_dir)
+    if lock is None:
+        print("model server already running; exiting", file=sys.stderr, flush=True)
+        return  # exit code 0: the supervisor stops too
+    handlers = engine_handlers()
+    # Load in the background so pings are answered while the weights come in
+    threading.Thread(target=handlers["load"], daemon=True).start()
+    serve(default_address(state_dir), load_authkey(state_dir), handlers)
+
+
+def supervise(command, backoff_min=1.0, backoff_max=RESTART_BACKOFF_MAX):
+    """Run `command` until it exits cleanly (code 0), restarting it with backoff when it crashes."""
+    backoff = backoff_min
+    while True:
+        started = time.monotonic()
+        code = subprocess.call(command)
+        if code == 0:
+            return
+        if time.monotonic() - started > 60:
+            backoff = backoff_min  # it ran for a while: not a crash loop
+        print(f"model worker exited with {code}; restarting in {backoff:.1f} s", file=sys.stderr, flush=True)
+        time.sleep(backoff)
+        backoff = min(backoff * 2, backoff_max)
+
+
+# ═══════════════════════════════════════════════════════
+#  CLIENT
+# ═══════════════════════════════════════════════════════
+
+def start_server(state_dir):
+    """Launch the supervisor detached from this process, logging to model_server.log."""
+    os.makedirs(state_dir, exist_ok=True)
+    log = open(os.path.join(state_dir, "model_server.log"), "ab")
+    env = dict(os.environ, LAPTOP_ASSISTANT_HOME=state_dir)
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = (subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                                   | getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    else:
+        kwargs["start_new_session"] = True
+    script = os.path.abspath(__file__)
+    subprocess.Popen([sys.executable, script], cwd=os.path.dirname(script), env=env,
+                     stdin=subprocess.DEVNULL, stdout=log, stderr=log, **kwargs)
+    log.close()
+
+
+class ModelClient:
+    """Thread-safe client. Each call borrows a pooled connection, so concurrent
+    callers reach the server together (and are batched there)."""
+
+    def __init__(self, state_dir=None, address=None, authkey=None, autostart=True,
+                 connect_timeout=CONNECT_TIMEOUT):
+        self.state_dir = state_dir or default_state_dir()
+        self.address = address or default_address(self.state_dir)
+        self.authkey = authkey or load_authkey(self.state_dir)
+        self.autostart = autostart
+        self.connect_timeout = connect_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    def _connect(self):
+        try:
+            return Client(self.address, authkey=self.authkey)
+        except OSError:
+            if not self.autostart:
+                raise
+        with self._start_lock:
+            try:
+                return Client(self.address, authkey=self.authkey)  # another thread started it
+            except OSError:
+                start_server(self.state_dir)
+            deadline = time.monotonic() + self.connect_timeout
+            while True:
+                try:
+                    return Client(self.address, authkey=self.authkey)
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.1)
+
+    def call(self, op, on_event=None, cancel=None, **params):
+        """Send one request and return its result. Reconnects (and restarts the server) once.
+
+        With `on_event` or `cancel`, the request is streamed: on_event(message,
+        severity) is called with each event the server logs while running it,
+        and setting `cancel` (a threading.Event) cancels it on the server.
+        """
+        stream = on_event is not None or cancel is not None
+        for attempt in (1, 2):
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            streamed = cancelling = False
+            try:
+                if conn is None:
+                    conn = self._connect()
+                conn.send(dict(params, op=op, stream=True) if stream else dict(params, op=op))
+                while True:
+                    if cancel is not None and not cancelling:
+                        if cancel.is_set():
+                            conn.send({"op": "cancel"})
+                            cancelling = True
+                        elif not conn.poll(CANCEL_POLL):
+                            continue
+                    reply = conn.recv()
+                    if "event" not in reply:
+                        break
+                    streamed = True
+                    if on_event is not None:
+                        on_event(*reply["event"])
+            except (EOFError, OSError):
+                if conn is not None:
+                    conn.close()
+                if attempt == 2 or op == "shutdown" or streamed:  # don't stream the same events twice
+                    raise
+                continue
+            with self._lock:
+                self._idle.append(conn)
+            if not reply["ok"]:
+                raise ServerError(reply["error"])
+            return reply["result"]
+
+    def decide(self, text, on_event=None, cancel=None):
+        decision = self.call("decide", on_event=on_event, cancel=cancel, text=text)
+        return None if decision is None else tuple(decision)
+
+    def close(self):
+        with self._lock:
+            conns, self._idle = self._idle, []
+        for conn in conns:
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Laptop assistant model server")
+    parser.add_argument("--worker", action="store_true", help="run the worker directly, without restarts")
+    parser.add_argument("--state-dir", default=default_state_dir())
+    args = parser.parse_args()
+    os.environ["LAPTOP_ASSISTANT_HOME"] = args.state_dir
+    if args.worker:
+        run_worker(args.state_dir)
+    else:
+        supervise([sys.executable, os.path.abspath(__file__), "--worker", "--state-dir", args.state_dir])
@@ -0,0 +1,131 @@
+"""
+Compound commands: "mute, dim the screen and lock my laptop".
+
+The utterance is split on conjunctions and sequencing words, and if every
+piece resolves to an intent on its own, the pieces become a plan. A plan is a
+list of stages run one after another; the actions within a stage run at the
+same time. A new stage starts
+
+  - after "then" / "after that" / "and then" (the speaker asked for an order)
+  - when an action has the same target as one in the stage: the same intent
+    with the same text arguments ("volume up and volume down", "turn wifi on
+    then off" keep their order; "turn on wifi and bluetooth" doesn't need to)
+
+and intents marked `final` (lock, shutdown, sleep...) each get a stage of
+their own, so everything said before one has finished when it runs and
+everything said after it ("shutdown and cancel shutdown") runs after it.
+
+A piece that doesn't resolve on its own borrows the verb of the last one that
+did: in "turn on wifi and bluetooth", "bluetooth" is tried as "turn on
+bluetooth". A command whose free-text argument takes in the conjunction
+("search for salt and pepper", "create folder foo and bar") is left whole.
+"""
+import asyncio
+import re
+import time
+
+_SEPARATOR = re.compile(r"\s*(,\s*and then\b|,\s*then\b|\band then\b|\bafter that\b|\bthen\b"
+                        r"|,\s*and\b|,|;|&|\band\b|\balso\b|\bplus\b)\s*")
+_SEQUENTIAL = re.compile(r"then|after that")
+
+
+def split(text):
+    """[(piece, after_previous)] for the parts of `text`; after_previous is True after "then"."""
+    parts = _SEPARATOR.split(text.strip())
+    pieces, after = [], False
+    for i, part in enumerate(parts):
+        if i % 2:
+            after = after or bool(_SEQUENTIAL.search(part))
+        elif part.strip():
+            pieces.append((part.strip(), after))
+            after = False
+    return pieces
+
+
+class Action:
+    """One step of a plan, and once run, its outcome."""
+    __slots__ = ("text", "intent", "args", "ok", "error", "seconds")
+
+    def __init__(self, text, intent, args):
+        self.text = text
+        self.intent = intent
+        self.args = args
+        self.ok = None
+        self.error = None
+        self.seconds = None
+
+    def __repr__(self):
+        return f"Action({self.intent!r}, {self.args!r})"
+
+
+def _target(action):
+    """What an action changes: its intent and its text arguments (numbers and on/off are settings of it)."""
+    text_args = {k: v for k, v in action.args.items()
+                 if isinstance(v, str) and not v.strip().lstrip("-").isdigit()}
+    return action.intent, sorted(text_args.items())
+
+
+class Plan:
+    """Stages of Actions: stages run in order, the actions in a stage concurrently."""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.seconds = None
+
+    @classmethod
+    def build(cls, text, resolve, final=()):
+        """The plan for `text`, or None unless it has several pieces and `resolve` maps each to (intent, args)."""
+        pieces = split(text)
+        if len(pieces) < 2:
+            return None
+        whole = resolve(text)
+        if whole is not None and any(isinstance(v, str) and len(split(v)) > 1 for v in whole[1].values()):
+            return None
+        stages, verb = [[]], None
+        for piece, after_previous in pieces:
+            resolved = resolve(piece)
+            if resolved is not None:
+                words = piece.split()
+                verb = " ".join(words[:-1]) or None
+            elif verb is not None:
+                piece = f"{verb} {piece}"
+                resolved = resolve(piece)
+            if resolved is None:
+                return None
+            action = Action(piece, *resolved)
+            if action.intent in final:
+                stages += [[action], []]
+                continue
+            if after_previous and stages[-1] or any(_target(a) == _target(action) for a in stages[-1]):
+                stages.append([])
+            stages[-1].append(action)
+        return cls([s for s in stages if s])
+
+    @property
+    def actions(self):
+        return [a for stage in self.stages for a in stage]
+
+    @property
+    def serial_seconds(self):
+        """How long the actions took added up: the wall time of running them one by one."""
+        return sum(a.seconds or 0.0 for a in self.actions)
+
+    async def run(self, execute):
+        """Run every action with `await execute(intent, args)` (True/False); returns True if all succeeded.
+
+        A failing action doesn't stop the rest; its exception is kept on it.
+        """
+        started = time.perf_counter()
+        for stage in self.stages:
+            await asyncio.gather(*(self._run_one(a, execute) for a in stage))
+        self.seconds = time.perf_counter() - started
+        return all(a.ok for a in self.actions)
+
+    @staticmethod
+    async def _run_one(action, execute):
+        started = time.perf_counter()
+        try:
+            action.ok = await execute(action.intent, action.args)
+        except Exception as e:
+            action.ok, action.error = False, e
+        action.seconds = time.perf_counter() - started
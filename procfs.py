@@ -0,0 +1,177 @@
+"""
+Native Linux telemetry backend: /proc, /sys and statvfs, no subprocess.
+
+ProcBackend.collect() returns the same metrics as the Windows CIM query (see
+telemetry.py) by reading:
+
+  /proc/stat                   CPU time counters and the boot time (btime)
+  /proc/meminfo                MemTotal and MemAvailable
+  /sys/class/power_supply/*    batteries (capacity, status)
+  /proc/self/mounts + statvfs  space on each mounted block device
+  /etc/os-release, /proc/cpuinfo, uname
+                               OS and CPU details (read once)
+
+CPU load is a delta: the share of non-idle time between this collect and the
+previous one, as LoadPercentage is on Windows. The first collect has no
+previous sample and reports the average since boot.
+
+Files are read with os.read and only the fields needed are picked out of the
+bytes, so a collect costs tens of microseconds; `root` lets tests point it at
+a fake tree.
+"""
+import os
+
+import telemetry
+
+# /proc/stat cpu columns that count as idle: idle, iowait
+_IDLE_COLUMNS = (3, 4)
+
+
+class ProcBackend:
+    """telemetry backend for Linux. Not thread-safe: the Sampler calls collect() one at a time."""
+
+    def __init__(self, root="/", statvfs=os.statvfs):
+        self.root = root
+        self.statvfs = statvfs
+        self._cpu = None        # (busy, total) jiffies at the previous collect
+        self._system = None
+
+    def collect(self):
+        values = {}
+        for read in (self._read_stat, self._read_meminfo, self._read_battery, self._read_disks, self._read_system):
+            try:
+                values.update(read())
+            except (OSError, ValueError, IndexError, TypeError):
+                pass  # that metric keeps its previous sample
+        return values
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def _read(self, *parts):
+        """The file's bytes (procfs files report size 0, so read until EOF)."""
+        fd = os.open(self._path(*parts), os.O_RDONLY)
+        try:
+            chunks = []
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
+
+    # ─── Metrics ───
+    def _read_stat(self):
+        data = self._read("proc", "stat")
+        values = {}
+        if data.startswith(b"cpu "):
+            # user nice system idle iowait irq softirq steal [guest guest_nice: already in user/nice]
+            ticks = [int(x) for x in data[:data.index(b"\n")].split()[1:9]]
+            total = sum(ticks)
+            busy = total - sum(ticks[i] for i in _IDLE_COLUMNS if i < len(ticks))
+            previous, self._cpu = self._cpu, (busy, total)
+            if previous is not None and total > previous[1]:
+                busy, total = busy - previous[0], total - previous[1]
+            values["cpu_percent"] = busy / total * 100 if total else 0.0
+        btime = _field(data, b"\nbtime ")
+        if btime is not None:
+            values["boot_time"] = float(btime)
+        return values
+
+    def _read_meminfo(self):
+        data = self._read("proc", "meminfo")
+        total = _field(data, b"MemTotal:")
+        free = _field(data, b"MemAvailable:") or _field(data, b"MemFree:")  # available counts reclaimable cache
+        return {"memory": telemetry.Memory(int(total) * 1024, int(free) * 1024)}
+
+    def _read_battery(self):
+        supplies = self._path("sys", "class", "power_supply")
+        try:
+            names = sorted(os.listdir(supplies))
+        except FileNotFoundError:
+            return {"battery": None}  # no power supply class: a desktop or a container
+        levels, discharging = [], False
+        for name in names:
+            try:
+                if self._read("sys", "class", "power_supply", name, "type").strip() != b"Battery":
+                    continue
+                if self._read_optional("sys", "class", "power_supply", name, "present") == "0":
+                    continue
+                levels.append(int(self._read("sys", "class", "power_supply", name, "capacity")))
+            except (OSError, ValueError):
+                continue
+            status = self._read_optional("sys", "class", "power_supply", name, "status")
+            discharging = discharging or status == "Discharging"
+        if not levels:
+            return {"battery": None}
+        return {"battery": telemetry.Battery(round(sum(levels) / len(levels)), discharging)}
+
+    def _read_disks(self):
+        disks, seen = [], set()
+        for line in self._read("proc", "self", "mounts").split(b"\n"):
+            if not line.startswith(b"/dev/"):
+                continue
+            fields = line.split()
+            if len(fields) < 2 or fields[0] in seen:
+                continue
+            mount_point = fields[1].decode("utf-8", "replace").replace("\\040", " ")
+            try:
+                st = self.statvfs(mount_point)
+            except OSError:
+                continue
+            if not st.f_blocks:
+                continue
+            seen.add(fields[0])
+            disks.append(telemetry.Disk(mount_point, (st.f_blocks - st.f_bfree) * st.f_frsize,
+                                        st.f_bavail * st.f_frsize))
+        return {"disks": disks}
+
+    def _read_system(self):
+        if self._system is None:
+            release = dict(_os_release_fields(self._read_optional("etc", "os-release")))
+            cpu_name = None
+            for line in (self._read_optional("proc", "cpuinfo") or "").splitlines():
+                name, _, value = line.partition(":")
+                if name.strip() in ("model name", "Model", "Hardware"):
+                    cpu_name = value.strip()
+                    break
+            uname = os.uname()
+            self._system = telemetry.SystemInfo(
+                release.get("PRETTY_NAME") or uname.sysname, uname.release, uname.machine, uname.nodename,
+                os.environ.get("USER") or os.environ.get("LOGNAME") or _login_name(), cpu_name)
+        return {"system": self._system}
+
+    def _read_optional(self, *parts):
+        """The file's stripped contents, or None if it can't be read."""
+        try:
+            return self._read(*parts).decode("utf-8", "replace").strip()
+        except OSError:
+            return None
+
+
+def _field(data, label):
+    """The first word after `label` in `data` (bytes), or None if it isn't there."""
+    start = data.find(label)
+    if start < 0:
+        return None
+    start += len(label)
+    end = data.find(b"\n", start)
+    words = data[start:end if end >= 0 else None].split()
+    return words[0] if words else None
+
+
+def _login_name():
+    try:
+        import pwd
+        return pwd.getpwuid(os.getuid()).pw_name
+    except (ImportError, KeyError):
+        return None
+
+
+def _os_release_fields(text):
+    for line in (text or "").splitlines():
+        name, sep, value = line.partition("=")
+        if sep:
+            yield name.strip(), value.strip().strip('"\'')
+
@@ -0,0 +1,147 @@
+"""
+Reusable KV cache for the fixed part of the prompt.
+
+Every AI fallback renders the same developer message and tool schema ahead of
+the user's words, and for short commands that shared prefix is most of the
+prompt. PromptCache prefills it once, right after the model loads, and gives
+each generate() call a copy of its past_key_values, so only the user's tokens
+and the generation prompt are encoded per request. When tools are retrieved per
+request the tool list varies, so a prefix is kept for each recent tool list.
+"""
+import copy
+from collections import OrderedDict
+
+
+class PromptCache:
+    """Chat-template encoding plus prefilled caches of the part every prompt shares.
+
+    The tool schema is part of that shared part, so there is one prefix per
+    tool list: the default list is prefilled by build(), any other (e.g. a
+    per-request tool selection) on its first single-prompt generate(). The
+    `max_prefixes` most recently used are kept.
+    """
+
+    def __init__(self, processor, model, system_prompt, tools, max_prefixes=8):
+        self.processor = processor
+        self.model = model
+        self.system_prompt = system_prompt
+        self.tools = tools
+        self.max_prefixes = max_prefixes
+        # tool names -> (1-D tensor of the shared prefix tokens, past_key_values),
+        # or (None, None) if that tool list has no usable prefix
+        self._prefixes = OrderedDict()
+        self.stats = {"reused": 0, "full": 0}
+
+    @staticmethod
+    def _key(tools):
+        return tuple(t["function"]["name"] for t in tools)
+
+    def messages(self, user_input):
+        return [
+            {"role": "developer", "content": self.system_prompt},
+            {"role": "user", "content": user_input},
+        ]
+
+    def encode(self, user_input, tools=None):
+        """Tokenized prompt for one utterance (the same call ai_fallback always made)."""
+        return self.processor.apply_chat_template(
+            self.messages(user_input), tools=self.tools if tools is None else tools,
+            add_generation_prompt=True, return_tensors="pt"
+        )
+
+    def encode_batch(self, user_inputs, pad_token_id, tools=None):
+        """Prompts for several utterances, left-padded to one width (one row each).
+
+        `tools` is None (the default tool list for every row) or one tool list per utterance.
+        """
+        tools = tools or [None] * len(user_inputs)
+        if len(user_inputs) == 1:
+            return self.encode(user_inputs[0], tools[0])
+        import torch
+        from transformers import BatchEncoding
+        rows = [self.encode(text, t)["input_ids"][0] for text, t in zip(user_inputs, tools)]
+        width = max(len(r) for r in rows)
+        input_ids = torch.full((len(rows), width), pad_token_id, dtype=rows[0].dtype)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for i, r in enumerate(rows):
+            input_ids[i, width - len(r):] = r
+            attention_mask[i, width - len(r):] = 1
+        return BatchEncoding({"input_ids": input_ids, "attention_mask": attention_mask})
+
+    def build(self, tools=None):
+        """Prefill the shared prefix for `tools` (default: the default tool list) and return self.
+
+        If this raises or finds no shared prefix, generate() simply prefills
+        whole prompts as before.
+        """
+        import torch
+        from transformers import DynamicCache
+
+        tools = self.tools if tools is None else tools
+        key = self._key(tools)
+        self._remember(key, (None, None))  # don't retry a tool list that fails
+        # The prefix is whatever two unrelated utterances have in common once
+        # tokenized, so template and tokenizer quirks at the boundary can't leak in.
+        a = self.encode("a", tools)["input_ids"][0]
+        b = self.encode("zq xv", tools)["input_ids"][0].tolist()
+        n = 0
+        for x, y in zip(a.tolist(), b):
+            if x != y:
+                break
+            n += 1
+        if n == 0:
+            return self
+
+        cache = DynamicCache()
+        with torch.no_grad():
+            self.model(input_ids=a[:n].unsqueeze(0).to(self.model.device), past_key_values=cache, use_cache=True)
+        self._remember(key, (a[:n].to(self.model.device), cache))
+        return self
+
+    def _remember(self, key, prefix):
+        self._prefixes[key] = prefix
+        self._prefixes.move_to_end(key)
+        while len(self._prefixes) > self.max_prefixes:
+            self._prefixes.popitem(last=False)
+
+    @property
+    def prefix_length(self):
+        """Length of the default tool list's prefix (0 if there is none)."""
+        prefix_ids, _ = self._prefixes.get(self._key(self.tools), (None, None))
+        return 0 if prefix_ids is None else len(prefix_ids)
+
+    def _prefix_for(self, input_ids, tools):
+        """The cached (prefix_ids, past_key_values) a single prompt starts with, else None.
+
+        Left-padded batches put the prefix at different positions per row, so
+        they are always prefilled in full.
+        """
+        if input_ids.shape[0] != 1:
+            return None
+        key = self._key(self.tools if tools is None else tools)
+        if key not in self._prefixes:
+            try:
+                self.build(tools)
+            except Exception:
+                pass  # stays (None, None): full prefill
+        prefix_ids, past_key_values = self._prefixes[key]
+        self._prefixes.move_to_end(key)
+        n = 0 if prefix_ids is None else len(prefix_ids)
+        if n > 0 and input_ids.shape[1] > n and bool((input_ids[0, :n] == prefix_ids).all()):
+            return prefix_ids, past_key_values
+        return None
+
+    def covers(self, input_ids, tools=None):
+        """True if a single prompt starts with the cached prefix for `tools` (and has tokens after it)."""
+        return self._prefix_for(input_ids, tools) is not None
+
+    def generate(self, inputs, tools=None, **kwargs):
+        """model.generate() on `inputs` (encoded with `tools`), starting from a copy of the prefix cache when it applies."""
+        prefix = self._prefix_for(inputs["input_ids"], tools)
+        if prefix is not None:
+            # generate() only prefills the positions the cache doesn't hold yet
+            kwargs["past_key_values"] = copy.deepcopy(prefix[1])
+            self.stats["reused"] += 1
+        else:
+            self.stats["full"] += 1
+        return self.model.generate(**inputs, **kwargs)
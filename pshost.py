@@ -0,0 +1,310 @@
+"""
+Persistent PowerShell host pool.
+
+Starting powershell.exe costs 300 ms to 1 s, so instead of one process per
+action we keep a few long-lived hosts around and feed them scripts over stdin.
+
+Protocol (one request at a time per host):
+  -> one line: base64(UTF-8 script)
+  <- the script's output (all streams merged), line by line as it is
+     produced, then a line "<sentinel> <status>"
+The sentinel is random per host and handed over in $env:PSHOST_SENTINEL, so
+script output can never fake the end of a result.
+"""
+import base64
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+# ─── Read-eval loop run inside each powershell.exe ───
+HOST_LOOP_PS = r'''
+$ErrorActionPreference = 'Continue'
+$ProgressPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+$sentinel = $env:PSHOST_SENTINEL
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    $script = [System.Text.Encoding]::UTF8.GetString([System.Convert]::FromBase64String($line))
+    $status = 0
+    try {
+        & ([ScriptBlock]::Create($script)) *>&1 | Out-String -Stream -Width 4096 | ForEach-Object {
+            [Console]::Out.WriteLine($_)
+            [Console]::Out.Flush()
+        }
+    } catch {
+        [Console]::Out.Write(($_ | Out-String))
+        $status = 1
+    }
+    [Console]::Out.WriteLine()
+    [Console]::Out.WriteLine("$sentinel $status")
+    [Console]::Out.Flush()
+}
+'''
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_USES = 500
+CANCEL_POLL = 0.05  # how often a running script checks whether it was cancelled
+
+
+class HostCrashed(RuntimeError):
+    """The host process died while running a script. `output` holds what it printed."""
+    def __init__(self, msg, output=""):
+        super().__init__(msg)
+        self.output = output
+
+
+class Cancelled(RuntimeError):
+    """The script was cancelled while running (the host is killed). `output` holds what it printed."""
+    def __init__(self, msg, output=""):
+        super().__init__(msg)
+        self.output = output
+
+
+def default_host_command():
+    """Command line for a real PowerShell host, or the override in LAPTOP_ASSISTANT_PS_HOST."""
+    override = os.environ.get("LAPTOP_ASSISTANT_PS_HOST")
+    if override:
+        return shlex.split(override, posix=(os.name != "nt"))
+    encoded = base64.b64encode(HOST_LOOP_PS.encode("utf-16-le")).decode("ascii")
+    return ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive",
+            "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded]
+
+
+# ═══════════════════════════════════════════════════════
+#  SINGLE HOST
+# ═══════════════════════════════════════════════════════
+
+class PowerShellHost:
+    """One long-lived host process plus a reader thread draining its stdout."""
+
+    def __init__(self, command):
+        self.sentinel = f"<<<PSHOST-{uuid.uuid4().hex}>>>"
+        self.uses = 0
+        env = dict(os.environ, PSHOST_SENTINEL=self.sentinel)
+        flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        self.proc = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            env=env, creationflags=flags, bufsize=0,
+        )
+        self._lines = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        for raw in iter(self.proc.stdout.readline, b""):
+            self._lines.put(raw.decode("utf-8", errors="replace"))
+        self._lines.put(None)
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def run(self, script, timeout, on_line=None, cancel=None):
+        """Run one script and return (output, status). status 0 = ok, 1 = script threw.
+
+        `cancel` (a threading.Event) is checked while waiting; once set, Cancelled is raised.
+        """
+        payload = base64.b64encode(script.encode("utf-8")) + b"\n"
+        try:
+            self.proc.stdin.write(payload)
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise HostCrashed(f"PowerShell host is gone: {e}")
+        self.uses += 1
+
+        out = []
+        blank = 0  # blank lines not yet passed to on_line: the last one may be the separator
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            wait = remaining if cancel is None else CANCEL_POLL if remaining is None else min(CANCEL_POLL, remaining)
+            try:
+                line = self._lines.get(timeout=wait)
+            except queue.Empty:
+                if cancel is not None and cancel.is_set():
+                    raise Cancelled("script cancelled", "".join(out))
+                if remaining is None or wait < remaining:
+                    continue
+                raise subprocess.TimeoutExpired("powershell", timeout, output="".join(out))
+            if line is None:
+                raise HostCrashed("PowerShell host exited mid-script", "".join(out))
+            if line.startswith(self.sentinel):
+                status = line[len(self.sentinel):].strip()
+                if out and out[-1] in ("\n", "\r\n"):
+                    out.pop()  # the separator newline the host writes before the sentinel
+                    blank -= 1
+                for _ in range(blank if on_line else 0):
+                    on_line("")
+                return "".join(out), (0 if status == "0" else 1)
+            out.append(line)
+            if line in ("\n", "\r\n"):
+                blank += 1
+                continue
+            if on_line:
+                for _ in range(blank):
+                    on_line("")
+                on_line(line.rstrip("\r\n"))
+            blank = 0
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+    def kill(self):
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+# ═══════════════════════════════════════════════════════
+#  POOL
+# ═══════════════════════════════════════════════════════
+
+class PowerShellPool:
+    """Up to `size` hosts shared between threads.
+
+    Hosts are started lazily, killed on timeout, replaced when they crash and
+    recycled after `max_uses` scripts so long sessions don't accumulate state.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, command=None, timeout=DEFAULT_TIMEOUT,
+                 max_uses=DEFAULT_MAX_USES):
+        self.size = max(1, int(size))
+        self.command = command or default_host_command()
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self._idle = []
+        self._count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        # Updated under _cond: scripts finish on several threads at once
+        self.stats = {"runs": 0, "spawned": 0, "crashed": 0, "timeouts": 0, "recycled": 0, "cancelled": 0}
+
+    def start(self, n=1):
+        """Pre-spawn up to `n` hosts so the first action doesn't pay the cold start."""
+        hosts = []
+        while True:
+            with self._cond:
+                if self._count >= min(n, self.size):
+                    break
+            host = self._reserve_and_spawn()
+            if host is None:
+                break
+            hosts.append(host)
+        for host in hosts:
+            self._release(host)
+
+    def run(self, script, timeout=None, on_line=None, cancel=None):
+        """Run a script on a free host and return its output text.
+
+        Raises subprocess.TimeoutExpired if it takes longer than `timeout`
+        (the host is killed and replaced), HostCrashed if the host dies and
+        Cancelled if the `cancel` event is set meanwhile (killed and replaced too).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if cancel is not None and cancel.is_set():
+            raise Cancelled("script cancelled")
+        host = self._acquire()
+        try:
+            output, _status = host.run(script, timeout, on_line, cancel)
+            return output
+        except subprocess.TimeoutExpired:
+            self._count_stat("timeouts")
+            host.kill()
+            host = None
+            raise
+        except Cancelled:
+            self._count_stat("cancelled")
+            host.kill()
+            host = None
+            raise
+        except HostCrashed:
+            self._count_stat("crashed")
+            host.kill()
+            host = None
+            raise
+        finally:
+            self._count_stat("runs")
+            self._release(host)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            hosts, self._idle = self._idle, []
+            self._count -= len(hosts)
+            self._cond.notify_all()
+        for host in hosts:
+            host.close()
+
+    def _count_stat(self, name):
+        with self._cond:
+            self.stats[name] += 1
+
+    def _reserve_and_spawn(self):
+        with self._cond:
+            if self._closed or self._count >= self.size:
+                return None
+            self._count += 1
+        try:
+            host = PowerShellHost(self.command)
+        except OSError:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+        self._count_stat("spawned")
+        return host
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("PowerShell pool is closed")
+                while self._idle:
+                    host = self._idle.pop()
+                    if host.alive():
+                        return host
+                    host.kill()
+                    self.stats["crashed"] += 1
+                    self._count -= 1
+                if self._count < self.size:
+                    break
+                self._cond.wait()
+        host = self._reserve_and_spawn()
+        return host if host is not None else self._acquire()
+
+    def _release(self, host):
+        retire = None
+        with self._cond:
+            if host is None:
+                self._count -= 1
+            elif self._closed or host.uses >= self.max_uses or not host.alive():
+                if host.uses >= self.max_uses:
+                    self.stats["recycled"] += 1
+                self._count -= 1
+                retire = host
+            else:
+                self._idle.append(host)
+            self._cond.notify()
+        if retire is not None:
+            retire.close()
+
+
+def stub_host_command():
+    """Command line for the Linux stand-in host (pshost_stub.py)."""
+    stub = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pshost_stub.py")
+    return [sys.executable, "-u", stub]
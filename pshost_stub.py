@@ -0,0 +1,53 @@
+"""
+Stand-in PowerShell host for Linux.
+
+Speaks the same stdin/stdout protocol as the loop in pshost.HOST_LOOP_PS but
+executes each script as Python, so the pool can be tested and benchmarked
+without powershell.exe:
+
+    LAPTOP_ASSISTANT_PS_HOST="python -u pshost_stub.py" python app.py
+"""
+import base64
+import contextlib
+import io
+import os
+import sys
+import traceback
+
+
+class _Unbuffered(io.TextIOBase):
+    """The script's stdout and stderr: written through as it is printed, like the real host's loop."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+        return len(text)
+
+
+def main():
+    sentinel = os.environ.get("PSHOST_SENTINEL", "<<<PSHOST>>>")
+    for line in sys.stdin:
+        script = base64.b64decode(line.strip()).decode("utf-8")
+        out = _Unbuffered(sys.stdout)
+        status = 0
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            try:
+                exec(compile(script, "<pshost>", "exec"), {"__name__": "__pshost__"})
+            except SystemExit:
+                raise
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+        sys.stdout.write("\n")
+        sys.stdout.write(f"{sentinel} {status}\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
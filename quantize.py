@@ -0,0 +1,118 @@
+"""
+Inference precision for the causal LM.
+
+  auto  what from_pretrained picks (torch_dtype="auto", device_map="auto")
+  fp32  float32 on CPU
+  bf16  bfloat16 on CPU, if the CPU has native bf16 (AVX512-BF16 or AMX);
+        otherwise fp32
+  int8  dynamic int8 quantization of every nn.Linear (weights int8, activations
+        quantized on the fly); the CPU path with the cheapest matmuls
+
+Converted models are cached under `cache_dir`, keyed by model ID, precision and
+torch/transformers versions, so conversion happens once:
+bf16 as a safetensors checkpoint (memory-mapped on load), int8 as the
+quantized state_dict next to the model's config (torch's dynamic-quantized
+modules have no save_pretrained format). The state_dict is loaded with
+weights_only=True: the cache is a user-writable directory, so it must not be
+able to run code the way unpickling a whole module could.
+"""
+import os
+import re
+import warnings
+
+PRECISIONS = ("auto", "fp32", "bf16", "int8")
+
+
+def cpu_supports_bf16():
+    import torch
+    cpu = torch.cpu
+    for probe in ("_is_avx512_bf16_supported", "_is_amx_tile_supported"):
+        fn = getattr(cpu, probe, None)
+        if fn is not None and fn():
+            return True
+    return False
+
+
+def artifact_path(cache_dir, model_id, precision):
+    import torch
+    import transformers
+    slug = re.sub(r"[^\w.-]+", "--", model_id)
+    tag = f"{precision}-torch{torch.__version__}-tf{transformers.__version__}"
+    return os.path.join(cache_dir, slug, re.sub(r"[^\w.-]+", "_", tag))
+
+
+def resolve_precision(precision):
+    """Validate a precision name and apply the bf16 hardware fallback."""
+    precision = (precision or "auto").lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; expected one of {', '.join(PRECISIONS)}")
+    if precision == "bf16" and not cpu_supports_bf16():
+        return "fp32"
+    return precision
+
+
+def load_causal_lm(model_id, precision="auto", cache_dir=None):
+    """Load `model_id` at `precision`, using (and filling) the converted-model cache.
+
+    Returns (model, precision actually used).
+    """
+    import torch
+    from transformers import AutoModelForCausalLM
+
+    precision = resolve_precision(precision)
+    if precision == "auto":
+        return AutoModelForCausalLM.from_pretrained(model_id, device_map="auto", torch_dtype="auto"), precision
+    if precision == "fp32":
+        return AutoModelForCausalLM.from_pretrained(model_id, torch_dtype=torch.float32), precision
+
+    path = artifact_path(cache_dir, model_id, precision) if cache_dir else None
+    if precision == "bf16":
+        if path and os.path.isfile(os.path.join(path, "config.json")):
+            return AutoModelForCausalLM.from_pretrained(path, torch_dtype=torch.bfloat16), precision
+        model = AutoModelForCausalLM.from_pretrained(model_id, torch_dtype=torch.bfloat16)
+        if path:
+            _save(lambda tmp: model.save_pretrained(tmp), path)
+        return model, precision
+
+    # int8: rebuilt from the cached config, quantized, then given the cached weights
+    weights = os.path.join(path, "model.pt") if path else None
+    if weights and os.path.isfile(weights):
+        try:
+            from transformers import AutoConfig, GenerationConfig
+            model = _quantize_int8(AutoModelForCausalLM.from_config(AutoConfig.from_pretrained(path),
+                                                                    torch_dtype=torch.float32).eval())
+            model.load_state_dict(torch.load(weights, weights_only=True))
+            model.generation_config = GenerationConfig.from_pretrained(path)
+            return model, precision
+        except Exception:
+            pass  # unreadable cache (or one from before it held a state_dict): convert again below
+    model = _quantize_int8(AutoModelForCausalLM.from_pretrained(model_id, torch_dtype=torch.float32).eval())
+    if weights:
+        def write(tmp):
+            model.config.save_pretrained(tmp)
+            model.generation_config.save_pretrained(tmp)
+            torch.save(model.state_dict(), os.path.join(tmp, "model.pt"))
+        _save(write, path)
+    return model, precision
+
+
+def _quantize_int8(model):
+    import torch
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # torch.ao eager quantization is deprecated in favour of torchao
+        from torch.ao.quantization import quantize_dynamic
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _save(write, path):
+    """Write an artifact directory atomically: into <path>.tmp, then rename."""
+    import shutil
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        write(tmp)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)  # no cache this time; the model is still usable
@@ -0,0 +1,154 @@
+"""
+Per-request response channels.
+
+Each command runs with its own Channel in a context variable, and log() adds
+an Event to whichever channel is current, so commands running at the same
+time (two UI clicks, concurrent plan actions) never see each other's output.
+asyncio tasks inherit the context they were created in; aio.to_thread passes
+it on to the blocking pool.
+
+An Event is structured rather than a display string:
+
+  message   the text, as logged
+  severity  "action" (something was done), "note" (the assistant explaining
+            itself: [AI chose ...], [Thinking...]), "error", "info",
+            "output" (a line of a command's output, as it arrived) or
+            "token" (a piece of the model's answer, as it was generated;
+            tokens continue the same line)
+  action    the intent that was running when it was logged, if any
+  at        seconds since the request started
+  seconds   how long the step it reports took, for timing events
+
+A channel also records the intents its request ran, with their arguments
+(`calls`), so the UI can pin a command as an already resolved button.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+
+SEVERITIES = ("info", "action", "note", "error", "output", "token")
+
+_channel = contextvars.ContextVar("response_channel", default=None)
+_action = contextvars.ContextVar("response_action", default=None)
+
+
+def severity_of(message):
+    """The severity of a plain log line, from the conventions log() callers already follow."""
+    if "Error" in message or "Unknown" in message or "❌" in message:
+        return "error"
+    if "->" in message:
+        return "action"
+    if message.lstrip().startswith("[") or "Thinking" in message:
+        return "note"
+    return "info"
+
+
+class Event:
+    __slots__ = ("message", "severity", "action", "at", "seconds")
+
+    def __init__(self, message, severity, action=None, at=0.0, seconds=None):
+        self.message = message
+        self.severity = severity
+        self.action = action
+        self.at = at
+        self.seconds = seconds
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return f"Event({self.severity}: {self.message!r})"
+
+
+class Channel:
+    """The events of one request. `listener(event)`, if given, is called as each one is emitted.
+
+    It also carries the request's cancellation flag: blocking work checks
+    `cancelled` (a threading.Event) to stop early, e.g. a PowerShell script
+    or the model's generate().
+    """
+
+    def __init__(self, listener=None):
+        self.listener = listener
+        self.events = []
+        self.calls = []            # (intent, args) the request ran, in order
+        self.started = time.perf_counter()
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def emit(self, message, severity=None, action=None, seconds=None):
+        event = Event(message, severity or severity_of(message), action or _action.get(),
+                      time.perf_counter() - self.started, seconds)
+        with self._lock:
+            self.events.append(event)
+        if self.listener is not None:
+            self.listener(event)
+        return event
+
+    def messages(self):
+        """The messages, in order (what process_command has always returned)."""
+        with self._lock:
+            return [e.message for e in self.events]
+
+
+def current():
+    """The channel of the request running in this context, or None."""
+    return _channel.get()
+
+
+def record_call(intent_name, args):
+    """Note on the current channel, if any, that the request is running `intent_name` with `args`."""
+    channel = _channel.get()
+    if channel is not None:
+        with channel._lock:
+            channel.calls.append((intent_name, dict(args)))
+
+
+def cancel_event():
+    """The current request's cancellation Event, or None outside of a request."""
+    channel = _channel.get()
+    return channel.cancelled if channel is not None else None
+
+
+@contextlib.contextmanager
+def opened(channel):
+    """with opened(Channel()): ... — log() in this context (and tasks/threads started from it) goes to `channel`."""
+    token = _channel.set(channel)
+    try:
+        yield channel
+    finally:
+        _channel.reset(token)
+
+
+@contextlib.contextmanager
+def acting_as(intent_name):
+    """Tag events emitted in this context with the intent being run."""
+    token = _action.set(intent_name)
+    try:
+        yield
+    finally:
+        _action.reset(token)
+
+
+class Printer:
+    """Channel listener for the CLI: prints events as they arrive, model tokens inline."""
+
+    def __init__(self, write=print):
+        self.write = write
+        self._mid_line = False
+
+    def __call__(self, event):
+        if event.severity == "token":
+            if not self._mid_line:
+                self.write("  ", end="")
+            self.write(event.message, end="", flush=True)
+            self._mid_line = True
+            return
+        if self._mid_line:
+            self.write()
+            self._mid_line = False
+        self.write(event.message)
@@ -0,0 +1,153 @@
+"""
+Compiled keyword router.
+
+Every trigger phrase of every route goes into one Aho-Corasick automaton, so a
+single left-to-right pass over the utterance finds all phrases it contains.
+Only routes whose phrases were hit are then checked, in priority order, and the
+first one whose conditions hold wins — the same first-match rules the old
+if-chain had, without re-scanning the text once per rule.
+"""
+import re
+from collections import deque
+
+
+# ═══════════════════════════════════════════════════════
+#  MULTI-PATTERN MATCHER
+# ═══════════════════════════════════════════════════════
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over a fixed set of phrases (plain substring semantics)."""
+
+    def __init__(self, phrases):
+        self.phrases = list(dict.fromkeys(phrases))
+        goto = [{}]
+        out = [set()]
+        for idx, phrase in enumerate(self.phrases):
+            state = 0
+            for ch in phrase:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(set())
+                state = nxt
+            out[state].add(idx)
+
+        # Breadth-first: failure links, merged outputs, then a full transition
+        # table so matching never has to follow failure links at runtime.
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            f = fail[state]
+            out[state] |= out[f]
+            trans = dict(delta[f])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[f].get(ch, 0)
+                trans[ch] = nxt
+                queue.append(nxt)
+            delta[state] = trans
+        self._delta = delta
+        self._out = [frozenset(o) for o in out]
+
+    def find(self, text):
+        """Return the set of phrases occurring anywhere in `text`."""
+        delta, out = self._delta, self._out
+        state = 0
+        hits = set()
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return {self.phrases[i] for i in hits}
+
+
+# ═══════════════════════════════════════════════════════
+#  ROUTES
+# ═══════════════════════════════════════════════════════
+
+class Route:
+    """One routing rule.
+
+    triggers  phrases that make the route a candidate (for regex routes: the
+              literals the regex can't match without)
+    also      at least one of these must be present too
+    excludes  none of these may be present
+    pattern   regex that must match; named groups become (stripped) arguments
+    when      extra check on the extracted arguments
+    pick      argument name that receives the best trigger hit (longest
+              first, then declaration order) — for the big name maps
+    args      fixed arguments
+    priority  lower wins; equal priorities keep declaration order
+    action    name of the intent to run (set by the intent registry)
+    """
+    __slots__ = ("action", "triggers", "also", "excludes", "pattern", "when", "pick", "args", "priority")
+
+    def __init__(self, triggers, also=(), excludes=(), pattern=None, when=None,
+                 pick=None, args=None, priority=0, action=None):
+        self.action = action
+        self.triggers = list(triggers)
+        self.also = list(also)
+        self.excludes = list(excludes)
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.when = when
+        self.pick = pick
+        self.args = dict(args or {})
+        self.priority = priority
+
+    def __repr__(self):
+        return f"Route({self.action!r}, priority={self.priority})"
+
+
+class Router:
+    """Resolves an utterance to (action, args) with one automaton pass."""
+
+    def __init__(self, routes):
+        self.routes = sorted(routes, key=lambda r: r.priority)
+        phrases = []
+        self._by_phrase = {}
+        self._rank = []
+        for order, route in enumerate(self.routes):
+            ranked = sorted(route.triggers, key=len, reverse=True)
+            self._rank.append({p: i for i, p in enumerate(ranked)})
+            for p in route.triggers:
+                self._by_phrase.setdefault(p, []).append(order)
+            phrases += route.triggers + route.also + route.excludes
+        self.matcher = PhraseMatcher(phrases)
+
+    def candidates(self, hits):
+        """Indexes into self.routes of the routes triggered by `hits`, best first."""
+        found = set()
+        for p in hits:
+            found.update(self._by_phrase.get(p, ()))
+        return sorted(found)
+
+    def resolve(self, text):
+        """Return (action, args, route) for the first matching route, or None.
+
+        `text` should already be lower-cased and stripped.
+        """
+        hits = self.matcher.find(text)
+        if not hits:
+            return None
+        for order in self.candidates(hits):
+            route = self.routes[order]
+            if route.also and not any(p in hits for p in route.also):
+                continue
+            if route.excludes and any(p in hits for p in route.excludes):
+                continue
+            args = dict(route.args)
+            if route.pattern is not None:
+                m = route.pattern.search(text)
+                if not m:
+                    continue
+                args.update({k: v.strip() for k, v in m.groupdict().items() if v is not None})
+            if route.when is not None and not route.when(args):
+                continue
+            if route.pick:
+                rank = self._rank[order]
+                args[route.pick] = min((p for p in hits if p in rank), key=rank.__getitem__)
+            return route.action, args, route
+        return None
@@ -0,0 +1,228 @@
+"""
+Semantic nearest-neighbour intent lookup.
+
+Sits between the AI decision cache and the model: the utterance is embedded
+and compared (one matrix-vector product) against every known phrasing of every
+intent. If the best match is close enough, and clearly closer than the best
+match for any other action, it is answered without calling generate().
+
+Embeddings are hashed word and character-trigram features, so there is no
+model to load and the same text always maps to the same vector. The matrix
+lives in a memory-mapped .npy file next to a JSON file of labels; it is built
+from the router's phrase lists and grows as the model resolves new phrasings.
+
+numpy is imported on first use (load_numpy()), not with the module, so a
+command the keyword router answers doesn't pay for it.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+
+np = None  # numpy, once load_numpy() has imported it
+
+DIM = 1024
+DEFAULT_THRESHOLD = 0.82
+DEFAULT_MARGIN = 0.05
+MIN_CAPACITY = 256
+
+# Politeness and filler words that say nothing about the intent
+STOPWORDS = {
+    "a", "an", "the", "please", "can", "could", "would", "will", "you", "u", "me", "my", "i",
+    "i'm", "want", "wanna", "to", "for", "of", "it", "this", "that", "just", "now", "hey",
+    "assistant", "kindly", "pls", "plz", "some", "bit", "little", "do", "is", "are", "be",
+}
+
+
+def load_numpy():
+    """The numpy module, imported on the first call. Raises ImportError without it."""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def available():
+    """Whether numpy can be imported (the semantic stage is skipped without it)."""
+    try:
+        load_numpy()
+    except ImportError:
+        return False
+    return True
+
+
+def _features(text):
+    words = [w for w in re.findall(r"[a-z0-9']+", text.lower()) if w not in STOPWORDS]
+    feats = [f"w:{w}" for w in words]
+    for w in words:
+        padded = f"<{w}>"
+        feats += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return feats
+
+
+def embed(text, dim=DIM):
+    """L2-normalized float32 vector for `text` (all zeros if it has no words)."""
+    np = load_numpy()
+    vec = np.zeros(dim, dtype=np.float32)
+    for feat in _features(text):
+        h = zlib.crc32(feat.encode("utf-8"))
+        # Words weigh more than trigrams; the sign bit spreads hash collisions out
+        vec[h % dim] += (2.0 if feat[0] == "w" else 1.0) * (1 if h & 0x80000000 else -1)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class SemanticIndex:
+    """Known phrasings -> (intent, args), searched by cosine similarity.
+
+    With a `directory` the vectors are kept in <directory>/semantic.npy
+    (memory-mapped, grown by doubling) and the labels in semantic.json;
+    without one everything stays in memory.
+    """
+
+    def __init__(self, directory=None, threshold=DEFAULT_THRESHOLD, margin=DEFAULT_MARGIN, dim=DIM):
+        load_numpy()  # the methods use the module's np
+        self.directory = directory
+        self.threshold = threshold
+        self.margin = margin
+        self.dim = dim
+        self.fingerprint = None
+        self._entries = []          # [text, intent, args, learned]
+        self._matrix = None         # capacity x dim, rows [0, len(entries)) in use
+        self._codes = None          # (intent, args) of each row, as a small int
+        self._code_of = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.directory, "semantic.npy")
+
+    @property
+    def _labels_path(self):
+        return os.path.join(self.directory, "semantic.json")
+
+    # ─── Building ───
+    def build(self, phrases, fingerprint):
+        """Load the stored index, or rebuild it if the base phrase list changed.
+
+        `phrases` is an iterable of (text, intent, args). Phrases learned from
+        the model survive a rebuild as long as their intent still exists.
+        """
+        with self._lock:
+            if self._load(fingerprint):
+                return
+            base = [[t, i, dict(a), False] for t, i, a in phrases]
+            intents = {e[1] for e in base}
+            learned = [e for e in self._read_labels().get("entries", []) if e[3] and e[1] in intents]
+            self.fingerprint = fingerprint
+            self._entries = []
+            self._matrix = None
+            self._append(base + learned)
+
+    def add(self, text, intent, args):
+        """Remember a phrasing the model resolved, so the next one like it skips the model."""
+        with self._lock:
+            if self._matrix is None or any(e[0] == text for e in self._entries):
+                return
+            self._append([[text, intent, dict(args), True]])
+
+    # ─── Lookup ───
+    def lookup(self, text):
+        """Return (intent, args, score) for a confident match, or None."""
+        with self._lock:
+            n = len(self._entries)
+            if not n:
+                return None
+            query = embed(text, self.dim)
+            if not query.any():
+                return None
+            scores = self._matrix[:n] @ query
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < self.threshold:
+                return None
+            _, intent, args, _ = self._entries[best]
+            # Ambiguous if the best phrasing of another action is nearly as close
+            others = self._codes != self._codes[best]
+            if others.any() and score - float(scores[others].max()) < self.margin:
+                return None
+            return intent, dict(args), score
+
+    # ─── Storage ───
+    def _append(self, entries):
+        vectors = np.stack([embed(e[0], self.dim) for e in entries]) if entries else None
+        n = len(self._entries)
+        needed = n + len(entries)
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed > capacity:
+            self._resize(max(MIN_CAPACITY, capacity * 2, needed))
+        if vectors is not None:
+            self._matrix[n:needed] = vectors
+        self._entries.extend(entries)
+        self._index_intents()
+        self._flush()
+
+    def _resize(self, capacity):
+        old = None if self._matrix is None else np.array(self._matrix[:len(self._entries)])
+        self._matrix = None  # release the old mapping before replacing its file
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._vectors_path + ".tmp"
+            grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+            if old is not None:
+                grown[:len(old)] = old
+            grown.flush()
+            del grown
+            os.replace(tmp, self._vectors_path)
+            self._matrix = np.load(self._vectors_path, mmap_mode="r+")
+        else:
+            self._matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            if old is not None:
+                self._matrix[:len(old)] = old
+
+    def _index_intents(self):
+        codes = []
+        for _, intent, args, _ in self._entries:
+            key = (intent, json.dumps(args, sort_keys=True))
+            codes.append(self._code_of.setdefault(key, len(self._code_of)))
+        self._codes = np.array(codes, dtype=np.int32)
+
+    def _flush(self):
+        if not self.directory:
+            return
+        self._matrix.flush()
+        tmp = self._labels_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "dim": self.dim, "entries": self._entries}, f)
+        os.replace(tmp, self._labels_path)
+
+    def _read_labels(self):
+        if not self.directory:
+            return {}
+        try:
+            with open(self._labels_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self, fingerprint):
+        labels = self._read_labels()
+        if labels.get("fingerprint") != fingerprint or labels.get("dim") != self.dim:
+            return False
+        try:
+            matrix = np.load(self._vectors_path, mmap_mode="r+")
+        except (OSError, ValueError):
+            return False
+        entries = labels.get("entries", [])
+        if matrix.shape[1] != self.dim or matrix.shape[0] < len(entries):
+            return False
+        self.fingerprint = fingerprint
+        self._entries = entries
+        self._matrix = matrix
+        self._index_intents()
+        return True
@@ -0,0 +1,347 @@
+"""
+Cached system telemetry.
+
+A Sampler collects every metric the info commands report (OS and CPU
+details, CPU load, memory, battery, boot time, disks) together, with one call
+of a platform backend's `collect()`, on a background thread, into a Snapshot
+held in memory. backend_for() picks the backend: on Windows CimBackend, a
+single PowerShell script whose CIM results come back as one ConvertTo-Json
+document (see parse_cim()); on Linux procfs.ProcBackend, which reads /proc
+and /sys directly. Info commands read() from it and only wait for a fresh sample
+when a metric they need is older than its max age (MAX_AGE); concurrent
+readers share that one refresh.
+
+The interval adapts to the power source: `interval` on AC, the longer
+`battery_interval` while discharging. Sampling pauses once nothing has read
+the snapshot for `idle_timeout` seconds and resumes with the next read, so an
+idle assistant doesn't keep waking the CPU to poll.
+
+collect() returns {metric: value}; metrics it leaves out (a failed query)
+keep their previous value and timestamp, and so does every metric when
+collect() raises.
+
+  system       SystemInfo
+  cpu_percent  CPU load, 0-100 (averaged over the processors)
+  memory       Memory
+  battery      Battery, or None without a battery
+  boot_time    when the system booted, seconds since the epoch
+  disks        [Disk]
+"""
+import json
+import threading
+import time
+
+DEFAULT_INTERVAL = 10.0
+DEFAULT_BATTERY_INTERVAL = 60.0
+DEFAULT_IDLE_TIMEOUT = 5 * 60.0
+
+# How old a metric may be and still answer a question (seconds); boot_time never changes
+MAX_AGE = {
+    "system": 3600.0,
+    "cpu_percent": 15.0,
+    "memory": 15.0,
+    "battery": 120.0,
+    "boot_time": float("inf"),
+    "disks": 120.0,
+}
+
+
+class SystemInfo:
+    __slots__ = ("os_name", "os_version", "architecture", "computer", "user", "cpu_name")
+
+    def __init__(self, os_name, os_version, architecture, computer, user, cpu_name):
+        self.os_name = os_name
+        self.os_version = os_version
+        self.architecture = architecture
+        self.computer = computer
+        self.user = user
+        self.cpu_name = cpu_name
+
+    def __repr__(self):
+        return f"SystemInfo({self.os_name!r}, {self.computer!r})"
+
+
+class Memory:
+    """Physical memory, in bytes."""
+    __slots__ = ("total", "free")
+
+    def __init__(self, total, free):
+        self.total = total
+        self.free = free
+
+    @property
+    def used(self):
+        return self.total - self.free
+
+    @property
+    def percent_used(self):
+        return self.used / self.total * 100 if self.total else 0.0
+
+    def __repr__(self):
+        return f"Memory({self.used / 2**30:.1f} / {self.total / 2**30:.1f} GiB)"
+
+
+class Battery:
+    __slots__ = ("percent", "on_battery")
+
+    def __init__(self, percent, on_battery):
+        self.percent = percent
+        self.on_battery = on_battery  # discharging
+
+    def __repr__(self):
+        return f"Battery({self.percent}%{', discharging' if self.on_battery else ''})"
+
+
+class Disk:
+    """A drive's space, in bytes."""
+    __slots__ = ("name", "used", "free")
+
+    def __init__(self, name, used, free):
+        self.name = name
+        self.used = used
+        self.free = free
+
+    @property
+    def total(self):
+        return self.used + self.free
+
+    def __repr__(self):
+        return f"Disk({self.name!r}, {self.used / 2**30:.1f} / {self.total / 2**30:.1f} GiB)"
+
+
+class Snapshot:
+    """The latest value of each metric and when it was sampled (time.monotonic())."""
+
+    def __init__(self):
+        self.values = {}
+        self.taken = {}
+
+    def update(self, values, at):
+        for name, value in values.items():
+            self.values[name] = value
+            self.taken[name] = at
+
+    def age(self, name, now=None):
+        """Seconds since `name` was sampled, or None if it never was."""
+        at = self.taken.get(name)
+        if at is None:
+            return None
+        return (now if now is not None else time.monotonic()) - at
+
+    def fresh(self, names, max_age=None):
+        """Whether every metric in `names` is younger than `max_age` (default: its MAX_AGE)."""
+        now = time.monotonic()
+        for name in names:
+            age = self.age(name, now)
+            if age is None or age > (max_age if max_age is not None else MAX_AGE.get(name, DEFAULT_INTERVAL)):
+                return False
+        return True
+
+    def copy(self):
+        snapshot = Snapshot()
+        snapshot.values, snapshot.taken = dict(self.values), dict(self.taken)
+        return snapshot
+
+
+class Sampler:
+    """Samples `collect()` in the background while it is being read. Thread-safe."""
+
+    def __init__(self, collect, interval=DEFAULT_INTERVAL, battery_interval=DEFAULT_BATTERY_INTERVAL,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.collect = collect
+        self.interval = interval
+        self.battery_interval = max(interval, battery_interval)
+        self.idle_timeout = idle_timeout or None      # seconds; None: never pause
+        self._snapshot = Snapshot()
+        self._lock = threading.Lock()                 # guards _snapshot and the stats
+        self._refresh_lock = threading.Lock()         # one collect() at a time
+        self._last_read = time.monotonic()
+        self._sampled_at = None                       # when collect() last ran (by the thread or a reader)
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.stats = {"samples": 0, "errors": 0, "hits": 0, "waits": 0, "sample_seconds": 0.0}
+
+    def read(self, *names, max_age=None):
+        """{metric: value} for `names` (all metrics if none), refreshed first if any is stale.
+
+        Starts (or resumes) background sampling. If the refresh fails the
+        last values are returned as they are (None for a metric never
+        sampled) and stats["errors"] counts it; age() tells how old they are.
+        """
+        with self._lock:
+            self._last_read = time.monotonic()
+            fresh = self._snapshot.fresh(names or MAX_AGE, max_age)
+            self.stats["hits" if fresh else "waits"] += 1
+        self.start()
+        if not fresh:
+            with self._refresh_lock:
+                with self._lock:
+                    fresh = self._snapshot.fresh(names or MAX_AGE, max_age)  # another reader refreshed it
+                if not fresh:
+                    try:
+                        self._sample()
+                    except Exception:
+                        pass  # answer from the last sample; the thread retries
+                    self._wake.set()  # the thread reschedules from this sample (and its power source)
+        with self._lock:
+            return {name: self._snapshot.values.get(name) for name in names or MAX_AGE}
+
+    def age(self, name):
+        """Seconds since `name` was sampled, or None if it never was."""
+        with self._lock:
+            return self._snapshot.age(name)
+
+    def snapshot(self):
+        """A copy of the current snapshot, without sampling."""
+        with self._lock:
+            return self._snapshot.copy()
+
+    def current_interval(self):
+        """The sampling interval for the current power source."""
+        with self._lock:
+            battery = self._snapshot.values.get("battery")
+        return self.battery_interval if battery is not None and battery.on_battery else self.interval
+
+    def start(self):
+        """Start the background thread, or wake it if it paused for idleness."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+                    self._thread.start()
+        self._wake.set()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _sample(self):
+        started = time.perf_counter()
+        self._sampled_at = time.monotonic()
+        try:
+            values = self.collect()
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        with self._lock:
+            self._snapshot.update(values, time.monotonic())
+            self.stats["samples"] += 1
+            self.stats["sample_seconds"] += time.perf_counter() - started
+
+    def _idle(self):
+        with self._lock:
+            return self.idle_timeout is not None and time.monotonic() - self._last_read >= self.idle_timeout
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            if self._idle():
+                self._wake.wait()  # paused until the next read()
+                continue
+            with self._refresh_lock:
+                due = 0 if self._sampled_at is None else self._sampled_at + self.current_interval() - time.monotonic()
+                if due <= 0:
+                    try:
+                        self._sample()
+                    except Exception:
+                        pass  # keep the last values; the next pass (or a reader) retries
+            self._wake.wait(max(due, 0) or self.current_interval())  # a read re-checks the interval
+
+
+
+# ─── Backends ───
+def backend_for(platform, run_script):
+    """The telemetry backend for `platform` (a sys.platform value).
+
+    `run_script(script)` runs PowerShell and returns its output (the CIM
+    backend's transport); it is not used on Linux.
+    """
+    if platform.startswith("linux"):
+        import procfs
+        return procfs.ProcBackend()
+    return CimBackend(run_script)
+
+
+class CimBackend:
+    """Windows: every metric from one PowerShell script, parsed by parse_cim()."""
+
+    # A query that fails leaves its section null; the boot time is sent as Unix seconds
+    # because Windows PowerShell's ConvertTo-Json writes DateTimes as "\/Date(...)\/".
+    SCRIPT = r'''
+$os = Get-CimInstance Win32_OperatingSystem -ErrorAction SilentlyContinue
+[pscustomobject]@{
+    os = $os | Select-Object Caption, Version, OSArchitecture, CSName, TotalVisibleMemorySize, FreePhysicalMemory,
+        @{N="LastBootUpTime"; E={ ([DateTimeOffset]$_.LastBootUpTime).ToUnixTimeSeconds() }}
+    cpu = @(Get-CimInstance Win32_Processor -ErrorAction SilentlyContinue | Select-Object Name, LoadPercentage)
+    battery = Get-CimInstance Win32_Battery -ErrorAction SilentlyContinue | Select-Object -First 1 EstimatedChargeRemaining, BatteryStatus
+    disks = @(Get-PSDrive -PSProvider FileSystem -ErrorAction SilentlyContinue | Where-Object { $_.Used -ne $null } | Select-Object Name, Used, Free)
+    user = $env:USERNAME
+} | ConvertTo-Json -Depth 3 -Compress
+'''
+
+    def __init__(self, run_script):
+        self.run_script = run_script
+
+    def collect(self):
+        return parse_cim(self.run_script(self.SCRIPT))
+
+
+# Win32_Battery.BatteryStatus: 1 is "discharging"
+_DISCHARGING = 1
+
+
+def _items(value):
+    """ConvertTo-Json writes a one-element array as the element itself, and no elements as null."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def parse_cim(text):
+    """Metrics from the collect script's JSON (see CimBackend.SCRIPT).
+
+    Sections that are missing or malformed (a query that failed) are left out,
+    so they keep their previous sample; the rest still parse. Raises
+    ValueError if `text` is not a JSON object at all.
+    """
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    values = {}
+    os_ = data.get("os") or {}
+    cpus = _items(data.get("cpu"))
+    try:
+        if os_:
+            values["system"] = SystemInfo(os_.get("Caption"), os_.get("Version"), os_.get("OSArchitecture"),
+                                          os_.get("CSName"), data.get("user"), cpus[0].get("Name") if cpus else None)
+    except AttributeError:
+        pass
+    try:
+        loads = [float(c["LoadPercentage"]) for c in cpus if c.get("LoadPercentage") is not None]
+        if loads:
+            values["cpu_percent"] = sum(loads) / len(loads)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        pass
+    try:
+        values["memory"] = Memory(int(os_["TotalVisibleMemorySize"]) * 1024, int(os_["FreePhysicalMemory"]) * 1024)
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        values["boot_time"] = float(os_["LastBootUpTime"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    if "battery" in data:
+        battery = data["battery"]
+        try:
+            values["battery"] = None if battery is None else Battery(
+                int(battery["EstimatedChargeRemaining"]), battery.get("BatteryStatus") == _DISCHARGING)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            pass
+    if "disks" in data:
+        try:
+            values["disks"] = [Disk(d["Name"], int(d["Used"]), int(d["Free"])) for d in _items(data["disks"])]
+        except (KeyError, TypeError, ValueError):
+            pass
+    return values
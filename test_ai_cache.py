@@ -0,0 +1,56 @@
+import pytest
+
+from ai_cache import DecisionCache, fingerprint, normalize
+
+
+def test_normalize():
+    assert normalize("  Make it  LOUDER please! ") == "make it louder please"
+    assert normalize("open chrome") == normalize("Open Chrome.")
+
+
+def test_lru_eviction_and_counters():
+    cache = DecisionCache(capacity=2)
+    cache.put("a", "open_app", {"app_name": "a"})
+    cache.put("b", "open_app", {"app_name": "b"})
+    assert cache.get("A") == ("open_app", {"app_name": "a"})  # a is now most recent
+    cache.put("c", "open_app", {"app_name": "c"})
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.stats == {"hits": 2, "misses": 1, "evictions": 1}
+
+
+def test_persists_and_invalidates_on_fingerprint_change(tmp_path):
+    path = str(tmp_path / "ai_cache.json")
+    fp = fingerprint("model-a", [{"name": "set_volume"}])
+    cache = DecisionCache(path, fingerprint=fp)
+    cache.put("crank it up", "set_volume", {"level": 100})
+
+    assert DecisionCache(path, fingerprint=fp).get("crank it up") == ("set_volume", {"level": 100})
+    other = fingerprint("model-b", [{"name": "set_volume"}])
+    assert DecisionCache(path, fingerprint=other).get("crank it up") is None
+
+
+def test_corrupt_file_starts_empty(tmp_path):
+    path = tmp_path / "ai_cache.json"
+    path.write_text("{not json")
+    assert len(DecisionCache(str(path))) == 0
+
+
+def test_ai_fallback_only_generates_once(monkeypatch):
+    main = pytest.importorskip("main")
+    monkeypatch.setattr(main, "ai_decisions", DecisionCache(fingerprint="test"))
+    monkeypatch.setattr(main, "get_semantic_index", lambda: None)
+    monkeypatch.setattr(main, "get_intent_classifier", lambda: None)
+    decisions = []
+    def fake_decide(text):
+        decisions.append(text)
+        return "web_search", {"query": "cats"}
+    executed = []
+    monkeypatch.setattr(main, "ai_decide", fake_decide)
+    monkeypatch.setattr(main, "execute_ai_function", lambda f, p: executed.append((f, p)) or True)
+
+    assert main.ai_fallback("find me some cats")
+    assert main.ai_fallback("Find me some cats!")
+    assert decisions == ["find me some cats"]
+    assert executed == [("web_search", {"query": "cats"})] * 2
+    assert main.ai_decisions.stats["hits"] == 1
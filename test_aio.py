@@ -0,0 +1,181 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import aio
+
+PY = f'"{sys.executable}" -c'
+
+
+def test_run_returns_completed_process():
+    result = aio.run_sync(aio.run(f"{PY} \"print('hi')\""))
+    assert result.returncode == 0 and result.stdout.strip() == "hi"
+
+
+def test_commands_run_concurrently_on_one_loop():
+    async def both():
+        return await asyncio.gather(*(aio.run(f'{PY} "import time; time.sleep(0.5)"') for _ in range(4)))
+
+    started = time.perf_counter()
+    results = aio.run_sync(both())
+    assert all(r.returncode == 0 for r in results)
+    assert time.perf_counter() - started < 1.5  # not 4 x 0.5 s
+
+
+def test_timeout_kills_the_process():
+    started = time.perf_counter()
+    with pytest.raises(subprocess.TimeoutExpired):
+        aio.run_sync(aio.run(f'{PY} "import time; time.sleep(30)"', timeout=0.3))
+    assert time.perf_counter() - started < 5
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="looks the process up in /proc")
+def test_cancel_kills_and_reaps_the_process():
+    pids = []
+
+    async def cancelled():
+        script = "import os, time; print(os.getpid(), flush=True); time.sleep(30)"
+        task = asyncio.ensure_future(aio.run([sys.executable, "-c", script], on_line=pids.append))
+        while not pids:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    aio.run_sync(cancelled(), timeout=10)
+    assert not os.path.exists(f"/proc/{pids[0]}")  # killed, and waited for: not left a zombie
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stands in a shell script for taskkill")
+def test_windows_kill_awaits_taskkill_without_blocking_the_loop(monkeypatch, tmp_path):
+    taskkill = tmp_path / "taskkill"
+    taskkill.write_text('#!/bin/sh\nsleep 0.3\nkill -9 "$4"\n')  # taskkill /T /F /PID <pid>
+    taskkill.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    async def kill():
+        proc = await asyncio.create_subprocess_exec(sys.executable, "-c", "import time; time.sleep(30)")
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        ticker = asyncio.ensure_future(tick())
+        monkeypatch.setattr(aio.os, "name", "nt")
+        try:
+            await aio._kill(proc)
+        finally:
+            monkeypatch.undo()
+        ticker.cancel()
+        return proc.returncode, len(ticks)
+
+    returncode, ticks = aio.run_sync(kill(), timeout=10)
+    assert returncode == -9
+    assert ticks >= 5  # the loop kept running while taskkill did
+
+
+def test_switching_narrator_off_runs_on_the_loop(monkeypatch):
+    import main
+    ran = []
+
+    async def fake_run(cmd, **kwargs):
+        ran.append((cmd, aio.get_loop().is_running()))
+
+    monkeypatch.setattr(aio, "run", fake_run)
+    assert main.registry.execute("toggle_feature", {"feature": "narrator", "on": False})
+    assert ran == [("taskkill /IM narrator.exe /F", True)]
+
+
+def test_call_accepts_sync_and_async_handlers():
+    async def async_handler(x):
+        return x + 1
+
+    assert aio.run_sync(aio.call(async_handler, 1)) == 2
+    assert aio.run_sync(aio.call(lambda x: x * 2, 3)) == 6
+
+
+def test_run_sync_refuses_the_loop_thread():
+    async def nested():
+        aio.run_sync(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        aio.run_sync(nested())
+
+
+def test_registry_runs_async_handlers_both_ways():
+    from intents import IntentRegistry
+    calls = []
+
+    async def handler(n):
+        await asyncio.sleep(0)
+        calls.append(n)
+
+    reg = IntentRegistry()
+    reg.add(handler, name="count", routes=[])
+    assert reg.execute("count", {"n": 1})
+    assert aio.run_sync(reg.execute_async("count", {"n": 2}))
+    assert calls == [1, 2]
+
+
+def test_process_command_returns_the_log(monkeypatch):
+    import main
+
+    async def lock():
+        await asyncio.sleep(0)
+        main.log("  -> locked")
+
+    monkeypatch.setattr(main.registry.intents["lock_screen"], "handler", lock)
+    assert main.process_command("lock my laptop") == ["  -> locked"]
+
+
+def test_process_command_runs_a_compound_command_as_a_plan(monkeypatch):
+    import main
+    ran = []
+    for name in ("mute_audio", "lock_screen"):
+        monkeypatch.setattr(main.registry.intents[name], "handler", lambda name=name: ran.append(name))
+
+    responses = main.process_command("mute and lock my laptop")
+    assert ran == ["mute_audio", "lock_screen"]
+    assert responses[-1].startswith("  [2 actions in 2 steps")
+
+
+def test_ai_calls_with_bad_arguments_fall_through(monkeypatch):
+    import main
+    assert main.registry.bind_tool("toggle_feature", {"feature": "volume", "on": True}) is None
+    assert main.registry.bind_tool("set_screen_timeout", {"minutes": "abc"}) is None
+    assert main.registry.bind_tool("set_screen_timeout", {"minutes": "10"}) == {"minutes": "10"}
+    assert main.registry.bind_tool("set_power_plan", {"plan": "turbo"}) is None
+
+    monkeypatch.setattr(main, "ai_decide", lambda text: ("toggle_feature", {"feature": "volume", "on": True}))
+    responses = main.process_command("crank it up")
+    assert "toggle_feature" in responses[-1] and "doesn't fit" in responses[-1]
+
+
+def test_a_failing_handler_is_logged_and_the_command_ends(monkeypatch):
+    import main
+
+    def broken():
+        raise RuntimeError("no display")
+
+    monkeypatch.setattr(main.registry.intents["lock_screen"], "handler", broken)
+    channel = aio.run_sync(main.handle_command("lock my laptop"))
+    assert [(e.severity, e.message) for e in channel.events] == [("error", "  ❌ Error: no display")]
+
+    monkeypatch.setattr(main, "ai_decide", lambda text: ("lock_screen", {}))
+    responses = main.process_command("put the laptop away")
+    assert responses[-1] == "  ❌ Error running lock_screen: no display"
+
+
+def test_run_streams_lines_as_they_arrive():
+    lines = []
+    script = "import time\nfor i in range(3):\n    print(i, flush=True)\n    time.sleep(0.1)"
+    result = aio.run_sync(aio.run([sys.executable, "-c", script], on_line=lambda line: lines.append((line, time.perf_counter()))))
+    assert [line for line, _ in lines] == ["0", "1", "2"]
+    assert lines[-1][1] - lines[0][1] > 0.15  # not all at the end
+    assert result.stdout.split() == ["0", "1", "2"]
@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+    def run(items):
+        batches.append(list(items))
+        time.sleep(0.05)
+        return [i * 10 for i in items]
+
+    b = MicroBatcher(run, max_batch=4, window=0.05)
+    results = {}
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, b.submit(i))) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    b.close()
+    assert results == {i: i * 10 for i in range(6)}
+    assert max(len(x) for x in batches) == 4
+    assert sum(len(x) for x in batches) == 6
+    assert b.stats["items"] == 6 and b.stats["largest"] == 4
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def run(items):
+        raise ValueError("model exploded")
+    b = MicroBatcher(run, window=0)
+    with pytest.raises(ValueError):
+        b.submit("x")
+    b.close()
+    with pytest.raises(RuntimeError):
+        b.submit("y")
+
+
+def test_ai_decide_goes_through_the_batcher(monkeypatch):
+    main = pytest.importorskip("main")
+    seen = []
+    def fake_batch(texts):
+        seen.append(list(texts))
+        return [("web_search", {"query": t}) for t in texts]
+    monkeypatch.setattr(main, "MODEL_BACKEND", "local")
+    monkeypatch.setattr(main, "decide_batcher", MicroBatcher(fake_batch, window=0))
+    assert main.ai_decide("find cats") == ("web_search", {"query": "find cats"})
+    assert seen == [["find cats"]]
+    main.decide_batcher.close()
@@ -0,0 +1,75 @@
+from chat_history import ChatHistory, pieces_from_dump
+
+
+def fill(history, n, lines=1):
+    ids = []
+    for i in range(n):
+        entry_id = history.add(lines=lines)
+        history.finish(entry_id)
+        ids.append(entry_id)
+    return ids
+
+
+def evict_overflow(history):
+    evicted = history.overflow()
+    for entry_id in evicted:
+        history.evict(entry_id, [(f"entry {entry_id}\n", "bot")])
+    return evicted
+
+
+def test_overflow_by_entries_and_lines(tmp_path):
+    h = ChatHistory(tmp_path / "chat.jsonl", max_entries=3, max_lines=100)
+    ids = fill(h, 5)
+    assert evict_overflow(h) == ids[:2]
+    assert [e.id for e in h.visible] == ids[2:]
+
+    h = ChatHistory(None, max_entries=100, max_lines=10)
+    ids = fill(h, 3, lines=4)
+    assert h.overflow() == ids[:1]
+
+
+def test_entries_in_progress_stay():
+    h = ChatHistory(None, max_entries=1)
+    running = h.add(lines=1)
+    fill(h, 2)
+    assert h.overflow() == []  # the oldest is still running: nothing below it leaves either
+    h.finish(running)
+    assert h.overflow() == [running, running + 1]
+
+
+def test_page_back_in_and_across_sessions(tmp_path):
+    path = tmp_path / "chat.jsonl"
+    h = ChatHistory(path, max_entries=2)
+    ids = fill(h, 6)
+    evict_overflow(h)
+    assert h.has_older()
+    page = h.page(count=3)
+    assert [entry_id for entry_id, _, _ in page] == ids[1:4]
+    assert page[0][1:] == (1, [(f"entry {ids[1]}\n", "bot")])
+    assert [e.id for e in h.visible] == ids[1:]
+    # Paged-in entries leave again without being written twice
+    assert evict_overflow(h) == ids[1:4]
+    assert len(path.read_text().splitlines()) == 4
+
+    again = ChatHistory(path, max_entries=2, max_archived=3)
+    assert len(path.read_text().splitlines()) == 3
+    new = again.add()
+    assert new == ids[3] + 1  # after the newest archived entry
+    assert [entry_id for entry_id, _, _ in again.page()] == ids[1:4]
+    assert not again.has_older()
+
+
+def test_welcome_text_is_not_archived(tmp_path):
+    h = ChatHistory(tmp_path / "chat.jsonl", max_entries=1)
+    welcome = h.add(lines=10, done=True, keep=False)
+    fill(h, 1)
+    assert evict_overflow(h) == [welcome]
+    assert not (tmp_path / "chat.jsonl").exists()
+
+
+def test_pieces_from_dump_keeps_style_tags_only():
+    dump = [("mark", "entry3", "5.0"), ("tagon", "user", "5.0"), ("text", "  You ▶  hi\n", "5.0"),
+            ("tagoff", "user", "6.0"), ("tagon", "status3", "6.0"), ("tagon", "dim", "6.0"),
+            ("text", "  ✓ done", "6.0"), ("tagoff", "dim", "6.8"), ("tagon", "cancel3", "6.8"),
+            ("text", "\n", "6.8")]
+    assert pieces_from_dump(dump) == [("  You ▶  hi\n", "user"), ("  ✓ done", "dim"), ("\n", None)]
@@ -0,0 +1,117 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+import classifier
+from classifier import IntentClassifier, SlotFiller, training_examples
+from intents import IntentRegistry
+from router import Route
+
+
+def make_registry():
+    reg = IntentRegistry()
+    reg.add(lambda level=50: None, name="set_volume", description="Set system volume",
+            params={"level": ("integer", "Volume level 0-100")}, routes=[
+        Route(["volume"], pattern=r"volume\s+(?:to\s+)?(?P<level>\d+)"),
+        Route(["louder", "volume up", "turn it up"], args={"level": 80}),
+        Route(["quieter", "volume down", "turn it down"], args={"level": 30}),
+    ])
+    reg.add(lambda app_name: None, name="open_app", description="Open an application", routes=[
+        Route(["chrome", "notepad", "spotify", "calculator"], also=["open", "launch", "start"], pick="app_name"),
+    ])
+    reg.add(lambda: None, name="empty_recycle_bin", description="Empty the recycle bin", routes=[
+        Route(["empty recycle bin", "empty trash", "clear recycle bin"]),
+    ])
+    reg.add(lambda: None, name="lock_screen", description="Lock the screen", routes=[
+        Route(["lock screen", "lock computer", "lock pc"]),
+    ])
+    return reg
+
+
+@pytest.fixture
+def trained():
+    reg = make_registry()
+    filler = SlotFiller(reg)
+    clf = IntentClassifier(threshold=0.3)
+    clf.train(training_examples(reg, [("pump up the jam", "set_volume", {"level": 90})]))
+    return clf, filler
+
+
+def test_phrasing_picks_class_and_implied_args(trained):
+    clf, _ = trained
+    assert clf.predict("make it louder please")[:2] == ("set_volume", {"level": 80})
+    assert clf.predict("please empty the trash can")[0] == "empty_recycle_bin"
+    assert clf.predict("pump up the jam")[:2] == ("set_volume", {"level": 90})  # learned from the model
+    assert clf.predict("zzz qqq") is None or clf.predict("zzz qqq")[2] < 0.5
+
+
+def test_slots_come_from_the_utterance(trained):
+    clf, filler = trained
+    intent, args, _ = clf.predict("could you launch spotify")
+    assert (intent, filler.fill("could you launch spotify", intent, args)) == ("open_app", {"app_name": "spotify"})
+    assert filler.fill("volume to 35", "set_volume", {}) == {"level": "35"}
+    assert filler.fill("set the sound at 20 percent", "set_volume", {}) == {"level": 20}
+    assert filler.fill("set the sound", "set_volume", {}) == {}         # handler default
+    assert filler.fill("launch my editor", "open_app", {}) is None      # required, not found
+
+
+def test_weights_persist_by_fingerprint(tmp_path):
+    reg = make_registry()
+    examples = training_examples(reg)
+    clf = IntentClassifier(str(tmp_path)).build(examples, "fp1")
+    loaded = IntentClassifier(str(tmp_path))
+    assert loaded._load("fp1") and not IntentClassifier(str(tmp_path))._load("fp2")
+    assert loaded.labels == clf.labels
+    assert np.array_equal(loaded.weights, clf.weights)
+
+
+def test_ai_fallback_uses_the_classifier_before_the_model(monkeypatch, trained):
+    main = pytest.importorskip("main")
+    from ai_cache import DecisionCache
+    clf, filler = trained
+    monkeypatch.setattr(main, "ai_decisions", DecisionCache(fingerprint="test"))
+    monkeypatch.setattr(main, "get_semantic_index", lambda: None)
+    monkeypatch.setattr(main, "get_intent_classifier", lambda: clf)
+    monkeypatch.setattr(main, "slot_filler", filler)
+    executed = []
+    monkeypatch.setattr(main.registry, "execute", lambda name, args: executed.append((name, args)) or True)
+    monkeypatch.setattr(main, "ai_decide", lambda text: pytest.fail("model should not be called"))
+    assert main.ai_fallback("make it louder please")
+    assert executed == [("set_volume", {"level": 80})]
+
+
+@pytest.fixture(scope="module")
+def assistant():
+    """main and a classifier trained on its registry (the threshold is set per test)."""
+    main = pytest.importorskip("main")
+    clf = IntentClassifier()
+    clf.train(training_examples(main.registry))
+    return main, clf
+
+
+def test_default_threshold_rejects_out_of_domain_requests(monkeypatch, assistant):
+    main, clf = assistant
+    monkeypatch.setattr(clf, "threshold", classifier.DEFAULT_THRESHOLD)
+    for text in ["what time does the store close", "is dark mode on", "is the volume too loud", "close the door",
+                 "kill the lights", "what is the capital of france", "is my battery healthy", "end the meeting"]:
+        guess = clf.predict(text)
+        assert guess is None or not main.registry.guessable(guess[0], guess[1]), (text, guess)
+    assert clf.predict("what's my ram usage")[0] == "show_ram_usage"
+
+
+@pytest.mark.parametrize("text, threshold", [
+    ("shut it all down", 0.3), ("lock the door", 0.3), ("turn the wifi off", 0.3),  # only the guard stops these
+    ("is the wifi on", classifier.DEFAULT_THRESHOLD),                               # the threshold stops this one
+])
+def test_ai_fallback_leaves_risky_guesses_to_the_model(monkeypatch, assistant, text, threshold):
+    main, clf = assistant
+    from ai_cache import DecisionCache
+    monkeypatch.setattr(clf, "threshold", threshold)
+    monkeypatch.setattr(main, "ai_decisions", DecisionCache(fingerprint="test"))
+    monkeypatch.setattr(main, "get_semantic_index", lambda: None)
+    monkeypatch.setattr(main, "get_intent_classifier", lambda: clf)
+    monkeypatch.setattr(main, "slot_filler", SlotFiller(main.registry))
+    monkeypatch.setattr(main.registry, "execute", lambda name, args: pytest.fail(f"guessed {name}({args})"))
+    asked = []
+    monkeypatch.setattr(main, "ai_decide", lambda text: asked.append(text))
+    assert not main.ai_fallback(text)
+    assert asked == [text]
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import time
+
+import aio
+from command_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, CommandQueue
+
+
+def wait_for(commands, timeout=5):
+    deadline = time.monotonic() + timeout
+    while any(c.active for c in commands) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+async def slow_or_fast(text, channel):
+    channel.emit(f"start {text}")
+    await asyncio.sleep(0.3 if text.startswith("slow") else 0.01)
+    channel.emit(f"end {text}")
+
+
+def test_workers_bound_concurrency_and_fast_commands_go_first():
+    order = []
+    q = CommandQueue(slow_or_fast, workers=1, is_fast=lambda text: text.startswith("fast"),
+                     on_change=lambda c: order.append((c.text, c.state)) if c.state == RUNNING else None)
+    commands = [q.submit("slow 1")]
+    while commands[0].state == QUEUED:
+        time.sleep(0.01)
+    commands += [q.submit("slow 2"), q.submit("fast 1")]
+    wait_for(commands)
+    assert [c.state for c in commands] == [DONE, DONE, DONE]
+    assert [t for t, _ in order] == ["slow 1", "fast 1", "slow 2"]
+    assert commands[2].channel.messages() == ["start fast 1", "end fast 1"]
+
+
+def test_fast_command_overtakes_a_running_slow_one():
+    q = CommandQueue(slow_or_fast, workers=2)
+    slow, fast = q.submit("slow"), q.submit("fast")
+    wait_for([fast])
+    assert fast.state == DONE and slow.state == RUNNING
+    wait_for([slow])
+
+
+def test_cancel_queued_and_running():
+    q = CommandQueue(slow_or_fast, workers=1)
+    running, queued = q.submit("slow 1"), q.submit("slow 2")
+    time.sleep(0.05)
+    assert queued.state == QUEUED and q.cancel(queued)
+    assert q.cancel(running)
+    wait_for([running])
+    assert running.state == queued.state == CANCELLED
+    assert running.channel.cancelled.is_set()
+    assert running.channel.messages() == ["start slow 1"]
+    assert not q.cancel(running)
+
+
+def test_cancel_kills_the_subprocess():
+    async def run(text, channel):
+        await aio.run(f'"{sys.executable}" -c "import time; time.sleep(30)"')
+
+    q = CommandQueue(run)
+    command = q.submit("sleep")
+    time.sleep(0.3)
+    started = time.perf_counter()
+    q.cancel(command)
+    wait_for([command])
+    assert command.state == CANCELLED and time.perf_counter() - started < 2
+
+
+def test_errors_mark_the_command_failed():
+    async def run(text, channel):
+        raise OSError("boom")
+
+    command = CommandQueue(run).submit("x")
+    wait_for([command])
+    assert command.state == FAILED and str(command.error) == "boom"
+
+
+def test_resolved_command_skips_the_text_and_goes_first(monkeypatch):
+    import main
+
+    levels = []
+    monkeypatch.setattr(main.registry.intents["set_volume"], "handler", lambda level: levels.append(level))
+    order = []
+    q = CommandQueue(slow_or_fast, workers=1, on_change=lambda c: order.append(c.text) if c.state == RUNNING else None)
+    commands = [q.submit("slow 1")]
+    while commands[0].state == QUEUED:
+        time.sleep(0.01)
+    commands += [q.submit("slow 2"),
+                 q.submit("Volume 50%", run=lambda channel: main.handle_intent("set_volume", {"level": 50}, channel))]
+    wait_for(commands)
+    assert [c.state for c in commands] == [DONE, DONE, DONE]
+    assert order == ["slow 1", "Volume 50%", "slow 2"]
+    assert levels == [50] and commands[2].channel.calls == [("set_volume", {"level": 50})]
+    assert commands[2].channel.messages() == []
@@ -0,0 +1,99 @@
+import pytest
+
+from decoding import COMPLETE, INVALID, PARTIAL, CallGrammar
+
+TOOLS = [
+    {"type": "function", "function": {"name": "set_volume", "description": "", "parameters": {
+        "type": "object", "properties": {"level": {"type": "integer"}}, "required": ["level"]}}},
+    {"type": "function", "function": {"name": "web_search", "description": "", "parameters": {
+        "type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}}},
+]
+
+
+@pytest.mark.parametrize("text, state", [
+    ("", PARTIAL),
+    ("<start_function_call>cal", PARTIAL),
+    ("call:set_vol", PARTIAL),
+    ("call:set_volumes", INVALID),
+    ("call:open_app{", INVALID),
+    ("call:set_volume{level:4", PARTIAL),
+    ("call:set_volume{level:40}", COMPLETE),
+    ("call:set_volume{level:loud", INVALID),
+    ("call:set_volume{}", INVALID),                      # required argument missing
+    ("call:set_volume{volume:40}", INVALID),
+    ("call:web_search{query:<escape>a } b", PARTIAL),     # braces inside strings are text
+    ("call:web_search{query:<escape>cats<escape>}<end_function_call>", COMPLETE),
+    ("Sorry, I can't do that", INVALID),
+])
+def test_grammar_states(text, state):
+    assert CallGrammar(TOOLS).check(text) == state
+
+
+def test_grammar_parses_typed_arguments():
+    g = CallGrammar(TOOLS)
+    assert g.parse("call:set_volume{level:40}") == ("set_volume", {"level": 40})
+    assert g.parse("call:web_search{query:<escape>weather, today<escape>}") == (
+        "web_search", {"query": "weather, today"})
+    assert g.parse("call:set_volume{level:4") is None
+
+
+class PieceTokenizer:
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    def decode(self, ids, skip_special_tokens=False):
+        return "".join(self.pieces[i] for i in ids)
+
+
+def run_constrained(pieces, preferences, eos=0):
+    """Greedy loop with the processor and stopping criteria; `preferences[i]` ranks tokens at step i."""
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from decoding import CallConstraint
+
+    c = CallConstraint(CallGrammar(TOOLS), PieceTokenizer(pieces), prompt_length=1, eos_token_id=eos, top_k=3)
+    kw = c.generate_kwargs()
+    ids = torch.tensor([[eos]])
+    for ranked in preferences:
+        scores = torch.zeros(1, len(pieces))
+        for rank, tok in enumerate(ranked):
+            scores[0, tok] = 10.0 - rank
+        scores = kw["logits_processor"](ids, scores)
+        ids = torch.cat([ids, scores.argmax(-1, keepdim=True)], dim=1)
+        if kw["stopping_criteria"](ids, scores).all():
+            break
+    return c.tokenizer.decode(ids[0, 1:].tolist()), c.finished
+
+
+def test_constraint_forces_valid_tokens_and_stops_at_brace():
+    pieces = ["</s>", "call:", "set_volume", "open_app", "{level:", "40", "loud", "}", " and more"]
+    prefs = [[1], [3, 2], [4], [6, 5], [7], [8]]
+    text, finished = run_constrained(pieces, prefs)
+    assert text == "call:set_volume{level:40}"
+    assert finished == {0: COMPLETE}
+
+
+def test_constraint_lets_the_model_decline():
+    pieces = ["</s>", "call:", "Sorry", "set_volume"]
+    text, finished = run_constrained(pieces, [[2, 1], [3]])
+    assert text == "</s>"
+    assert finished == {0: "declined"}
+
+
+def test_token_stream_reports_new_text_per_row():
+    torch = pytest.importorskip("torch")
+    from decoding import TokenStream
+
+    seen = []
+    stream = TokenStream(PieceTokenizer(["", "call:", "set_volume", "{"]), 1, lambda row, text: seen.append((row, text)))
+    assert not stream(torch.tensor([[0, 1], [0, 0]]), None).any()
+    stream(torch.tensor([[0, 1, 2], [0, 0, 1]]), None)
+    assert seen == [(0, "call:"), (0, "set_volume"), (1, "call:")]
+
+
+def test_token_stream_stops_only_the_rows_asked_to():
+    torch = pytest.importorskip("torch")
+    from decoding import TokenStream
+
+    stream = TokenStream(PieceTokenizer(["", "a"]), 1, lambda row, text: None, stop=lambda row: row == 1)
+    assert stream(torch.tensor([[0, 1], [0, 1]]), None).tolist() == [False, True]
@@ -0,0 +1,138 @@
+import pytest
+
+from intents import IntentRegistry, PinnedActions, QuickAction
+from router import Route
+
+
+def make_registry(calls):
+    def set_volume(level=50):
+        """Set the volume."""
+        calls.append(("set_volume", int(level)))
+
+    def web_search(query):
+        calls.append(("web_search", query))
+        return False
+
+    reg = IntentRegistry()
+    reg.add(set_volume, ai=True, params={"level": ("integer", "Volume level 0-100")}, routes=[
+        Route(["volume"], pattern=r"volume\s+(?:to\s+)?(?P<level>\d+)", priority=10),
+        Route(["louder"], args={"level": 80}, priority=20),
+    ])
+    reg.add(web_search, ai=True, description="Search the web",
+            params={"query": ("string", "Search query")}, routes=[
+        Route(["search"], pattern=r"search\s+(?P<query>.+)", priority=30),
+    ])
+    return reg
+
+
+def test_routes_resolve_to_intents():
+    calls = []
+    reg = make_registry(calls)
+    assert reg.resolve("Volume to 30") == ("set_volume", {"level": "30"})
+    assert reg.resolve("louder please") == ("set_volume", {"level": 80})
+    assert reg.resolve("hello") is None
+    assert reg.execute("set_volume", {"level": "30"}) is True
+    assert reg.execute("web_search", {"query": "cats"}) is False
+    assert calls == [("set_volume", 30), ("web_search", "cats")]
+
+
+def test_tool_schema_and_duplicates():
+    reg = make_registry([])
+    schema = {t["function"]["name"]: t["function"] for t in reg.tool_schema()}
+    assert schema["set_volume"]["description"] == "Set the volume"
+    assert schema["set_volume"]["parameters"]["required"] == ["level"]
+    assert schema["web_search"]["parameters"]["properties"]["query"]["type"] == "string"
+    with pytest.raises(ValueError):
+        reg.add(lambda: None, name="set_volume")
+
+
+def test_call_tool_filters_and_defaults():
+    calls = []
+    reg = make_registry(calls)
+    assert reg.call_tool("set_volume", {"level": 40, "bogus": 1}) is True
+    assert reg.call_tool("set_volume", {}) is True            # handler default
+    assert reg.call_tool("web_search", {}) is False           # required, no default
+    assert reg.call_tool("format_disk", {}) is False
+    assert calls == [("set_volume", 40), ("set_volume", 50)]
+
+
+def test_undeclared_params_come_from_the_signature():
+    calls = []
+    reg = make_registry(calls)
+    reg.add(lambda feature, on=True, minutes=5: calls.append((feature, on, minutes)), name="toggle_feature",
+            routes=[Route(["wifi"], pick="feature")])
+    schema = {t["function"]["name"]: t["function"] for t in reg.tool_schema(["toggle_feature", "web_search"])}
+    assert list(schema) == ["web_search", "toggle_feature"]
+    params = schema["toggle_feature"]["parameters"]
+    assert {p: v["type"] for p, v in params["properties"].items()} == {
+        "feature": "string", "on": "boolean", "minutes": "integer"}
+    assert params["required"] == ["feature"]
+    assert reg.call_tool("toggle_feature", {"feature": "wifi", "on": False}) is True
+    assert calls == [("wifi", False, 5)]
+    assert "wifi" in reg.tool_documents()["toggle_feature"]
+
+
+def test_bind_tool_checks_values_against_the_schema():
+    reg = make_registry([])
+    reg.add(lambda feature, on=True: None, name="toggle_feature", params={
+        "feature": ("string", "Feature", ["wifi", "bluetooth"]), "on": ("boolean", "On or off")})
+    feature = {t["function"]["name"]: t["function"] for t in reg.tool_schema(["toggle_feature"])}["toggle_feature"]
+    assert feature["parameters"]["properties"]["feature"]["enum"] == ["wifi", "bluetooth"]
+    assert reg.bind_tool("toggle_feature", {"feature": "wifi", "on": False}) == {"feature": "wifi", "on": False}
+    assert reg.bind_tool("toggle_feature", {"feature": "volume", "on": True}) is None
+    assert reg.bind_tool("toggle_feature", {"feature": "wifi", "on": "yes"}) is None
+    assert reg.bind_tool("set_volume", {"level": "40"}) == {"level": "40"}
+    assert reg.bind_tool("set_volume", {"level": "abc"}) is None
+    assert reg.bind_tool("set_volume", {"level": True}) is None
+    assert reg.bind_tool("web_search", {"query": ["cats"]}) is None
+    assert reg.call_tool("toggle_feature", {"feature": "volume"}) is False
+
+
+def test_quick_actions_are_validated():
+    reg = make_registry([])
+    reg.quick("Audio", "Volume 50%", "set volume to 50", "set_volume")
+    reg.quick("Audio", "Louder", "louder", "set_volume")
+    reg.quick("Web", "Search", "search cats", "web_search")
+    assert reg.quick_actions() == [
+        ("Audio", None, True), QuickAction("Volume 50%", "set_volume", {"level": "50"}),
+        QuickAction("Louder", "set_volume", {"level": 80}),
+        ("Web", None, True), QuickAction("Search", "web_search", {"query": "cats"}),
+    ]
+    reg.quick("Web", "Broken", "louder", "web_search")
+    with pytest.raises(ValueError):
+        reg.quick_actions()
+
+
+def test_main_quick_actions_route_to_their_intents():
+    main = pytest.importorskip("main")
+    items = main.registry.quick_actions()
+    assert QuickAction("Cancel Shutdown", "cancel_shutdown", {}) in items
+    assert QuickAction("WiFi OFF", "toggle_feature", {"feature": "wifi", "on": False}) in items
+
+
+def test_pinned_actions_persist_and_drop_stale_pins(tmp_path):
+    path = str(tmp_path / "pins.json")
+    reg = make_registry([])
+    pins = PinnedActions(reg, path)
+    pins.pin("quiet", "set_volume", {"level": 20, "bogus": 1})
+    pins.pin("cats", "web_search", {"query": "cats"})
+    pins.pin("quiet", "set_volume", {"level": 10})
+    with pytest.raises(ValueError):
+        pins.pin("nothing", "web_search", {})
+    assert PinnedActions(reg, path).items() == [
+        QuickAction("cats", "web_search", {"query": "cats"}), QuickAction("quiet", "set_volume", {"level": 10})]
+
+    other = IntentRegistry()
+    other.add(lambda level: None, name="set_volume")
+    assert [a.label for a in PinnedActions(other, path).items()] == ["quiet"]
+    assert pins.unpin("cats") and not pins.unpin("cats")
+    assert len(PinnedActions(reg, path)) == 1
+
+
+def test_phrases_expand_fixed_routes_only():
+    reg = make_registry([])
+    assert list(reg.phrases()) == [("louder", "set_volume", {"level": 80})]
+    reg.add(lambda feature, on: None, name="toggle", routes=[
+        Route(["wifi"], also=["turn on"], pick="feature", args={"on": True}),
+    ])
+    assert ("turn on wifi", "toggle", {"on": True, "feature": "wifi"}) in list(reg.phrases())
@@ -0,0 +1,37 @@
+import pytest
+
+import keys
+
+
+@pytest.fixture
+def recorder():
+    rec = keys.RecordingBackend()
+    previous = keys.set_backend(rec)
+    yield rec
+    keys.set_backend(previous)
+
+
+def test_parse_chord():
+    assert keys.parse_chord("win+ctrl+d") == [0x5B, 0x11, 0x44]
+    assert keys.parse_chord("Win + Left") == [0x5B, 0x25]
+    with pytest.raises(ValueError):
+        keys.parse_chord("win+hyper")
+
+
+def test_chord_presses_in_order_and_releases_in_reverse(recorder):
+    keys.send_chord("win+ctrl+f4", hold=0)
+    assert recorder.events == [(0x5B, True), (0x11, True), (0x73, True),
+                               (0x73, False), (0x11, False), (0x5B, False)]
+
+
+def test_repeat_single_key(recorder):
+    keys.send_chord("volume_down", repeat=3)
+    assert recorder.events == [(0xAE, True), (0xAE, False)] * 3
+
+
+def test_window_actions_use_engine(recorder):
+    main = pytest.importorskip("main")
+    main.snap_window_left()
+    main.open_emoji_panel()
+    assert recorder.events[:2] == [(0x5B, True), (0x25, True)]
+    assert (0xBE, True) in recorder.events
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from lifecycle import ModelLifecycle, current_rss
+
+
+class FakeModel:
+    def __init__(self):
+        self.loaded = False
+        self.loads = 0
+
+    def load(self):
+        self.loaded = True
+        self.loads += 1
+
+    def unload(self):
+        self.loaded = False
+
+    def lifecycle(self, **kwargs):
+        kwargs.setdefault("rss", lambda: 100)
+        return ModelLifecycle(self.load, self.unload, lambda: self.loaded, **kwargs)
+
+
+def test_use_loads_once_and_records_first_call():
+    m = FakeModel()
+    lc = m.lifecycle(idle_timeout=None)
+    with lc.use():
+        time.sleep(0.01)
+    with lc.use():
+        pass
+    stats = lc.metrics()
+    assert m.loads == 1 and stats["loads"] == 1
+    assert stats["first_call_seconds"] >= 0.01
+    assert stats["rss"] == 100 and stats["peak_rss"] == 100
+
+
+def test_racing_first_uses_load_and_count_once():
+    m = FakeModel()
+    load_lock = threading.Lock()
+
+    def slow_load():  # idempotent under its own lock, like main.load_model
+        with load_lock:
+            if not m.loaded:
+                time.sleep(0.1)
+                m.load()
+
+    lc = ModelLifecycle(slow_load, m.unload, lambda: m.loaded, idle_timeout=None, rss=lambda: 100)
+    threads = [threading.Thread(target=lc.ensure_loaded) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert m.loads == 1 and lc.metrics()["loads"] == 1
+    assert lc.metrics()["load_seconds"] >= 0.1
+
+
+def test_idle_unload_and_reload():
+    m = FakeModel()
+    lc = m.lifecycle(idle_timeout=0.05)
+    lc.ensure_loaded()
+    assert lc.check() is None
+    time.sleep(0.06)
+    assert lc.check() == "idle" and not m.loaded
+    with lc.use():
+        assert m.loaded
+    assert m.loads == 2 and lc.metrics()["unloads"] == {"idle": 1}
+
+
+def test_memory_budget_unloads_but_never_mid_call():
+    m = FakeModel()
+    rss = [100]
+    lc = m.lifecycle(idle_timeout=None, memory_budget=150, rss=lambda: rss[0])
+    lc.ensure_loaded()
+    assert lc.check() is None
+    rss[0] = 200
+    with lc.use():
+        assert lc.check() is None and m.loaded
+    assert lc.check() == "memory" and not m.loaded
+
+
+def test_memory_unload_is_not_repeated_while_it_cannot_help():
+    m = FakeModel()
+    extra = [0]
+    lc = m.lifecycle(idle_timeout=None, memory_budget=500, rss=lambda: (900 if m.loaded else 700) + extra[0])
+    lc.ensure_loaded()
+    assert lc.check() == "memory"          # 900 -> 700: still over budget
+    lc.ensure_loaded()
+    assert lc.check() is None and m.loaded  # back to 900: unloading again wouldn't get under budget
+    extra[0] = 100
+    assert lc.check() == "memory"          # grew past 900: unload again
+    assert lc.metrics()["unloads"] == {"memory": 2}
+
+
+def test_monitor_thread_unloads_in_the_background():
+    m = FakeModel()
+    unloaded = threading.Event()
+    lc = m.lifecycle(idle_timeout=0.05, check_interval=0.02, on_unload=lambda reason: unloaded.set())
+    lc.ensure_loaded()
+    assert unloaded.wait(2) and not m.loaded
+    lc.close()
+
+
+def test_current_rss_is_plausible():
+    rss = current_rss()
+    assert rss is None or rss > 1 << 20
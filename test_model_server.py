@@ -0,0 +1,182 @@
+import sys
+import threading
+import time
+
+import pytest
+
+import model_server
+import responses
+from model_server import ModelClient, ServerError
+
+
+@pytest.fixture
+def server(tmp_path):
+    calls = []
+
+    def decide(text):
+        calls.append(text)
+        channel = responses.current()
+        if channel is not None:  # a streamed request
+            channel.emit("call:toggle_wifi{on:true}", "token")
+            if text == "slow":
+                return None if channel.cancelled.wait(5) else ("toggle_wifi", {"on": True})
+        if text == "boom":
+            raise RuntimeError("model exploded")
+        return None if text == "gibberish" else ("toggle_wifi", {"on": True})
+
+    handlers = {"ping": lambda: {"pid": 1, "loaded": True}, "decide": decide}
+    address = model_server.default_address(str(tmp_path))
+    authkey = model_server.load_authkey(str(tmp_path))
+    ready = threading.Event()
+    threading.Thread(target=model_server.serve, args=(address, authkey, handlers, ready), daemon=True).start()
+    assert ready.wait(5)
+    client = ModelClient(str(tmp_path), autostart=False)
+    yield client, calls
+    client.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket path under tmp_path")
+def test_decide_round_trip(server):
+    client, calls = server
+    assert client.call("ping")["loaded"] is True
+    assert client.decide("turn on wifi") == ("toggle_wifi", {"on": True})
+    assert client.decide("gibberish") is None
+    assert calls == ["turn on wifi", "gibberish"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket path under tmp_path")
+def test_server_errors_are_raised_and_connection_survives(server):
+    client, _ = server
+    with pytest.raises(ServerError, match="model exploded"):
+        client.decide("boom")
+    with pytest.raises(ServerError, match="unknown op"):
+        client.call("nope")
+    assert client.decide("wifi on") == ("toggle_wifi", {"on": True})
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket path under tmp_path")
+def test_streamed_decide_sends_events_before_the_reply(server):
+    client, _ = server
+    events = []
+    assert client.decide("turn on wifi", on_event=lambda *e: events.append(e)) == ("toggle_wifi", {"on": True})
+    assert events == [("call:toggle_wifi{on:true}", "token")]
+    with pytest.raises(ServerError, match="model exploded"):
+        client.decide("boom", on_event=lambda *e: None)
+    assert client.decide("wifi on") == ("toggle_wifi", {"on": True})  # same pooled connection, not streamed
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket path under tmp_path")
+def test_cancel_reaches_the_server(server):
+    client, _ = server
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    started = time.monotonic()
+    assert client.decide("slow", cancel=cancel) is None
+    assert time.monotonic() - started < 2
+    assert client.decide("wifi on") == ("toggle_wifi", {"on": True})  # the connection is still in step
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket path under tmp_path")
+def test_concurrent_clients(server):
+    client, calls = server
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.decide("wifi on"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [("toggle_wifi", {"on": True})] * 8
+
+
+def test_authkey_is_created_once(tmp_path):
+    key = model_server.load_authkey(str(tmp_path))
+    assert model_server.load_authkey(str(tmp_path)) == key
+    assert len(key) == 32
+
+
+def test_only_one_worker_holds_the_server_lock(tmp_path):
+    lock = model_server.acquire_server_lock(str(tmp_path))
+    assert lock is not None
+    assert model_server.acquire_server_lock(str(tmp_path)) is None
+    model_server.run_worker(str(tmp_path))  # returns at once instead of taking over the socket
+    lock.close()
+    again = model_server.acquire_server_lock(str(tmp_path))
+    assert again is not None
+    again.close()
+
+
+def test_no_server_without_autostart(tmp_path):
+    client = ModelClient(str(tmp_path), autostart=False)
+    with pytest.raises(OSError):
+        client.call("ping")
+
+
+def test_supervisor_restarts_a_crashed_worker(tmp_path):
+    marker = tmp_path / "runs"
+    # Exits 1 (crash) on its first two runs, then 0
+    script = (f"import pathlib, sys; p = pathlib.Path({str(marker)!r}); "
+              "n = len(p.read_text()) if p.exists() else 0; p.write_text('x' * (n + 1)); "
+              "sys.exit(1 if n < 2 else 0)")
+    model_server.supervise([sys.executable, "-c", script], backoff_min=0.01)
+    assert marker.read_text() == "xxx"
+
+
+def test_main_asks_the_server_and_falls_back_to_local(monkeypatch):
+    main = pytest.importorskip("main")
+
+    class FakeClient:
+        def __init__(self, reply):
+            self.reply = reply
+
+        def decide(self, text, on_event=None, cancel=None):
+            if isinstance(self.reply, Exception):
+                raise self.reply
+            if on_event is not None:
+                on_event("call:", "token")
+            return self.reply
+
+    class FakeBatcher:
+        def submit(self, text):
+            return ("web_search", {"query": text})
+
+    monkeypatch.setattr(main, "MODEL_BACKEND", "server")
+    monkeypatch.setattr(main, "decide_batcher", FakeBatcher())
+    monkeypatch.setattr(main, "model_client", FakeClient(("mute_audio", {})))
+    assert main.ai_decide("hush") == ("mute_audio", {})
+    with responses.opened(responses.Channel()) as channel:
+        assert main.ai_decide("hush") == ("mute_audio", {})
+    assert [(e.message, e.severity) for e in channel.events] == [("call:", "token")]  # streamed from the server
+    with responses.opened(responses.Channel()) as channel:
+        channel.cancel()
+        assert main.ai_decide("hush") is None  # cancelled: a late answer is dropped
+
+    monkeypatch.setattr(main, "model_client", FakeClient(ConnectionRefusedError("no server")))
+    assert main.ai_decide("find cats") == ("web_search", {"query": "find cats"})
+    assert main.MODEL_BACKEND == "local"
+
+    monkeypatch.setattr(main, "MODEL_BACKEND", "server")
+    monkeypatch.setattr(main, "model_client", FakeClient(ServerError("ImportError: No module named 'torch'")))
+    assert main.ai_decide("find dogs") == ("web_search", {"query": "find dogs"})
+    assert main.MODEL_BACKEND == "local"
+
+
+def test_main_loads_here_when_the_server_fails_to_load(monkeypatch):
+    main = pytest.importorskip("main")
+
+    class FailingClient:
+        def call(self, op, **params):
+            raise ServerError("OSError: out of memory")
+
+    monkeypatch.setattr(main, "MODEL_BACKEND", "server")
+    monkeypatch.setattr(main, "model_precision", None)
+    monkeypatch.setattr(main, "model_client", FailingClient())
+    assert main._load_model_server() is False
+    assert main.MODEL_BACKEND == "local"
+
+
+def test_each_state_dir_gets_its_own_windows_pipe(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_server.sys, "platform", "win32")
+    a, b = model_server.default_address(str(tmp_path / "a")), model_server.default_address(str(tmp_path / "b"))
+    assert a.startswith(r"\\.\pipe\laptop_assistant_model_") and a != b
+    monkeypatch.chdir(tmp_path)
+    assert model_server.default_address("a") == a  # the same dir, however it is written
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import aio
+from plan import Plan, split
+
+ROUTES = {
+    "mute": ("mute_audio", {}),
+    "dim the screen": ("set_brightness", {"level": 30}),
+    "lock my laptop": ("lock_screen", {}),
+    "shutdown": ("shutdown_pc", {}),
+    "cancel shutdown": ("cancel_shutdown", {}),
+    "open notepad": ("open_app", {"app_name": "notepad"}),
+    "turn on wifi": ("toggle_feature", {"on": True, "feature": "wifi"}),
+    "turn on bluetooth": ("toggle_feature", {"on": True, "feature": "bluetooth"}),
+    "volume up": ("set_volume", {"level": 80}),
+    "volume down": ("set_volume", {"level": 30}),
+    "search for salt and pepper": ("web_search", {"query": "salt and pepper"}),
+    "search for salt": ("web_search", {"query": "salt"}),
+}
+resolve = ROUTES.get
+
+
+def stages(plan):
+    return [[a.intent for a in stage] for stage in plan.stages]
+
+
+def test_split_marks_sequencing_words():
+    assert split("mute, dim the screen and lock my laptop") == [
+        ("mute", False), ("dim the screen", False), ("lock my laptop", False)]
+    assert split("mute then dim the screen") == [("mute", False), ("dim the screen", True)]
+    assert split("mute, and then dim the screen") == [("mute", False), ("dim the screen", True)]
+    assert split("mute") == [("mute", False)]
+
+
+def test_independent_actions_share_a_stage_and_lock_stands_alone():
+    plan = Plan.build("mute, dim the screen and lock my laptop", resolve, final={"lock_screen"})
+    assert stages(plan) == [["mute_audio", "set_brightness"], ["lock_screen"]]
+
+
+def test_actions_after_a_final_intent_run_after_it():
+    final = {"lock_screen", "shutdown_pc"}
+    assert stages(Plan.build("shutdown and cancel shutdown", resolve, final)) == [["shutdown_pc"], ["cancel_shutdown"]]
+    assert stages(Plan.build("open notepad, then shutdown and cancel shutdown", resolve, final)) == [
+        ["open_app"], ["shutdown_pc"], ["cancel_shutdown"]]
+    assert stages(Plan.build("lock my laptop, mute and dim the screen", resolve, final)) == [
+        ["lock_screen"], ["mute_audio", "set_brightness"]]
+
+
+def test_then_and_repeated_targets_keep_their_order():
+    assert stages(Plan.build("mute then dim the screen", resolve)) == [["mute_audio"], ["set_brightness"]]
+    assert stages(Plan.build("volume up and volume down", resolve)) == [["set_volume"], ["set_volume"]]
+
+
+def test_pieces_borrow_the_previous_verb():
+    plan = Plan.build("turn on wifi and bluetooth", resolve)
+    assert [[a.args["feature"] for a in stage] for stage in plan.stages] == [["wifi", "bluetooth"]]
+
+
+def test_no_plan_for_single_or_unresolvable_commands():
+    assert Plan.build("mute", resolve) is None
+    assert Plan.build("mute and make me a sandwich", resolve) is None
+    assert Plan.build("search for salt and pepper", resolve) is None  # the query took the "and"
+
+
+def test_run_is_concurrent_within_a_stage_and_reports_outcomes():
+    async def execute(intent, args):
+        await asyncio.sleep(0.2)
+        if intent == "set_brightness":
+            raise OSError("no display")
+        return True
+
+    plan = Plan.build("mute, dim the screen and lock my laptop", resolve, final={"lock_screen"})
+    started = time.perf_counter()
+    assert not aio.run_sync(plan.run(execute))
+    assert time.perf_counter() - started < 0.55  # two stages, not three actions
+    assert [a.ok for a in plan.actions] == [True, False, True]
+    assert isinstance(plan.actions[1].error, OSError)
+    assert plan.serial_seconds > plan.seconds
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+
+import pytest
+
+import procfs
+import telemetry
+
+
+def write(root, path, text):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class FakeStatvfs:
+    f_frsize = 4096
+    f_blocks = 1000
+    f_bfree = 400
+    f_bavail = 300
+
+
+def fake_tree(root, idle=800, busy=200):
+    # user nice system idle iowait irq softirq steal guest guest_nice
+    write(root, "proc/stat", f"cpu  {busy} 0 0 {idle} 0 0 0 0 50 0\ncpu0 1 2 3 4 5 6 7 8 9 10\n"
+                             "intr 1 2 3\nbtime 1760000000\nprocesses 42\n")
+    write(root, "proc/meminfo", "MemTotal:       16000000 kB\nMemFree:         1000000 kB\n"
+                                "MemAvailable:    4000000 kB\nBuffers:          100 kB\n")
+    write(root, "proc/self/mounts", "proc /proc proc rw 0 0\n/dev/nvme0n1p2 / ext4 rw 0 0\n"
+                                    "/dev/nvme0n1p1 /boot/efi vfat rw 0 0\n/dev/nvme0n1p2 /home ext4 rw 0 0\n"
+                                    "tmpfs /tmp tmpfs rw 0 0\n/dev/sdb1 /media/usb\\040stick vfat rw 0 0\n")
+    write(root, "sys/class/power_supply/AC/type", "Mains\n")
+    write(root, "sys/class/power_supply/AC/online", "0\n")
+    write(root, "sys/class/power_supply/BAT0/type", "Battery\n")
+    write(root, "sys/class/power_supply/BAT0/capacity", "57\n")
+    write(root, "sys/class/power_supply/BAT0/status", "Discharging\n")
+    write(root, "etc/os-release", 'NAME="Ubuntu"\nPRETTY_NAME="Ubuntu 24.04.1 LTS"\n')
+    write(root, "proc/cpuinfo", "processor\t: 0\nmodel name\t: Intel(R) Core(TM) i7-1260P\n")
+
+
+def test_collect_reads_every_metric(tmp_path):
+    root = str(tmp_path)
+    fake_tree(root)
+    mounted = []
+    backend = procfs.ProcBackend(root, statvfs=lambda path: mounted.append(path) or FakeStatvfs)
+    values = backend.collect()
+    assert values["cpu_percent"] == 20.0 and values["boot_time"] == 1760000000.0
+    assert (values["memory"].total, values["memory"].free) == (16000000 * 1024, 4000000 * 1024)
+    assert values["battery"].percent == 57 and values["battery"].on_battery
+    assert mounted == ["/", "/boot/efi", "/media/usb stick"]
+    assert [(d.used, d.free) for d in values["disks"]][0] == (600 * 4096, 300 * 4096)
+    assert values["system"].os_name == "Ubuntu 24.04.1 LTS"
+    assert values["system"].cpu_name == "Intel(R) Core(TM) i7-1260P"
+
+
+def test_cpu_load_is_the_delta_since_the_last_collect(tmp_path):
+    root = str(tmp_path)
+    fake_tree(root, idle=800, busy=200)
+    backend = procfs.ProcBackend(root, statvfs=lambda path: FakeStatvfs)
+    assert backend.collect()["cpu_percent"] == 20.0     # since boot
+    fake_tree(root, idle=830, busy=270)
+    assert backend.collect()["cpu_percent"] == 70.0     # 70 busy of the last 100 ticks
+
+
+def test_missing_files_leave_metrics_out(tmp_path):
+    root = str(tmp_path)
+    write(root, "proc/meminfo", "MemTotal: 2048 kB\nMemFree: 1024 kB\n")
+    values = procfs.ProcBackend(root).collect()
+    assert values["memory"].free == 1024 * 1024 and values["battery"] is None
+    assert "cpu_percent" not in values and "disks" not in values
+
+
+def test_backend_is_selected_for_the_platform():
+    assert isinstance(telemetry.backend_for("linux", None), procfs.ProcBackend)
+    assert isinstance(telemetry.backend_for("win32", lambda script: "{}"), telemetry.CimBackend)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads this machine's /proc")
+def test_live_collect_is_cheap():
+    backend = procfs.ProcBackend()
+    values = backend.collect()
+    assert 0 <= values["cpu_percent"] <= 100 and values["memory"].total > 0
+    started = time.perf_counter()
+    for _ in range(100):
+        backend.collect()
+    assert (time.perf_counter() - started) / 100 < 0.005
@@ -0,0 +1,61 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+from prompt_cache import PromptCache
+
+
+class FakeModel:
+    device = "cpu"
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, input_ids, past_key_values, use_cache):
+        self.calls.append(("prefill", input_ids.shape[1]))
+
+    def generate(self, **kwargs):
+        self.calls.append(("generate", "past_key_values" in kwargs))
+
+
+class FakeProcessor:
+    """Template: [1, 2, 3] + one token per character + [9]."""
+    def apply_chat_template(self, messages, **kwargs):
+        ids = [1, 2, 3] + [100 + ord(c) % 50 for c in messages[-1]["content"]] + [9]
+        return {"input_ids": torch.tensor([ids])}
+
+
+def test_prefix_is_prefilled_once_and_reused():
+    model = FakeModel()
+    cache = PromptCache(FakeProcessor(), model, "system", []).build()
+    assert cache.prefix_length == 3
+    assert model.calls == [("prefill", 3)]
+
+    cache.generate(cache.encode("hello"))
+    cache.generate({"input_ids": torch.tensor([[7, 7, 7, 7]])})
+    assert model.calls[1:] == [("generate", True), ("generate", False)]
+    assert cache.stats == {"reused": 1, "full": 1}
+
+
+class ToolsProcessor(FakeProcessor):
+    """Template: [1, 2, 3] + one token per tool + one per character + [9]."""
+    def apply_chat_template(self, messages, tools=(), **kwargs):
+        ids = [1, 2, 3] + [200 + len(t["function"]["name"]) for t in tools]
+        ids += [100 + ord(c) % 50 for c in messages[-1]["content"]] + [9]
+        return {"input_ids": torch.tensor([ids])}
+
+
+def test_one_prefix_per_tool_list():
+    tool = lambda name: {"function": {"name": name}}
+    default, other = [tool("a")], [tool("bb"), tool("ccc")]
+    model = FakeModel()
+    cache = PromptCache(ToolsProcessor(), model, "system", default, max_prefixes=2).build()
+    assert cache.prefix_length == 4
+
+    cache.generate(cache.encode("hi", other), tools=other)
+    cache.generate(cache.encode("yo", other), tools=other)
+    cache.generate(cache.encode("yo", default))
+    # the second tool list is prefilled on first use, then reused like the default
+    assert model.calls == [("prefill", 4), ("prefill", 5), ("generate", True),
+                           ("generate", True), ("generate", True)]
+    assert cache.stats == {"reused": 3, "full": 0}
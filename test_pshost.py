@@ -0,0 +1,93 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+import pshost
+
+
+@pytest.fixture
+def pool():
+    p = pshost.PowerShellPool(size=2, command=pshost.stub_host_command(), timeout=10, max_uses=3)
+    yield p
+    p.close()
+
+
+def test_output_and_reuse(pool):
+    assert pool.run("print('hello')") == "hello\n"
+    assert pool.run("print('again')") == "again\n"
+    assert pool.stats["spawned"] == 1
+
+
+def test_sentinel_in_output_is_not_end_of_result(pool):
+    assert pool.run("print('<<<PSHOST-0>>> 0')\nprint('tail')") == "<<<PSHOST-0>>> 0\ntail\n"
+
+
+def test_timeout_kills_host_and_pool_recovers(pool):
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run("import time; time.sleep(5)", timeout=0.3)
+    assert pool.run("print('ok')") == "ok\n"
+    assert pool.stats["timeouts"] == 1
+
+
+def test_crash_is_reported_and_replaced(pool):
+    with pytest.raises(pshost.HostCrashed):
+        pool.run("print('partial', flush=True)\nimport os; os._exit(1)")
+    assert pool.run("print('ok')") == "ok\n"
+    assert pool.stats["crashed"] == 1
+
+
+def test_hosts_recycled_after_max_uses(pool):
+    for _ in range(4):
+        pool.run("pass")
+    assert pool.stats["recycled"] == 1
+
+
+def test_size_limit(pool):
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(pool.run(f"print({i})")))
+               for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == [f"{i}\n" for i in range(8)]
+    assert pool._count <= 2
+
+
+def test_cancel_kills_host_and_pool_recovers(pool):
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    with pytest.raises(pshost.Cancelled):
+        pool.run("import time; time.sleep(5)", cancel=cancel)
+    assert pool.run("print('ok')") == "ok\n"
+    assert pool.stats["cancelled"] == 1
+
+
+def test_stats_count_every_run_across_threads(pool):
+    threads = [threading.Thread(target=lambda: [pool.run("pass") for _ in range(10)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pool.stats["runs"] == 40
+
+
+def test_output_lines_arrive_while_the_script_runs(pool):
+    seen = []
+    started = time.monotonic()
+    out = pool.run("print('first')\nimport time; time.sleep(0.5)\nprint('second')",
+                   on_line=lambda line: seen.append((line, time.monotonic() - started)))
+    assert out == "first\nsecond\n"
+    assert [line for line, _ in seen] == ["first", "second"]
+    assert seen[0][1] < 0.4 <= seen[1][1]
+
+
+def test_run_ps_returns_what_a_timed_out_script_printed(monkeypatch, pool):
+    import main
+
+    monkeypatch.setattr(main, "ps_pool", pool)
+    assert main.run_ps("print('started')\nimport time; time.sleep(5)", timeout=0.5) == "started\n"
+    assert pool.stats["timeouts"] == 1
+    assert main.run_ps("print('ok')") == "ok\n"
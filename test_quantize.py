@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+import quantize
+
+
+def test_rejects_unknown_precision():
+    with pytest.raises(ValueError):
+        quantize.resolve_precision("int4")
+    assert quantize.resolve_precision(None) == "auto"
+
+
+def test_int8_conversion_is_cached(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    config = transformers.Gemma3TextConfig(
+        vocab_size=64, hidden_size=32, intermediate_size=64, num_hidden_layers=1,
+        num_attention_heads=2, num_key_value_heads=1, head_dim=16)
+    source = str(tmp_path / "tiny")
+    transformers.Gemma3ForCausalLM(config).save_pretrained(source)
+    cache = str(tmp_path / "cache")
+
+    model, used = quantize.load_causal_lm(source, "int8", cache)
+    assert used == "int8"
+    artifact = quantize.artifact_path(cache, source, "int8")
+    state = torch.load(os.path.join(artifact, "model.pt"), weights_only=True)  # tensors only, no pickled module
+    assert isinstance(state, dict)
+
+    monkeypatch.setattr(transformers.AutoModelForCausalLM, "from_pretrained",
+                        lambda *a, **k: pytest.fail("converted again instead of loading the cache"))
+    again, _ = quantize.load_causal_lm(source, "int8", cache)
+    ids = torch.tensor([[1, 2, 3]])
+    with torch.no_grad():
+        assert torch.equal(model(ids).logits, again(ids).logits)
+
+
+def test_int8_cache_holding_a_pickled_module_is_converted_again(tmp_path):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    config = transformers.Gemma3TextConfig(
+        vocab_size=64, hidden_size=32, intermediate_size=64, num_hidden_layers=1,
+        num_attention_heads=2, num_key_value_heads=1, head_dim=16)
+    source = str(tmp_path / "tiny")
+    transformers.Gemma3ForCausalLM(config).save_pretrained(source)
+    cache = str(tmp_path / "cache")
+    artifact = quantize.artifact_path(cache, source, "int8")
+    os.makedirs(artifact)
+    torch.save(torch.nn.Linear(2, 2), os.path.join(artifact, "model.pt"))  # what the cache used to hold
+
+    model, used = quantize.load_causal_lm(source, "int8", cache)
+    assert used == "int8" and model.config.vocab_size == 64
+    assert isinstance(torch.load(os.path.join(artifact, "model.pt"), weights_only=True), dict)
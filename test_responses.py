@@ -0,0 +1,71 @@
+import asyncio
+
+import aio
+import responses
+from responses import Channel, severity_of
+
+
+def test_severity_of_log_lines():
+    assert severity_of("  -> Volume set to 30%") == "action"
+    assert severity_of("  [AI chose: open_app({})]") == "note"
+    assert severity_of("  -> Unknown action: dance") == "error"
+    assert severity_of("  Battery: 80%") == "info"
+
+
+def test_channel_follows_tasks_and_threads():
+    def blocking():
+        responses.current().emit("from the pool")
+
+    async def command(name):
+        with responses.opened(Channel()) as channel:
+            with responses.acting_as(name):
+                await asyncio.sleep(0.05)
+                channel.emit(f"{name} started")
+                await aio.to_thread(blocking)
+        return channel
+
+    async def both():
+        return await asyncio.gather(command("a"), command("b"))
+
+    a, b = aio.run_sync(both())
+    assert a.messages() == ["a started", "from the pool"]
+    assert b.messages() == ["b started", "from the pool"]
+    assert {e.action for e in a.events} == {"a"}
+    assert responses.current() is None
+
+
+def test_listener_sees_events_as_they_happen():
+    seen = []
+    channel = Channel(listener=seen.append)
+    event = channel.emit("  -> done", seconds=0.5)
+    assert seen == [event] and event.severity == "action" and event.seconds == 0.5 and event.at >= 0
+
+
+def test_concurrent_commands_keep_their_own_output(monkeypatch):
+    import main
+
+    def handler(label, delay):
+        async def run():
+            main.log(f"  -> {label} 1")
+            await asyncio.sleep(delay)
+            main.log(f"  -> {label} 2")
+        return run
+
+    monkeypatch.setattr(main.registry.intents["mute_audio"], "handler", handler("mute", 0.1))
+    monkeypatch.setattr(main.registry.intents["lock_screen"], "handler", handler("lock", 0.05))
+
+    async def both():
+        return await asyncio.gather(main.process_command_async("mute"), main.process_command_async("lock my laptop"))
+
+    assert aio.run_sync(both()) == [["  -> mute 1", "  -> mute 2"], ["  -> lock 1", "  -> lock 2"]]
+
+
+def test_printer_keeps_tokens_on_one_line():
+    out = []
+    printer = responses.Printer(write=lambda *a, end="\n", flush=False: out.append("".join(a) + end))
+    channel = Channel(listener=printer)
+    channel.emit("  [Thinking...]")
+    channel.emit("call:", "token")
+    channel.emit("open_app", "token")
+    channel.emit("  -> Opening notepad")
+    assert "".join(out) == "  [Thinking...]\n  call:open_app\n  -> Opening notepad\n"
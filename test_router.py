@@ -0,0 +1,52 @@
+import pytest
+
+from router import PhraseMatcher, Route, Router
+
+
+def test_matcher_finds_overlapping_phrases():
+    m = PhraseMatcher(["volume", "volume up", "up", "lume"])
+    assert m.find("turn volume up") == {"volume", "volume up", "up", "lume"}
+    assert m.find("nothing here") == set()
+
+
+def test_first_route_wins_and_conditions_apply():
+    r = Router([
+        Route(["lock"], also=["screen", "pc"], action="lock"),
+        Route(["sleep"], excludes=["sleep timeout"], action="sleep"),
+        Route(["timeout"], pattern=r"sleep\s+timeout\s+(?P<minutes>\d+)", action="timeout"),
+        Route(["notepad", "note"], pick="name", action="app"),
+    ])
+    assert r.resolve("lock my pc")[:2] == ("lock", {})
+    assert r.resolve("lock the door") is None
+    assert r.resolve("sleep now")[:2] == ("sleep", {})
+    assert r.resolve("sleep timeout 10")[:2] == ("timeout", {"minutes": "10"})
+    assert r.resolve("open notepad")[:2] == ("app", {"name": "notepad"})
+
+
+def test_priority_overrides_declaration_order():
+    r = Router([
+        Route(["shutdown"], priority=20, action="shutdown"),
+        Route(["cancel shutdown"], priority=10, action="cancel"),
+    ])
+    assert r.resolve("cancel shutdown")[0] == "cancel"
+    assert r.resolve("shutdown now")[0] == "shutdown"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("turn on bluetooth", ("toggle_feature", {"feature": "bluetooth", "on": True})),
+    ("turn off dark mode", ("toggle_feature", {"feature": "dark mode", "on": False})),
+    ("set volume to 40", ("set_volume", {"level": "40"})),
+    ("max brightness", ("set_brightness", {"level": 100})),
+    ("show my public ip address", ("show_public_ip", {})),
+    ("close notepad", ("kill_process", {"name": "notepad"})),
+    ("close window", ("close_current_window", {})),
+    ("open bluetooth settings", ("open_settings", {"setting": "bluetooth"})),
+    ("open pen settings", ("open_settings", {"setting": "pen"})),
+    ("open file explorer", ("open_app", {"app_name": "file explorer"})),
+    ("cancel shutdown", ("cancel_shutdown", {})),
+    ("play lofi beats", ("play_online", {"query": "lofi beats"})),
+    ("tell me a joke", None),
+])
+def test_main_routes(text, expected):
+    main = pytest.importorskip("main")
+    assert main.route(text) == expected
@@ -0,0 +1,90 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+import semantic
+from semantic import SemanticIndex
+
+PHRASES = [
+    ("turn on bluetooth", "toggle_feature", {"feature": "bluetooth", "on": True}),
+    ("turn off bluetooth", "toggle_feature", {"feature": "bluetooth", "on": False}),
+    ("battery level", "show_battery_level", {}),
+    ("notepad", "open_app", {"app_name": "notepad"}),
+]
+
+
+def test_embed_is_normalized_and_ignores_filler():
+    v = semantic.embed("could you please open notepad")
+    assert abs(float(np.linalg.norm(v)) - 1.0) < 1e-5
+    assert float(v @ semantic.embed("open notepad")) > 0.99
+    assert not semantic.embed("please").any()
+
+
+def test_lookup_threshold_and_args():
+    index = SemanticIndex()
+    index.build(PHRASES, "fp")
+    intent, args, score = index.lookup("my battery level please")
+    assert (intent, args) == ("show_battery_level", {})
+    assert score >= index.threshold
+    assert index.lookup("notepad please")[:2] == ("open_app", {"app_name": "notepad"})
+    assert index.lookup("write me a poem about cats") is None
+
+
+def test_ambiguous_match_is_rejected():
+    index = SemanticIndex(threshold=0.3, margin=0.2)
+    index.build(PHRASES, "fp")
+    assert index.lookup("bluetooth") is None  # as close to "on" as to "off"
+
+
+def test_persists_grows_and_keeps_learned_phrases(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic, "MIN_CAPACITY", 4)
+    directory = str(tmp_path / "semantic")
+    index = SemanticIndex(directory)
+    index.build(PHRASES, "fp1")
+    index.add("crank the tunes", "set_volume", {"level": 100})  # 5th row: file doubles
+    assert index._matrix.shape[0] == 8
+
+    reloaded = SemanticIndex(directory)
+    reloaded.build([], "fp1")  # same fingerprint: loaded from disk, phrases unused
+    assert len(reloaded) == 5
+    assert reloaded.lookup("crank the tunes")[:2] == ("set_volume", {"level": 100})
+
+    rebuilt = SemanticIndex(directory)
+    rebuilt.build(PHRASES[:3] + [("volume up", "set_volume", {"level": 80})], "fp2")
+    assert len(rebuilt) == 5  # new base phrases plus the learned one
+    assert rebuilt.lookup("crank the tunes")[:2] == ("set_volume", {"level": 100})
+
+
+def test_ai_fallback_answers_from_index_and_learns(monkeypatch):
+    main = pytest.importorskip("main")
+    from ai_cache import DecisionCache
+    index = SemanticIndex()
+    index.build(PHRASES, "fp")
+    monkeypatch.setattr(main, "get_semantic_index", lambda: index)
+    monkeypatch.setattr(main, "get_intent_classifier", lambda: None)
+    monkeypatch.setattr(main, "ai_decisions", DecisionCache(fingerprint="test"))
+    executed = []
+    monkeypatch.setattr(main.registry, "execute", lambda name, args: executed.append((name, args)) or True)
+    monkeypatch.setattr(main, "execute_ai_function", lambda f, p: True)
+    monkeypatch.setattr(main, "ai_decide", lambda text: ("set_volume", {"level": 90}))
+
+    assert main.ai_fallback("notepad please")
+    assert executed == [("open_app", {"app_name": "notepad"})]
+    assert main.ai_fallback("pump up the jam")  # unknown: goes to the model, then is learned
+    assert index.lookup("pump up the jam")[:2] == ("set_volume", {"level": 90})
+
+
+def test_ai_fallback_leaves_final_and_off_matches_to_the_model(monkeypatch):
+    main = pytest.importorskip("main")
+    from ai_cache import DecisionCache
+    index = SemanticIndex()
+    index.build(PHRASES + [("shutdown", "shutdown_pc", {}), ("close notepad", "kill_process", {"name": "notepad"})],
+                "fp")
+    monkeypatch.setattr(main, "get_semantic_index", lambda: index)
+    monkeypatch.setattr(main, "get_intent_classifier", lambda: None)
+    monkeypatch.setattr(main, "ai_decisions", DecisionCache(fingerprint="test"))
+    monkeypatch.setattr(main.registry, "execute", lambda name, args: pytest.fail(f"guessed {name}({args})"))
+    asked = []
+    monkeypatch.setattr(main, "ai_decide", lambda text: asked.append(text))
+    for text in ["shutdown please", "turn off bluetooth please", "close notepad please"]:
+        assert index.lookup(text) is not None and not main.ai_fallback(text)
+    assert asked == ["shutdown please", "turn off bluetooth please", "close notepad please"]
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+
+def test_import_main_does_not_load_ml_stack():
+    code = ("import sys, main; main.route('turn on wifi'); "
+            "print('transformers' in sys.modules, 'torch' in sys.modules, 'numpy' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split()[-3:] == ["False", "False", "False"]
+
+
+def test_startup_profile_records_phases():
+    import main
+    assert "import main" in main.startup_profile
+    with main.profile_phase("test phase"):
+        pass
+    assert main.startup_profile.pop("test phase") >= 0
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+import telemetry
+from telemetry import Battery, Disk, Memory, Sampler, SystemInfo, parse_cim
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeSystem:
+    def __init__(self, delay=0.0, on_battery=False):
+        self.delay = delay
+        self.on_battery = on_battery
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def collect(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {"system": SystemInfo("Microsoft Windows 11 Home", "10.0.22631", "64-bit", "LAPTOP", "sam", "Ryzen"),
+                "cpu_percent": 12.0, "memory": Memory(16 * 2**30, 4 * 2**30),
+                "battery": Battery(80, self.on_battery), "boot_time": time.time() - 3 * 3600,
+                "disks": [Disk("C", 100 * 2**30, 50 * 2**30)]}
+
+
+def test_reads_answer_from_the_snapshot_while_fresh():
+    system = FakeSystem()
+    sampler = Sampler(system.collect, interval=60)
+    try:
+        assert sampler.read("cpu_percent") == {"cpu_percent": 12.0}
+        assert sampler.read("memory", "boot_time")["memory"].used == 12 * 2**30
+        assert system.calls == 1 and sampler.stats["hits"] == 1
+        time.sleep(0.05)
+        assert sampler.read("cpu_percent", max_age=0.01) and system.calls == 2
+    finally:
+        sampler.close()
+
+
+def test_concurrent_stale_reads_share_one_collect():
+    system = FakeSystem(delay=0.2)
+    sampler = Sampler(system.collect, interval=60)
+    try:
+        threads = [threading.Thread(target=sampler.read, args=("cpu_percent",)) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert system.calls == 1
+    finally:
+        sampler.close()
+
+
+def test_interval_adapts_to_battery_and_idle_pauses_sampling():
+    system = FakeSystem(on_battery=True)
+    sampler = Sampler(system.collect, interval=0.02, battery_interval=10, idle_timeout=0.1)
+    try:
+        sampler.read()
+        assert sampler.current_interval() == 10
+        system.on_battery = False
+        sampler.read("battery", max_age=0)
+        assert sampler.current_interval() == 0.02
+        time.sleep(0.3)
+        calls = system.calls
+        assert calls > 2                   # sampled in the background on AC...
+        time.sleep(0.2)
+        assert system.calls == calls       # ...until nothing read it for idle_timeout
+    finally:
+        sampler.close()
+
+
+def test_parse_cim_fixtures():
+    laptop = parse_cim(fixture("cim_laptop.json"))
+    assert laptop["system"].os_name == "Microsoft Windows 11 Home" and laptop["system"].user == "sam"
+    assert laptop["cpu_percent"] == 23.0 and laptop["boot_time"] == 1760600000.0
+    assert laptop["memory"].total == 16502524 * 1024 and round(laptop["memory"].percent_used) == 68
+    assert laptop["battery"].percent == 64 and laptop["battery"].on_battery
+    assert [(d.name, d.total) for d in laptop["disks"]] == [("C", 511040081920), ("D", 1101004800)]
+
+    desktop = parse_cim(fixture("cim_desktop.json"))  # pretty-printed, one disk written as a bare object
+    assert desktop["battery"] is None and desktop["cpu_percent"] == 20.0
+    assert desktop["system"].cpu_name.startswith("Intel(R) Xeon(R)")
+    assert [d.name for d in desktop["disks"]] == ["C"]
+
+
+def test_failed_queries_keep_their_last_sample():
+    snapshot = telemetry.Snapshot()
+    snapshot.update(parse_cim(fixture("cim_laptop.json")), at=time.monotonic() - 100)
+    partial = parse_cim(fixture("cim_failed_queries.json"))
+    assert set(partial) == {"battery", "disks"}
+    snapshot.update(partial, time.monotonic())
+    assert snapshot.values["system"].computer == "LAPTOP-7Q2K" and snapshot.values["disks"] == []
+    assert not snapshot.values["battery"].on_battery
+    assert not snapshot.fresh(["memory"]) and snapshot.fresh(["battery"])
+
+
+def test_info_commands_answer_from_the_sampler(monkeypatch):
+    import main
+
+    system = FakeSystem()
+    monkeypatch.setattr(main, "telemetry_sampler", Sampler(system.collect, interval=60))
+    try:
+        assert main.process_command("cpu usage") == ["  -> CPU Usage: 12%"]
+        assert main.process_command("ram usage") == ["  -> RAM: 12.0 GB / 16.0 GB (75% used)"]
+        assert main.process_command("battery level") == ["  -> Battery: 80%"]
+        assert main.process_command("uptime") == ["  -> Uptime: 0d 3h 0m"]
+        assert main.process_command("system info")[0].splitlines()[1:4] == [
+            "OS: Microsoft Windows 11 Home 64-bit", "CPU: Ryzen", "RAM: 4.0 GB free / 16.0 GB total"]
+        assert main.process_command("disk space")[0].splitlines()[1:] == [
+            "Name Used(GB) Free(GB) Total(GB)", "---- -------- -------- ---------", "C       100.0     50.0     150.0"]
+        assert system.calls == 1
+    finally:
+        main.telemetry_sampler.close()
+
+
+def test_failed_refresh_answers_from_the_last_sample(monkeypatch):
+    import main
+
+    outputs = []
+    backend = telemetry.CimBackend(lambda script: outputs.pop(0) if outputs else "")  # "": PowerShell failed
+    sampler = Sampler(backend.collect, interval=60)
+    monkeypatch.setattr(main, "telemetry_sampler", sampler)
+    try:
+        assert main.process_command("battery level") == ["  -> Battery: unavailable"]
+        assert main.process_command("cpu usage") == ["  -> CPU Usage: unavailable"]
+        assert sampler.stats["errors"] >= 1
+
+        outputs.append(fixture("cim_laptop.json"))
+        assert main.process_command("battery level") == ["  -> Battery: 64%"]
+        monkeypatch.setitem(telemetry.MAX_AGE, "battery", 0.0)  # stale: the next read refreshes, and fails
+        assert main.process_command("battery level") == ["  -> Battery: 64%"]
+        assert sampler.age("battery") > 0
+    finally:
+        sampler.close()
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("numpy")
+from tool_retrieval import ToolRetriever
+
+DOCS = {
+    "set_volume": ["Set system volume", "volume up", "louder", "quieter", "mute the sound"],
+    "set_brightness": ["Set screen brightness", "brighter", "dimmer", "brightness up"],
+    "web_search": ["Search the web", "search", "google", "look up"],
+    "empty_recycle_bin": ["Empty the recycle bin", "empty recycle bin", "empty trash"],
+    "sleep_pc": ["Put the PC to sleep", "sleep", "go to sleep"],
+}
+
+
+def test_top_k_in_registration_order():
+    r = ToolRetriever(DOCS, k=2)
+    assert r.select("make the sound louder")[0] == "set_volume"
+    assert "empty_recycle_bin" in r.select("please empty the trash can")
+    picked = r.select("google cheap flights, then sleep")
+    assert picked == ["web_search", "sleep_pc"]
+
+
+def test_every_intent_is_reachable():
+    r = ToolRetriever(DOCS, k=1)
+    for name, texts in DOCS.items():
+        assert r.select(texts[0]) == [name]
+
+
+def test_empty_utterance_gets_the_fallback():
+    r = ToolRetriever(DOCS, k=2, fallback=["set_volume", "web_search", "sleep_pc"])
+    assert r.select("please, the") == ["set_volume", "web_search"]
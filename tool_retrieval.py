@@ -0,0 +1,52 @@
+"""
+Per-request tool retrieval.
+
+Every tool the model is offered is rendered into its prompt, so offering all of
+the registry's actions would make each prompt many times longer (and prefill
+that much slower). Instead every intent is scored against the utterance and
+only the top k schemas go into the prompt, so every action is reachable while
+the prompt stays bounded.
+
+An intent's score is the best cosine similarity between the utterance and any
+of its documents (description, name, trigger phrases), using the semantic
+index's hashed embeddings: one matrix-vector product per request.
+"""
+import semantic
+
+DEFAULT_K = 6
+
+
+class ToolRetriever:
+    """Top-k intent selection over {intent_name: [texts]} (needs numpy)."""
+
+    def __init__(self, documents, k=DEFAULT_K, fallback=()):
+        np = semantic.load_numpy()
+        self.k = k
+        self.names = list(documents)
+        self.fallback = list(fallback)
+        rows, owners = [], []
+        for i, name in enumerate(self.names):
+            for text in dict.fromkeys(documents[name]):
+                rows.append(semantic.embed(text))
+                owners.append(i)
+        self._matrix = np.stack(rows)
+        self._owners = np.array(owners)
+
+    def scores(self, text):
+        """Best similarity of `text` to each intent, in `names` order."""
+        np = semantic.load_numpy()
+        best = np.full(len(self.names), -1.0, dtype=np.float32)
+        np.maximum.at(best, self._owners, self._matrix @ semantic.embed(text))
+        return best
+
+    def select(self, text):
+        """Names of the k intents most relevant to `text`, in registration order.
+
+        An utterance with no usable words gets the `fallback` names instead.
+        """
+        np = semantic.load_numpy()
+        if not semantic.embed(text).any():
+            return self.fallback[:self.k]
+        best = self.scores(text)
+        top = np.argsort(-best, kind="stable")[:self.k]
+        return [self.names[i] for i in sorted(top)]